@@ -0,0 +1,51 @@
+"""
+Pagination for high-volume transaction listings.
+
+The default ``PageNumberPagination`` runs a ``COUNT(*)`` and an OFFSET scan
+for every page, both of which grow with the table. Listings that mix in
+``OptionalCursorPaginationMixin`` keep page numbers by default but switch to
+keyset (cursor) pagination when the client asks for it with
+``?pagination=cursor``. Pages are then fetched by seeking from the last row
+of the previous page on the view's ``ordering`` (a date plus an id
+tiebreak), so deep scrolling costs the same as the first page.
+"""
+from rest_framework.pagination import CursorPagination
+from rest_framework.settings import api_settings
+
+CURSOR_PAGINATION_PARAM = 'pagination'
+CURSOR_PAGINATION_VALUE = 'cursor'
+
+
+class TransactionCursorPagination(CursorPagination):
+    """Cursor pagination keyed on the ordering of the view it serves."""
+    page_size = api_settings.PAGE_SIZE
+
+    def __init__(self, ordering=None):
+        if ordering:
+            self.ordering = ordering
+
+
+def wants_cursor_pagination(request):
+    """True when the client opted into cursor pagination."""
+    params = request.query_params if hasattr(request, 'query_params') else request.GET
+    return (
+        params.get(CURSOR_PAGINATION_PARAM) == CURSOR_PAGINATION_VALUE
+        or TransactionCursorPagination.cursor_query_param in params
+    )
+
+
+class OptionalCursorPaginationMixin:
+    """
+    Serve ``?pagination=cursor`` requests with ``TransactionCursorPagination``.
+
+    The view's ``ordering`` must end with a unique tiebreak (usually ``-id``)
+    so that rows sharing a timestamp are never skipped or repeated.
+    """
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            if wants_cursor_pagination(self.request):
+                self._paginator = TransactionCursorPagination(ordering=self.ordering)
+                return self._paginator
+        return super().paginator
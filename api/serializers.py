@@ -1,5 +1,8 @@
+from decimal import Decimal
+
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from django.db import transaction
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 import logging
 
@@ -7,7 +10,7 @@ logger = logging.getLogger(__name__)
 from groups.models import (
     Kikoba, KikobaMembership, KikobaInvitation, 
     KikobaContributionConfig, EntryFeePayment, 
-    ShareContribution, EmergencyFundContribution
+    ShareContribution, EmergencyFundContribution, RoscaRotation
 )
 from savings.models import Saving, KikobaBalance, MemberBalance, SavingCycle, Contribution
 from loans.models import LoanProduct, LoanApplication, Loan, Repayment, LoanGuarantor
@@ -107,6 +110,9 @@ class KikobaSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'kikoba_number', 'created_by']
     
     def get_member_count(self, obj):
+        # Annotated by KikobaViewSet.get_queryset; fall back to a COUNT elsewhere
+        if hasattr(obj, 'active_member_count'):
+            return obj.active_member_count
         return obj.kikoba_memberships.filter(is_active=True).count()
 
 
@@ -133,13 +139,38 @@ class KikobaInvitationSerializer(serializers.ModelSerializer):
     class Meta:
         model = KikobaInvitation
         fields = [
-            'id', 'kikoba', 'kikoba_name', 'phone_number', 
-            'invited_by', 'invited_by_name', 'status', 
+            'id', 'kikoba', 'kikoba_name', 'email_or_phone', 'invitation_code',
+            'role', 'invited_by', 'invited_by_name', 'status', 
             'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'invitation_code', 'invited_by', 'created_at', 'updated_at']
 
 
+class RoscaRotationSerializer(serializers.ModelSerializer):
+    """Serializer for choosing a ROSCA kikoba's payout rotation"""
+    recipient_order = serializers.ListField(
+        child=serializers.IntegerField(),
+        required=False,
+        help_text="Membership ids in payout order (defaults to active members in joining order)"
+    )
+    meeting_frequency = serializers.ChoiceField(choices=Kikoba.FREQUENCY_CHOICES, required=False)
+    
+    class Meta:
+        model = RoscaRotation
+        fields = ['recipient_order', 'contribution_amount', 'start_date', 'meeting_frequency']
+    
+    def validate_recipient_order(self, value):
+        kikoba = self.context['kikoba']
+        if len(set(value)) != len(value):
+            raise serializers.ValidationError("A member can only appear once in the rotation.")
+        active_ids = set(
+            kikoba.kikoba_memberships.filter(is_active=True, id__in=value).values_list('id', flat=True)
+        )
+        unknown = [membership_id for membership_id in value if membership_id not in active_ids]
+        if unknown:
+            raise serializers.ValidationError(f"Not active memberships of this kikoba: {unknown}")
+        return value
+
 class SavingSerializer(serializers.ModelSerializer):
     """Serializer for Saving transactions"""
     member_name = serializers.CharField(source='member.name', read_only=True)
@@ -220,7 +251,7 @@ class LoanProductSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'kikoba', 'kikoba_name', 'name', 'interest_rate',
             'min_amount', 'max_amount', 'min_duration_days',
-            'max_duration_days', 'grace_period_days', 'is_active', 'description'
+            'max_duration_days', 'grace_period_days', 'amortization_method', 'is_active', 'description'
         ]
         read_only_fields = ['id']
 
@@ -378,31 +409,38 @@ class LoanApplicationCreateSerializer(serializers.Serializer):
         # Get the kikoba
         kikoba = Kikoba.objects.get(id=kikundi_id)
         
-        # Create loan application
-        loan_app = LoanApplication.objects.create(
-            member=self.context['request'].user,
-            kikoba=kikoba,
-            requested_amount=amount,
-            purpose=validated_data['purpose'],
-            purpose_description=validated_data.get('purpose_description', ''),
-            repayment_period=validated_data['repayment_period'],
-            applicant_id_number=validated_data['applicant_id_number'],
-            interest_rate=validated_data['interest_rate'],
-            total_amount=validated_data['total_amount'],
-            monthly_installment=validated_data['monthly_installment'],
-            collateral_description=validated_data.get('collateral_description', ''),
-            applicant_id_photo=validated_data.get('applicant_id_photo'),
-            applicant_photo=validated_data.get('applicant_photo'),
-        )
+        # Take the number before the transaction so it comes from this
+        # process's reserved block instead of locking the counter row
+        application_number = LoanApplication.next_application_number()
         
-        # Create guarantors
-        for guarantor_data in guarantors_data:
-            LoanGuarantor.objects.create(
-                loan_application=loan_app,
-                name=guarantor_data['name'],
-                phone_number=guarantor_data['phone_number'],
-                id_number=guarantor_data['id_number'],
+        with transaction.atomic():
+            loan_app = LoanApplication.objects.create(
+                application_number=application_number,
+                member=self.context['request'].user,
+                kikoba=kikoba,
+                requested_amount=amount,
+                purpose=validated_data['purpose'],
+                purpose_description=validated_data.get('purpose_description', ''),
+                repayment_period=validated_data['repayment_period'],
+                applicant_id_number=validated_data['applicant_id_number'],
+                interest_rate=validated_data['interest_rate'],
+                total_amount=validated_data['total_amount'],
+                monthly_installment=validated_data['monthly_installment'],
+                collateral_description=validated_data.get('collateral_description', ''),
+                applicant_id_photo=validated_data.get('applicant_id_photo'),
+                applicant_photo=validated_data.get('applicant_photo'),
             )
+            
+            # Create guarantors
+            LoanGuarantor.objects.bulk_create([
+                LoanGuarantor(
+                    loan_application=loan_app,
+                    name=guarantor_data['name'],
+                    phone_number=guarantor_data['phone_number'],
+                    id_number=guarantor_data['id_number'],
+                )
+                for guarantor_data in guarantors_data
+            ])
         
         return loan_app
 
@@ -477,6 +515,23 @@ class ShareContributionSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'amount_paid', 'is_fully_paid']
 
 
+class InstallmentSerializer(serializers.Serializer):
+    """One installment towards an entry fee payment or share contribution"""
+    payment = serializers.IntegerField(min_value=1, help_text="Entry fee payment or share contribution ID")
+    amount = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=Decimal('0.01'))
+
+
+class InstallmentBatchSerializer(serializers.Serializer):
+    """Installments across members, recorded together (e.g. at a meeting)"""
+    MAX_INSTALLMENTS = 500
+
+    installments = serializers.ListField(
+        child=InstallmentSerializer(),
+        min_length=1,
+        max_length=MAX_INSTALLMENTS
+    )
+
+
 class EmergencyFundContributionSerializer(serializers.ModelSerializer):
     """Serializer for Emergency Fund Contributions"""
     member_name = serializers.CharField(source='kikoba_membership.user.name', read_only=True)
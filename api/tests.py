@@ -0,0 +1,479 @@
+import json
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from groups.models import (
+    Kikoba, KikobaMembership, KikobaInvitation,
+    EntryFeePayment, ShareContribution, EmergencyFundContribution, RoscaRotation
+)
+from loans.models import LoanProduct, LoanApplication, LoanGuarantor, Loan, Repayment
+from notifications.models import Notification
+from registration.models import User
+from savings.models import Saving, Contribution, SavingCycle
+
+from .urls import router
+
+API_ROOT = '/api/v1/'
+
+
+class QueryBudgetTests(TestCase):
+    """
+    Every ViewSet registered on the API router declares ``query_budgets`` for
+    its list and retrieve actions. The budget is the total number of queries
+    for the request (JWT user lookup included) and must not depend on how
+    many rows the endpoint returns.
+    """
+
+    def setUp(self):
+        self.admin = User.objects.create_user(phone_number='0700000000', name='Admin', password='1234')
+        self.kikoba = Kikoba.objects.create(name='Budget Kikoba', created_by=self.admin)
+        self.admin_membership = KikobaMembership.objects.create(
+            kikoba=self.kikoba, user=self.admin, role='kikoba_admin'
+        )
+        self.cycle = SavingCycle.objects.create(kikoba=self.kikoba, name='Cycle 1', start_date='2025-01-01')
+        self.product = LoanProduct.objects.create(
+            kikoba=self.kikoba, name='Standard', interest_rate=Decimal('10'),
+            max_amount=Decimal('100000'), max_duration_days=90
+        )
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.admin)}')
+        self.members = 0
+        self.add_members(2)
+
+    def add_members(self, count):
+        """Create ``count`` members, each with a row in every API listing."""
+        for _ in range(count):
+            self.members += 1
+            user = User.objects.create_user(
+                phone_number=f'0711{self.members:06d}', name=f'Member {self.members}', password='1234'
+            )
+            KikobaMembership.objects.create(kikoba=self.kikoba, user=user)
+            Kikoba.objects.create(name=f'Kikoba {self.members}', created_by=self.admin)
+            KikobaInvitation.objects.create(
+                kikoba=self.kikoba, invited_by=self.admin, email_or_phone=user.phone_number
+            )
+            Saving.objects.create(
+                group=self.kikoba, member=user, amount=Decimal('1000'),
+                status='confirmed', confirmed_by=self.admin
+            )
+            Contribution.objects.create(
+                kikoba=self.kikoba, member=user, saving_cycle=self.cycle, amount=Decimal('1000')
+            )
+            application = LoanApplication.objects.create(
+                member=user, kikoba=self.kikoba, loan_product=self.product,
+                requested_amount=Decimal('10000'), decision_by=self.admin
+            )
+            LoanGuarantor.objects.create(
+                loan_application=application, name='Guarantor', phone_number='0722000000',
+                id_number='1', guaranteed_amount=Decimal('5000')
+            )
+            loan = Loan.objects.create(application=application, disbursed_amount=Decimal('10000'), status='active')
+            Repayment.objects.create(loan=loan, amount_paid=Decimal('1000'), is_verified=True, verified_by=self.admin)
+            Notification.objects.create(
+                user=self.admin, kikoba=self.kikoba, type='saving_confirmed', title='Saving', message='Confirmed'
+            )
+            # Fee listings are scoped to the caller's own memberships
+            EntryFeePayment.objects.create(
+                kikoba_membership=self.admin_membership, amount_due=Decimal('5000'), amount_paid=Decimal('5000')
+            )
+            ShareContribution.objects.create(
+                kikoba_membership=self.admin_membership, amount_due=Decimal('20000'), amount_paid=Decimal('20000'),
+                period_start='2025-01-01', period_end='2025-01-31'
+            )
+            EmergencyFundContribution.objects.create(kikoba_membership=self.admin_membership, amount=Decimal('1000'))
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, f'{url}: {response.content[:200]}')
+        return response, len(ctx.captured_queries)
+
+    def test_every_viewset_declares_budgets(self):
+        for prefix, viewset, basename in router.registry:
+            with self.subTest(prefix=prefix):
+                budgets = getattr(viewset, 'query_budgets', None)
+                self.assertIsNotNone(budgets, f'{viewset.__name__} has no query_budgets')
+                self.assertIn('list', budgets)
+                self.assertIn('retrieve', budgets)
+
+    def test_list_and_retrieve_within_budget(self):
+        for prefix, viewset, basename in router.registry:
+            with self.subTest(prefix=prefix):
+                response, queries = self.count_queries(f'{API_ROOT}{prefix}/')
+                self.assertLessEqual(queries, viewset.query_budgets['list'])
+                results = response.data['results']
+                self.assertTrue(results, f'{prefix} returned no rows')
+
+                detail_url = f"{API_ROOT}{prefix}/{results[0]['id']}/"
+                response, queries = self.count_queries(detail_url)
+                self.assertLessEqual(queries, viewset.query_budgets['retrieve'])
+
+    def test_list_queries_do_not_grow_with_rows(self):
+        before = {
+            prefix: self.count_queries(f'{API_ROOT}{prefix}/')[1]
+            for prefix, viewset, basename in router.registry
+        }
+        self.add_members(5)
+        for prefix, viewset, basename in router.registry:
+            with self.subTest(prefix=prefix):
+                self.assertEqual(self.count_queries(f'{API_ROOT}{prefix}/')[1], before[prefix])
+
+
+class AccessScopingTests(TestCase):
+    """Listings show the caller's own rows and those of their vikoba, once each."""
+
+    def setUp(self):
+        self.member = User.objects.create_user(phone_number='0700000001', name='Member', password='1234')
+        self.outsider = User.objects.create_user(phone_number='0700000002', name='Outsider', password='1234')
+        self.kikoba = Kikoba.objects.create(name='Scoped Kikoba')
+        KikobaMembership.objects.create(kikoba=self.kikoba, user=self.member)
+        other = Kikoba.objects.create(name='Other Kikoba')
+        KikobaMembership.objects.create(kikoba=other, user=self.outsider)
+        Contribution.objects.create(kikoba=self.kikoba, member=self.outsider, amount=Decimal('1000'))
+        Contribution.objects.create(kikoba=other, member=self.member, amount=Decimal('2000'))
+        Contribution.objects.create(kikoba=other, member=self.outsider, amount=Decimal('3000'))
+
+    def list_amounts(self, user):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+        response = client.get(f'{API_ROOT}contributions/')
+        self.assertEqual(response.status_code, 200)
+        return sorted(Decimal(row['amount']) for row in response.data['results'])
+
+    def test_member_sees_own_rows_and_kikoba_rows(self):
+        self.assertEqual(self.list_amounts(self.member), [Decimal('1000'), Decimal('2000')])
+
+    def test_outsider_sees_only_own_and_own_kikoba_rows(self):
+        self.assertEqual(self.list_amounts(self.outsider), [Decimal('1000'), Decimal('2000'), Decimal('3000')])
+
+
+class CursorPaginationTests(TestCase):
+    """``?pagination=cursor`` walks a listing by keyset, without COUNT or OFFSET."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(phone_number='0700000003', name='Member', password='1234')
+        kikoba = Kikoba.objects.create(name='Cursor Kikoba')
+        KikobaMembership.objects.create(kikoba=kikoba, user=self.user)
+        # Shared timestamps exercise the id tiebreak
+        when = timezone.now()
+        for i in range(45):
+            Contribution.objects.create(
+                kikoba=kikoba, member=self.user, amount=Decimal('100') + i,
+                date_contributed=when - timedelta(days=i // 3)
+            )
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+
+    def test_pages_cover_every_row_once(self):
+        url = f'{API_ROOT}contributions/?pagination=cursor'
+        seen = []
+        page_queries = set()
+        while url:
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn('count', response.data)
+            self.assertFalse(any('COUNT(' in q['sql'] for q in ctx.captured_queries))
+            page_queries.add(len(ctx.captured_queries))
+            seen.extend(row['id'] for row in response.data['results'])
+            url = response.data['next']
+
+        expected = list(
+            Contribution.objects.order_by('-date_contributed', '-id').values_list('id', flat=True)
+        )
+        self.assertEqual(seen, expected)
+        self.assertEqual(len(page_queries), 1)
+
+    def test_page_numbers_remain_the_default(self):
+        response = self.client.get(f'{API_ROOT}contributions/')
+        self.assertEqual(response.data['count'], 45)
+
+
+class RoscaRotationTests(TestCase):
+    """A ROSCA kikoba's rotation is stored once and read back without per-member work."""
+
+    def setUp(self):
+        self.admin = User.objects.create_user(phone_number='0700000004', name='Admin', password='1234')
+        self.kikoba = Kikoba.objects.create(name='Rosca Kikoba', group_type='rosca', created_by=self.admin)
+        self.memberships = [KikobaMembership.objects.create(kikoba=self.kikoba, user=self.admin, role='kikoba_admin')]
+        for i in range(4):
+            user = User.objects.create_user(phone_number=f'0733{i:06d}', name=f'Member {i}', password='1234')
+            self.memberships.append(KikobaMembership.objects.create(kikoba=self.kikoba, user=user))
+        self.url = f'{API_ROOT}vikoba/{self.kikoba.id}/rosca/'
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.admin)}')
+
+    def start_rotation(self, **data):
+        return self.client.post(self.url, {
+            'contribution_amount': '50000.00', 'start_date': '2025-01-31', 'meeting_frequency': 'monthly', **data
+        }, format='json')
+
+    def test_default_order_and_next_recipient(self):
+        response = self.start_rotation()
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['recipient_order'], [m.id for m in self.memberships])
+        self.assertEqual(response.data['pot_size'], 250000.0)
+        self.assertEqual(response.data['next_meeting']['recipient']['user_id'], self.admin.id)
+
+        response = self.client.post(f'{self.url}payout/')
+        self.assertEqual(response.data['next_meeting']['meeting_number'], 2)
+        self.assertEqual(response.data['next_meeting']['meeting_date'], '2025-02-28')
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.url)
+        self.assertEqual(response.data['next_meeting']['recipient']['membership_id'], self.memberships[1].id)
+        # JWT user, kikoba, membership check, rotation, next recipient
+        self.assertEqual(len(ctx.captured_queries), 5)
+
+    def test_custom_order_is_validated(self):
+        order = [m.id for m in reversed(self.memberships)]
+        self.assertEqual(self.start_rotation(recipient_order=order).data['recipient_order'], order)
+        self.assertEqual(self.start_rotation(recipient_order=order + [order[0]]).status_code, 400)
+        self.assertEqual(self.start_rotation(recipient_order=[0]).status_code, 400)
+        self.assertEqual(RoscaRotation.objects.get(kikoba=self.kikoba).recipient_order, order)
+
+    def test_schedule_is_streamed(self):
+        self.start_rotation()
+        response = self.client.get(f'{self.url}schedule/')
+        self.assertTrue(response.streaming)
+        data = json.loads(b''.join(response.streaming_content))
+        self.assertEqual([m['meeting_number'] for m in data['meetings']], [1, 2, 3, 4, 5])
+        self.assertEqual(data['meetings'][4]['recipient']['name'], 'Member 3')
+
+    def test_rotation_closes_after_everyone_is_paid(self):
+        self.start_rotation()
+        for _ in self.memberships:
+            self.assertEqual(self.client.post(f'{self.url}payout/').status_code, 200)
+        self.assertIsNone(self.client.get(self.url).data['next_meeting'])
+        self.assertEqual(self.client.post(f'{self.url}payout/').status_code, 400)
+
+
+class KikobaTypeSimulationApiTests(TestCase):
+    """Kikoba-type simulation is limited to the vikoba the caller administers."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(phone_number='0700000005', name='Treasurer', password='1234')
+        self.kikoba = Kikoba.objects.create(name='Simulation Kikoba', created_by=self.user)
+        self.other = Kikoba.objects.create(name='Other Kikoba')
+        KikobaMembership.objects.create(kikoba=self.kikoba, user=self.user, role='treasurer')
+        KikobaMembership.objects.create(kikoba=self.other, user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+        self.url = f'{API_ROOT}vikoba/type-simulation/'
+
+    def test_treasurer_simulates_own_vikoba(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual({row['kikoba_id'] for row in response.data['results']}, {self.kikoba.id})
+        self.assertEqual(response.data['count'], len(response.data['group_types']))
+        self.assertEqual(self.client.get(f'{self.url}?ids={self.other.id}').status_code, 403)
+        self.assertEqual(self.client.get(f'{self.url}?ids=x').status_code, 400)
+
+    def test_api_runs_with_bounded_workers(self):
+        with mock.patch('groups.simulation.run_simulation', return_value=[]) as run_simulation:
+            with self.settings(KIKOBA_SIMULATION_API_WORKERS=2, KIKOBA_SIMULATION_WORKERS=8):
+                self.assertEqual(self.client.get(self.url).status_code, 200)
+        run_simulation.assert_called_once_with([self.kikoba.id], workers=2)
+
+
+class InstallmentBatchApiTests(TestCase):
+    """A meeting's installments are recorded in one request, by kikoba admins only."""
+
+    def setUp(self):
+        self.treasurer = User.objects.create_user(phone_number='0700000006', name='Treasurer', password='1234')
+        self.kikoba = Kikoba.objects.create(name='Meeting Kikoba', created_by=self.treasurer)
+        KikobaMembership.objects.create(kikoba=self.kikoba, user=self.treasurer, role='treasurer')
+        self.contributions = []
+        for i in range(3):
+            user = User.objects.create_user(phone_number=f'07440000{i:02d}', name=f'Member {i}', password='1234')
+            membership = KikobaMembership.objects.create(kikoba=self.kikoba, user=user)
+            self.contributions.append(ShareContribution.objects.create(
+                kikoba_membership=membership, amount_due=Decimal('20000'),
+                period_start='2025-01-01', period_end='2025-01-31'
+            ))
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.treasurer)}')
+        self.url = f'{API_ROOT}share-contributions/installments/'
+
+    def post(self, installments):
+        return self.client.post(self.url, {'installments': installments}, format='json')
+
+    def test_records_installments_across_members(self):
+        installments = [
+            {'payment': contribution.id, 'amount': '10000'}
+            for contribution in self.contributions for _ in range(2)
+        ]
+        response = self.post(installments[:1] + installments[2:])
+        self.assertEqual(response.status_code, 201, response.content[:200])
+        self.assertEqual(response.data['recorded'], 5)
+        self.assertEqual(
+            [(row['amount_paid'], row['is_fully_paid']) for row in response.data['payments']],
+            [('10000.00', False), ('20000.00', True), ('20000.00', True)]
+        )
+
+    def test_rejects_unknown_and_foreign_payments(self):
+        self.assertEqual(self.post([{'payment': 999999, 'amount': '1000'}]).status_code, 400)
+        outsider = User.objects.create_user(phone_number='0700000007', name='Outsider', password='1234')
+        other = KikobaMembership.objects.create(kikoba=Kikoba.objects.create(name='Other Kikoba'), user=outsider)
+        foreign = ShareContribution.objects.create(
+            kikoba_membership=other, amount_due=Decimal('20000'), period_start='2025-01-01', period_end='2025-01-31'
+        )
+        response = self.post([{'payment': self.contributions[0].id, 'amount': '1000'}, {'payment': foreign.id, 'amount': '1000'}])
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(ShareContribution.objects.filter(amount_paid__gt=0).exists())
+
+
+class MonthlyRollupApiTests(TestCase):
+    """A kikoba's monthly movements are served from its rollups, to its members only."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(phone_number='0700000008', name='Member', password='1234')
+        self.kikoba = Kikoba.objects.create(name='Trend Kikoba', created_by=self.user)
+        KikobaMembership.objects.create(kikoba=self.kikoba, user=self.user)
+        Contribution.objects.create(member=self.user, kikoba=self.kikoba, amount=Decimal('2500'), is_verified=True)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+        self.url = f'{API_ROOT}vikoba/{self.kikoba.id}/monthly/'
+
+    def test_members_read_their_kikoba_months(self):
+        response = self.client.get(f'{self.url}?months=6')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 6)
+        current = response.data['results'][-1]
+        self.assertEqual((current['contributions'], current['collected'], current['new_members']), (2500.0, 2500.0, 1))
+        self.assertEqual(self.client.get(f'{self.url}?months=61').status_code, 400)
+
+        other = Kikoba.objects.create(name='Other Kikoba')
+        self.assertEqual(self.client.get(f'{API_ROOT}vikoba/{other.id}/monthly/').status_code, 403)
+
+
+class MemberPayoutApiTests(TestCase):
+    """A member's own payout, alone or in the kikoba-wide listing."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(phone_number='0700000009', name='Member', password='1234')
+        self.kikoba = Kikoba.objects.create(name='Payout Kikoba', created_by=self.user, group_type='fixed_share')
+        self.add_member(self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+        self.url = f'{API_ROOT}vikoba/{self.kikoba.id}/'
+
+    def add_member(self, user):
+        membership = KikobaMembership.objects.create(kikoba=self.kikoba, user=user)
+        ShareContribution.objects.create(
+            kikoba_membership=membership, amount_due=Decimal('20000'), amount_paid=Decimal('20000'),
+            period_start='2025-01-01', period_end='2025-01-31'
+        )
+
+    def add_members(self, count):
+        start = KikobaMembership.objects.filter(kikoba=self.kikoba).count()
+        for i in range(start, start + count):
+            self.add_member(User.objects.create_user(phone_number=f'07550000{i:02d}', name=f'Member {i}', password='1234'))
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, response.content[:200])
+        return response, len(ctx.captured_queries)
+
+    def count_memberships_loaded(self, url):
+        with mock.patch.object(KikobaMembership, 'from_db', wraps=KikobaMembership.from_db) as from_db:
+            self.count_queries(url)
+        return from_db.call_count
+
+    def test_my_total_loads_only_the_callers_row(self):
+        self.add_members(7)
+        self.assertEqual(self.count_memberships_loaded(f'{self.url}my_total/'), 1)
+
+    def join_vikoba(self, count):
+        """Make the caller a contributing member of ``count`` more vikoba, with other members."""
+        start = Kikoba.objects.count()
+        for i in range(start, start + count):
+            kikoba = Kikoba.objects.create(name=f'Extra Kikoba {i}', group_type='fixed_share')
+            for user in (self.user, User.objects.create_user(phone_number=f'07560000{i:02d}', name=f'Other {i}', password='1234')):
+                ShareContribution.objects.create(
+                    kikoba_membership=KikobaMembership.objects.create(kikoba=kikoba, user=user),
+                    amount_due=Decimal('20000'), amount_paid=Decimal('20000'),
+                    period_start='2025-01-01', period_end='2025-01-31'
+                )
+
+    def test_my_totals_queries_do_not_grow_with_vikoba(self):
+        self.join_vikoba(2)
+        response, queries = self.count_queries(f'{API_ROOT}users/my_totals/')
+        self.assertEqual(len(response.data['vikoba']), 3)
+        self.join_vikoba(3)
+        response, more_queries = self.count_queries(f'{API_ROOT}users/my_totals/')
+        self.assertEqual(len(response.data['vikoba']), 6)
+        self.assertEqual(more_queries, queries)
+
+    def test_kikoba_with_ledger_history_cannot_be_deleted(self):
+        response = self.client.delete(self.url)
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(Kikoba.objects.filter(pk=self.kikoba.pk).exists())
+        empty = Kikoba.objects.create(name='Empty Kikoba', created_by=self.user)
+        self.assertEqual(self.client.delete(f'{API_ROOT}vikoba/{empty.id}/').status_code, 204)
+
+    def test_member_totals_show_current_names(self):
+        # Let the first request's snapshot reach the cache, as it would once committed
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.client.get(f'{self.url}member_totals/').data['members'][0]['name'], 'Member')
+        self.user.name = 'Renamed'
+        self.user.phone_number = '0700000010'
+        self.user.save()
+        member = self.client.get(f'{self.url}member_totals/').data['members'][0]
+        self.assertEqual((member['name'], member['phone_number']), ('Renamed', '0700000010'))
+
+    def test_saving_a_stale_kikoba_keeps_the_ledger_version(self):
+        stale = Kikoba.objects.get(pk=self.kikoba.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.get(f'{self.url}member_totals/')
+        newcomer = User.objects.create_user(phone_number='0700000011', name='Newcomer', password='1234')
+        self.add_member(newcomer)
+        version = Kikoba.objects.get(pk=self.kikoba.pk).ledger_version
+
+        stale.description = 'Edited'
+        stale.save()
+        self.assertEqual(Kikoba.objects.get(pk=self.kikoba.pk).ledger_version, version)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(newcomer)}')
+        financial_data = self.client.get(f'{self.url}my_total/').data['financial_data']
+        self.assertEqual((financial_data['contribution'], financial_data['total_payout']), (20000.0, 20000.0))
+
+        stale.group_type = 'standard'
+        stale.save()
+        self.assertGreater(Kikoba.objects.get(pk=self.kikoba.pk).ledger_version, version)
+
+    def test_my_total_is_within_a_cent_of_member_totals(self):
+        self.add_members(2)
+        product = LoanProduct.objects.create(
+            kikoba=self.kikoba, name='Standard', interest_rate=Decimal('10'),
+            max_amount=Decimal('100000'), max_duration_days=90
+        )
+        application = LoanApplication.objects.create(
+            member=self.user, kikoba=self.kikoba, loan_product=product, requested_amount=Decimal('10000')
+        )
+        loan = Loan.objects.create(application=application, disbursed_amount=Decimal('10000'), status='active')
+        # 1000 of interest does not split evenly between three members
+        Repayment.objects.create(loan=loan, amount_paid=Decimal('11000'), is_verified=True, verified_by=self.user)
+
+        # The settled listing hands the leftover cent to one member; my_total
+        # rounds each member's own share and may be a cent off
+        listing = {row['user_id']: row['total_payout'] for row in self.client.get(f'{self.url}member_totals/').data['members']}
+        self.assertEqual(sorted(listing.values()), [20333.33, 20333.33, 20333.34])
+        for membership in KikobaMembership.objects.filter(kikoba=self.kikoba).select_related('user'):
+            with self.subTest(member=membership.user.name):
+                self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(membership.user)}')
+                payout = self.client.get(f'{self.url}my_total/').data['financial_data']['total_payout']
+                self.assertEqual(payout, 20333.33)
+                my_totals = self.client.get(f'{API_ROOT}users/my_totals/').data
+                self.assertEqual(
+                    [row['my_total']['financial_data']['total_payout'] for row in my_totals['vikoba']],
+                    [payout]
+                )
@@ -6,21 +6,28 @@ from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework.reverse import reverse
 from rest_framework_simplejwt.views import TokenObtainPairView
 from django.contrib.auth import get_user_model
-from django.db.models import Q, Sum
+from django.db.models import Count, Q
+from django.http import StreamingHttpResponse
 from django_filters.rest_framework import DjangoFilterBackend
+import json
 import logging
 
+from money import Amount, ZERO
+
 logger = logging.getLogger(__name__)
 
+from groups.access import ADMIN_ROLES, accessible_kikoba_ids, scope_to_member_or_kikobas
 from groups.models import (
     Kikoba, KikobaMembership, KikobaInvitation,
     KikobaContributionConfig, EntryFeePayment,
-    ShareContribution, EmergencyFundContribution
+    ShareContribution, EmergencyFundContribution, RoscaRotation,
+    EntryFeeInstallment, ShareInstallment
 )
 from savings.models import Saving, KikobaBalance, MemberBalance, SavingCycle, Contribution
 from loans.models import LoanProduct, LoanApplication, Loan, Repayment
 from notifications.models import Notification
 
+from .pagination import OptionalCursorPaginationMixin
 from .serializers import (
     UserSerializer, UserRegistrationSerializer,
     CustomTokenObtainPairSerializer,
@@ -29,12 +36,224 @@ from .serializers import (
     KikobaBalanceSerializer, MemberBalanceSerializer, SavingCycleSerializer,
     LoanProductSerializer, LoanApplicationSerializer, LoanApplicationCreateSerializer, LoanSerializer,
     RepaymentSerializer, NotificationSerializer, EntryFeePaymentSerializer,
-    ShareContributionSerializer, EmergencyFundContributionSerializer, LoanGuarantorSerializer
+    ShareContributionSerializer, EmergencyFundContributionSerializer, LoanGuarantorSerializer,
+    RoscaRotationSerializer, InstallmentBatchSerializer
 )
 
 User = get_user_model()
 
 
+def _calculation_method(kikoba_type, member_count):
+    """Describe how payouts are calculated for a kikoba type."""
+    from decimal import Decimal
+    from finance import RoscaModel
+    
+    if kikoba_type == 'standard':
+        return 'Proportional to shares (more shares = more profit)'
+    elif kikoba_type == 'fixed_share':
+        return 'Equal distribution among all members'
+    elif kikoba_type == 'interest_refund':
+        return 'Interest refunded to borrowers + equal share of fines'
+    elif kikoba_type == 'rosca':
+        contribution_per_member = Decimal('50000')
+        pot_size = RoscaModel.calculate_pot_size(float(contribution_per_member), member_count)
+        return f'Rotating pot of {pot_size:,.2f} TZS per meeting'
+    return 'Unknown kikoba type'
+
+
+def _payout_data(kikoba, user_totals, group_totals):
+    """
+    Build the ``financial_data`` and ``kikoba_summary`` sections of a member's total.
+    
+    The payout is computed from the kikoba-wide scalars and the member's own
+    figures, rounded to the cent. ``member_totals`` settles every member
+    together (see ``finance.PayoutEngine``), so when the profit does not
+    split evenly the two may differ by one cent. Fines are not tracked yet
+    and count as 0.
+    
+    Returns:
+        Tuple of (financial_data, kikoba_summary)
+    """
+    from finance import get_payout_calculator
+    
+    # Emergency fund stays with the kikoba and is not part of payouts
+    user_contribution = user_totals.to_member_contribution(include_emergency_fund=False)
+    
+    # Calculate payout based on kikoba type
+    kikoba_type = kikoba.group_type or 'standard'
+    calculator = get_payout_calculator(kikoba_type)
+    
+    if calculator is not None:
+        user_payout = Amount.from_decimal(calculator.calculate_member_payout(user_contribution, group_totals))
+    else:
+        user_payout = ZERO
+    
+    contribution = Amount.from_decimal(user_contribution.fixed_contribution)
+    
+    financial_data = {
+        'contribution': float(contribution),
+        'shares': float(user_contribution.shares),
+        'interest_paid_on_loans': float(Amount.from_decimal(user_contribution.interest_paid)),
+        'total_payout': float(user_payout),
+        'profit': float(user_payout - contribution)
+    }
+    kikoba_summary = {
+        'total_members': group_totals.member_count,
+        'total_interest_collected': float(Amount.from_decimal(group_totals.total_interest)),
+        'total_fines_collected': float(Amount.from_decimal(group_totals.total_fines)),
+        'calculation_method': _calculation_method(kikoba_type, group_totals.member_count)
+    }
+    return financial_data, kikoba_summary
+
+
+def _loans_data(loans):
+    """
+    Summarise loans annotated with ``verified_repaid`` (see ``member_loans_by_kikoba``).
+    
+    Returns:
+        Tuple of (summary, loans_data)
+    """
+    loans_data = []
+    total_borrowed = ZERO
+    total_repaid = ZERO
+    total_interest_paid = ZERO
+    
+    for loan in loans:
+        loan_repaid = Amount.from_decimal(loan.verified_repaid or 0)
+        principal = Amount.from_decimal(loan.disbursed_amount or 0)
+        interest_paid = max(loan_repaid - principal, ZERO)
+        
+        total_borrowed += principal
+        total_repaid += loan_repaid
+        total_interest_paid += interest_paid
+        
+        loans_data.append({
+            'loan_id': loan.id,
+            'disbursement_date': loan.disbursement_date.isoformat() if loan.disbursement_date else None,
+            'principal': float(principal),
+            'interest_rate': float(loan.interest_rate_at_disbursement or 0),
+            'total_repayable': float(Amount.from_decimal(loan.total_repayable or 0)),
+            'amount_repaid': float(loan_repaid),
+            'interest_paid': float(interest_paid),
+            'status': loan.status,
+            'due_date': loan.current_due_date.isoformat() if loan.current_due_date else None
+        })
+    
+    summary = {
+        'total_loans': len(loans_data),
+        'total_borrowed': float(total_borrowed),
+        'total_repaid': float(total_repaid),
+        'total_interest_paid': float(total_interest_paid),
+        'outstanding_balance': float(total_borrowed - total_repaid)
+    }
+    return summary, loans_data
+
+
+def _shares_data(share_contributions, user_totals):
+    """
+    Summarise a member's share contributions.
+    
+    Returns:
+        Tuple of (summary, contributions_data)
+    """
+    from groups.aggregates import SHARE_VALUE
+    
+    contributions_data = []
+    for contribution in share_contributions:
+        contributions_data.append({
+            'id': contribution.id,
+            'amount': float(Amount.from_decimal(contribution.amount_paid)),
+            'payment_date': contribution.period_start.isoformat(),
+            'number_of_shares': float(contribution.amount_paid / SHARE_VALUE),
+            'is_verified': contribution.is_fully_paid
+        })
+    
+    summary = {
+        'total_amount': float(Amount.from_decimal(user_totals.share_total)),
+        'number_of_shares': float(user_totals.shares),
+        'share_value': float(Amount.from_decimal(SHARE_VALUE)),
+        'total_contributions': len(contributions_data)
+    }
+    return summary, contributions_data
+
+
+def _emergency_fund_data(emergency_contributions):
+    """
+    Summarise a member's emergency fund contributions.
+    
+    Returns:
+        Tuple of (summary, contributions_data)
+    """
+    contributions_data = []
+    total_emergency_fund = ZERO
+    
+    for contribution in emergency_contributions:
+        amount = Amount.from_decimal(contribution.amount)
+        contributions_data.append({
+            'id': contribution.id,
+            'amount': float(amount),
+            'contribution_date': contribution.contributed_on.isoformat(),
+            'notes': ''
+        })
+        total_emergency_fund += amount
+    
+    summary = {
+        'total_amount': float(total_emergency_fund),
+        'total_contributions': len(contributions_data),
+        'is_reclaimable': False,
+        'note': 'Emergency fund stays with the kikoba and is not part of member payouts'
+    }
+    return summary, contributions_data
+
+
+def _rosca_recipients(membership_ids):
+    """Map membership id to the recipient details shown for a ROSCA meeting."""
+    memberships = KikobaMembership.objects.filter(pk__in=membership_ids).values('id', 'user_id', 'user__name')
+    return {
+        membership['id']: {
+            'membership_id': membership['id'],
+            'user_id': membership['user_id'],
+            'name': membership['user__name']
+        }
+        for membership in memberships
+    }
+
+
+def _rosca_meeting_data(meeting, recipients):
+    return {
+        'meeting_number': meeting.meeting_number,
+        'meeting_date': meeting.meeting_date.isoformat(),
+        'recipient': recipients.get(meeting.recipient, {'membership_id': meeting.recipient}),
+        'pot_size': float(meeting.pot_size)
+    }
+
+
+def _rosca_rotation_data(rotation):
+    """Summary of a ROSCA rotation with the next meeting; reads at most one membership."""
+    schedule = rotation.as_schedule()
+    next_meeting = rotation.next_meeting()
+    recipients = _rosca_recipients([next_meeting.recipient]) if next_meeting else {}
+    return {
+        'kikoba_id': rotation.kikoba_id,
+        'member_count': len(schedule),
+        'contribution_amount': float(schedule.contribution),
+        'pot_size': float(schedule.pot_size),
+        'meeting_frequency': rotation.meeting_frequency,
+        'start_date': rotation.start_date.isoformat(),
+        'completed_meetings': rotation.completed_meetings,
+        'recipient_order': rotation.recipient_order,
+        'next_meeting': _rosca_meeting_data(next_meeting, recipients) if next_meeting else None
+    }
+
+
+def _rosca_schedule_json(schedule, recipients):
+    """Yield a rotation's meetings as one JSON document, a meeting at a time."""
+    yield '{"pot_size": %s, "meetings": [' % json.dumps(float(schedule.pot_size))
+    for index, meeting in enumerate(schedule.meetings()):
+        yield (', ' if index else '') + json.dumps(_rosca_meeting_data(meeting, recipients))
+    yield ']}'
+
+
 class CustomTokenObtainPairView(TokenObtainPairView):
     """
     Custom token view that uses phone_number instead of username
@@ -109,16 +328,26 @@ def api_root(request, format=None):
     })
 
 
+def _active_member_count():
+    """Annotation for ``KikobaSerializer.member_count`` (avoids a COUNT per kikoba)."""
+    return Count(
+        'kikoba_memberships__id',
+        filter=Q(kikoba_memberships__is_active=True),
+        distinct=True
+    )
+
+
 class UserViewSet(viewsets.ModelViewSet):
     """
     API endpoint for users
     """
-    queryset = User.objects.all()
+    queryset = User.objects.all().order_by('id')
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['name', 'phone_number', 'email']
     ordering_fields = ['date_joined', 'name']
+    query_budgets = {'list': 3, 'retrieve': 2}
     
     def get_permissions(self):
         if self.action == 'create':
@@ -130,6 +359,17 @@ class UserViewSet(viewsets.ModelViewSet):
             return UserRegistrationSerializer
         return UserSerializer
     
+    def destroy(self, request, *args, **kwargs):
+        from django.db.models import ProtectedError
+        
+        try:
+            return super().destroy(request, *args, **kwargs)
+        except ProtectedError:
+            return Response(
+                {"detail": "Users with ledger history cannot be deleted"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+    
     @action(detail=False, methods=['get'])
     def me(self, request):
         """Get current user profile"""
@@ -139,14 +379,97 @@ class UserViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def my_vikoba(self, request):
         """Get all vikoba where current user is a member"""
-        memberships = KikobaMembership.objects.filter(
-            user=request.user,
-            is_active=True
-        ).select_related('kikoba')
-        vikoba = [membership.kikoba for membership in memberships]
+        vikoba = Kikoba.objects.filter(
+            kikoba_memberships__user=request.user,
+            kikoba_memberships__is_active=True
+        ).select_related('created_by', 'contribution_config').annotate(
+            active_member_count=_active_member_count()
+        ).order_by('id')
         serializer = KikobaSerializer(vikoba, many=True)
         return Response(serializer.data)
 
+    @action(detail=False, methods=['get'])
+    def my_totals(self, request):
+        """
+        Get my_total, my_loans, my_shares and my_emergency_fund for every
+        kikoba where the current user is an active member, in one response.
+        Uses a fixed number of grouped queries however many vikoba the user is in.
+        """
+        from decimal import Decimal
+        from groups.aggregates import MemberTotals, group_totals_by_kikoba, member_loans_by_kikoba
+
+        user = request.user
+        memberships = list(KikobaMembership.objects.filter(
+            user=user,
+            is_active=True
+        ).select_related('kikoba', 'user', 'ledger_summary').order_by('joined_at', 'id'))
+        kikoba_ids = [membership.kikoba_id for membership in memberships]
+        membership_ids = [membership.id for membership in memberships]
+
+        group_totals = group_totals_by_kikoba(kikoba_ids, total_fines=Decimal('0'))
+        loans = member_loans_by_kikoba(user, kikoba_ids)
+
+        share_contributions = {}
+        for contribution in ShareContribution.objects.filter(
+            kikoba_membership_id__in=membership_ids
+        ).order_by('-period_start', '-id'):
+            share_contributions.setdefault(contribution.kikoba_membership_id, []).append(contribution)
+
+        emergency_contributions = {}
+        for contribution in EmergencyFundContribution.objects.filter(
+            kikoba_membership_id__in=membership_ids
+        ).order_by('-contributed_on', '-id'):
+            emergency_contributions.setdefault(contribution.kikoba_membership_id, []).append(contribution)
+
+        vikoba = []
+        for membership in memberships:
+            kikoba = membership.kikoba
+            user_totals = MemberTotals.from_membership(membership)
+            financial_data, kikoba_summary = _payout_data(kikoba, user_totals, group_totals[kikoba.id])
+            loans_summary, loans_data = _loans_data(loans.get(kikoba.id, []))
+            shares_summary, shares_data = _shares_data(share_contributions.get(membership.id, []), user_totals)
+            emergency_summary, emergency_data = _emergency_fund_data(emergency_contributions.get(membership.id, []))
+            vikoba.append({
+                'kikoba': {
+                    'id': kikoba.id,
+                    'name': kikoba.name,
+                    'kikoba_number': kikoba.kikoba_number,
+                    'group_type': kikoba.group_type or 'standard',
+                    'group_type_display': kikoba.get_group_type_display() if kikoba.group_type else 'Standard VIKOBA'
+                },
+                'membership': {
+                    'membership_id': membership.id,
+                    'role': membership.role,
+                    'joined_at': membership.joined_at.isoformat()
+                },
+                'my_total': {
+                    'financial_data': financial_data,
+                    'kikoba_summary': kikoba_summary
+                },
+                'my_loans': {
+                    'summary': loans_summary,
+                    'loans': loans_data
+                },
+                'my_shares': {
+                    'summary': shares_summary,
+                    'contributions': shares_data
+                },
+                'my_emergency_fund': {
+                    'summary': emergency_summary,
+                    'contributions': emergency_data
+                }
+            })
+
+        return Response({
+            'user': {
+                'id': user.id,
+                'name': user.name,
+                'phone_number': user.phone_number
+            },
+            'total_vikoba': len(vikoba),
+            'vikoba': vikoba
+        })
+
 
 class KikobaViewSet(viewsets.ModelViewSet):
     """
@@ -159,10 +482,75 @@ class KikobaViewSet(viewsets.ModelViewSet):
     filterset_fields = ['is_active', 'is_center_kikoba', 'contribution_frequency']
     search_fields = ['name', 'kikoba_number', 'location']
     ordering_fields = ['created_at', 'name']
+    query_budgets = {'list': 3, 'retrieve': 2}
+    
+    def destroy(self, request, *args, **kwargs):
+        from django.db.models import ProtectedError
+        
+        try:
+            return super().destroy(request, *args, **kwargs)
+        except ProtectedError:
+            return Response(
+                {"detail": "Vikoba with ledger history cannot be deleted"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+    
+    def get_queryset(self):
+        queryset = Kikoba.objects.all().order_by('id')
+        if self.action in ('list', 'retrieve'):
+            queryset = queryset.select_related('created_by', 'contribution_config').annotate(
+                active_member_count=_active_member_count()
+            )
+        return queryset
     
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
     
+    @action(detail=False, methods=['get'], url_path='type-simulation')
+    def type_simulation(self, request):
+        """
+        Simulate every kikoba type on the real ledgers of many vikoba.
+        Superusers may simulate any kikoba; other users the vikoba they
+        administer (chairperson, treasurer or kikoba admin). ``?ids=1,2,3``
+        limits the run to those vikoba; the default is all allowed vikoba.
+        Runs with ``KIKOBA_SIMULATION_API_WORKERS`` worker processes (default 1).
+        """
+        from django.conf import settings
+        from groups.simulation import run_simulation
+        
+        kikoba_ids = None
+        if request.query_params.get('ids'):
+            try:
+                kikoba_ids = [int(value) for value in request.query_params['ids'].split(',')]
+            except ValueError:
+                return Response(
+                    {"detail": "ids must be a comma-separated list of kikoba ids"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        if not request.user.is_superuser:
+            allowed_ids = accessible_kikoba_ids(request, roles=ADMIN_ROLES, active_only=True)
+            if kikoba_ids is None:
+                kikoba_ids = allowed_ids
+            elif not set(kikoba_ids) <= set(allowed_ids):
+                return Response(
+                    {"detail": "You can only simulate vikoba you administer"},
+                    status=status.HTTP_403_FORBIDDEN
+                )
+        
+        money_fields = ('total_contributions', 'total_payout', 'total_profit', 'min_profit', 'max_profit')
+        results = [
+            {
+                field: float(value) if field in money_fields else value
+                for field, value in result.as_dict().items()
+            }
+            for result in run_simulation(kikoba_ids, workers=getattr(settings, 'KIKOBA_SIMULATION_API_WORKERS', 1))
+        ]
+        return Response({
+            'group_types': [value for value, _label in Kikoba.GROUP_TYPE_CHOICES],
+            'count': len(results),
+            'results': results
+        })
+    
     @action(detail=True, methods=['get'])
     def members(self, request, pk=None):
         """Get all members of a kikoba"""
@@ -173,11 +561,10 @@ class KikobaViewSet(viewsets.ModelViewSet):
     
     @action(detail=True, methods=['get'])
     def balance(self, request, pk=None):
-        """Get kikoba balance"""
+        """Get kikoba balance (kept current by deltas, so this is a plain read)"""
         kikoba = self.get_object()
         try:
             balance = kikoba.kikoba_balance_detail
-            balance.update_balance()
             serializer = KikobaBalanceSerializer(balance)
             return Response(serializer.data)
         except KikobaBalance.DoesNotExist:
@@ -186,6 +573,41 @@ class KikobaViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_404_NOT_FOUND
             )
     
+    @action(detail=True, methods=['get'])
+    def monthly(self, request, pk=None):
+        """
+        Month-by-month money movements and new members of a kikoba, read
+        from its monthly rollups. ``?months=N`` (1-60, default 12) sets how
+        many months back from the current one are returned. Members of the
+        kikoba and superusers only.
+        """
+        from groups.rollups import monthly_totals, months_back
+        
+        kikoba = self.get_object()
+        if not request.user.is_superuser and kikoba.id not in accessible_kikoba_ids(request, active_only=True):
+            return Response(
+                {"detail": "You are not a member of this kikoba"},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        try:
+            months = int(request.query_params.get('months', 12))
+        except ValueError:
+            months = 0
+        if not 1 <= months <= 60:
+            return Response(
+                {"detail": "months must be a number from 1 to 60"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        results = [
+            {
+                field: value.isoformat() if field == 'month' else value if field == 'new_members' else float(value)
+                for field, value in month.items()
+            }
+            for month in monthly_totals(*months_back(months), kikoba_ids=[kikoba.id])
+        ]
+        return Response({'kikoba': kikoba.id, 'count': len(results), 'results': results})
+    
     @action(detail=True, methods=['post'])
     def join(self, request, pk=None):
         """Join a kikoba"""
@@ -212,143 +634,61 @@ class KikobaViewSet(viewsets.ModelViewSet):
         """
         Calculate and return member totals/payouts based on kikoba type.
         This endpoint demonstrates how different kikoba types affect member payouts.
+        Kikoba-wide figures come from the kikoba's cached financial snapshot;
+        member rows are read with the members' current names.
         """
         from decimal import Decimal
-        from finance import (
-            MemberContribution,
-            StandardVikoba,
-            FixedShareVikoba,
-            InterestRefundVikoba,
-            RoscaModel
-        )
+        from finance import get_payout_calculator
+        from groups.aggregates import build_member_contributions, collect_member_totals
+        from groups.snapshots import get_kikoba_snapshot
         
         kikoba = self.get_object()
-        memberships = kikoba.kikoba_memberships.filter(is_active=True)
+        snapshot = get_kikoba_snapshot(kikoba)
+        member_totals = collect_member_totals(kikoba)
         
-        if not memberships.exists():
+        if not member_totals:
             return Response(
                 {"detail": "No active members in this kikoba"},
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        # Get financial data from database
-        # For now, we'll use aggregated data. In production, this should come from actual transactions
-        total_interest_collected = Decimal('0')
-        total_fines_collected = Decimal('0')
-        
-        # Aggregate interest from loan repayments
-        from loans.models import Repayment
-        interest_data = Repayment.objects.filter(
-            loan__application__kikoba=kikoba,
-            is_verified=True
-        ).aggregate(total_interest=Sum('interest_amount'))
-        if interest_data['total_interest']:
-            total_interest_collected = Decimal(str(interest_data['total_interest']))
-        
-        # Aggregate fines (you can add fine model when implemented)
-        # For now, we'll use a sample value
-        total_fines_collected = Decimal('5000.00')  # Sample value
-        
-        # Build member contributions list
-        members = []
-        member_details = []
+        # Interest = verified repayments above disbursed principal
+        # TODO: Add Fines model to track actual fines
+        group_totals = snapshot.group_totals(total_fines=Decimal('0'))
+        total_interest_collected = group_totals.total_interest
+        total_fines_collected = group_totals.total_fines
         
-        for membership in memberships:
-            # Get member's share contributions
-            share_total = ShareContribution.objects.filter(
-                kikoba_membership=membership
-            ).aggregate(total=Sum('amount_paid'))['total'] or Decimal('0')
-            
-            # Get member's entry fee
-            entry_fee = EntryFeePayment.objects.filter(
-                kikoba_membership=membership
-            ).aggregate(total=Sum('amount_paid'))['total'] or Decimal('0')
-            
-            # Get member's emergency fund contributions
-            emergency_fund = EmergencyFundContribution.objects.filter(
-                kikoba_membership=membership
-            ).aggregate(total=Sum('amount'))['total'] or Decimal('0')
-            
-            # Calculate total fixed contribution
-            fixed_contribution = share_total + entry_fee + emergency_fund
-            
-            # Get interest paid by this member on their loans
-            interest_paid = Repayment.objects.filter(
-                loan__application__member=membership.user,
-                loan__application__kikoba=kikoba,
-                is_verified=True
-            ).aggregate(total=Sum('interest_amount'))['total'] or Decimal('0')
-            interest_paid = Decimal(str(interest_paid))
-            
-            # For standard vikoba, calculate shares based on contribution
-            # Assuming 1 share = 10,000 TZS (you can adjust this)
-            share_value = Decimal('10000')
-            shares = share_total / share_value if share_total > 0 else Decimal('0')
-            
-            member_contrib = MemberContribution(
-                member_id=membership.user.id,
-                shares=shares,
-                fixed_contribution=fixed_contribution,
-                interest_paid=interest_paid,
-                fines_paid=Decimal('0')
-            )
-            members.append(member_contrib)
-            
-            member_details.append({
-                'user_id': membership.user.id,
-                'name': membership.user.name,
-                'phone_number': membership.user.phone_number,
-                'shares': float(shares),
-                'fixed_contribution': float(fixed_contribution),
-                'interest_paid': float(interest_paid)
-            })
+        # Emergency fund stays with the kikoba and is not part of payouts
+        members = build_member_contributions(member_totals)
         
-        # Calculate payouts based on kikoba type
+        # Payouts are settled together in minor units, so they add up to the kikoba total
         kikoba_type = kikoba.group_type or 'standard'
-        
-        if kikoba_type == 'standard':
-            payouts = StandardVikoba.calculate_payouts(
-                members, total_interest_collected, total_fines_collected
-            )
-            calculation_method = 'Proportional to shares (more shares = more profit)'
-        elif kikoba_type == 'fixed_share':
-            payouts = FixedShareVikoba.calculate_payouts(
-                members, total_interest_collected, total_fines_collected
-            )
-            calculation_method = 'Equal distribution among all members'
-        elif kikoba_type == 'interest_refund':
-            payouts = InterestRefundVikoba.calculate_payouts(
-                members, total_interest_collected, total_fines_collected
-            )
-            calculation_method = 'Interest refunded to borrowers + equal share of fines'
-        elif kikoba_type == 'rosca':
-            # ROSCA doesn't use the same payout calculation
-            contribution_per_member = Decimal('50000')  # Sample value
-            pot_size = RoscaModel.calculate_pot_size(
-                float(contribution_per_member), len(members)
-            )
-            payouts = {}  # ROSCA payouts rotate
-            calculation_method = f'Rotating pot of {pot_size:,.2f} TZS per meeting'
-        else:
-            payouts = {}
-            calculation_method = 'Unknown kikoba type'
+        calculator = get_payout_calculator(kikoba_type)
+        payouts = {}
+        if calculator is not None:
+            payouts = calculator.calculate_share_out_payouts(members, total_interest_collected, total_fines_collected)
+        calculation_method = _calculation_method(kikoba_type, len(members))
         
         # Format the response
         member_payouts = []
-        for detail in member_details:
-            user_id = detail['user_id']
-            payout = float(payouts.get(user_id, Decimal('0')))
-            profit = payout - detail['fixed_contribution']
+        total_contributions = ZERO
+        total_payouts = ZERO
+        for totals, member in zip(member_totals, members):
+            user_id = member.member_id
+            payout = Amount.from_decimal(payouts.get(user_id, 0))
+            contribution = Amount.from_decimal(member.fixed_contribution)
+            total_contributions += contribution
+            total_payouts += payout
             
             member_payouts.append({
                 'user_id': user_id,
-                'name': detail['name'],
-                'phone_number': detail['phone_number'],
-                'contribution': detail['fixed_contribution'],
-                'shares': detail['shares'],
-                'interest_paid': detail['interest_paid'],
-                'total_payout': payout,
-                'profit': profit
+                'name': totals.name,
+                'phone_number': totals.phone_number,
+                'contribution': float(contribution),
+                'shares': float(member.shares),
+                'interest_paid': float(Amount.from_decimal(member.interest_paid)),
+                'total_payout': float(payout),
+                'profit': float(payout - contribution)
             })
         
         response_data = {
@@ -360,17 +700,17 @@ class KikobaViewSet(viewsets.ModelViewSet):
                 'group_type_display': kikoba.get_group_type_display() if kikoba.group_type else 'Standard VIKOBA'
             },
             'financial_summary': {
-                'total_interest_collected': float(total_interest_collected),
-                'total_fines_collected': float(total_fines_collected),
-                'total_profit': float(total_interest_collected + total_fines_collected),
+                'total_interest_collected': float(Amount.from_decimal(total_interest_collected)),
+                'total_fines_collected': float(Amount.from_decimal(total_fines_collected)),
+                'total_profit': float(Amount.from_decimal(total_interest_collected + total_fines_collected)),
                 'calculation_method': calculation_method
             },
             'members': member_payouts,
             'summary': {
                 'total_members': len(member_payouts),
-                'total_contributions': sum(m['contribution'] for m in member_payouts),
-                'total_payouts': sum(m['total_payout'] for m in member_payouts),
-                'total_profit_distributed': sum(m['profit'] for m in member_payouts)
+                'total_contributions': float(total_contributions),
+                'total_payouts': float(total_payouts),
+                'total_profit_distributed': float(total_payouts - total_contributions)
             }
         }
         
@@ -414,186 +754,36 @@ class KikobaViewSet(viewsets.ModelViewSet):
         """
         Get the total/payout for the currently logged-in user in this specific kikoba.
         This endpoint is user-specific and only shows their own financial data.
+        Computed from the kikoba-wide scalars and the user's own row, so the
+        work does not depend on the number of members.
         """
-        # Debug logging
         logger.info(f"my_total endpoint called - User: {request.user}, Is authenticated: {request.user.is_authenticated}")
-        logger.info(f"Authorization header: {request.headers.get('Authorization', 'Not provided')}")
         
         from decimal import Decimal
-        from finance import (
-            MemberContribution,
-            StandardVikoba,
-            FixedShareVikoba,
-            InterestRefundVikoba,
-            RoscaModel
-        )
+        from groups.aggregates import kikoba_group_totals, member_totals_for_user
         
         kikoba = self.get_object()
         user = request.user
         
-        # Check if user is a member of this kikoba
-        try:
-            membership = KikobaMembership.objects.get(
-                kikoba=kikoba,
-                user=user,
-                is_active=True
-            )
-        except KikobaMembership.DoesNotExist:
+        # Check if user is a member of this kikoba and load their figures
+        user_totals = member_totals_for_user(kikoba, user)
+        if user_totals is None:
             return Response(
                 {"detail": "You are not a member of this kikoba"},
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        # Get all active members for calculation context
-        all_memberships = kikoba.kikoba_memberships.filter(is_active=True)
-        
-        # Get financial data from database - NO PLACEHOLDERS!
-        logger.info("="*80)
-        logger.info(f"CALCULATING TOTALS FOR KIKOBA: {kikoba.name} (ID: {kikoba.id})")
-        logger.info(f"User: {user.name} (ID: {user.id})")
-        logger.info("="*80)
-        
-        total_interest_collected = Decimal('0')
-        total_fines_collected = Decimal('0')
-        
-        # Aggregate interest from loan repayments
-        from loans.models import Repayment, Loan
-        total_repayments = Repayment.objects.filter(
-            loan__application__kikoba=kikoba,
-            is_verified=True
-        ).aggregate(total=Sum('amount_paid'))['total'] or Decimal('0')
-        
-        logger.info(f"Total Verified Repayments: {total_repayments:,.2f} TZS")
-        
-        # Calculate actual interest from loans
-        # Get all loans for this kikoba
-        kikoba_loans = Loan.objects.filter(application__kikoba=kikoba, status='disbursed')
-        total_principal = kikoba_loans.aggregate(total=Sum('disbursed_amount'))['total'] or Decimal('0')
-        
-        # Interest = Total Repayments - Total Principal
-        total_interest_collected = max(total_repayments - total_principal, Decimal('0'))
-        logger.info(f"Total Principal Loaned: {total_principal:,.2f} TZS")
-        logger.info(f"Total Interest Collected: {total_interest_collected:,.2f} TZS")
-        
-        # TODO: Add Fines model to track actual fines
-        # For now, fines are 0 until fines are tracked in database
-        total_fines_collected = Decimal('0')  # Real value from database (currently no fines recorded)
-        logger.info(f"Total Fines Collected: {total_fines_collected:,.2f} TZS")
-        
-        # Build member contributions list for all members (needed for calculation)
-        members = []
-        
-        for mem in all_memberships:
-            # Get member's share contributions
-            share_total = ShareContribution.objects.filter(
-                kikoba_membership=mem
-            ).aggregate(total=Sum('amount_paid'))['total'] or Decimal('0')
-            
-            # Get member's entry fee
-            entry_fee = EntryFeePayment.objects.filter(
-                kikoba_membership=mem
-            ).aggregate(total=Sum('amount_paid'))['total'] or Decimal('0')
-            
-            # Get member's emergency fund contributions (NOT reclaimable)
-            emergency_fund = EmergencyFundContribution.objects.filter(
-                kikoba_membership=mem
-            ).aggregate(total=Sum('amount'))['total'] or Decimal('0')
-            
-            # Calculate total RECLAIMABLE contribution (excluding emergency fund)
-            # Emergency fund stays with the kikoba and is not part of payouts
-            fixed_contribution = share_total + entry_fee
-            
-            # Get interest paid by this member on their loans
-            member_repayments = Repayment.objects.filter(
-                loan__application__member=mem.user,
-                loan__application__kikoba=kikoba,
-                is_verified=True
-            ).aggregate(total=Sum('amount_paid'))['total'] or Decimal('0')
-            
-            # Get principal borrowed by this member
-            member_loans = Loan.objects.filter(
-                application__member=mem.user,
-                application__kikoba=kikoba,
-                status='disbursed'
-            ).aggregate(total=Sum('disbursed_amount'))['total'] or Decimal('0')
-            
-            # Actual interest = Repayments - Principal
-            interest_paid = max(Decimal(str(member_repayments)) - Decimal(str(member_loans)), Decimal('0'))
-            
-            if mem.user.id == user.id:
-                logger.info(f"\n--- {mem.user.name}'s Contributions ---")
-                logger.info(f"  Share Contributions: {share_total:,.2f} TZS")
-                logger.info(f"  Entry Fee: {entry_fee:,.2f} TZS")
-                logger.info(f"  Emergency Fund: {emergency_fund:,.2f} TZS (NOT reclaimable)")
-                logger.info(f"  RECLAIMABLE Contribution: {fixed_contribution:,.2f} TZS")
-                logger.info(f"  Loans Taken: {member_loans:,.2f} TZS")
-                logger.info(f"  Total Repayments: {member_repayments:,.2f} TZS")
-                logger.info(f"  Interest Paid: {interest_paid:,.2f} TZS")
-            
-            # Calculate shares
-            share_value = Decimal('10000')
-            shares = share_total / share_value if share_total > 0 else Decimal('0')
-            
-            member_contrib = MemberContribution(
-                member_id=mem.user.id,
-                shares=shares,
-                fixed_contribution=fixed_contribution,
-                interest_paid=interest_paid,
-                fines_paid=Decimal('0')
-            )
-            members.append(member_contrib)
+        group_totals = kikoba_group_totals(kikoba, total_fines=Decimal('0'))
+        logger.info(f"Kikoba {kikoba.id}: {group_totals.member_count} members, "
+                    f"interest {group_totals.total_interest:,.2f} TZS")
         
-        # Calculate payouts based on kikoba type
+        financial_data, kikoba_summary = _payout_data(kikoba, user_totals, group_totals)
         kikoba_type = kikoba.group_type or 'standard'
+        user_payout = financial_data['total_payout']
+        user_profit = financial_data['profit']
         
-        if kikoba_type == 'standard':
-            payouts = StandardVikoba.calculate_payouts(
-                members, total_interest_collected, total_fines_collected
-            )
-            calculation_method = 'Proportional to shares (more shares = more profit)'
-        elif kikoba_type == 'fixed_share':
-            payouts = FixedShareVikoba.calculate_payouts(
-                members, total_interest_collected, total_fines_collected
-            )
-            calculation_method = 'Equal distribution among all members'
-        elif kikoba_type == 'interest_refund':
-            payouts = InterestRefundVikoba.calculate_payouts(
-                members, total_interest_collected, total_fines_collected
-            )
-            calculation_method = 'Interest refunded to borrowers + equal share of fines'
-        elif kikoba_type == 'rosca':
-            contribution_per_member = Decimal('50000')
-            pot_size = RoscaModel.calculate_pot_size(
-                float(contribution_per_member), len(members)
-            )
-            payouts = {}
-            calculation_method = f'Rotating pot of {pot_size:,.2f} TZS per meeting'
-        else:
-            payouts = {}
-            calculation_method = 'Unknown kikoba type'
-        
-        # Get user's specific data
-        user_contribution = next(
-            (m for m in members if m.member_id == user.id), None
-        )
-        
-        if not user_contribution:
-            return Response(
-                {"detail": "Could not find your contribution data"},
-                status=status.HTTP_404_NOT_FOUND
-            )
-        
-        user_payout = float(payouts.get(user.id, Decimal('0')))
-        user_profit = user_payout - float(user_contribution.fixed_contribution)
-        
-        logger.info(f"\n--- FINAL CALCULATION FOR {user.name} ---")
-        logger.info(f"  Total Contribution: {user_contribution.fixed_contribution:,.2f} TZS")
-        logger.info(f"  Interest Paid (Refunded): {user_contribution.interest_paid:,.2f} TZS")
-        logger.info(f"  Fine Share: {total_fines_collected / Decimal(str(len(members))):,.2f} TZS")
-        logger.info(f"  Total Payout: {user_payout:,.2f} TZS")
-        logger.info(f"  Profit: {user_profit:,.2f} TZS")
-        logger.info(f"  Calculation: {user_contribution.fixed_contribution} + {user_contribution.interest_paid} + {total_fines_collected / Decimal(str(len(members)))} = {user_payout}")
-        logger.info("="*80)
+        logger.info(f"{user.name} in {kikoba.name}: contribution {financial_data['contribution']:,.2f}, "
+                    f"interest paid {financial_data['interest_paid_on_loans']:,.2f}, payout {user_payout:,.2f} TZS")
         
         response_data = {
             'kikoba': {
@@ -604,28 +794,17 @@ class KikobaViewSet(viewsets.ModelViewSet):
                 'group_type_display': kikoba.get_group_type_display() if kikoba.group_type else 'Standard VIKOBA'
             },
             'membership': {
-                'membership_id': membership.id,
-                'role': membership.role,
-                'joined_at': membership.joined_at.isoformat()
+                'membership_id': user_totals.membership_id,
+                'role': user_totals.role,
+                'joined_at': user_totals.joined_at.isoformat()
             },
             'user': {
                 'id': user.id,
                 'name': user.name,
                 'phone_number': user.phone_number
             },
-            'financial_data': {
-                'contribution': float(user_contribution.fixed_contribution),
-                'shares': float(user_contribution.shares),
-                'interest_paid_on_loans': float(user_contribution.interest_paid),
-                'total_payout': user_payout,
-                'profit': user_profit
-            },
-            'kikoba_summary': {
-                'total_members': len(members),
-                'total_interest_collected': float(total_interest_collected),
-                'total_fines_collected': float(total_fines_collected),
-                'calculation_method': calculation_method
-            },
+            'financial_data': financial_data,
+            'kikoba_summary': kikoba_summary,
             'message': f'Your total payout in {kikoba.name} is {user_payout:,.2f} TZS (Profit: {user_profit:,.2f} TZS)'
         }
         
@@ -643,59 +822,21 @@ class KikobaViewSet(viewsets.ModelViewSet):
         Returns loan details including
         principal, repayments, and interest.
         """
-        from decimal import Decimal
-        from loans.models import Loan, LoanApplication, Repayment
+        from groups.aggregates import member_loans_by_kikoba
         
         kikoba = self.get_object()
         user = request.user
         
         # Check if user is a member of this kikoba
-        try:
-            membership = KikobaMembership.objects.get(
-                kikoba=kikoba,
-                user=user,
-                is_active=True
-            )
-        except KikobaMembership.DoesNotExist:
+        if not KikobaMembership.objects.filter(kikoba=kikoba, user=user, is_active=True).exists():
             return Response(
                 {"detail": "You are not a member of this kikoba"},
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        # Get user's loans in this kikoba
-        user_loans = Loan.objects.filter(
-            application__member=user,
-            application__kikoba=kikoba
-        ).select_related('application')
-        
-        loans_data = []
-        total_borrowed = Decimal('0')
-        total_repaid = Decimal('0')
-        total_interest_paid = Decimal('0')
-        
-        for loan in user_loans:
-            # Get repayments for this loan
-            repayments = Repayment.objects.filter(loan=loan, is_verified=True)
-            loan_repaid = repayments.aggregate(total=Sum('amount_paid'))['total'] or Decimal('0')
-            
-            principal = loan.disbursed_amount or Decimal('0')
-            interest_paid = max(loan_repaid - principal, Decimal('0'))
-            
-            total_borrowed += principal
-            total_repaid += loan_repaid
-            total_interest_paid += interest_paid
-            
-            loans_data.append({
-                'loan_id': loan.id,
-                'disbursement_date': loan.disbursement_date.isoformat() if loan.disbursement_date else None,
-                'principal': float(principal),
-                'interest_rate': float(loan.interest_rate_at_disbursement or 0),
-                'total_repayable': float(loan.total_repayable or 0),
-                'amount_repaid': float(loan_repaid),
-                'interest_paid': float(interest_paid),
-                'status': loan.status,
-                'due_date': loan.current_due_date.isoformat() if loan.current_due_date else None
-            })
+        # Get user's loans in this kikoba with their verified repayments
+        user_loans = member_loans_by_kikoba(user, [kikoba.id]).get(kikoba.id, [])
+        summary, loans_data = _loans_data(user_loans)
         
         return Response({
             'kikoba': {
@@ -708,13 +849,7 @@ class KikobaViewSet(viewsets.ModelViewSet):
                 'name': user.name,
                 'phone_number': user.phone_number
             },
-            'summary': {
-                'total_loans': len(loans_data),
-                'total_borrowed': float(total_borrowed),
-                'total_repaid': float(total_repaid),
-                'total_interest_paid': float(total_interest_paid),
-                'outstanding_balance': float(total_borrowed - total_repaid)
-            },
+            'summary': summary,
             'loans': loans_data
         })
     
@@ -727,20 +862,16 @@ class KikobaViewSet(viewsets.ModelViewSet):
     def my_shares(self, request, pk=None):
         """
         Get the currently logged-in user's share contributions in this specific kikoba.
+        The totals come from the member's ledger summary row.
         """
-        from decimal import Decimal
+        from groups.aggregates import member_totals_for_user
         
         kikoba = self.get_object()
         user = request.user
         
         # Check if user is a member of this kikoba
-        try:
-            membership = KikobaMembership.objects.get(
-                kikoba=kikoba,
-                user=user,
-                is_active=True
-            )
-        except KikobaMembership.DoesNotExist:
+        user_totals = member_totals_for_user(kikoba, user)
+        if user_totals is None:
             return Response(
                 {"detail": "You are not a member of this kikoba"},
                 status=status.HTTP_404_NOT_FOUND
@@ -748,25 +879,10 @@ class KikobaViewSet(viewsets.ModelViewSet):
         
         # Get share contributions
         share_contributions = ShareContribution.objects.filter(
-            kikoba_membership=membership
-        ).order_by('-payment_date')
-        
-        contributions_data = []
-        total_shares = Decimal('0')
-        
-        for contribution in share_contributions:
-            contributions_data.append({
-                'id': contribution.id,
-                'amount': float(contribution.amount_paid),
-                'payment_date': contribution.payment_date.isoformat(),
-                'number_of_shares': float(contribution.number_of_shares or 0),
-                'is_verified': contribution.is_verified
-            })
-            total_shares += contribution.amount_paid
+            kikoba_membership_id=user_totals.membership_id
+        ).order_by('-period_start', '-id')
         
-        # Calculate number of shares (assuming share_value from kikoba settings)
-        share_value = Decimal('10000')  # Default share value
-        number_of_shares = total_shares / share_value if total_shares > 0 else Decimal('0')
+        summary, contributions_data = _shares_data(share_contributions, user_totals)
         
         return Response({
             'kikoba': {
@@ -779,12 +895,7 @@ class KikobaViewSet(viewsets.ModelViewSet):
                 'name': user.name,
                 'phone_number': user.phone_number
             },
-            'summary': {
-                'total_amount': float(total_shares),
-                'number_of_shares': float(number_of_shares),
-                'share_value': float(share_value),
-                'total_contributions': len(contributions_data)
-            },
+            'summary': summary,
             'contributions': contributions_data
         })
     
@@ -799,8 +910,6 @@ class KikobaViewSet(viewsets.ModelViewSet):
         Get the currently logged-in user's emergency fund contributions in this specific kikoba.
         Note: Emergency fund is NOT reclaimable - it stays with the kikoba.
         """
-        from decimal import Decimal
-        
         kikoba = self.get_object()
         user = request.user
         
@@ -820,19 +929,9 @@ class KikobaViewSet(viewsets.ModelViewSet):
         # Get emergency fund contributions
         emergency_contributions = EmergencyFundContribution.objects.filter(
             kikoba_membership=membership
-        ).order_by('-contribution_date')
+        ).order_by('-contributed_on', '-id')
         
-        contributions_data = []
-        total_emergency_fund = Decimal('0')
-        
-        for contribution in emergency_contributions:
-            contributions_data.append({
-                'id': contribution.id,
-                'amount': float(contribution.amount),
-                'contribution_date': contribution.contribution_date.isoformat(),
-                'notes': contribution.notes or ''
-            })
-            total_emergency_fund += contribution.amount
+        summary, contributions_data = _emergency_fund_data(emergency_contributions)
         
         return Response({
             'kikoba': {
@@ -845,14 +944,85 @@ class KikobaViewSet(viewsets.ModelViewSet):
                 'name': user.name,
                 'phone_number': user.phone_number
             },
-            'summary': {
-                'total_amount': float(total_emergency_fund),
-                'total_contributions': len(contributions_data),
-                'is_reclaimable': False,
-                'note': 'Emergency fund stays with the kikoba and is not part of member payouts'
-            },
+            'summary': summary,
             'contributions': contributions_data
         })
+    
+    def _rosca_rotation_or_error(self, kikoba, request):
+        """Return ``(rotation, None)`` for a member of the kikoba, else ``(None, error response)``."""
+        if kikoba.id not in accessible_kikoba_ids(request, active_only=True):
+            return None, Response(
+                {"detail": "You are not a member of this kikoba"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        rotation = RoscaRotation.objects.filter(kikoba=kikoba).first()
+        if rotation is None:
+            return None, Response(
+                {"detail": "No ROSCA rotation has been set for this kikoba"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        return rotation, None
+    
+    @action(detail=True, methods=['get', 'post'])
+    def rosca(self, request, pk=None):
+        """
+        GET: the kikoba's ROSCA rotation and who receives the pot next.
+        POST: choose the rotation (kikoba admins only). This restarts the
+        rotation from its first meeting.
+        """
+        kikoba = self.get_object()
+        if request.method == 'POST':
+            if kikoba.group_type != 'rosca':
+                return Response(
+                    {"detail": "Only ROSCA vikoba have a payout rotation"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if kikoba.id not in accessible_kikoba_ids(request, roles=ADMIN_ROLES, active_only=True):
+                return Response(
+                    {"detail": "Only kikoba admins can set the rotation"},
+                    status=status.HTTP_403_FORBIDDEN
+                )
+            serializer = RoscaRotationSerializer(data=request.data, context={'request': request, 'kikoba': kikoba})
+            serializer.is_valid(raise_exception=True)
+            rotation = RoscaRotation.start(kikoba, **serializer.validated_data)
+            return Response(_rosca_rotation_data(rotation), status=status.HTTP_201_CREATED)
+        
+        rotation, error = self._rosca_rotation_or_error(kikoba, request)
+        if error:
+            return error
+        return Response(_rosca_rotation_data(rotation))
+    
+    @action(detail=True, methods=['get'], url_path='rosca/schedule')
+    def rosca_schedule(self, request, pk=None):
+        """Stream every meeting of the ROSCA rotation as JSON."""
+        kikoba = self.get_object()
+        rotation, error = self._rosca_rotation_or_error(kikoba, request)
+        if error:
+            return error
+        schedule = rotation.as_schedule()
+        return StreamingHttpResponse(
+            _rosca_schedule_json(schedule, _rosca_recipients(schedule.recipients)),
+            content_type='application/json'
+        )
+    
+    @action(detail=True, methods=['post'], url_path='rosca/payout')
+    def rosca_payout(self, request, pk=None):
+        """Record that the next recipient has received the pot (kikoba admins only)."""
+        kikoba = self.get_object()
+        rotation, error = self._rosca_rotation_or_error(kikoba, request)
+        if error:
+            return error
+        if kikoba.id not in accessible_kikoba_ids(request, roles=ADMIN_ROLES, active_only=True):
+            return Response(
+                {"detail": "Only kikoba admins can record payouts"},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        if not rotation.record_payout():
+            return Response(
+                {"detail": "Every member has already received the pot"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response(_rosca_rotation_data(rotation))
 
 
 class KikobaMembershipViewSet(viewsets.ModelViewSet):
@@ -865,13 +1035,14 @@ class KikobaMembershipViewSet(viewsets.ModelViewSet):
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ['kikoba', 'user', 'role', 'is_active']
     ordering_fields = ['joined_at']
+    query_budgets = {'list': 3, 'retrieve': 2}
     
     def get_queryset(self):
         """Filter to show only memberships for current user or their kikoba"""
         user = self.request.user
         return KikobaMembership.objects.filter(
             Q(user=user) | Q(kikoba__created_by=user)
-        )
+        ).select_related('user', 'kikoba').order_by('-joined_at', '-id')
 
 
 class KikobaInvitationViewSet(viewsets.ModelViewSet):
@@ -884,6 +1055,10 @@ class KikobaInvitationViewSet(viewsets.ModelViewSet):
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ['kikoba', 'status']
     ordering_fields = ['created_at']
+    query_budgets = {'list': 3, 'retrieve': 2}
+    
+    def get_queryset(self):
+        return KikobaInvitation.objects.select_related('kikoba', 'invited_by').order_by('-created_at', '-id')
     
     def perform_create(self, serializer):
         serializer.save(invited_by=self.request.user)
@@ -928,7 +1103,7 @@ class KikobaInvitationViewSet(viewsets.ModelViewSet):
         return Response({"detail": "Invitation rejected"})
 
 
-class SavingViewSet(viewsets.ModelViewSet):
+class SavingViewSet(OptionalCursorPaginationMixin, viewsets.ModelViewSet):
     """
     API endpoint for Savings
     """
@@ -938,13 +1113,14 @@ class SavingViewSet(viewsets.ModelViewSet):
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ['group', 'member', 'status']
     ordering_fields = ['transaction_date']
+    ordering = ['-transaction_date', '-id']
+    query_budgets = {'list': 4, 'retrieve': 3}
     
     def get_queryset(self):
         """Filter savings for user's vikoba"""
-        user = self.request.user
-        return Saving.objects.filter(
-            Q(member=user) | Q(group__memberships__user=user)
-        ).distinct()
+        return scope_to_member_or_kikobas(
+            Saving.objects.all(), self.request, 'member', 'group_id'
+        ).select_related('member', 'group', 'confirmed_by')
     
     @action(detail=True, methods=['post'])
     def confirm(self, request, pk=None):
@@ -963,7 +1139,7 @@ class SavingViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class ContributionViewSet(viewsets.ModelViewSet):
+class ContributionViewSet(OptionalCursorPaginationMixin, viewsets.ModelViewSet):
     """
     API endpoint for Contributions
     """
@@ -973,13 +1149,14 @@ class ContributionViewSet(viewsets.ModelViewSet):
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ['kikoba', 'member', 'saving_cycle', 'is_verified']
     ordering_fields = ['date_contributed']
+    ordering = ['-date_contributed', '-id']
+    query_budgets = {'list': 4, 'retrieve': 3}
     
     def get_queryset(self):
         """Filter contributions for user's vikoba"""
-        user = self.request.user
-        return Contribution.objects.filter(
-            Q(member=user) | Q(kikoba__memberships__user=user)
-        ).distinct()
+        return scope_to_member_or_kikobas(
+            Contribution.objects.all(), self.request, 'member', 'kikoba_id'
+        ).select_related('member', 'kikoba')
 
 
 class MemberBalanceViewSet(viewsets.ReadOnlyModelViewSet):
@@ -991,48 +1168,51 @@ class MemberBalanceViewSet(viewsets.ReadOnlyModelViewSet):
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['group', 'member']
+    query_budgets = {'list': 4, 'retrieve': 3}
     
     def get_queryset(self):
         """Filter balances for user's vikoba"""
-        user = self.request.user
-        return MemberBalance.objects.filter(
-            Q(member=user) | Q(group__memberships__user=user)
-        ).distinct()
+        return scope_to_member_or_kikobas(
+            MemberBalance.objects.all(), self.request, 'member', 'group_id'
+        ).select_related('member', 'group').order_by('id')
 
 
 class KikobaBalanceViewSet(viewsets.ReadOnlyModelViewSet):
     """
     API endpoint for Kikoba Balances (read-only)
     """
-    queryset = KikobaBalance.objects.all()
+    queryset = KikobaBalance.objects.select_related('kikoba').order_by('id')
     serializer_class = KikobaBalanceSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['kikoba']
+    query_budgets = {'list': 3, 'retrieve': 2}
 
 
 class SavingCycleViewSet(viewsets.ModelViewSet):
     """
     API endpoint for Saving Cycles
     """
-    queryset = SavingCycle.objects.all()
+    queryset = SavingCycle.objects.select_related('kikoba').order_by('-start_date', '-id')
     serializer_class = SavingCycleSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ['kikoba', 'is_active']
     ordering_fields = ['start_date']
+    query_budgets = {'list': 3, 'retrieve': 2}
 
 
 class LoanProductViewSet(viewsets.ModelViewSet):
     """
     API endpoint for Loan Products
     """
-    queryset = LoanProduct.objects.all()
+    queryset = LoanProduct.objects.select_related('kikoba').order_by('name', 'id')
     serializer_class = LoanProductSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ['kikoba', 'is_active']
     ordering_fields = ['name']
+    query_budgets = {'list': 3, 'retrieve': 2}
 
 
 class LoanApplicationViewSet(viewsets.ModelViewSet):
@@ -1045,6 +1225,7 @@ class LoanApplicationViewSet(viewsets.ModelViewSet):
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ['status', 'kikoba', 'member']
     ordering_fields = ['application_date']
+    query_budgets = {'list': 5, 'retrieve': 4}
     
     def get_serializer_class(self):
         """Use different serializer for create action"""
@@ -1054,10 +1235,11 @@ class LoanApplicationViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         """Filter applications for user's vikoba or user's own applications"""
-        user = self.request.user
-        return LoanApplication.objects.filter(
-            Q(member=user) | Q(kikoba__memberships__user=user)
-        ).select_related('member', 'kikoba', 'loan_product', 'decision_by').prefetch_related('guarantors').distinct()
+        return scope_to_member_or_kikobas(
+            LoanApplication.objects.all(), self.request, 'member', 'kikoba_id'
+        ).select_related(
+            'member', 'kikoba', 'loan_product', 'decision_by'
+        ).prefetch_related('guarantors').order_by('-application_date', '-id')
     
     def create(self, request, *args, **kwargs):
         """
@@ -1197,16 +1379,16 @@ class LoanViewSet(viewsets.ModelViewSet):
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ['status']
     ordering_fields = ['disbursement_date']
+    query_budgets = {'list': 4, 'retrieve': 3}
     
     def get_queryset(self):
         """Filter loans for user's vikoba"""
-        user = self.request.user
-        return Loan.objects.filter(
-            Q(application__member=user) | Q(application__kikoba__memberships__user=user)
-        ).distinct()
+        return scope_to_member_or_kikobas(
+            Loan.objects.all(), self.request, 'application__member', 'application__kikoba_id'
+        ).select_related('application__member', 'application__kikoba').order_by('-disbursement_date', '-id')
 
 
-class RepaymentViewSet(viewsets.ModelViewSet):
+class RepaymentViewSet(OptionalCursorPaginationMixin, viewsets.ModelViewSet):
     """
     API endpoint for Loan Repayments
     """
@@ -1216,14 +1398,14 @@ class RepaymentViewSet(viewsets.ModelViewSet):
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ['loan', 'is_verified', 'payment_method']
     ordering_fields = ['payment_date']
+    ordering = ['-payment_date', '-id']
+    query_budgets = {'list': 4, 'retrieve': 3}
     
     def get_queryset(self):
         """Filter repayments for user's loans"""
-        user = self.request.user
-        return Repayment.objects.filter(
-            Q(loan__application__member=user) | 
-            Q(loan__application__kikoba__memberships__user=user)
-        ).distinct()
+        return scope_to_member_or_kikobas(
+            Repayment.objects.all(), self.request, 'loan__application__member', 'loan__application__kikoba_id'
+        ).select_related('loan__application__member', 'verified_by')
     
     @action(detail=True, methods=['post'])
     def verify(self, request, pk=None):
@@ -1240,7 +1422,7 @@ class RepaymentViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
+class NotificationViewSet(OptionalCursorPaginationMixin, viewsets.ReadOnlyModelViewSet):
     """
     API endpoint for Notifications (read-only)
     """
@@ -1250,6 +1432,8 @@ class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ['user', 'is_read']
     ordering_fields = ['created_at']
+    ordering = ['-created_at', '-id']
+    query_budgets = {'list': 3, 'retrieve': 2}
     
     def get_queryset(self):
         """Filter notifications for current user"""
@@ -1271,6 +1455,47 @@ class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
         return Response({"detail": "All notifications marked as read"})
 
 
+def _record_installments(request, installment_model):
+    """
+    Record a batch of installments (kikoba admins only).
+
+    Every payment must exist and belong to a kikoba the caller administers.
+    The batch is written in one transaction with a fixed number of queries
+    (see ``InstallmentMixin.record_bulk``).
+    """
+    serializer = InstallmentBatchSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    items = serializer.validated_data['installments']
+    payment_ids = {item['payment'] for item in items}
+    payments = installment_model.payment_model().objects.filter(pk__in=payment_ids)
+    payment_kikobas = dict(payments.values_list('pk', 'kikoba_membership__kikoba_id'))
+    unknown = sorted(payment_ids - set(payment_kikobas))
+    if unknown:
+        return Response(
+            {"detail": f"Unknown payments: {', '.join(map(str, unknown))}"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if not set(payment_kikobas.values()) <= set(accessible_kikoba_ids(request, roles=ADMIN_ROLES, active_only=True)):
+        return Response(
+            {"detail": "Only kikoba admins can record installments"},
+            status=status.HTTP_403_FORBIDDEN
+        )
+
+    installment_model.record_bulk(
+        installment_model(**{f'{installment_model.payment_field}_id': item['payment'], 'amount': item['amount']})
+        for item in items
+    )
+    return Response({
+        'recorded': len(items),
+        'payments': [
+            {'id': pk, 'amount_paid': str(amount_paid), 'is_fully_paid': is_fully_paid}
+            for pk, amount_paid, is_fully_paid in payments.order_by('pk').values_list(
+                'pk', 'amount_paid', 'is_fully_paid'
+            )
+        ]
+    }, status=status.HTTP_201_CREATED)
+
+
 class EntryFeePaymentViewSet(viewsets.ModelViewSet):
     """
     API endpoint for Entry Fee Payments
@@ -1280,11 +1505,19 @@ class EntryFeePaymentViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['kikoba_membership', 'is_fully_paid']
+    query_budgets = {'list': 3, 'retrieve': 2}
     
     def get_queryset(self):
         """Filter entry fee payments for user's memberships"""
         user = self.request.user
-        return EntryFeePayment.objects.filter(kikoba_membership__user=user)
+        return EntryFeePayment.objects.filter(kikoba_membership__user=user).select_related(
+            'kikoba_membership__user', 'kikoba_membership__kikoba'
+        ).order_by('-id')
+    
+    @action(detail=False, methods=['post'])
+    def installments(self, request):
+        """Record installments towards many members' entry fees at once (kikoba admins only)."""
+        return _record_installments(request, EntryFeeInstallment)
 
 
 class ShareContributionViewSet(viewsets.ModelViewSet):
@@ -1296,11 +1529,19 @@ class ShareContributionViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['kikoba_membership', 'is_fully_paid']
+    query_budgets = {'list': 3, 'retrieve': 2}
     
     def get_queryset(self):
         """Filter share contributions for user's memberships"""
         user = self.request.user
-        return ShareContribution.objects.filter(kikoba_membership__user=user)
+        return ShareContribution.objects.filter(kikoba_membership__user=user).select_related(
+            'kikoba_membership__user', 'kikoba_membership__kikoba'
+        ).order_by('-id')
+    
+    @action(detail=False, methods=['post'])
+    def installments(self, request):
+        """Record share installments for many members at once (kikoba admins only)."""
+        return _record_installments(request, ShareInstallment)
 
 
 class EmergencyFundContributionViewSet(viewsets.ModelViewSet):
@@ -1312,8 +1553,11 @@ class EmergencyFundContributionViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['kikoba_membership']
+    query_budgets = {'list': 3, 'retrieve': 2}
     
     def get_queryset(self):
         """Filter emergency fund contributions for user's memberships"""
         user = self.request.user
-        return EmergencyFundContribution.objects.filter(kikoba_membership__user=user)
+        return EmergencyFundContribution.objects.filter(kikoba_membership__user=user).select_related(
+            'kikoba_membership__user', 'kikoba_membership__kikoba'
+        ).order_by('-id')
@@ -0,0 +1,7 @@
+"""
+Performance benchmarks for the finance calculators and payout endpoints.
+
+Run ``python -m benchmarks.run`` from the project root. Results (time, query
+count and peak memory per benchmark and member count) are written as JSON
+and compared against the committed ``benchmarks/baseline.json``.
+"""
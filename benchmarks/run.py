@@ -0,0 +1,164 @@
+"""
+Run the benchmarks and compare them with a baseline.
+
+    python -m benchmarks.run                          # all benchmarks, all sizes
+    python -m benchmarks.run --sizes 10,1000 --only finance
+    python -m benchmarks.run --output results.json --baseline benchmarks/baseline.json
+    python -m benchmarks.run --update-baseline        # rewrite benchmarks/baseline.json
+
+Every benchmark is timed ``--repeat`` times and the fastest run is kept.
+One further run measures the query count and the peak memory allocated by
+Python (tracemalloc), which would otherwise slow down the timed runs.
+
+The exit status is 1 if any benchmark is slower than the baseline by more
+than ``--tolerance`` (and by more than 1 ms), or runs more queries.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+DEFAULT_SIZES = (10, 100, 1_000, 10_000, 100_000)
+# Ignore differences below this many seconds; they are timer noise
+MIN_SIGNIFICANT_SECONDS = 0.001
+
+
+def setup_django():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings')
+    import django
+    from django.conf import settings
+
+    database = settings.DATABASES['default']['NAME']
+    if os.path.exists(database):
+        os.remove(database)
+    django.setup()
+
+    from django.core.management import call_command
+    call_command('migrate', run_syncdb=True, verbosity=0)
+    return database
+
+
+def measure(operation, repeat):
+    """Return (fastest seconds, query count, peak traced memory in bytes) for one operation."""
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        operation()
+        timings.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    try:
+        with CaptureQueriesContext(connection) as queries:
+            operation()
+        _current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return min(timings), len(queries), peak
+
+
+def run_benchmarks(benchmarks, sizes, repeat, log):
+    results = {}
+    for name, setup in benchmarks.items():
+        for size in sizes:
+            operation = setup(size)
+            seconds, queries, peak = measure(operation, repeat)
+            key = f'{name}[{size}]'
+            results[key] = {'seconds': round(seconds, 6), 'queries': queries, 'peak_memory_bytes': peak}
+            log(f'{key:<50} {seconds * 1000:>10.2f} ms {queries:>5} queries {peak / 1024:>10.0f} KiB')
+    return results
+
+
+def compare(results, baseline, tolerance, log):
+    """Log the change against the baseline and return the keys that regressed."""
+    regressions = []
+    for key, result in results.items():
+        previous = baseline.get(key)
+        if previous is None:
+            continue
+        slower = (
+            result['seconds'] > previous['seconds'] * (1 + tolerance)
+            and result['seconds'] - previous['seconds'] > MIN_SIGNIFICANT_SECONDS
+        )
+        more_queries = result['queries'] > previous['queries']
+        change = (result['seconds'] / previous['seconds'] - 1) * 100 if previous['seconds'] else 0
+        flag = ' REGRESSION' if slower or more_queries else ''
+        log(f'{key:<50} {change:>+8.1f}% time  {result["queries"] - previous["queries"]:>+4} queries{flag}')
+        if flag:
+            regressions.append(key)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the finance calculators and payout endpoints.')
+    parser.add_argument('--sizes', default=','.join(str(size) for size in DEFAULT_SIZES),
+                        help='Comma-separated member counts (default: %(default)s)')
+    parser.add_argument('--only', choices=('finance', 'api'), help='Run only one group of benchmarks')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per benchmark (default: %(default)s)')
+    parser.add_argument('--output', help='Write the results as JSON to this file')
+    parser.add_argument('--baseline', default=BASELINE_PATH, help='Baseline JSON to compare with (default: %(default)s)')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='Allowed slowdown before a benchmark counts as a regression (default: %(default)s)')
+    parser.add_argument('--update-baseline', action='store_true', help='Write the results to the baseline file')
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    database = setup_django()
+
+    from benchmarks.suites import API_BENCHMARKS, FINANCE_BENCHMARKS
+    benchmarks = {}
+    if args.only in (None, 'finance'):
+        benchmarks.update(FINANCE_BENCHMARKS)
+    if args.only in (None, 'api'):
+        benchmarks.update(API_BENCHMARKS)
+
+    log = lambda line: print(line, file=sys.stderr)  # noqa: E731
+    try:
+        results = run_benchmarks(benchmarks, sizes, args.repeat, log)
+    finally:
+        if os.path.exists(database):
+            os.remove(database)
+
+    import django
+    document = {
+        'meta': {
+            'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'machine': platform.platform(),
+            'repeat': args.repeat,
+        },
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(document, output, indent=2, sort_keys=True)
+            output.write('\n')
+    if args.update_baseline:
+        with open(args.baseline, 'w') as output:
+            json.dump(document, output, indent=2, sort_keys=True)
+            output.write('\n')
+        return 0
+
+    if not os.path.exists(args.baseline):
+        log(f'No baseline at {args.baseline}; nothing to compare with')
+        return 0
+    with open(args.baseline) as baseline_file:
+        baseline = json.load(baseline_file)['results']
+    log('\nChange against baseline:')
+    regressions = compare(results, baseline, args.tolerance, log)
+    if regressions:
+        log(f'\n{len(regressions)} benchmark(s) regressed: {", ".join(regressions)}')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,29 @@
+"""
+Settings for benchmark runs.
+
+The benchmark database is a throwaway SQLite file whose schema is created
+straight from the current models, so runs do not depend on the migration
+history of the development database.
+"""
+import os
+import tempfile
+
+from mangikikoba.settings import *  # noqa: F401,F403
+from mangikikoba.settings import INSTALLED_APPS
+
+DEBUG = False
+
+ALLOWED_HOSTS = ['testserver', 'localhost']
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ.get(
+            'BENCHMARK_DATABASE', os.path.join(tempfile.gettempdir(), 'mangikikoba-benchmarks.sqlite3')
+        ),
+    }
+}
+
+MIGRATION_MODULES = {app.rsplit('.', 1)[-1]: None for app in INSTALLED_APPS}
+
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
@@ -0,0 +1,166 @@
+"""
+Benchmark definitions.
+
+Each benchmark is a function ``(size) -> callable``: the outer call does the
+setup for a synthetic group of ``size`` members, the returned callable is
+the timed operation.
+"""
+import random
+from decimal import Decimal
+
+from finance import (
+    MemberContribution, MemberContributionSet, VikobaCalculator,
+    StandardVikoba, FixedShareVikoba, InterestRefundVikoba
+)
+
+TOTAL_INTEREST = Decimal('987654.32')
+TOTAL_FINES = Decimal('12345.67')
+
+
+def synthetic_members(size, seed=0):
+    """Member contributions shaped like real ledgers: whole shares and amounts in cents."""
+    rng = random.Random(seed)
+    return [
+        MemberContribution(
+            member_id=i,
+            shares=Decimal(rng.randint(1, 100)),
+            fixed_contribution=Decimal(rng.randint(1_000_000, 50_000_000)).scaleb(-2),
+            interest_paid=Decimal(rng.randint(0, 2_000_000)).scaleb(-2) if i % 3 == 0 else Decimal('0')
+        )
+        for i in range(size)
+    ]
+
+
+def _payouts(calculator, columnar=False):
+    def setup(size):
+        members = synthetic_members(size)
+        if columnar:
+            members = MemberContributionSet.from_members(members)
+        return lambda: calculator.calculate_payouts(members, TOTAL_INTEREST, TOTAL_FINES)
+    return setup
+
+
+def _loans(size):
+    rng = random.Random(size)
+    loans = [(rng.randint(10_000, 5_000_000), rng.choice((0.05, 0.1, 0.2)), rng.randint(1, 24)) for _ in range(size)]
+
+    def run():
+        for principal, rate, months in loans:
+            VikobaCalculator.calculate_loan(principal, rate, months)
+    return run
+
+
+def _loan_book_risk(size):
+    from loans.risk import DEFAULT_SCENARIOS, LoanBook, simulate_collections
+
+    rng = random.Random(size)
+    remaining = [rng.randint(10_000, 5_000_000) * 100 for _ in range(size)]
+    book = LoanBook(
+        kikoba_id=0,
+        loan_ids=list(range(size)),
+        remaining=remaining,
+        principal=[amount * 10 // 11 for amount in remaining],
+        default_rate=[rng.uniform(0.01, 0.3) for _ in range(size)],
+        late_rate=[rng.uniform(0.0, 0.2) for _ in range(size)],
+    )
+    return lambda: simulate_collections(book, DEFAULT_SCENARIOS, random.Random(0))
+
+
+FINANCE_BENCHMARKS = {
+    'finance.standard.calculate_payouts': _payouts(StandardVikoba),
+    'finance.fixed_share.calculate_payouts': _payouts(FixedShareVikoba),
+    'finance.interest_refund.calculate_payouts': _payouts(InterestRefundVikoba),
+    'finance.standard.calculate_payouts_set': _payouts(StandardVikoba, columnar=True),
+    'finance.fixed_share.calculate_payouts_set': _payouts(FixedShareVikoba, columnar=True),
+    'finance.interest_refund.calculate_payouts_set': _payouts(InterestRefundVikoba, columnar=True),
+    'finance.calculate_loan': _loans,
+    'loans.risk.simulate_collections': _loan_book_risk,
+}
+
+
+_seeded = {}
+
+
+def seed_kikoba(size):
+    """
+    Create a kikoba with ``size`` members, each with a share contribution
+    and entry fee and every fifth one with a repaid loan. Each size is
+    seeded once per run and shared by the endpoint benchmarks.
+
+    Rows are bulk inserted and the members' ledger summaries rebuilt once,
+    as after an import.
+
+    Returns:
+        (kikoba, one of its members)
+    """
+    from django.contrib.auth.hashers import make_password
+    from groups.aggregates import rebuild_ledger_summaries
+    from groups.models import Kikoba, KikobaMembership, ShareContribution, EntryFeePayment
+    from loans.models import LoanApplication, Loan, Repayment
+    from registration.models import User
+
+    if size in _seeded:
+        return _seeded[size]
+    kikoba = Kikoba.objects.create(name=f'Benchmark {size}', group_type='standard')
+    password = make_password(None)
+    users = User.objects.bulk_create([
+        User(phone_number=f'B{size}-{i}', name=f'Member {i}', password=password)
+        for i in range(size)
+    ])
+    memberships = KikobaMembership.objects.bulk_create([
+        KikobaMembership(kikoba=kikoba, user=user) for user in users
+    ])
+    ShareContribution.objects.bulk_create([
+        ShareContribution(
+            kikoba_membership=membership, amount_due=Decimal('100000'),
+            amount_paid=Decimal('10000') * (1 + i % 10),
+            period_start='2025-01-01', period_end='2025-12-31'
+        )
+        for i, membership in enumerate(memberships)
+    ])
+    EntryFeePayment.objects.bulk_create([
+        EntryFeePayment(kikoba_membership=membership, amount_due=Decimal('5000'), amount_paid=Decimal('5000'))
+        for membership in memberships
+    ])
+    applications = LoanApplication.objects.bulk_create([
+        LoanApplication(member=user, kikoba=kikoba, requested_amount=Decimal('100000'), status='approved')
+        for user in users[::5]
+    ])
+    loans = Loan.objects.bulk_create([
+        Loan(application=application, disbursed_amount=Decimal('100000'), status='active')
+        for application in applications
+    ])
+    Repayment.objects.bulk_create([
+        Repayment(loan=loan, amount_paid=Decimal('110000'), is_verified=True) for loan in loans
+    ])
+    rebuild_ledger_summaries(kikoba)
+    _seeded[size] = kikoba, users[0]
+    return _seeded[size]
+
+
+def _endpoint(path):
+    def setup(size):
+        from django.core.cache import cache
+        from django.test import Client
+        from rest_framework_simplejwt.tokens import AccessToken
+        from groups.snapshots import clear_local_snapshots
+
+        kikoba, user = seed_kikoba(size)
+        client = Client(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+        url = f'/api/v1/vikoba/{kikoba.id}/{path}/'
+
+        def run():
+            # Time the uncached path: the kikoba snapshot is rebuilt every run
+            clear_local_snapshots()
+            cache.clear()
+            response = client.get(url)
+            if response.status_code != 200:
+                raise RuntimeError(f'GET {url} returned {response.status_code}')
+        return run
+    return setup
+
+
+API_BENCHMARKS = {
+    'api.member_totals': _endpoint('member_totals'),
+    'api.my_total': _endpoint('my_total'),
+}
@@ -219,6 +219,10 @@ class AuditLog(models.Model):
     
     class Meta:
         ordering = ['-timestamp']
+        indexes = [
+            # Keyset pagination of the audit log listing
+            models.Index(fields=['-timestamp', '-id'], name='auditlog_ts_id_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user} - {self.action} - {self.model_name} at {self.timestamp}"
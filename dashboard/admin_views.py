@@ -3,8 +3,11 @@ from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib import messages
 from django.db.models import Sum, Count, Q
 from django.utils import timezone
+from django.utils.dateparse import parse_date
 from django.http import JsonResponse
 from django.core.paginator import Paginator
+from rest_framework.request import Request
+from api.pagination import TransactionCursorPagination, wants_cursor_pagination
 from datetime import timedelta
 
 from .admin_models import (
@@ -12,6 +15,7 @@ from .admin_models import (
     SystemNotification, AuditLog
 )
 from groups.models import Kikoba, KikobaMembership
+from groups.rollups import monthly_totals
 from registration.models import User
 from loans.models import Loan
 
@@ -501,9 +505,20 @@ def audit_logs(request):
     if user_filter:
         logs = logs.filter(user_id=user_filter)
     
-    paginator = Paginator(logs, 50)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    cursor_page = None
+    if wants_cursor_pagination(request):
+        # Keyset pagination: no COUNT(*) and no OFFSET scan on deep pages
+        cursor_paginator = TransactionCursorPagination(ordering=('-timestamp', '-id'))
+        cursor_paginator.page_size = 50
+        page_obj = cursor_paginator.paginate_queryset(logs, Request(request))
+        cursor_page = {
+            'next': cursor_paginator.get_next_link(),
+            'previous': cursor_paginator.get_previous_link(),
+        }
+    else:
+        paginator = Paginator(logs, 50)
+        page_number = request.GET.get('page')
+        page_obj = paginator.get_page(page_number)
     
     # Get unique model names and users for filters
     model_names = AuditLog.objects.values_list('model_name', flat=True).distinct()
@@ -512,6 +527,7 @@ def audit_logs(request):
     context = {
         'page_title': 'Audit Logs',
         'page_obj': page_obj,
+        'cursor_page': cursor_page,
         'action_filter': action_filter,
         'model_filter': model_filter,
         'user_filter': user_filter,
@@ -555,6 +571,17 @@ def reports_analytics(request):
         total_raised=Sum('current_amount')
     )
     
+    # Money movements of all vikoba by month (months overlapping the range), from the monthly rollups
+    try:
+        period = [parse_date(str(start_date)), parse_date(str(end_date))]
+    except ValueError:
+        period = [None, None]
+    monthly_movements = monthly_totals(*period) if all(period) and period[0] <= period[1] else []
+    movement_totals = {
+        field: sum(month[field] for month in monthly_movements)
+        for field in ('collected', 'disbursements', 'repayments', 'interest', 'new_members')
+    }
+    
     context = {
         'page_title': 'Reports & Analytics',
         'start_date': start_date,
@@ -562,6 +589,8 @@ def reports_analytics(request):
         'vikoba_growth': vikoba_growth,
         'user_growth': user_growth,
         'investment_data': investment_data,
+        'monthly_movements': monthly_movements,
+        'movement_totals': movement_totals,
     }
     
     return render(request, 'dashboard/super_admin/reports.html', context)
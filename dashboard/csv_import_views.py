@@ -8,7 +8,8 @@ from datetime import datetime
 import csv
 import io
 
-from groups.models import KikobaMembership, ShareContribution
+from groups import ledger
+from groups.models import Kikoba, KikobaMembership, ShareContribution, MemberLedgerSummary
 from savings.models import Contribution
 
 
@@ -275,8 +276,13 @@ def upload_contributions_csv(request):
                 with transaction.atomic():
                     if contributions_to_create:
                         Contribution.objects.bulk_create(contributions_to_create)
+                        Kikoba.bump_ledger_version([current_kikoba.id])
+                        ledger.sync(Contribution, contributions_to_create)
                     if share_contributions_to_create:
                         ShareContribution.objects.bulk_create(share_contributions_to_create)
+                        # bulk_create skips save(), so apply the ledger summary deltas here
+                        MemberLedgerSummary.record_bulk(share_contributions_to_create)
+                        ledger.sync(ShareContribution, share_contributions_to_create)
                     
                     success_msg = f"Successfully imported {total_to_create} contribution(s) for {member_count} member(s)!"
                     if contribution_type == 'shares':
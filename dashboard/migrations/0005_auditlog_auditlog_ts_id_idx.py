@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:47
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        (
+            "dashboard",
+            "0004_investment_core_objective_investment_current_price_and_more",
+        ),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="auditlog",
+            index=models.Index(fields=["-timestamp", "-id"], name="auditlog_ts_id_idx"),
+        ),
+    ]
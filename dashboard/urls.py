@@ -21,6 +21,7 @@ urlpatterns = [
     path('kikoba-admin/csv-import/upload/', csv_import_views.upload_contributions_csv, name='upload_contributions_csv'),
     path('kikoba-admin/loans-management/', views.kikoba_loans_management_view, name='kikoba_loans_management'),
     path('kikoba-admin/credit-score/', views.credit_score_engine_view, name='credit_score_engine'),
+    path('kikoba-admin/loan-risk/', views.loan_book_risk_view, name='loan_book_risk'),
     path('kikoba-admin/auditing-reporting/', views.auditing_reporting_view, name='auditing_reporting'),
     path('kikoba-admin/learning-hub/', views.learning_hub_view, name='learning_hub'),
 
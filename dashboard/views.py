@@ -9,6 +9,7 @@ from .forms import AddMemberForm, AddLoanForm, PolicyLinkForm, BatchContribution
 from .models import PolicyLink
 from registration.models import User 
 from loans.models import Loan, LoanApplication
+from groups import ledger
 from groups.models import Kikoba, KikobaMembership
 from savings.models import Contribution
 from django.contrib.admin.views.decorators import staff_member_required
@@ -98,48 +99,31 @@ def kikoba_admin_dashboard(request, kikoba_id=None):
         current_kikoba = admin_membership.kikoba
     
     # Fetch analytics data for the dashboard
-    from django.db.models import Sum, Count
     from savings.models import Contribution
     from groups.models import ShareContribution
+    from groups.rollups import monthly_totals, months_back
+    from groups.snapshots import get_kikoba_snapshot
+    
+    snapshot = get_kikoba_snapshot(current_kikoba)
     
     # Member statistics
-    total_members = KikobaMembership.objects.filter(kikoba=current_kikoba, is_active=True).count()
+    total_members = snapshot.member_count
     
     # Contribution statistics
-    total_contributions = Contribution.objects.filter(kikoba=current_kikoba).aggregate(
-        total=Sum('amount'),
-        count=Count('id')
-    )
-    total_contributions_amount = total_contributions['total'] or 0
-    total_contributions_count = total_contributions['count'] or 0
+    total_contributions_amount = snapshot.contributions_amount
+    total_contributions_count = snapshot.contributions_count
     
     # Share contributions
-    total_share_contributions = ShareContribution.objects.filter(
-        kikoba_membership__kikoba=current_kikoba
-    ).aggregate(
-        total=Sum('amount_paid'),
-        count=Count('id')
-    )
-    total_shares_amount = total_share_contributions['total'] or 0
-    total_shares_count = total_share_contributions['count'] or 0
+    total_shares_amount = snapshot.shares_amount
+    total_shares_count = snapshot.shares_count
     
     # Loan statistics
-    total_loans = Loan.objects.filter(application__kikoba=current_kikoba).count()
-    total_loans_amount = Loan.objects.filter(application__kikoba=current_kikoba).aggregate(
-        total=Sum('disbursed_amount')
-    )['total'] or 0
+    total_loans = snapshot.loans_count
+    total_loans_amount = snapshot.loans_amount
     
-    # Calculate outstanding balance from total_repayable minus repayments
-    active_loans = Loan.objects.filter(
-        application__kikoba=current_kikoba,
-        status__in=['active', 'overdue']
-    )
-    active_loans_count = active_loans.count()
-    
-    # Calculate outstanding balance (total_repayable for active loans)
-    outstanding_balance = active_loans.aggregate(
-        total=Sum('total_repayable')
-    )['total'] or 0
+    # Active loans and their outstanding balance (total_repayable)
+    active_loans_count = snapshot.active_loans_count
+    outstanding_balance = snapshot.outstanding_balance
     
     # Recent activity - last 10 contributions
     recent_contributions = Contribution.objects.filter(
@@ -154,6 +138,9 @@ def kikoba_admin_dashboard(request, kikoba_id=None):
     # Calculate total collected (contributions + shares)
     total_collected = total_contributions_amount + total_shares_amount
 
+    # Last 12 months, one rollup row per month
+    monthly_trend = monthly_totals(*months_back(12), kikoba_ids=[current_kikoba.id])
+
     context = {
         'page_title': f'Admin Dashboard - {current_kikoba.name}',
         'current_kikoba': current_kikoba,
@@ -177,6 +164,7 @@ def kikoba_admin_dashboard(request, kikoba_id=None):
         # Recent activity
         'recent_contributions': recent_contributions,
         'recent_share_contributions': recent_share_contributions,
+        'monthly_trend': monthly_trend,
     }
 
     return render(request, 'dashboard/kikoba_admin_dashboard.html', context)
@@ -1054,6 +1042,8 @@ def historical_batch_contributions_view(request):
                     try:
                         with transaction.atomic():
                             Contribution.objects.bulk_create(contributions_to_create)
+                            Kikoba.bump_ledger_version([current_kikoba.id])
+                            ledger.sync(Contribution, contributions_to_create)
                             success_count = len(contributions_to_create)
                             
                             messages.success(
@@ -1099,6 +1089,41 @@ def credit_score_engine_view(request):
     }
     return render(request, 'dashboard/credit_score_engine.html', context)
 
+@login_required
+def loan_book_risk_view(request):
+    from groups.aggregates import collect_member_totals
+    from loans.risk import DEFAULT_SCENARIOS, loan_book_risk
+
+    admin_membership = KikobaMembership.objects.filter(user=request.user, role__in=['kikoba_admin', 'chairperson', 'treasurer'], is_active=True).select_related('kikoba').first()
+    if not admin_membership:
+        messages.error(request, "You do not have administrative access.")
+        return redirect('dashboard:home')
+    current_kikoba = admin_membership.kikoba
+
+    try:
+        scenarios = int(request.GET.get('scenarios', DEFAULT_SCENARIOS))
+    except ValueError:
+        scenarios = DEFAULT_SCENARIOS
+    risk = loan_book_risk(current_kikoba, scenarios=scenarios)
+
+    # One row per member with their payout at each percentile
+    member_rows = [
+        {
+            'name': totals.name,
+            'contribution': totals.total_contribution,
+            'payouts': [percentile.payouts.get(totals.user_id) for percentile in risk.percentiles],
+        }
+        for totals in collect_member_totals(current_kikoba)
+    ]
+    context = {
+        'page_title': f'Loan Book Risk - {current_kikoba.name}',
+        'current_kikoba': current_kikoba,
+        'risk': risk,
+        'shortfall_percent': risk.shortfall_probability * 100,
+        'member_rows': member_rows,
+    }
+    return render(request, 'dashboard/loan_book_risk.html', context)
+
 @login_required
 def auditing_reporting_view(request):
     admin_membership = KikobaMembership.objects.filter(user=request.user, role__in=['kikoba_admin', 'chairperson', 'treasurer'], is_active=True).select_related('kikoba').first()
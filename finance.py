@@ -3,15 +3,29 @@ Financial calculations for the VIKOBA application.
 
 This module implements the core financial calculations for different community finance models
 including Standard VIKOBA, Fixed-Share VIKOBA, Interest Refund VIKOBA, and ROSCA.
+
+Group share-outs are computed by ``PayoutEngine`` on integer columns and settled
+in whole minor units with largest-remainder rounding, so payouts always add up
+to the group total.
+
+Loan repayment schedules are generated by ``AmortizationSchedule`` (flat or
+reducing-balance, with an optional grace period), also in minor units. ROSCA
+rotations are described compactly by ``RoscaSchedule``.
 """
-from decimal import Decimal, getcontext
-from typing import List, Dict, Any, Optional
+from calendar import monthrange
+from datetime import date, timedelta
+from fractions import Fraction
+from functools import reduce
+from types import MappingProxyType
+from decimal import Decimal
+from typing import Iterator, List, Dict, Any, Optional, Sequence, Tuple, Union
 from dataclasses import dataclass
 
-# Set precision for decimal calculations
-getcontext().prec = 10
+from money import (
+    Amount, EXACT, MINOR_UNIT_PLACES, ZERO, allocate_largest_remainder, to_decimal
+)
 
-@dataclass
+@dataclass(slots=True)
 class LoanDetails:
     """Represents a loan with its details."""
     principal: Decimal
@@ -27,7 +41,7 @@ class LoanDetails:
         self.total_repayment = self.principal + self.total_interest
         self.monthly_payment = self.total_repayment / self.duration_months if self.duration_months > 0 else Decimal('0')
 
-@dataclass
+@dataclass(slots=True)
 class MemberContribution:
     """Represents a member's contribution to the group."""
     member_id: Any
@@ -41,9 +55,335 @@ class MemberContribution:
         """Total contribution is either shares or fixed contribution, whichever is applicable."""
         return self.shares if self.shares else self.fixed_contribution
 
+class MemberContributionSet:
+    """
+    Contributions of a whole group stored as parallel columns.
+    
+    Amounts are exact integers in units of ``10 ** -scale`` shillings, as in
+    ``ContributionColumns``; the scale grows when an appended value needs
+    more decimal places. Iterating or indexing yields ``__slots__`` row views
+    with the attributes of ``MemberContribution``, so code written for a
+    list of ``MemberContribution`` accepts a set unchanged, and the payout
+    calculators turn a set into ``ContributionColumns`` without converting
+    each member again.
+    """
+    __slots__ = ('member_ids', 'shares', 'fixed_contribution', 'interest_paid', 'fines_paid', 'scale')
+    AMOUNT_FIELDS = ('shares', 'fixed_contribution', 'interest_paid', 'fines_paid')
+    
+    def __init__(self, scale: int = MINOR_UNIT_PLACES):
+        self.member_ids = []
+        self.shares = []
+        self.fixed_contribution = []
+        self.interest_paid = []
+        self.fines_paid = []
+        self.scale = scale
+    
+    @classmethod
+    def from_members(cls, members: Sequence[MemberContribution]) -> 'MemberContributionSet':
+        """Build a set from ``MemberContribution`` objects (or rows of another set)."""
+        contributions = cls()
+        for m in members:
+            contributions.append(m.member_id, m.shares, m.fixed_contribution, m.interest_paid, m.fines_paid)
+        return contributions
+    
+    def append(self, member_id: Any, shares=0, fixed_contribution=0, interest_paid=0, fines_paid=0):
+        """Add one member; amounts may be Decimal, int, float or numeric strings."""
+        amounts = [to_decimal(value) for value in (shares, fixed_contribution, interest_paid, fines_paid)]
+        units = self._units(amounts)
+        self.member_ids.append(member_id)
+        for field, value in zip(self.AMOUNT_FIELDS, units):
+            getattr(self, field).append(value)
+    
+    def _units(self, amounts: List[Decimal]) -> List[int]:
+        scaled = [amount.scaleb(self.scale, EXACT) for amount in amounts]
+        units = [int(value) for value in scaled]
+        if units != scaled:
+            self._rescale(max(-amount.as_tuple().exponent for amount in amounts))
+            units = [int(amount.scaleb(self.scale, EXACT)) for amount in amounts]
+        return units
+    
+    def _rescale(self, scale: int):
+        if scale <= self.scale:
+            return
+        factor = 10 ** (scale - self.scale)
+        for field in self.AMOUNT_FIELDS:
+            setattr(self, field, [value * factor for value in getattr(self, field)])
+        self.scale = scale
+    
+    def _decimal(self, units: int) -> Decimal:
+        return Decimal(units).scaleb(-self.scale, EXACT)
+    
+    def __len__(self) -> int:
+        return len(self.member_ids)
+    
+    def __getitem__(self, index: int) -> 'MemberContributionRow':
+        if index < 0:
+            index += len(self.member_ids)
+        if not 0 <= index < len(self.member_ids):
+            raise IndexError("member index out of range")
+        return MemberContributionRow(self, index)
+    
+    def __iter__(self) -> Iterator['MemberContributionRow']:
+        for index in range(len(self.member_ids)):
+            yield MemberContributionRow(self, index)
+
+class MemberContributionRow:
+    """Read-only view of one member of a ``MemberContributionSet``."""
+    __slots__ = ('_contributions', '_index')
+    
+    def __init__(self, contributions: MemberContributionSet, index: int):
+        self._contributions = contributions
+        self._index = index
+    
+    @property
+    def member_id(self) -> Any:
+        return self._contributions.member_ids[self._index]
+    
+    @property
+    def shares(self) -> Decimal:
+        return self._contributions._decimal(self._contributions.shares[self._index])
+    
+    @property
+    def fixed_contribution(self) -> Decimal:
+        return self._contributions._decimal(self._contributions.fixed_contribution[self._index])
+    
+    @property
+    def interest_paid(self) -> Decimal:
+        return self._contributions._decimal(self._contributions.interest_paid[self._index])
+    
+    @property
+    def fines_paid(self) -> Decimal:
+        return self._contributions._decimal(self._contributions.fines_paid[self._index])
+    
+    @property
+    def total_contribution(self) -> Decimal:
+        """Total contribution is either shares or fixed contribution, whichever is applicable."""
+        return self.shares if self.shares else self.fixed_contribution
+    
+    def __repr__(self) -> str:
+        return (
+            f"MemberContributionRow(member_id={self.member_id!r}, shares={self.shares}, "
+            f"fixed_contribution={self.fixed_contribution}, interest_paid={self.interest_paid})"
+        )
+
+# Anything the payout calculators accept as a group's members
+Members = Union[Sequence[MemberContribution], MemberContributionSet]
+
+@dataclass
+class GroupTotals:
+    """Group-wide figures needed to calculate a single member's payout."""
+    total_shares: Decimal = Decimal('0')
+    member_count: int = 0
+    total_interest: Decimal = Decimal('0')
+    total_fines: Decimal = Decimal('0')
+    
+    @classmethod
+    def from_members(
+        cls,
+        members: Members,
+        total_interest: Decimal,
+        total_fines: Decimal
+    ) -> 'GroupTotals':
+        """Derive the group-wide figures from a full list of member contributions."""
+        return cls(
+            total_shares=sum((m.shares for m in members), Decimal('0')),
+            member_count=len(members),
+            total_interest=total_interest,
+            total_fines=total_fines
+        )
+
+@dataclass
+class ContributionColumns:
+    """
+    Member contributions stored as parallel integer columns.
+    
+    Every amount is an exact integer in units of ``10 ** -scale`` shillings,
+    where ``scale`` is at least ``MINOR_UNIT_PLACES`` and large enough to
+    hold every input without rounding. The payout engine works on these
+    columns with plain integer arithmetic instead of per-member Decimal math.
+    """
+    member_ids: List[Any]
+    shares: List[int]
+    fixed_contribution: List[int]
+    interest_paid: List[int]
+    total_interest: int
+    total_fines: int
+    scale: int
+    
+    @classmethod
+    def from_members(
+        cls,
+        members: Members,
+        total_interest: Decimal,
+        total_fines: Decimal
+    ) -> 'ContributionColumns':
+        """Convert member contributions and group totals into integer columns."""
+        if isinstance(members, MemberContributionSet):
+            return cls.from_contribution_set(members, total_interest, total_fines)
+        shares = [to_decimal(m.shares) for m in members]
+        fixed = [to_decimal(m.fixed_contribution) for m in members]
+        interest = [to_decimal(m.interest_paid) for m in members]
+        totals = (to_decimal(total_interest), to_decimal(total_fines))
+        
+        # An exact sum carries the smallest exponent of its terms
+        scale = MINOR_UNIT_PLACES
+        for column in (shares, fixed, interest, totals):
+            exponent = reduce(EXACT.add, column, Decimal('0')).as_tuple().exponent
+            scale = max(scale, -exponent)
+        
+        def scaled(values):
+            return [int(value.scaleb(scale, EXACT)) for value in values]
+        
+        total_interest, total_fines = scaled(totals)
+        return cls(
+            member_ids=[m.member_id for m in members],
+            shares=scaled(shares),
+            fixed_contribution=scaled(fixed),
+            interest_paid=scaled(interest),
+            total_interest=total_interest,
+            total_fines=total_fines,
+            scale=scale
+        )
+    
+    @classmethod
+    def from_contribution_set(
+        cls,
+        contributions: MemberContributionSet,
+        total_interest: Decimal,
+        total_fines: Decimal
+    ) -> 'ContributionColumns':
+        """
+        Use the integer columns of a ``MemberContributionSet`` directly.
+        
+        The columns are shared with the set unless the group totals need a
+        larger scale.
+        """
+        totals = (to_decimal(total_interest), to_decimal(total_fines))
+        scale = max(contributions.scale, *(-total.as_tuple().exponent for total in totals))
+        factor = 10 ** (scale - contributions.scale)
+        
+        def rescaled(column):
+            return column if factor == 1 else [value * factor for value in column]
+        
+        total_interest, total_fines = (int(total.scaleb(scale, EXACT)) for total in totals)
+        return cls(
+            member_ids=contributions.member_ids,
+            shares=rescaled(contributions.shares),
+            fixed_contribution=rescaled(contributions.fixed_contribution),
+            interest_paid=rescaled(contributions.interest_paid),
+            total_interest=total_interest,
+            total_fines=total_fines,
+            scale=scale
+        )
+    
+    @property
+    def minor_unit_divisor(self) -> int:
+        """Number of column units in one minor unit."""
+        return 10 ** (self.scale - MINOR_UNIT_PLACES)
+
+def minor_units_to_decimal(amount: int) -> Decimal:
+    """Convert an amount in minor units to shillings."""
+    return Amount(amount).to_decimal()
+
+class PayoutEngine:
+    """
+    Share-out payouts for whole groups, settled in minor units.
+    
+    Each method returns one payout per member (in ``columns`` order) in
+    minor units. Payouts add up exactly to the group's distributable total
+    rounded to the minor unit, so a share-out reconciles to the cent however
+    many members the group has.
+    """
+    
+    @staticmethod
+    def standard(columns: ContributionColumns) -> List[int]:
+        """Shares plus profit proportional to shares (``StandardVikoba``)."""
+        total_shares = sum(columns.shares)
+        if total_shares == 0:
+            return [0] * len(columns.shares)
+        # shares * (1 + profit / total_shares) over a common denominator
+        factor = total_shares + columns.total_interest + columns.total_fines
+        return allocate_largest_remainder(
+            [shares * factor for shares in columns.shares],
+            total_shares * columns.minor_unit_divisor
+        )
+    
+    @staticmethod
+    def standard_profit(columns: ContributionColumns) -> List[int]:
+        """Each member's share of the profit, in proportion to shares (``StandardVikoba``)."""
+        total_shares = sum(columns.shares)
+        if total_shares == 0:
+            return [0] * len(columns.shares)
+        profit = columns.total_interest + columns.total_fines
+        return allocate_largest_remainder(
+            [shares * profit for shares in columns.shares],
+            total_shares * columns.minor_unit_divisor
+        )
+    
+    @staticmethod
+    def standard_share_out(columns: ContributionColumns) -> List[int]:
+        """
+        ``standard`` payouts in money: contribution plus profit share.
+        
+        ``standard`` itself counts the member's stake in shares, not
+        shillings, so it cannot be compared with contributions.
+        """
+        return [
+            fixed // columns.minor_unit_divisor + profit
+            for fixed, profit in zip(columns.fixed_contribution, PayoutEngine.standard_profit(columns))
+        ]
+    
+    @staticmethod
+    def fixed_share(columns: ContributionColumns) -> List[int]:
+        """Contribution plus an equal share of profit (``FixedShareVikoba``)."""
+        member_count = len(columns.member_ids)
+        if member_count == 0:
+            return []
+        profit = columns.total_interest + columns.total_fines
+        return allocate_largest_remainder(
+            [fixed * member_count + profit for fixed in columns.fixed_contribution],
+            member_count * columns.minor_unit_divisor
+        )
+    
+    @staticmethod
+    def interest_refund(columns: ContributionColumns) -> List[int]:
+        """Contribution, refunded interest and an equal share of fines (``InterestRefundVikoba``)."""
+        member_count = len(columns.member_ids)
+        if member_count == 0:
+            return []
+        fines = columns.total_fines
+        return allocate_largest_remainder(
+            [
+                (fixed + interest) * member_count + fines
+                for fixed, interest in zip(columns.fixed_contribution, columns.interest_paid)
+            ],
+            member_count * columns.minor_unit_divisor
+        )
+
+def _payouts_by_member(columns: ContributionColumns, payouts: List[int]) -> Dict[Any, Decimal]:
+    return {
+        member_id: minor_units_to_decimal(amount)
+        for member_id, amount in zip(columns.member_ids, payouts)
+    }
+
 class VikobaCalculator:
     """Base class for VIKOBA financial calculations."""
     
+    @classmethod
+    def calculate_share_out_payouts(
+        cls,
+        members: Members,
+        total_interest: Decimal,
+        total_fines: Decimal
+    ) -> Dict[Any, Decimal]:
+        """
+        Payouts in shillings, comparable with what each member paid in.
+        
+        The same as ``calculate_payouts`` for models whose payouts are
+        already money.
+        """
+        return cls.calculate_payouts(members, total_interest, total_fines)
+    
     @staticmethod
     def calculate_loan(principal: float, annual_interest_rate: float, duration_months: int) -> LoanDetails:
         """
@@ -57,20 +397,126 @@ class VikobaCalculator:
         Returns:
             LoanDetails object with calculated values
         """
-        monthly_rate = Decimal(str(annual_interest_rate)) / Decimal('12')
+        monthly_rate = to_decimal(annual_interest_rate) / 12
         return LoanDetails(
-            principal=Decimal(str(principal)),
+            principal=to_decimal(principal),
             monthly_interest_rate=monthly_rate,
             duration_months=duration_months
         )
 
+@dataclass
+class ScheduledInstallment:
+    """One installment of a loan repayment schedule."""
+    number: int
+    due_date: date
+    principal: Amount
+    interest: Amount
+    
+    @property
+    def total(self) -> Amount:
+        return self.principal + self.interest
+
+def add_months(start: date, months: int) -> date:
+    """Return the same day ``months`` later, clamped to the end of shorter months."""
+    month_index = start.month - 1 + months
+    year, month = start.year + month_index // 12, month_index % 12 + 1
+    return date(year, month, min(start.day, monthrange(year, month)[1]))
+
+class AmortizationSchedule:
+    """
+    Monthly loan repayment schedules.
+    
+    ``flat`` charges simple interest on the original principal for the whole
+    term, as ``VikobaCalculator.calculate_loan`` does, and spreads principal
+    and interest evenly over the installments. ``reducing_balance`` charges
+    each month's interest on the outstanding principal and keeps the
+    installment constant (annuity); the last installment clears whatever
+    principal is left.
+    
+    Installments fall due monthly, the first one month after the grace
+    period ends. No interest accrues during the grace period.
+    """
+    FLAT = 'flat'
+    REDUCING_BALANCE = 'reducing_balance'
+    METHODS = (FLAT, REDUCING_BALANCE)
+    
+    @classmethod
+    def generate(
+        cls,
+        principal: Decimal,
+        annual_interest_rate: Decimal,
+        duration_months: int,
+        start_date: date,
+        method: str = FLAT,
+        grace_period_days: int = 0
+    ) -> List[ScheduledInstallment]:
+        """
+        Generate a repayment schedule.
+        
+        Args:
+            principal: Loan amount
+            annual_interest_rate: Annual interest rate as a decimal (e.g., 0.10 for 10%)
+            duration_months: Number of monthly installments
+            start_date: Disbursement date
+            method: 'flat' or 'reducing_balance'
+            grace_period_days: Days after disbursement before the schedule starts
+            
+        Returns:
+            Installments in due order; principal parts add up to the principal
+        """
+        if method not in cls.METHODS:
+            raise ValueError(f"Unknown amortization method: {method}")
+        if duration_months <= 0:
+            return []
+        
+        principal = Amount.from_decimal(principal)
+        monthly_rate = Fraction(to_decimal(annual_interest_rate)) / 12
+        if method == cls.FLAT:
+            principals, interests = cls._flat(principal, monthly_rate, duration_months)
+        else:
+            principals, interests = cls._reducing_balance(principal, monthly_rate, duration_months)
+        
+        schedule_start = start_date + timedelta(days=grace_period_days)
+        return [
+            ScheduledInstallment(
+                number=number,
+                due_date=add_months(schedule_start, number),
+                principal=principal_part,
+                interest=interest_part
+            )
+            for number, (principal_part, interest_part) in enumerate(zip(principals, interests), start=1)
+        ]
+    
+    @staticmethod
+    def _flat(principal: Amount, monthly_rate: Fraction, months: int) -> Tuple[List[Amount], List[Amount]]:
+        total_interest = principal.multiply(monthly_rate * months)
+        weights = [1] * months
+        return principal.allocate(weights), total_interest.allocate(weights)
+    
+    @staticmethod
+    def _reducing_balance(principal: Amount, monthly_rate: Fraction, months: int) -> Tuple[List[Amount], List[Amount]]:
+        if monthly_rate == 0:
+            return principal.allocate([1] * months), [ZERO] * months
+        
+        growth = (1 + monthly_rate) ** months
+        payment = principal.multiply(monthly_rate * growth / (growth - 1))
+        balance = principal
+        principals, interests = [], []
+        for number in range(1, months + 1):
+            interest = balance.multiply(monthly_rate)
+            principal_part = balance if number == months else min(payment - interest, balance)
+            principals.append(principal_part)
+            interests.append(interest)
+            balance -= principal_part
+        return principals, interests
+
 class StandardVikoba(VikobaCalculator):
     """Standard VIKOBA / Variable-Share ASCA model."""
     
     @classmethod
     def calculate_payouts(
         cls,
-        members: List[MemberContribution],
+        members: Members,
         total_interest: Decimal,
         total_fines: Decimal
     ) -> Dict[Any, Decimal]:
@@ -78,24 +524,60 @@ class StandardVikoba(VikobaCalculator):
         Calculate payouts for members based on their shares.
         
         Args:
-            members: List of member contributions
+            members: Member contributions, as a list or a MemberContributionSet
             total_interest: Total interest collected from all loans
             total_fines: Total fines collected
             
         Returns:
-            Dictionary mapping member_id to payout amount
+            Dictionary mapping member_id to payout amount, settled in minor
+            units (see ``PayoutEngine``)
         """
-        total_shares = sum(m.shares for m in members)
-        if total_shares == 0:
+        columns = ContributionColumns.from_members(members, total_interest, total_fines)
+        if sum(columns.shares) == 0:
+            return {}
+        
+        return _payouts_by_member(columns, PayoutEngine.standard(columns))
+    
+    @classmethod
+    def calculate_share_out_payouts(
+        cls,
+        members: Members,
+        total_interest: Decimal,
+        total_fines: Decimal
+    ) -> Dict[Any, Decimal]:
+        """
+        Each member's fixed contribution plus their profit share, in shillings.
+        
+        ``calculate_payouts`` counts the stake in shares; share-outs and
+        profit figures need it in money.
+        """
+        columns = ContributionColumns.from_members(members, total_interest, total_fines)
+        if sum(columns.shares) == 0:
             return {}
+        
+        return _payouts_by_member(columns, PayoutEngine.standard_share_out(columns))
+    
+    @classmethod
+    def calculate_member_payout(cls, member: MemberContribution, totals: GroupTotals) -> Decimal:
+        """
+        Calculate one member's payout without the other members' contributions.
+        
+        Like ``calculate_share_out_payouts``, the payout is in shillings: the
+        member's fixed contribution plus their profit share.
+        
+        Args:
+            member: The member's contribution
+            totals: Group-wide total shares, interest and fines
             
-        total_profit = total_interest + total_fines
-        profit_per_share = total_profit / total_shares
+        Returns:
+            Payout amount for the member, before rounding to minor units
+        """
+        if totals.total_shares == 0:
+            return Decimal('0')
         
-        return {
-            m.member_id: m.shares * (Decimal('1') + profit_per_share)
-            for m in members
-        }
+        total_profit = totals.total_interest + totals.total_fines
+        profit_per_share = total_profit / totals.total_shares
+        return member.fixed_contribution + member.shares * profit_per_share
 
 class FixedShareVikoba(VikobaCalculator):
     """Fixed-Share VIKOBA model with equal profit sharing."""
@@ -103,7 +585,7 @@ class FixedShareVikoba(VikobaCalculator):
     @classmethod
     def calculate_payouts(
         cls,
-        members: List[MemberContribution],
+        members: Members,
         total_interest: Decimal,
         total_fines: Decimal
     ) -> Dict[Any, Decimal]:
@@ -111,23 +593,38 @@ class FixedShareVikoba(VikobaCalculator):
         Calculate equal payouts for all members.
         
         Args:
-            members: List of member contributions
+            members: Member contributions, as a list or a MemberContributionSet
             total_interest: Total interest collected from all loans
             total_fines: Total fines collected
             
         Returns:
-            Dictionary mapping member_id to payout amount
+            Dictionary mapping member_id to payout amount, settled in minor
+            units (see ``PayoutEngine``)
         """
         if not members:
             return {}
+        
+        columns = ContributionColumns.from_members(members, total_interest, total_fines)
+        return _payouts_by_member(columns, PayoutEngine.fixed_share(columns))
+    
+    @classmethod
+    def calculate_member_payout(cls, member: MemberContribution, totals: GroupTotals) -> Decimal:
+        """
+        Calculate one member's payout without the other members' contributions.
+        
+        Args:
+            member: The member's contribution
+            totals: Group-wide member count, interest and fines
             
-        total_profit = total_interest + total_fines
-        equal_dividend = total_profit / Decimal(str(len(members)))
+        Returns:
+            Payout amount for the member
+        """
+        if totals.member_count == 0:
+            return Decimal('0')
         
-        return {
-            m.member_id: m.fixed_contribution + equal_dividend
-            for m in members
-        }
+        total_profit = totals.total_interest + totals.total_fines
+        equal_dividend = total_profit / totals.member_count
+        return member.fixed_contribution + equal_dividend
 
 class InterestRefundVikoba(VikobaCalculator):
     """Interest Refund VIKOBA model where interest is refunded to borrowers."""
@@ -135,7 +632,7 @@ class InterestRefundVikoba(VikobaCalculator):
     @classmethod
     def calculate_payouts(
         cls,
-        members: List[MemberContribution],
+        members: Members,
         total_interest: Decimal,  # Unused in this model
         total_fines: Decimal
     ) -> Dict[Any, Decimal]:
@@ -143,22 +640,123 @@ class InterestRefundVikoba(VikobaCalculator):
         Calculate payouts with interest refund and equal sharing of fines.
         
         Args:
-            members: List of member contributions with interest paid
+            members: Member contributions with interest paid, as a list or a MemberContributionSet
             total_interest: Total interest collected (for reference)
             total_fines: Total fines collected
             
         Returns:
-            Dictionary mapping member_id to payout amount
+            Dictionary mapping member_id to payout amount, settled in minor
+            units (see ``PayoutEngine``)
         """
         if not members:
             return {}
+        
+        columns = ContributionColumns.from_members(members, total_interest, total_fines)
+        return _payouts_by_member(columns, PayoutEngine.interest_refund(columns))
+    
+    @classmethod
+    def calculate_member_payout(cls, member: MemberContribution, totals: GroupTotals) -> Decimal:
+        """
+        Calculate one member's payout without the other members' contributions.
+        
+        Args:
+            member: The member's contribution with interest paid
+            totals: Group-wide member count and fines
             
-        fine_share = total_fines / Decimal(str(len(members)))
+        Returns:
+            Payout amount for the member
+        """
+        if totals.member_count == 0:
+            return Decimal('0')
         
-        return {
-            m.member_id: m.fixed_contribution + m.interest_paid + fine_share
-            for m in members
-        }
+        fine_share = totals.total_fines / totals.member_count
+        return member.fixed_contribution + member.interest_paid + fine_share
+
+# Days between ROSCA meetings; monthly meetings follow calendar months
+ROSCA_MEETING_INTERVAL_DAYS = {
+    'daily': 1,
+    'weekly': 7,
+    'biweekly': 14,
+}
+
+@dataclass(frozen=True)
+class RoscaMeeting:
+    """One ROSCA meeting: who receives the pot, and when."""
+    meeting_number: int
+    meeting_date: date
+    recipient: Any
+    pot_size: Amount
+
+@dataclass(frozen=True)
+class RoscaSchedule:
+    """
+    A ROSCA rotation stored compactly.
+    
+    Every member contributes the same amount at every meeting and the pot goes
+    to the members in ``recipients`` order, one per meeting, so the whole
+    rotation is described by the order, the contribution and the first
+    meeting date. Meetings are computed on demand in O(1) each; ``meetings``
+    yields them lazily.
+    """
+    recipients: Tuple[Any, ...]
+    contribution: Amount
+    start_date: date
+    meeting_frequency: str = 'monthly'
+    
+    def __post_init__(self):
+        if self.meeting_frequency != 'monthly' and self.meeting_frequency not in ROSCA_MEETING_INTERVAL_DAYS:
+            raise ValueError(f"Unknown meeting frequency: {self.meeting_frequency}")
+        object.__setattr__(self, 'recipients', tuple(self.recipients))
+    
+    def __len__(self) -> int:
+        return len(self.recipients)
+    
+    @property
+    def pot_size(self) -> Amount:
+        return self.contribution * len(self.recipients)
+    
+    def meeting_date(self, meeting_number: int) -> date:
+        """Date of a meeting (numbered from 1)."""
+        if self.meeting_frequency == 'monthly':
+            return add_months(self.start_date, meeting_number - 1)
+        return self.start_date + timedelta(days=ROSCA_MEETING_INTERVAL_DAYS[self.meeting_frequency] * (meeting_number - 1))
+    
+    def meeting(self, meeting_number: int) -> RoscaMeeting:
+        """
+        Return one meeting of the rotation.
+        
+        Raises:
+            IndexError: if there is no meeting with that number
+        """
+        if not 1 <= meeting_number <= len(self.recipients):
+            raise IndexError(f"Meeting {meeting_number} is outside the rotation")
+        return RoscaMeeting(
+            meeting_number=meeting_number,
+            meeting_date=self.meeting_date(meeting_number),
+            recipient=self.recipients[meeting_number - 1],
+            pot_size=self.pot_size
+        )
+    
+    def meetings(self, start: int = 1) -> Iterator[RoscaMeeting]:
+        """Yield the meetings from number ``start`` to the end of the rotation."""
+        for meeting_number in range(max(start, 1), len(self.recipients) + 1):
+            yield self.meeting(meeting_number)
+    
+    def next_meeting(self, on_or_after: date) -> Optional[RoscaMeeting]:
+        """
+        The first meeting on or after a date, or None once the rotation is over.
+        """
+        if self.meeting_frequency == 'monthly':
+            meeting_number = (on_or_after.year - self.start_date.year) * 12 + on_or_after.month - self.start_date.month + 1
+            if meeting_number >= 1 and self.meeting_date(meeting_number) < on_or_after:
+                meeting_number += 1
+        else:
+            interval = ROSCA_MEETING_INTERVAL_DAYS[self.meeting_frequency]
+            meeting_number = -(-(on_or_after - self.start_date).days // interval) + 1
+        meeting_number = max(meeting_number, 1)
+        if meeting_number > len(self.recipients):
+            return None
+        return self.meeting(meeting_number)
 
 class RoscaModel:
     """Rotating Savings and Credit Association (ROSCA) model."""
@@ -181,34 +779,68 @@ class RoscaModel:
     def calculate_payout_schedule(
         contribution: float,
         num_members: int,
-        meeting_frequency: str = 'monthly'
+        meeting_frequency: str = 'monthly',
+        start_date: Optional[date] = None
     ) -> List[Dict[str, Any]]:
         """
         Generate a payout schedule for the ROSCA.
         
+        Use ``RoscaSchedule`` to work with a rotation without building the
+        rows at all.
+        
         Args:
             contribution: Fixed contribution per member per meeting
             num_members: Total number of members
-            meeting_frequency: 'weekly', 'biweekly', or 'monthly'
+            meeting_frequency: 'daily', 'weekly', 'biweekly', or 'monthly'
+            start_date: Date of the first meeting; rows have a ``meeting_date``
+                only when it is given
             
         Returns:
-            List of dictionaries containing meeting details
+            List of dictionaries containing meeting details. Every member pays
+            the same at every meeting, so all rows share one read-only
+            ``contributions`` mapping.
+            
+        Raises:
+            ValueError: for an unknown meeting frequency when ``start_date``
+                is given (without it the frequency is not used)
         """
         pot_size = contribution * num_members
-        schedule = []
+        recipients = [f"Member {i + 1}" for i in range(num_members)]  # In practice, this would be determined by the group
+        contributions = MappingProxyType({member: float(contribution) for member in recipients})
+        rotation = None
+        if start_date is not None:
+            rotation = RoscaSchedule(recipients, Amount.from_decimal(contribution), start_date, meeting_frequency)
         
-        for i in range(num_members):
-            schedule.append({
-                'meeting_number': i + 1,
+        return [
+            {
+                'meeting_number': meeting_number,
+                'meeting_date': rotation.meeting_date(meeting_number) if rotation else None,
                 'pot_size': float(pot_size),
-                'recipient': f"Member {i + 1}",  # In practice, this would be determined by the group
-                'contributions': {
-                    f"Member {j + 1}": float(contribution)
-                    for j in range(num_members)
-                }
-            })
-            
-        return schedule
+                'recipient': recipient,
+                'contributions': contributions
+            }
+            for meeting_number, recipient in enumerate(recipients, start=1)
+        ]
+
+# Payout calculators keyed by Kikoba.group_type. ROSCA and welfare groups
+# rotate or pool their funds and have no share-out payout.
+PAYOUT_CALCULATORS = {
+    'standard': StandardVikoba,
+    'fixed_share': FixedShareVikoba,
+    'interest_refund': InterestRefundVikoba,
+}
+
+def get_payout_calculator(group_type: Optional[str]):
+    """
+    Return the payout calculator for a kikoba group type.
+    
+    Args:
+        group_type: Kikoba.group_type value; None is treated as 'standard'
+        
+    Returns:
+        Calculator class, or None if the group type has no share-out payout
+    """
+    return PAYOUT_CALCULATORS.get(group_type or 'standard')
 
 # Example usage
 if __name__ == "__main__":
@@ -0,0 +1,60 @@
+"""
+Kikoba access scoping for viewsets.
+
+List endpoints show a user their own rows plus the rows of the vikoba they
+belong to. Filtering through a join on the memberships table fans out one
+row per membership and then needs ``distinct()`` over the whole result, so
+instead the caller's kikoba ids are resolved once per request and the
+querysets are filtered with a plain ``kikoba_id IN (...)``.
+"""
+from django.db.models import Q
+
+from .models import KikobaMembership
+
+ADMIN_ROLES = ('kikoba_admin', 'chairperson', 'treasurer')
+
+
+def accessible_kikoba_ids(request, roles=None, active_only=False):
+    """
+    Ids of the vikoba the request's user is a member of.
+
+    The result is memoised on the request, so every queryset built while
+    handling it (list and count queries, permission checks) shares one
+    lookup.
+
+    Args:
+        request: the current (DRF or Django) request
+        roles: only memberships with one of these roles, e.g. ``ADMIN_ROLES``
+        active_only: only active memberships
+
+    Returns:
+        list of kikoba ids
+    """
+    key = (tuple(roles) if roles else None, active_only)
+    resolved = request.__dict__.setdefault('_accessible_kikoba_ids', {})
+    if key not in resolved:
+        memberships = KikobaMembership.objects.filter(user=request.user)
+        if roles:
+            memberships = memberships.filter(role__in=roles)
+        if active_only:
+            memberships = memberships.filter(is_active=True)
+        resolved[key] = list(memberships.values_list('kikoba_id', flat=True).distinct())
+    return resolved[key]
+
+
+def scope_to_member_or_kikobas(queryset, request, member_field, kikoba_field, roles=None, active_only=False):
+    """
+    Restrict ``queryset`` to rows owned by the request's user or belonging to
+    one of their vikoba.
+
+    Args:
+        queryset: the queryset to filter
+        request: the current request
+        member_field: lookup path to the owning user, e.g. ``'loan__application__member'``
+        kikoba_field: lookup path to the kikoba id, e.g. ``'loan__application__kikoba_id'``
+        roles, active_only: passed to ``accessible_kikoba_ids``
+    """
+    kikoba_ids = accessible_kikoba_ids(request, roles=roles, active_only=active_only)
+    return queryset.filter(
+        Q(**{member_field: request.user}) | Q(**{f'{kikoba_field}__in': kikoba_ids})
+    )
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Kikoba, KikobaMembership, KikobaInvitation, KikobaContributionConfig, EntryFeePayment, EntryFeeInstallment, ShareContribution, ShareInstallment, Saving, EmergencyFundContribution # Changed GroupInvitation to KikobaInvitation
+from .models import Kikoba, KikobaMembership, KikobaInvitation, KikobaContributionConfig, EntryFeePayment, EntryFeeInstallment, ShareContribution, ShareInstallment, Saving, EmergencyFundContribution, RoscaRotation, NumberSequence # Changed GroupInvitation to KikobaInvitation
 
 class KikobaAdmin(admin.ModelAdmin):
     list_display = ('name', 'created_by', 'created_at', 'contribution_frequency', 'interest_rate', 'is_active', 'is_center_kikoba')
@@ -19,6 +19,17 @@ class KikobaInvitationAdmin(admin.ModelAdmin): # Renamed from GroupInvitationAdm
     search_fields = ('email_or_phone', 'invited_by__name', 'kikoba__name') # Changed group__name to kikoba__name
     raw_id_fields = ('invited_by', 'kikoba') # Changed group to kikoba
 
+class RoscaRotationAdmin(admin.ModelAdmin):
+    list_display = ('kikoba', 'contribution_amount', 'meeting_frequency', 'start_date', 'completed_meetings')
+    list_filter = ('meeting_frequency',)
+    search_fields = ('kikoba__name',)
+    raw_id_fields = ('kikoba',)
+
+class NumberSequenceAdmin(admin.ModelAdmin):
+    list_display = ('name', 'last_value')
+    # Counters only ever move forward through groups.sequences
+    readonly_fields = ('name', 'last_value')
+
 # Register your models here.
 admin.site.register(Kikoba, KikobaAdmin) 
 admin.site.register(KikobaMembership, KikobaMembershipAdmin) 
@@ -30,3 +41,5 @@ admin.site.register(ShareContribution)
 admin.site.register(ShareInstallment)
 admin.site.register(Saving)
 admin.site.register(EmergencyFundContribution)
+admin.site.register(RoscaRotation, RoscaRotationAdmin)
+admin.site.register(NumberSequence, NumberSequenceAdmin)
@@ -0,0 +1,337 @@
+"""
+Per-member ledger totals for a kikoba.
+
+Payout and dashboard views need the same per-member figures (shares, entry
+fees, emergency fund, loan repayments and principal). These are kept in
+``MemberLedgerSummary`` rows that are updated by deltas as transactions are
+written, so readers load one indexed row per member. The grouped aggregate
+queries over the transaction tables are used to rebuild those rows.
+"""
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional
+
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+
+from finance import MemberContribution, MemberContributionSet, GroupTotals
+from .models import (
+    Kikoba, KikobaMembership, MemberLedgerSummary,
+    ShareContribution, EntryFeePayment, EmergencyFundContribution
+)
+
+# Assuming 1 share = 10,000 TZS until share value is configurable per kikoba
+SHARE_VALUE = Decimal('10000')
+
+
+@dataclass
+class MemberTotals:
+    """Ledger totals for one active membership of a kikoba."""
+    membership_id: int
+    user_id: Any
+    name: str
+    phone_number: str
+    role: str
+    joined_at: Any
+    share_total: Decimal = Decimal('0')
+    entry_fee_total: Decimal = Decimal('0')
+    emergency_fund_total: Decimal = Decimal('0')
+    repayments_total: Decimal = Decimal('0')
+    principal_total: Decimal = Decimal('0')
+
+    @property
+    def shares(self) -> Decimal:
+        """Number of shares held, derived from share contributions."""
+        return self.share_total / SHARE_VALUE if self.share_total > 0 else Decimal('0')
+
+    @property
+    def reclaimable_contribution(self) -> Decimal:
+        """Contributions returned at share-out (emergency fund stays with the kikoba)."""
+        return self.share_total + self.entry_fee_total
+
+    @property
+    def total_contribution(self) -> Decimal:
+        """Everything the member has paid in, including the emergency fund."""
+        return self.share_total + self.entry_fee_total + self.emergency_fund_total
+
+    @property
+    def interest_paid(self) -> Decimal:
+        """Interest paid on loans: verified repayments above principal borrowed."""
+        return max(self.repayments_total - self.principal_total, Decimal('0'))
+
+    def to_member_contribution(self, include_emergency_fund: bool = False) -> MemberContribution:
+        """Build the ``finance.MemberContribution`` used by the payout calculators."""
+        return MemberContribution(
+            member_id=self.user_id,
+            shares=self.shares,
+            fixed_contribution=(
+                self.total_contribution if include_emergency_fund
+                else self.reclaimable_contribution
+            ),
+            interest_paid=self.interest_paid,
+            fines_paid=Decimal('0')
+        )
+
+    @classmethod
+    def from_membership(cls, membership) -> 'MemberTotals':
+        """Build totals from a membership loaded with ``select_related('user', 'ledger_summary')``."""
+        try:
+            summary = membership.ledger_summary
+        except MemberLedgerSummary.DoesNotExist:
+            summary = None
+        return cls(
+            membership_id=membership.id,
+            user_id=membership.user_id,
+            name=membership.user.name,
+            phone_number=membership.user.phone_number,
+            role=membership.role,
+            joined_at=membership.joined_at,
+            **{
+                field: getattr(summary, field) if summary else Decimal('0')
+                for field in MemberLedgerSummary.TOTAL_FIELDS
+            }
+        )
+
+
+def collect_member_totals(kikoba) -> List[MemberTotals]:
+    """
+    Collect ledger totals for the active members of a kikoba.
+
+    Reads each member's summary row in a single query.
+
+    Args:
+        kikoba: Kikoba instance
+
+    Returns:
+        List of MemberTotals, one per active membership
+    """
+    memberships = KikobaMembership.objects.filter(
+        kikoba=kikoba, is_active=True
+    ).select_related('user', 'ledger_summary').order_by('id')
+    return [MemberTotals.from_membership(membership) for membership in memberships]
+
+
+def member_totals_for_user(kikoba, user) -> Optional[MemberTotals]:
+    """
+    Collect one user's ledger totals in a kikoba with a single query.
+
+    Args:
+        kikoba: Kikoba instance
+        user: The member whose totals are needed
+
+    Returns:
+        MemberTotals, or None if the user is not an active member
+    """
+    membership = KikobaMembership.objects.filter(
+        kikoba=kikoba, user=user, is_active=True
+    ).select_related('user', 'ledger_summary').first()
+    if membership is None:
+        return None
+    return MemberTotals.from_membership(membership)
+
+
+def _summary_total_expressions() -> Dict[str, Any]:
+    """Aggregates over memberships and their summary rows used for payout scalars."""
+    return {
+        'member_count': Count('id', filter=Q(is_active=True)),
+        'share_total': Sum('ledger_summary__share_total', filter=Q(is_active=True)),
+        'repayments_total': Sum('ledger_summary__repayments_total'),
+        'principal_total': Sum('ledger_summary__principal_total'),
+    }
+
+
+def _clean_summary_row(row) -> Dict[str, Any]:
+    return {
+        key: value or (0 if key == 'member_count' else Decimal('0'))
+        for key, value in row.items() if key in _summary_total_expressions()
+    }
+
+
+def _group_totals_from_row(row, total_fines: Decimal) -> GroupTotals:
+    return GroupTotals(
+        total_shares=row['share_total'] / SHARE_VALUE,
+        member_count=row['member_count'],
+        total_interest=max(row['repayments_total'] - row['principal_total'], Decimal('0')),
+        total_fines=total_fines
+    )
+
+
+def _kikoba_summary_totals(kikoba) -> Dict[str, Any]:
+    """Aggregate the kikoba's summary rows in one query."""
+    row = KikobaMembership.objects.filter(kikoba=kikoba).aggregate(**_summary_total_expressions())
+    return _clean_summary_row(row)
+
+
+def _summary_totals_by_kikoba(kikoba_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+    """Aggregate the summary rows of several kikobas with one grouped query."""
+    rows = KikobaMembership.objects.filter(kikoba_id__in=list(kikoba_ids)).values(
+        'kikoba_id'
+    ).annotate(**_summary_total_expressions()).order_by()
+    return {row['kikoba_id']: _clean_summary_row(row) for row in rows}
+
+
+def kikoba_group_totals(kikoba, total_fines: Decimal = Decimal('0')) -> GroupTotals:
+    """
+    Compute the kikoba-wide payout scalars with a single query.
+
+    Args:
+        kikoba: Kikoba instance
+        total_fines: Fines collected by the kikoba
+
+    Returns:
+        finance.GroupTotals with total shares, active member count and interest
+    """
+    return _group_totals_from_row(_kikoba_summary_totals(kikoba), total_fines)
+
+
+def group_totals_by_kikoba(kikoba_ids: Iterable[int], total_fines: Decimal = Decimal('0')) -> Dict[int, GroupTotals]:
+    """
+    Compute payout scalars for several kikobas with one grouped query.
+
+    Args:
+        kikoba_ids: Ids of the kikobas
+        total_fines: Fines collected, applied to every kikoba
+
+    Returns:
+        Dictionary mapping kikoba id to finance.GroupTotals
+    """
+    return {
+        kikoba_id: _group_totals_from_row(row, total_fines)
+        for kikoba_id, row in _summary_totals_by_kikoba(kikoba_ids).items()
+    }
+
+
+def kikoba_loan_totals(kikoba) -> Dict[str, Decimal]:
+    """
+    Kikoba-wide loan figures from the members' summary rows.
+
+    Returns:
+        Dictionary with total_repayments, total_principal and total_interest
+    """
+    row = _kikoba_summary_totals(kikoba)
+    return {
+        'total_repayments': row['repayments_total'],
+        'total_principal': row['principal_total'],
+        'total_interest': max(row['repayments_total'] - row['principal_total'], Decimal('0')),
+    }
+
+
+def member_loans_by_kikoba(user, kikoba_ids: Iterable[int]) -> Dict[int, list]:
+    """
+    Load a user's loans in several kikobas with their verified repayments, in one query.
+
+    Each loan carries a ``verified_repaid`` annotation.
+
+    Returns:
+        Dictionary mapping kikoba id to the user's loans there
+    """
+    from loans.models import Loan
+
+    loans = Loan.objects.filter(
+        application__member=user,
+        application__kikoba_id__in=list(kikoba_ids)
+    ).select_related('application').annotate(
+        verified_repaid=Sum('repayments__amount_paid', filter=Q(repayments__is_verified=True))
+    ).order_by('-disbursement_date', '-id')
+    by_kikoba = {}
+    for loan in loans:
+        by_kikoba.setdefault(loan.application.kikoba_id, []).append(loan)
+    return by_kikoba
+
+
+def build_member_contributions(
+    totals: List[MemberTotals],
+    include_emergency_fund: bool = False
+) -> MemberContributionSet:
+    """Convert collected totals to a columnar ``MemberContributionSet`` in bulk."""
+    contributions = MemberContributionSet()
+    for t in totals:
+        contributions.append(
+            t.user_id,
+            shares=t.shares,
+            fixed_contribution=t.total_contribution if include_emergency_fund else t.reclaimable_contribution,
+            interest_paid=t.interest_paid,
+        )
+    return contributions
+
+
+def _grouped_sums(queryset, group_fields: Iterable[str], sum_field: str) -> Dict[Any, Decimal]:
+    """Run one ``GROUP BY`` query and return ``{group key tuple: Sum(sum_field)}``."""
+    group_fields = list(group_fields)
+    rows = queryset.values(*group_fields).annotate(total=Sum(sum_field)).order_by()
+    return {tuple(row[f] for f in group_fields): row['total'] or Decimal('0') for row in rows}
+
+
+def compute_ledger_totals(kikoba) -> Dict[int, Dict[str, Decimal]]:
+    """
+    Recompute every membership's totals from the transaction tables.
+
+    Uses one grouped query per source table regardless of kikoba size.
+
+    Returns:
+        Dictionary mapping membership id to MemberLedgerSummary field values
+    """
+    from loans.models import Loan, Repayment
+
+    memberships = list(KikobaMembership.objects.filter(kikoba=kikoba).values_list('id', 'user_id'))
+    if not memberships:
+        return {}
+
+    membership_key = ['kikoba_membership']
+    share_totals = _grouped_sums(
+        ShareContribution.objects.filter(kikoba_membership__kikoba=kikoba), membership_key, 'amount_paid'
+    )
+    entry_fee_totals = _grouped_sums(
+        EntryFeePayment.objects.filter(kikoba_membership__kikoba=kikoba), membership_key, 'amount_paid'
+    )
+    emergency_fund_totals = _grouped_sums(
+        EmergencyFundContribution.objects.filter(kikoba_membership__kikoba=kikoba), membership_key, 'amount'
+    )
+    repayment_totals = _grouped_sums(
+        Repayment.objects.filter(loan__application__kikoba=kikoba, is_verified=True),
+        ['loan__application__member'], 'amount_paid'
+    )
+    principal_totals = _grouped_sums(
+        Loan.objects.filter(application__kikoba=kikoba).exclude(status__in=Loan.UNDISBURSED_STATUSES),
+        ['application__member'], 'disbursed_amount'
+    )
+
+    zero = Decimal('0')
+    return {
+        membership_id: {
+            'share_total': share_totals.get((membership_id,), zero),
+            'entry_fee_total': entry_fee_totals.get((membership_id,), zero),
+            'emergency_fund_total': emergency_fund_totals.get((membership_id,), zero),
+            'repayments_total': repayment_totals.get((user_id,), zero),
+            'principal_total': principal_totals.get((user_id,), zero),
+        }
+        for membership_id, user_id in memberships
+    }
+
+
+def rebuild_ledger_summaries(kikoba) -> int:
+    """
+    Overwrite a kikoba's MemberLedgerSummary rows with recomputed totals.
+
+    The existing rows are locked first so that deltas written concurrently
+    wait for the rebuild and are applied on top of it.
+
+    Returns:
+        Number of summary rows written
+    """
+    with transaction.atomic():
+        list(MemberLedgerSummary.objects.select_for_update().filter(kikoba=kikoba).values_list('id', flat=True))
+        totals = compute_ledger_totals(kikoba)
+        summaries = [
+            MemberLedgerSummary(kikoba_membership_id=membership_id, kikoba_id=kikoba.id, **fields)
+            for membership_id, fields in totals.items()
+        ]
+        MemberLedgerSummary.objects.bulk_create(
+            summaries,
+            batch_size=500,
+            update_conflicts=True,
+            unique_fields=['kikoba_membership'],
+            update_fields=list(MemberLedgerSummary.TOTAL_FIELDS) + ['updated_at'],
+        )
+        Kikoba.bump_ledger_version([kikoba.id])
+    return len(summaries)
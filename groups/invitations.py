@@ -0,0 +1,76 @@
+"""
+Invitation codes.
+
+Codes look like ``WA-123456``: a two-letter prefix from the kikoba name and
+six digits. The digits are a keyed permutation of a per-prefix counter (see
+``groups.sequences``): the counter never repeats and the permutation is a
+bijection on 000000-999999, so codes are unique without checking the
+table first, while consecutive invitations still get unrelated-looking
+codes.
+
+The permutation is a four-round Feistel network on the two three-digit
+halves, with HMAC-SHA256 as the round function. Its key is the
+``INVITATION_CODE_KEY`` setting (default: ``SECRET_KEY``). Changing the
+key changes the permutation, so codes issued afterwards may repeat older
+ones; saving relies on the unique constraint to catch such repeats and
+codes issued before this scheme.
+"""
+import hashlib
+import hmac
+from typing import List
+
+from .sequences import SequenceAllocator
+
+CODE_DIGITS = 6
+HALF = 10 ** (CODE_DIGITS // 2)
+CODE_SPACE = HALF * HALF
+ROUNDS = 4
+
+_allocators = {}
+
+
+def _key() -> bytes:
+    from django.conf import settings
+
+    secret = getattr(settings, 'INVITATION_CODE_KEY', None) or settings.SECRET_KEY
+    return hashlib.sha256(f'groups.invitation_code:{secret}'.encode()).digest()
+
+
+def permute(value: int, prefix: str, key: bytes) -> int:
+    """Map ``value`` in ``[0, CODE_SPACE)`` to a unique number in the same range."""
+    left, right = divmod(value, HALF)
+    for round_number in range(ROUNDS):
+        digest = hmac.new(key, f'{prefix}:{round_number}:{right}'.encode(), hashlib.sha256).digest()
+        left, right = right, (left + int.from_bytes(digest[:8], 'big')) % HALF
+    return left * HALF + right
+
+
+def code_prefix(kikoba_name: str) -> str:
+    return kikoba_name[:2].upper()
+
+
+def _allocator(prefix: str) -> SequenceAllocator:
+    from django.conf import settings
+
+    allocator = _allocators.get(prefix)
+    if allocator is None:
+        allocator = _allocators.setdefault(prefix, SequenceAllocator(
+            f'invitation_code:{prefix}', block_size=getattr(settings, 'INVITATION_CODE_BLOCK_SIZE', 10)
+        ))
+    return allocator
+
+
+def issue_invitation_codes(prefix: str, count: int = 1) -> List[str]:
+    """
+    Issue ``count`` new invitation codes with ``prefix``.
+
+    Raises:
+        ValueError: if the prefix has no unused codes left
+    """
+    allocator = _allocator(prefix)
+    values = [allocator.next()] if count == 1 else allocator.reserve(count)
+    if values[-1] > CODE_SPACE:
+        raise ValueError(f"All invitation codes with prefix {prefix!r} have been issued")
+    key = _key()
+    # Counter values start at 1; the permutation works on 0 .. CODE_SPACE - 1
+    return [f'{prefix}-{permute(value - 1, prefix, key):0{CODE_DIGITS}d}' for value in values]
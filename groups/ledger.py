@@ -0,0 +1,417 @@
+"""
+Double-entry ledger.
+
+Every movement of money (savings, contributions, share and entry fee
+payments, emergency fund contributions, loan disbursements and
+repayments) is posted as a balanced set of ``LedgerEntry`` rows: the
+entries of one posting share a ``transaction_id`` and their amounts, in
+minor units with debits positive and credits negative, add up to zero.
+
+Accounts belong to a kikoba, and all but the kikoba's cash to one member:
+
+  * ``cash`` (debit): money the kikoba holds
+  * ``loans`` (debit): principal a member owes
+  * ``savings``, ``contributions``, ``shares``, ``entry_fees``,
+    ``emergency_fund`` (credit): what a member has paid in
+  * ``interest`` (credit): interest a member has paid. As in the member
+    ledger summary, repayments go to principal first and only what is
+    repaid above the member's outstanding principal counts as interest.
+
+Entries are never changed or deleted. A source row is kept in step by
+posting the difference between the legs it should have posted in its
+current state (``LedgerPostingMixin.ledger_legs``) and the legs already
+posted for it, so an edit posts an adjustment and a delete a reversal.
+
+Entries also carry the ``effective_date`` of the movement (the day the
+money was contributed, disbursed or repaid), separate from when it was
+posted. When a row's date changes, what it posted on the old date is
+reversed there and posted again on the new one; changes to rows without a
+date are dated the day they are made. Monthly rollups
+(``groups.rollups``) are kept by effective date in the same transaction.
+
+Each account's balance is kept in a ``LedgerAccount`` row, moved with an
+``F()`` update that also makes concurrent postings to the account queue,
+and every entry stores the balance of its account after it. Balances are
+one indexed row, statements an index range scan.
+"""
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass, field, replace
+from datetime import date, datetime
+from typing import Dict, Iterable, Optional, Tuple
+
+from django.db import transaction
+from django.utils import timezone
+
+from money import Amount
+
+CASH = 'cash'
+LOANS = 'loans'
+SAVINGS = 'savings'
+CONTRIBUTIONS = 'contributions'
+SHARES = 'shares'
+ENTRY_FEES = 'entry_fees'
+EMERGENCY_FUND = 'emergency_fund'
+INTEREST = 'interest'
+
+ACCOUNT_CHOICES = [
+    (CASH, 'Cash'),
+    (LOANS, 'Loans'),
+    (SAVINGS, 'Savings'),
+    (CONTRIBUTIONS, 'Contributions'),
+    (SHARES, 'Shares'),
+    (ENTRY_FEES, 'Entry fees'),
+    (EMERGENCY_FUND, 'Emergency fund'),
+    (INTEREST, 'Interest'),
+]
+
+# Accounts whose natural balance is a debit; the others are credits
+DEBIT_ACCOUNTS = frozenset({CASH, LOANS})
+
+# (kikoba id, account, member id or None) -> amount in minor units
+Legs = Dict[Tuple[int, str, Optional[int]], int]
+
+
+def cents(value) -> int:
+    """Minor units of a Decimal (or int, float, numeric string) amount."""
+    return Amount.from_decimal(value or 0).cents
+
+
+def local_date(value) -> Optional[date]:
+    """The local date of a date or datetime."""
+    if isinstance(value, datetime):
+        return timezone.localdate(value) if timezone.is_aware(value) else value.date()
+    return value
+
+
+def natural_balance(account: str, balance: int) -> Amount:
+    """A stored balance (debits less credits) with the sign that reads naturally for ``account``."""
+    return Amount(balance if account in DEBIT_ACCOUNTS else -balance)
+
+
+def payment_legs(kikoba_id: int, member_id: Optional[int], account: str, amount: int) -> Legs:
+    """A member paying ``amount`` into the kikoba, recorded on ``account``."""
+    if not amount or not kikoba_id:
+        return {}
+    return {(kikoba_id, CASH, None): amount, (kikoba_id, account, member_id): -amount}
+
+
+@dataclass
+class Posting:
+    """Legs to post for one source row, dated ``effective_date`` (default: today)."""
+    source_type: str
+    source_id: int
+    legs: Legs = field(default_factory=dict)
+    effective_date: Optional[date] = None
+
+
+def source_type(model) -> str:
+    return model._meta.label_lower
+
+
+def _locked_accounts(keys) -> Dict[Tuple[int, str, Optional[int]], Tuple[int, int]]:
+    """
+    ``(id, balance)`` of the accounts for ``keys``, creating the missing ones.
+
+    The rows are locked until the transaction ends, so the balances read
+    here stay current while entries are posted against them.
+    """
+    from django.db.models import Q
+    from .models import LedgerAccount
+
+    def lookup():
+        members = {member_id for _kikoba_id, _account, member_id in keys if member_id is not None}
+        rows = LedgerAccount.objects.select_for_update().filter(
+            Q(member_id__in=members) | Q(member__isnull=True),
+            kikoba_id__in={kikoba_id for kikoba_id, _account, _member_id in keys},
+            account__in={account for _kikoba_id, account, _member_id in keys},
+        ).values_list('pk', 'kikoba_id', 'account', 'member_id', 'balance')
+        return {
+            (kikoba_id, account, member_id): (pk, balance)
+            for pk, kikoba_id, account, member_id, balance in rows
+        }
+
+    accounts = lookup()
+    missing = [key for key in keys if key not in accounts]
+    if missing:
+        LedgerAccount.objects.bulk_create([
+            LedgerAccount(kikoba_id=kikoba_id, account=account, member_id=member_id)
+            for kikoba_id, account, member_id in missing
+        ], ignore_conflicts=True)
+        accounts = lookup()
+    return accounts
+
+
+def post(postings: Iterable[Posting], posted_at=None) -> list:
+    """
+    Write balanced postings to the ledger with a fixed number of queries.
+
+    Returns:
+        The LedgerEntry rows written
+    """
+    from django.db.models import BigIntegerField, Case, F, Value, When
+    from .models import KikobaMonthlyRollup, LedgerAccount, LedgerEntry
+    from .rollups import posting_deltas
+
+    posted_at = posted_at or timezone.now()
+    postings = [
+        replace(
+            posting,
+            legs={key: amount for key, amount in posting.legs.items() if amount},
+            effective_date=posting.effective_date or timezone.localdate(posted_at),
+        )
+        for posting in postings
+    ]
+    postings = [posting for posting in postings if posting.legs]
+    if not postings:
+        return []
+    for posting in postings:
+        if sum(posting.legs.values()):
+            raise ValueError(f"Unbalanced posting for {posting.source_type} {posting.source_id}: {posting.legs}")
+
+    with transaction.atomic():
+        accounts = _locked_accounts({key for posting in postings for key in posting.legs})
+        deltas = defaultdict(int)
+        for posting in postings:
+            for key, amount in posting.legs.items():
+                deltas[accounts[key][0]] += amount
+        LedgerAccount.objects.filter(pk__in=list(deltas)).update(
+            balance=F('balance') + Case(
+                *[When(pk=pk, then=Value(amount)) for pk, amount in deltas.items()],
+                default=Value(0),
+                output_field=BigIntegerField(),
+            ),
+            updated_at=posted_at,
+        )
+        # The accounts are locked, so their balances are still the ones read
+        running = dict(accounts.values())
+
+        entries = []
+        for posting in postings:
+            transaction_id = uuid.uuid4()
+            for key, amount in posting.legs.items():
+                kikoba_id, account, member_id = key
+                pk = accounts[key][0]
+                running[pk] += amount
+                entries.append(LedgerEntry(
+                    transaction_id=transaction_id,
+                    kikoba_id=kikoba_id,
+                    member_id=member_id,
+                    account=account,
+                    amount=amount,
+                    balance=running[pk],
+                    posted_at=posted_at,
+                    effective_date=posting.effective_date,
+                    source_type=posting.source_type,
+                    source_id=posting.source_id,
+                ))
+        entries = LedgerEntry.objects.bulk_create(entries)
+        KikobaMonthlyRollup.apply_deltas(posting_deltas(postings))
+        return entries
+
+
+def posted_legs(model, source_ids) -> Dict[int, Dict[date, Legs]]:
+    """Net legs already posted for each source row of ``model``, by effective date."""
+    from django.db.models import Sum
+    from .models import LedgerEntry
+
+    rows = LedgerEntry.objects.filter(
+        source_type=source_type(model), source_id__in=list(source_ids)
+    ).values_list('source_id', 'effective_date', 'kikoba_id', 'account', 'member_id').annotate(
+        total=Sum('amount')
+    ).order_by()
+    posted = defaultdict(lambda: defaultdict(dict))
+    for source_id, effective_date, kikoba_id, account, member_id, total in rows:
+        if total:
+            posted[source_id][effective_date][(kikoba_id, account, member_id)] = total
+    return posted
+
+
+def sync(model, rows: Iterable = (), deleted_ids: Iterable[int] = (), created: bool = False) -> list:
+    """
+    Post whatever ``rows`` (saved instances of ``model``) and the deleted
+    rows ``deleted_ids`` still need for the ledger to match them.
+
+    ``created`` says the rows were just inserted with new ids, so nothing
+    has been posted for them and the ledger is not read.
+
+    Returns:
+        The LedgerEntry rows written
+    """
+    rows = list(rows)
+    deleted_ids = list(deleted_ids)
+    if created and not deleted_ids:
+        posted = {}
+    else:
+        posted = posted_legs(model, [row.pk for row in rows] + deleted_ids)
+    label = source_type(model)
+    postings = []
+    for row in rows:
+        by_date = posted.get(row.pk, {})
+        current = defaultdict(int)
+        for legs in by_date.values():
+            for key, amount in legs.items():
+                current[key] += amount
+        current = {key: amount for key, amount in current.items() if amount}
+        wanted = row.ledger_legs(current)
+        effective_date = row.ledger_date()
+        if effective_date is None:
+            # Rows without a date of their own post each change on the day it is made
+            postings.append(Posting(label, row.pk, _difference(wanted, current)))
+            continue
+        for posted_on, legs in by_date.items():
+            if posted_on != effective_date:
+                postings.append(Posting(label, row.pk, _difference({}, legs), posted_on))
+        postings.append(Posting(label, row.pk, _difference(wanted, by_date.get(effective_date, {})), effective_date))
+    for source_id in deleted_ids:
+        for posted_on, legs in posted.get(source_id, {}).items():
+            postings.append(Posting(label, source_id, _difference({}, legs), posted_on))
+    return post(postings)
+
+
+def _difference(wanted: Legs, current: Legs) -> Legs:
+    return {
+        key: wanted.get(key, 0) - current.get(key, 0)
+        for key in wanted.keys() | current.keys()
+        if wanted.get(key, 0) != current.get(key, 0)
+    }
+
+
+class LedgerPostingMixin:
+    """
+    Posts a money row to the ledger when it is saved or deleted.
+
+    Subclasses return the legs the row should have posted in its current
+    state from ``ledger_legs``; the difference from what is already posted
+    is written in the same transaction as the save or delete. Rows written
+    with ``bulk_create`` or ``QuerySet.update`` skip this and need
+    ``sync`` (or the ``sync_ledger`` command).
+
+    Entries are dated by the ``ledger_date_field`` of the row, and monthly
+    rollups count member legs under ``ledger_rollup_fields`` (account to
+    rollup field, defaulting to the account's own field).
+
+    ``sync_all`` also uses the model's ``ledger_kikoba_path`` (as for
+    ``LedgerVersionMixin``), loads ``ledger_select_related`` with each row,
+    and syncs one row at a time unless ``ledger_sync_in_batches``, for rows
+    whose legs depend on balances that earlier rows move.
+
+    A new row has nothing posted yet, so its save skips reading the ledger.
+    Overrides that read the row's stored state in the same transaction can
+    pass ``sync_ledger=False`` to ``save`` when nothing its legs depend on
+    has changed.
+    """
+    ledger_date_field = None
+    ledger_rollup_fields = {}
+    ledger_select_related = ()
+    ledger_sync_in_batches = True
+
+    def ledger_legs(self, posted: Legs) -> Legs:
+        """
+        Legs for the row's current state.
+
+        Args:
+            posted: the legs already posted for this row
+        """
+        raise NotImplementedError
+
+    def ledger_date(self) -> Optional[date]:
+        """The day the money moved, if the row records one."""
+        if not self.ledger_date_field:
+            return None
+        value = getattr(self, self.ledger_date_field)
+        return local_date(self._meta.get_field(self.ledger_date_field).to_python(value))
+
+    def save(self, *args, sync_ledger=True, **kwargs):
+        created = self._state.adding and self.pk is None
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if sync_ledger:
+                sync(type(self), [self], created=created)
+
+    def delete(self, *args, **kwargs):
+        source_id = self.pk
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            sync(type(self), deleted_ids=[source_id])
+        return result
+
+
+def ledger_sources() -> list:
+    """Models that post to the ledger, in app registry order (loans before their repayments)."""
+    from django.apps import apps
+
+    return [model for model in apps.get_models() if issubclass(model, LedgerPostingMixin)]
+
+
+def sync_all(model, kikoba_ids: Optional[Iterable[int]] = None, chunk_size: int = 500) -> int:
+    """
+    Post whatever the ledger is missing for the rows of ``model``, including
+    rows deleted without ``delete()`` (e.g. by cascade).
+
+    Returns:
+        The number of entries written
+    """
+    from .models import LedgerEntry
+
+    rows = model._base_manager.select_related(*model.ledger_select_related).order_by('pk')
+    entries = LedgerEntry.objects.filter(source_type=source_type(model))
+    if kikoba_ids is not None:
+        kikoba_ids = list(kikoba_ids)
+        rows = rows.filter(**{f'{model.ledger_kikoba_path}__in': kikoba_ids})
+        entries = entries.filter(kikoba_id__in=kikoba_ids)
+    if not model.ledger_sync_in_batches:
+        chunk_size = 1
+
+    written = 0
+    chunk = []
+    for row in rows.iterator():
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            written += len(sync(model, chunk))
+            chunk = []
+    written += len(sync(model, chunk))
+    deleted = entries.exclude(source_id__in=model._base_manager.values('pk')).values_list('source_id', flat=True)
+    written += len(sync(model, deleted_ids=set(deleted)))
+    return written
+
+
+def account_balances(kikoba_id: int, member_id: Optional[int] = None) -> Dict[str, Amount]:
+    """
+    Balances of a member's accounts in a kikoba (of the kikoba's own
+    accounts if ``member_id`` is None), each with its natural sign.
+    """
+    from .models import LedgerAccount
+
+    accounts = LedgerAccount.objects.filter(kikoba_id=kikoba_id)
+    accounts = accounts.filter(member__isnull=True) if member_id is None else accounts.filter(member_id=member_id)
+    return {account: natural_balance(account, balance) for account, balance in accounts.values_list('account', 'balance')}
+
+
+def member_balances(kikoba_id: int) -> Dict[int, Dict[str, Amount]]:
+    """Every member's account balances in a kikoba, with one query."""
+    from .models import LedgerAccount
+
+    balances = defaultdict(dict)
+    for member_id, account, balance in LedgerAccount.objects.filter(
+        kikoba_id=kikoba_id, member__isnull=False
+    ).values_list('member_id', 'account', 'balance'):
+        balances[member_id][account] = natural_balance(account, balance)
+    return dict(balances)
+
+
+def statement(kikoba_id: int, account: str, member_id: Optional[int] = None, start=None, end=None):
+    """
+    Entries of one account in posting order, each with the balance after it.
+
+    Args:
+        start, end: only entries posted at or after ``start`` and before ``end``
+    """
+    from .models import LedgerEntry
+
+    entries = LedgerEntry.objects.filter(kikoba_id=kikoba_id, account=account, member_id=member_id)
+    if start is not None:
+        entries = entries.filter(posted_at__gte=start)
+    if end is not None:
+        entries = entries.filter(posted_at__lt=end)
+    return entries.order_by('id')
@@ -0,0 +1,51 @@
+"""
+Management command to check that the hot queries in groups.query_plans use their indexes.
+Run it against a migrated database with realistic data, e.g. in CI after seeding.
+"""
+from django.core.management.base import BaseCommand, CommandError
+from groups.query_plans import check_query_plan, hot_queries
+
+
+class Command(BaseCommand):
+    help = 'EXPLAIN every registered hot query and fail if one scans a whole table or misses its index'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--query',
+            type=str,
+            action='append',
+            help='Only check this query; repeat for several (default: all)',
+        )
+        parser.add_argument(
+            '--show-plans',
+            action='store_true',
+            help='Print each query plan',
+        )
+
+    def handle(self, *args, **options):
+        queries = hot_queries()
+        names = options.get('query')
+        if names:
+            unknown = set(names) - {query.name for query in queries}
+            if unknown:
+                raise CommandError(f'Unknown queries: {", ".join(sorted(unknown))}')
+            queries = [query for query in queries if query.name in names]
+
+        failures = 0
+        for query in queries:
+            try:
+                plan, problems = check_query_plan(query)
+            except NotImplementedError as e:
+                raise CommandError(str(e))
+            if problems:
+                failures += 1
+                self.stdout.write(self.style.ERROR(f'{query.name}: {"; ".join(problems)}'))
+            else:
+                self.stdout.write(f'{query.name}: ok')
+            if options.get('show_plans') or problems:
+                for line in plan.splitlines():
+                    self.stdout.write(f'    {line}')
+
+        if failures:
+            raise CommandError(f'{failures} of {len(queries)} hot queries have a bad plan')
+        self.stdout.write(self.style.SUCCESS(f'All {len(queries)} hot queries use their indexes'))
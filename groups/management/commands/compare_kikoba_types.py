@@ -189,7 +189,7 @@ class Command(BaseCommand):
             payout = interest_payouts.get(user_id, Decimal('0'))
             contribution = data['fixed']
             interest_refund = data['interest']
-            fine_share = total_fines_collected / Decimal(str(len(members)))
+            fine_share = total_fines_collected / len(members)
             self.stdout.write(f"{data['name']}: {payout:,.2f} TZS")
             self.stdout.write(f"  └─ Contribution: {contribution:,.2f} + Interest Refund: {interest_refund:,.2f} + Fine Share: {fine_share:,.2f}")
         
@@ -0,0 +1,36 @@
+"""
+Management command to rebuild MemberLedgerSummary rows from transaction history.
+Use it after bulk imports or direct database edits that bypass model save().
+"""
+from django.core.management.base import BaseCommand
+from groups.models import Kikoba
+from groups.aggregates import rebuild_ledger_summaries
+
+
+class Command(BaseCommand):
+    help = 'Rebuild per-member ledger summaries from share, entry fee, emergency fund and loan records'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--kikoba-number',
+            type=str,
+            help='Only rebuild this kikoba (default: all vikoba)',
+        )
+
+    def handle(self, *args, **options):
+        kikoba_number = options.get('kikoba_number')
+        
+        vikoba = Kikoba.objects.all().order_by('id')
+        if kikoba_number:
+            vikoba = vikoba.filter(kikoba_number=kikoba_number)
+            if not vikoba.exists():
+                self.stdout.write(self.style.ERROR(f'Kikoba with number {kikoba_number} not found'))
+                return
+
+        total_rows = 0
+        for kikoba in vikoba.iterator():
+            rows = rebuild_ledger_summaries(kikoba)
+            total_rows += rows
+            self.stdout.write(f'{kikoba.kikoba_number or kikoba.id}: {rows} member summaries rebuilt')
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {total_rows} member ledger summaries'))
@@ -0,0 +1,45 @@
+"""
+Management command to rebuild KikobaMonthlyRollup rows from the ledger and memberships.
+Use it after bulk imports or direct database edits that bypass model save().
+"""
+from django.core.management.base import BaseCommand
+from groups.ledger import ledger_sources, sync_all
+from groups.models import Kikoba
+from groups.rollups import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Rebuild per-kikoba monthly rollups from ledger entries and memberships'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--kikoba-number',
+            type=str,
+            help='Only rebuild this kikoba (default: all vikoba)',
+        )
+        parser.add_argument(
+            '--sync-ledger',
+            action='store_true',
+            help='Post missing ledger entries first (as the sync_ledger command does)',
+        )
+
+    def handle(self, *args, **options):
+        kikoba_number = options.get('kikoba_number')
+
+        vikoba = Kikoba.objects.all().order_by('id')
+        if kikoba_number:
+            vikoba = vikoba.filter(kikoba_number=kikoba_number)
+            if not vikoba.exists():
+                self.stdout.write(self.style.ERROR(f'Kikoba with number {kikoba_number} not found'))
+                return
+
+        total_rows = 0
+        for kikoba in vikoba.iterator():
+            if options['sync_ledger']:
+                for model in ledger_sources():
+                    sync_all(model, [kikoba.id])
+            rows = rebuild([kikoba.id])
+            total_rows += rows
+            self.stdout.write(f'{kikoba.kikoba_number or kikoba.id}: {rows} monthly rollups rebuilt')
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {total_rows} monthly rollups'))
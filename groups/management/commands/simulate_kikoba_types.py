@@ -0,0 +1,56 @@
+"""
+Management command to simulate every kikoba type on the real ledgers of many vikoba.
+Writes one CSV row per kikoba and kikoba type (see groups.simulation).
+"""
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+from groups.models import Kikoba
+from groups.simulation import SimulationResult, run_simulation
+
+
+class Command(BaseCommand):
+    help = 'Simulate member payouts under every kikoba type using real ledger data, as CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--kikoba-number',
+            type=str,
+            action='append',
+            help='Kikoba number to simulate; repeat for several (default: all vikoba)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            help='Worker processes (default: KIKOBA_SIMULATION_WORKERS setting or the number of CPUs)',
+        )
+        parser.add_argument(
+            '--output',
+            type=str,
+            help='Write the CSV to this file instead of standard output',
+        )
+
+    def handle(self, *args, **options):
+        kikoba_numbers = options.get('kikoba_number')
+
+        kikoba_ids = None
+        if kikoba_numbers:
+            kikoba_ids = list(Kikoba.objects.filter(kikoba_number__in=kikoba_numbers).values_list('id', flat=True))
+            if len(kikoba_ids) != len(set(kikoba_numbers)):
+                raise CommandError(f'Kikoba not found among: {", ".join(kikoba_numbers)}')
+
+        results = run_simulation(kikoba_ids, workers=options.get('workers'))
+
+        output = options.get('output')
+        if output:
+            with open(output, 'w', newline='') as csv_file:
+                self._write_csv(csv_file, results)
+            self.stderr.write(self.style.SUCCESS(f'Wrote {len(results)} simulation rows to {output}'))
+        else:
+            self._write_csv(self.stdout, results)
+
+    def _write_csv(self, stream, results):
+        writer = csv.DictWriter(stream, fieldnames=SimulationResult.CSV_FIELDS, lineterminator='\n')
+        writer.writeheader()
+        for result in results:
+            writer.writerow(result.as_dict())
@@ -0,0 +1,36 @@
+"""
+Management command to post the ledger entries that money rows are missing.
+Use it once to fill the ledger from existing records, and after bulk imports
+or direct database edits that bypass model save().
+"""
+from django.core.management.base import BaseCommand
+from groups.ledger import ledger_sources, sync_all
+from groups.models import Kikoba
+
+
+class Command(BaseCommand):
+    help = 'Post ledger entries for savings, contributions, fees, loans and repayments the ledger does not match yet'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--kikoba-number',
+            type=str,
+            help='Only sync this kikoba (default: all vikoba)',
+        )
+
+    def handle(self, *args, **options):
+        kikoba_ids = None
+        kikoba_number = options.get('kikoba_number')
+        if kikoba_number:
+            kikoba_ids = list(Kikoba.objects.filter(kikoba_number=kikoba_number).values_list('id', flat=True))
+            if not kikoba_ids:
+                self.stdout.write(self.style.ERROR(f'Kikoba with number {kikoba_number} not found'))
+                return
+
+        total = 0
+        for model in ledger_sources():
+            written = sync_all(model, kikoba_ids)
+            total += written
+            self.stdout.write(f'{model._meta.label}: {written} ledger entries posted')
+
+        self.stdout.write(self.style.SUCCESS(f'Posted {total} ledger entries'))
@@ -0,0 +1,116 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def build_summaries(apps, schema_editor):
+    """Backfill one summary per membership from existing transaction history."""
+    KikobaMembership = apps.get_model("groups", "KikobaMembership")
+    MemberLedgerSummary = apps.get_model("groups", "MemberLedgerSummary")
+    ShareContribution = apps.get_model("groups", "ShareContribution")
+    EntryFeePayment = apps.get_model("groups", "EntryFeePayment")
+    EmergencyFundContribution = apps.get_model("groups", "EmergencyFundContribution")
+    Loan = apps.get_model("loans", "Loan")
+    Repayment = apps.get_model("loans", "Repayment")
+
+    def grouped(queryset, *keys, field):
+        rows = queryset.values(*keys).annotate(total=models.Sum(field)).order_by()
+        return {tuple(row[k] for k in keys): row["total"] or 0 for row in rows}
+
+    shares = grouped(ShareContribution.objects.all(), "kikoba_membership", field="amount_paid")
+    entry_fees = grouped(EntryFeePayment.objects.all(), "kikoba_membership", field="amount_paid")
+    emergency = grouped(EmergencyFundContribution.objects.all(), "kikoba_membership", field="amount")
+    repayments = grouped(
+        Repayment.objects.filter(is_verified=True),
+        "loan__application__kikoba", "loan__application__member", field="amount_paid",
+    )
+    principal = grouped(
+        Loan.objects.exclude(status="pending_disbursement"),
+        "application__kikoba", "application__member", field="disbursed_amount",
+    )
+
+    summaries = []
+    for membership_id, kikoba_id, user_id in KikobaMembership.objects.values_list("id", "kikoba_id", "user_id"):
+        summaries.append(MemberLedgerSummary(
+            kikoba_membership_id=membership_id,
+            kikoba_id=kikoba_id,
+            share_total=shares.get((membership_id,), 0),
+            entry_fee_total=entry_fees.get((membership_id,), 0),
+            emergency_fund_total=emergency.get((membership_id,), 0),
+            repayments_total=repayments.get((kikoba_id, user_id), 0),
+            principal_total=principal.get((kikoba_id, user_id), 0),
+        ))
+    MemberLedgerSummary.objects.bulk_create(summaries, batch_size=500)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("groups", "0011_kikobainvitation_invitation_code"),
+        ("loans", "0004_loanapplication_applicant_id_number_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MemberLedgerSummary",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "share_total",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                (
+                    "entry_fee_total",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                (
+                    "emergency_fund_total",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                (
+                    "repayments_total",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        help_text="Verified loan repayments",
+                        max_digits=14,
+                    ),
+                ),
+                (
+                    "principal_total",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        help_text="Disbursed loan principal",
+                        max_digits=14,
+                    ),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "kikoba",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="member_ledger_summaries",
+                        to="groups.kikoba",
+                    ),
+                ),
+                (
+                    "kikoba_membership",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="ledger_summary",
+                        to="groups.kikobamembership",
+                    ),
+                ),
+            ],
+        ),
+        migrations.RunPython(build_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("groups", "0012_memberledgersummary"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="kikoba",
+            name="ledger_version",
+            field=models.PositiveBigIntegerField(
+                default=0,
+                editable=False,
+                help_text="Incremented on every write that changes the kikoba's financial figures.",
+            ),
+        ),
+    ]
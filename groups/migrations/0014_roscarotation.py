@@ -0,0 +1,71 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("groups", "0013_kikoba_ledger_version"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RoscaRotation",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "recipient_order",
+                    models.JSONField(
+                        default=list, help_text="Membership ids in payout order"
+                    ),
+                ),
+                (
+                    "contribution_amount",
+                    models.DecimalField(
+                        decimal_places=2,
+                        help_text="Contribution per member per meeting",
+                        max_digits=12,
+                    ),
+                ),
+                ("start_date", models.DateField(help_text="Date of the first meeting")),
+                (
+                    "meeting_frequency",
+                    models.CharField(
+                        choices=[
+                            ("daily", "Daily"),
+                            ("weekly", "Weekly"),
+                            ("biweekly", "Bi-weekly"),
+                            ("monthly", "Monthly"),
+                        ],
+                        default="monthly",
+                        max_length=10,
+                    ),
+                ),
+                (
+                    "completed_meetings",
+                    models.PositiveIntegerField(
+                        default=0, help_text="Meetings whose pot has been paid out"
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "kikoba",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="rosca_rotation",
+                        to="groups.kikoba",
+                    ),
+                ),
+            ],
+        ),
+    ]
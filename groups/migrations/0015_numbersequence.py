@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("groups", "0014_roscarotation"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="NumberSequence",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=100, unique=True)),
+                (
+                    "last_value",
+                    models.PositiveBigIntegerField(
+                        default=0, help_text="Last value handed out."
+                    ),
+                ),
+            ],
+        ),
+    ]
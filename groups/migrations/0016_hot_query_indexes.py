@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:28
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("groups", "0015_numbersequence"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="kikobamembership",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["kikoba"],
+                name="membership_kikoba_active_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,174 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:33
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("groups", "0016_hot_query_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LedgerAccount",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "account",
+                    models.CharField(
+                        choices=[
+                            ("cash", "Cash"),
+                            ("loans", "Loans"),
+                            ("savings", "Savings"),
+                            ("contributions", "Contributions"),
+                            ("shares", "Shares"),
+                            ("entry_fees", "Entry fees"),
+                            ("emergency_fund", "Emergency fund"),
+                            ("interest", "Interest"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "balance",
+                    models.BigIntegerField(
+                        default=0, help_text="Debits less credits, in minor units"
+                    ),
+                ),
+                ("updated_at", models.DateTimeField(default=django.utils.timezone.now)),
+                (
+                    "kikoba",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="ledger_accounts",
+                        to="groups.kikoba",
+                    ),
+                ),
+                (
+                    "member",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="ledger_accounts",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("kikoba", "account", "member"),
+                        name="unique_ledger_member_account",
+                    ),
+                    models.UniqueConstraint(
+                        condition=models.Q(("member__isnull", True)),
+                        fields=("kikoba", "account"),
+                        name="unique_ledger_kikoba_account",
+                    ),
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="LedgerEntry",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "transaction_id",
+                    models.UUIDField(
+                        db_index=True, help_text="Shared by the entries of one posting"
+                    ),
+                ),
+                (
+                    "account",
+                    models.CharField(
+                        choices=[
+                            ("cash", "Cash"),
+                            ("loans", "Loans"),
+                            ("savings", "Savings"),
+                            ("contributions", "Contributions"),
+                            ("shares", "Shares"),
+                            ("entry_fees", "Entry fees"),
+                            ("emergency_fund", "Emergency fund"),
+                            ("interest", "Interest"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "amount",
+                    models.BigIntegerField(
+                        help_text="Minor units; debits positive, credits negative"
+                    ),
+                ),
+                (
+                    "balance",
+                    models.BigIntegerField(
+                        help_text="Balance of the account after this entry, in minor units"
+                    ),
+                ),
+                ("posted_at", models.DateTimeField(default=django.utils.timezone.now)),
+                (
+                    "source_type",
+                    models.CharField(
+                        help_text="Model of the row that caused the posting",
+                        max_length=50,
+                    ),
+                ),
+                ("source_id", models.PositiveBigIntegerField()),
+                (
+                    "kikoba",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="ledger_entries",
+                        to="groups.kikoba",
+                    ),
+                ),
+                (
+                    "member",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="ledger_entries",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "Ledger entries",
+                "indexes": [
+                    models.Index(
+                        fields=["kikoba", "account", "member", "id"],
+                        name="ledger_account_entries_idx",
+                    ),
+                    models.Index(
+                        fields=["source_type", "source_id"], name="ledger_source_idx"
+                    ),
+                    models.Index(
+                        fields=["kikoba", "posted_at"], name="ledger_kikoba_posted_idx"
+                    ),
+                ],
+            },
+        ),
+    ]
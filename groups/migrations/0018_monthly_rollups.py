@@ -0,0 +1,97 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:39
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("groups", "0017_ledger"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ledgerentry",
+            name="effective_date",
+            field=models.DateField(
+                default=django.utils.timezone.localdate, help_text="Day the money moved"
+            ),
+        ),
+        migrations.CreateModel(
+            name="KikobaMonthlyRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("month", models.DateField(help_text="First day of the month")),
+                (
+                    "savings",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                (
+                    "contributions",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                (
+                    "shares",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                (
+                    "entry_fees",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                (
+                    "emergency_fund",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                (
+                    "disbursements",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        help_text="Loan principal disbursed",
+                        max_digits=14,
+                    ),
+                ),
+                (
+                    "principal_repaid",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                (
+                    "interest",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        help_text="Repaid above principal",
+                        max_digits=14,
+                    ),
+                ),
+                ("new_members", models.IntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "kikoba",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="monthly_rollups",
+                        to="groups.kikoba",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["kikoba", "month"],
+                "indexes": [models.Index(fields=["month"], name="rollup_month_idx")],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("kikoba", "month"), name="unique_kikoba_month_rollup"
+                    )
+                ],
+            },
+        ),
+    ]
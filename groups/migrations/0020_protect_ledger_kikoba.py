@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-17 09:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("groups", "0019_protect_ledger_members"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="ledgeraccount",
+            name="kikoba",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="ledger_accounts",
+                to="groups.kikoba",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="ledgerentry",
+            name="kikoba",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="ledger_entries",
+                to="groups.kikoba",
+            ),
+        ),
+    ]
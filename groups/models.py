@@ -1,9 +1,41 @@
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models.lookups import GreaterThanOrEqual
 from django.conf import settings
 from django.utils import timezone
-import uuid
+from decimal import Decimal
+from finance import RoscaSchedule
+from money import Amount, to_decimal
+from typing import List
+from .invitations import code_prefix, issue_invitation_codes
+from .ledger import (
+    ACCOUNT_CHOICES, EMERGENCY_FUND, ENTRY_FEES, SAVINGS, SHARES,
+    LedgerPostingMixin, Posting, cents, local_date, payment_legs, post, source_type
+)
+from .sequences import SequenceAllocator
 from django.utils.translation import gettext_lazy as _
 
+def _last_kikoba_number() -> int:
+    """The highest ``KB<digits>`` kikoba number in use, to start the counter after it."""
+    numbers = Kikoba.objects.filter(kikoba_number__regex=r'^KB[0-9]+$').values_list('kikoba_number', flat=True)
+    return max((int(number[2:]) for number in numbers), default=0)
+
+
+kikoba_numbers = SequenceAllocator(
+    'kikoba_number',
+    block_size=getattr(settings, 'KIKOBA_NUMBER_BLOCK_SIZE', 10),
+    initial=_last_kikoba_number,
+)
+
+
+class NumberSequence(models.Model):
+    """A named counter used to hand out unique numbers (see ``groups.sequences``)."""
+    name = models.CharField(max_length=100, unique=True)
+    last_value = models.PositiveBigIntegerField(default=0, help_text=_('Last value handed out.'))
+
+    def __str__(self):
+        return f"{self.name}: {self.last_value}"
+
+
 class Kikoba(models.Model): # Renamed from Group
     GROUP_TYPE_CHOICES = (
         ('standard', 'Standard VIKOBA (Variable-Share ASCA)'),
@@ -77,34 +109,98 @@ class Kikoba(models.Model): # Renamed from Group
         help_text=_('Type of the group which determines the financial model used.')
     )
     creator_phone_number = models.CharField(max_length=15, blank=True, null=True, help_text=_('Phone number of the user who initiated creation.'))
+    ledger_version = models.PositiveBigIntegerField(default=0, editable=False, help_text=_('Incremented on every write that changes the kikoba\'s financial figures.'))
     
     def __str__(self):
         return self.name
 
+    @classmethod
+    def bump_ledger_version(cls, kikoba_ids):
+        """Increment ``ledger_version`` for the given kikoba ids (a list or a values() subquery)."""
+        cls.objects.filter(pk__in=kikoba_ids).update(ledger_version=models.F('ledger_version') + 1)
+
+    @staticmethod
+    def format_kikoba_number(value: int) -> str:
+        return f"KB{value:06d}"
+
+    @classmethod
+    def allocate_kikoba_numbers(cls, count: int) -> List[str]:
+        """
+        Reserve ``count`` kikoba numbers at once, e.g. for bulk onboarding.
+
+        The numbers are consecutive and never handed out again; assign them
+        to ``kikoba_number`` before saving.
+        """
+        return [cls.format_kikoba_number(value) for value in kikoba_numbers.reserve(count)]
+
     def save(self, *args, **kwargs):
         if not self.kikoba_number:
-            last_kikoba = Kikoba.objects.all().order_by('id').last()
-            if last_kikoba and last_kikoba.kikoba_number and last_kikoba.kikoba_number.startswith('KB'):
-                try:
-                    last_num = int(last_kikoba.kikoba_number[2:])
-                    new_num = last_num + 1
-                    self.kikoba_number = f"KB{new_num:06d}"
-                except ValueError:
-                    self.kikoba_number = f"KB{uuid.uuid4().hex[:6].upper()}"
-            else:
-                self.kikoba_number = "KB000001"
-            while Kikoba.objects.filter(kikoba_number=self.kikoba_number).exclude(pk=self.pk).exists():
-                if self.kikoba_number.startswith('KB') and len(self.kikoba_number) > 2:
-                    try:
-                        current_num_part = int(self.kikoba_number[2:])
-                        self.kikoba_number = f"KB{current_num_part + 1:06d}"
-                    except ValueError:
-                        self.kikoba_number = f"KB{uuid.uuid4().hex[:6].upper()}"
-                else:
-                    self.kikoba_number = f"KB{uuid.uuid4().hex[:6].upper()}"
-        super().save(*args, **kwargs)
+            self.kikoba_number = self.format_kikoba_number(kikoba_numbers.next())
+        if self._state.adding or self.pk is None:
+            super().save(*args, **kwargs)
+            return
+
+        # ledger_version only moves through bump_ledger_version, in SQL; the
+        # value held by a loaded instance may be stale and must not be written back
+        update_fields = kwargs.pop('update_fields', None)
+        if update_fields is None:
+            deferred = self.get_deferred_fields()
+            update_fields = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.attname not in deferred
+            ]
+        update_fields = [name for name in update_fields if name != 'ledger_version']
+        with transaction.atomic():
+            if 'group_type' in update_fields:
+                # Payouts depend on the financial model, so a new type is a new version
+                Kikoba.objects.filter(pk=self.pk).exclude(group_type=self.group_type).update(
+                    ledger_version=models.F('ledger_version') + 1
+                )
+            super().save(*args, update_fields=update_fields, **kwargs)
+
+class LedgerVersionMixin:
+    """
+    Bumps the owning kikoba's ``ledger_version`` when a row is saved or deleted.
+
+    ``ledger_kikoba_path`` is the lookup from the model to its kikoba id. On
+    updates the previous kikoba is bumped as well, in case the row moved.
+    Cached financial snapshots are keyed by the version, so they are never
+    served after a write.
+    """
+    ledger_kikoba_path = 'kikoba_id'
+
+    def _bump_ledger_version(self):
+        if '__' in self.ledger_kikoba_path:
+            kikoba_ids = type(self)._base_manager.filter(pk=self.pk).values(self.ledger_kikoba_path)
+        else:
+            kikoba_ids = [getattr(self, self.ledger_kikoba_path)]
+        Kikoba.bump_ledger_version(kikoba_ids)
 
-class KikobaMembership(models.Model): # Renamed from GroupMembership
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            if self._state.adding or self.pk is None:
+                super().save(*args, **kwargs)
+                self._bump_ledger_version()
+                return
+            previous = type(self)._base_manager.filter(pk=self.pk).values(self.ledger_kikoba_path)
+            if '__' in self.ledger_kikoba_path:
+                Kikoba.bump_ledger_version(previous)
+                super().save(*args, **kwargs)
+                self._bump_ledger_version()
+                return
+            # The new kikoba is on the row already, so one update bumps both
+            Kikoba.bump_ledger_version(Kikoba.objects.filter(
+                models.Q(pk__in=previous) | models.Q(pk=getattr(self, self.ledger_kikoba_path))
+            ).values('pk'))
+            super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            self._bump_ledger_version()
+            return super().delete(*args, **kwargs)
+
+
+class KikobaMembership(LedgerVersionMixin, models.Model): # Renamed from GroupMembership
     ROLE_CHOICES = (
         ('member', 'Member'),
         ('chairperson', 'Chairperson'),
@@ -126,10 +222,32 @@ class KikobaMembership(models.Model): # Renamed from GroupMembership
         # Each user can have only ONE role per Kikoba
         # Leadership roles (chairperson, treasurer, secretary) are still members
         unique_together = ('kikoba', 'user')
+        indexes = [
+            # A kikoba's active members (dashboards, aggregates, notifications). Partial,
+            # because boolean filters compile to a bare column that composite indexes can't match
+            models.Index(fields=['kikoba'], condition=models.Q(is_active=True), name='membership_kikoba_active_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.name} - {self.kikoba.name} ({self.get_role_display()})"
 
+    def save(self, *args, **kwargs):
+        from .rollups import membership_deltas
+
+        with transaction.atomic():
+            previous = None
+            if not self._state.adding and self.pk is not None:
+                previous = type(self)._base_manager.filter(pk=self.pk).values_list('kikoba_id', 'joined_at').first()
+            super().save(*args, **kwargs)
+            KikobaMonthlyRollup.apply_deltas(membership_deltas(previous, (self.kikoba_id, self.joined_at)))
+
+    def delete(self, *args, **kwargs):
+        from .rollups import membership_deltas
+
+        with transaction.atomic():
+            KikobaMonthlyRollup.apply_deltas(membership_deltas((self.kikoba_id, self.joined_at), None))
+            return super().delete(*args, **kwargs)
+
 class KikobaInvitation(models.Model): # Renamed from GroupInvitation
     STATUS_CHOICES = (
         ('pending', 'Pending'),
@@ -148,25 +266,49 @@ class KikobaInvitation(models.Model): # Renamed from GroupInvitation
     updated_at = models.DateTimeField(auto_now=True)
 
     def save(self, *args, **kwargs):
-        if not self.invitation_code:
-            # Generate unique code with Kikoba prefix
-            import random
-            import string
-            
-            # Get first 2 letters of Kikoba name (uppercase)
-            prefix = self.kikoba.name[:2].upper()
-            
-            # Generate 6-digit random number
-            while True:
-                code_number = ''.join(random.choices(string.digits, k=6))
-                code = f"{prefix}-{code_number}"
-                
-                # Check if code already exists
-                if not KikobaInvitation.objects.filter(invitation_code=code).exists():
-                    self.invitation_code = code
-                    break
-        
-        super().save(*args, **kwargs)
+        if self.invitation_code:
+            return super().save(*args, **kwargs)
+        # Codes from the counter are unique; the unique constraint only
+        # catches repeats of codes issued another way
+        prefix = code_prefix(self.kikoba.name)
+        while True:
+            self.invitation_code, = issue_invitation_codes(prefix)
+            try:
+                with transaction.atomic():
+                    return super().save(*args, **kwargs)
+            except IntegrityError:
+                if not KikobaInvitation.objects.filter(invitation_code=self.invitation_code).exists():
+                    raise
+
+    @classmethod
+    def bulk_invite(cls, kikoba, invited_by, contacts, role='member') -> List['KikobaInvitation']:
+        """
+        Create pending invitations for many phone numbers or emails at once.
+
+        Codes are issued in one reservation and the invitations written with
+        one ``bulk_create``.
+        """
+        invitations = [
+            cls(kikoba=kikoba, invited_by=invited_by, email_or_phone=contact, role=role)
+            for contact in contacts
+        ]
+        if not invitations:
+            return []
+        prefix = code_prefix(kikoba.name)
+        for invitation, code in zip(invitations, issue_invitation_codes(prefix, len(invitations))):
+            invitation.invitation_code = code
+        while True:
+            try:
+                with transaction.atomic():
+                    return cls.objects.bulk_create(invitations)
+            except IntegrityError:
+                codes = [invitation.invitation_code for invitation in invitations]
+                taken = set(cls.objects.filter(invitation_code__in=codes).values_list('invitation_code', flat=True))
+                if not taken:
+                    raise
+                repeats = [invitation for invitation in invitations if invitation.invitation_code in taken]
+                for invitation, code in zip(repeats, issue_invitation_codes(prefix, len(repeats))):
+                    invitation.invitation_code = code
 
     def __str__(self):
         return f"Invitation {self.invitation_code} for {self.email_or_phone} to {self.kikoba.name}" # Updated to self.kikoba.name
@@ -193,6 +335,397 @@ class KikobaContributionConfig(models.Model):
     def __str__(self):
         return f"Contribution Config for {self.kikoba.name}"
 
+class RoscaRotation(models.Model):
+    """
+    The payout order chosen for a ROSCA kikoba.
+
+    The rotation is stored compactly as the membership ids in payout order
+    plus a pointer to the next slot, so "who receives next" is a single row
+    read. Meeting dates and pot sizes are derived on demand from
+    ``as_schedule()``.
+    """
+    kikoba = models.OneToOneField(Kikoba, on_delete=models.CASCADE, related_name='rosca_rotation')
+    recipient_order = models.JSONField(default=list, help_text=_("Membership ids in payout order"))
+    contribution_amount = models.DecimalField(max_digits=12, decimal_places=2, help_text=_("Contribution per member per meeting"))
+    start_date = models.DateField(help_text=_("Date of the first meeting"))
+    meeting_frequency = models.CharField(max_length=10, choices=Kikoba.FREQUENCY_CHOICES, default='monthly')
+    completed_meetings = models.PositiveIntegerField(default=0, help_text=_("Meetings whose pot has been paid out"))
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"ROSCA rotation for {self.kikoba.name}"
+
+    @classmethod
+    def start(cls, kikoba, contribution_amount, start_date, meeting_frequency=None, recipient_order=None):
+        """
+        Create or replace a kikoba's rotation and reset its pointer.
+
+        Args:
+            recipient_order: membership ids in payout order; defaults to the
+                active members in joining order
+        """
+        if recipient_order is None:
+            recipient_order = list(
+                kikoba.kikoba_memberships.filter(is_active=True).order_by('joined_at', 'id').values_list('id', flat=True)
+            )
+        rotation, _created = cls.objects.update_or_create(
+            kikoba=kikoba,
+            defaults={
+                'recipient_order': list(recipient_order),
+                'contribution_amount': contribution_amount,
+                'start_date': start_date,
+                'meeting_frequency': meeting_frequency or kikoba.contribution_frequency,
+                'completed_meetings': 0,
+            }
+        )
+        return rotation
+
+    def as_schedule(self):
+        return RoscaSchedule(
+            recipients=self.recipient_order,
+            contribution=Amount.from_decimal(self.contribution_amount),
+            start_date=self.start_date,
+            meeting_frequency=self.meeting_frequency,
+        )
+
+    @property
+    def next_recipient_id(self):
+        """Membership id of the next member to receive the pot, or None once everyone has."""
+        if self.completed_meetings < len(self.recipient_order):
+            return self.recipient_order[self.completed_meetings]
+        return None
+
+    def next_meeting(self):
+        """The next meeting whose pot has not been paid out, or None."""
+        if self.next_recipient_id is None:
+            return None
+        return self.as_schedule().meeting(self.completed_meetings + 1)
+
+    def record_payout(self):
+        """
+        Advance the pointer past the current recipient.
+
+        Returns:
+            True if a payout was recorded, False if the rotation was already complete
+        """
+        advanced = RoscaRotation.objects.filter(
+            pk=self.pk, completed_meetings__lt=len(self.recipient_order)
+        ).update(completed_meetings=models.F('completed_meetings') + 1, updated_at=timezone.now())
+        self.refresh_from_db(fields=['completed_meetings', 'updated_at'])
+        return bool(advanced)
+
+class MemberLedgerSummary(models.Model):
+    """
+    Running money totals for one membership, maintained by deltas.
+
+    Source rows (share contributions, entry fees, emergency fund
+    contributions, loans and verified repayments) apply their change here
+    when they are saved or deleted, so readers get a member's totals from a
+    single indexed row. Bulk operations that bypass save() can be repaired
+    with the ``rebuild_ledger_summaries`` management command.
+    """
+    TOTAL_FIELDS = (
+        'share_total', 'entry_fee_total', 'emergency_fund_total',
+        'repayments_total', 'principal_total',
+    )
+
+    kikoba_membership = models.OneToOneField(KikobaMembership, on_delete=models.CASCADE, related_name='ledger_summary')
+    kikoba = models.ForeignKey(Kikoba, on_delete=models.CASCADE, related_name='member_ledger_summaries')
+    share_total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    entry_fee_total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    emergency_fund_total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    repayments_total = models.DecimalField(max_digits=14, decimal_places=2, default=0, help_text=_('Verified loan repayments'))
+    principal_total = models.DecimalField(max_digits=14, decimal_places=2, default=0, help_text=_('Disbursed loan principal'))
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Ledger summary for membership {self.kikoba_membership_id}"
+
+    @classmethod
+    def apply_delta(cls, membership_id, **deltas):
+        """Atomically add ``deltas`` (field name -> Decimal) to a membership's summary."""
+        deltas = {field: amount for field, amount in deltas.items() if amount}
+        if not membership_id or not deltas:
+            return
+        changes = {field: models.F(field) + amount for field, amount in deltas.items()}
+        changes['updated_at'] = timezone.now()
+        if cls.objects.filter(kikoba_membership_id=membership_id).update(**changes):
+            return
+        kikoba_id = KikobaMembership.objects.filter(pk=membership_id).values_list('kikoba_id', flat=True).first()
+        if kikoba_id is None:
+            return
+        with transaction.atomic():
+            cls.objects.get_or_create(kikoba_membership_id=membership_id, defaults={'kikoba_id': kikoba_id})
+            cls.objects.filter(kikoba_membership_id=membership_id).update(**changes)
+
+    @classmethod
+    def apply_deltas(cls, deltas):
+        """
+        Atomically add ``{membership_id: {field name: Decimal}}`` to many summaries.
+
+        Missing summaries are created first, so every change is applied by
+        a single UPDATE however many memberships it touches.
+        """
+        deltas = {
+            membership_id: {field: amount for field, amount in fields.items() if amount}
+            for membership_id, fields in deltas.items() if membership_id
+        }
+        deltas = {membership_id: fields for membership_id, fields in deltas.items() if fields}
+        if not deltas:
+            return
+        summaries = cls.objects.filter(kikoba_membership_id__in=list(deltas))
+        missing = set(deltas) - set(summaries.values_list('kikoba_membership_id', flat=True))
+        if missing:
+            cls.objects.bulk_create([
+                cls(kikoba_membership_id=membership_id, kikoba_id=kikoba_id)
+                for membership_id, kikoba_id in KikobaMembership.objects.filter(
+                    pk__in=missing
+                ).values_list('pk', 'kikoba_id')
+            ], ignore_conflicts=True)
+        changes = {}
+        for field in {field for fields in deltas.values() for field in fields}:
+            added = models.Case(
+                *[
+                    models.When(kikoba_membership_id=membership_id, then=models.Value(fields[field]))
+                    for membership_id, fields in deltas.items() if field in fields
+                ],
+                default=models.Value(Decimal('0')),
+                output_field=models.DecimalField(max_digits=14, decimal_places=2),
+            )
+            changes[field] = models.F(field) + added
+        changes['updated_at'] = timezone.now()
+        summaries.update(**changes)
+
+    @classmethod
+    def record_bulk(cls, objs):
+        """Apply the totals of rows created with ``bulk_create`` (which skips save())."""
+        deltas = {}
+        for obj in objs:
+            membership_id, amount = obj.ledger_contribution(obj.ledger_state())
+            if membership_id and amount:
+                per_member = deltas.setdefault(membership_id, {})
+                per_member[obj.ledger_summary_field] = per_member.get(obj.ledger_summary_field, Decimal('0')) + amount
+        cls.apply_deltas(deltas)
+        if deltas:
+            Kikoba.bump_ledger_version(
+                KikobaMembership.objects.filter(pk__in=list(deltas)).values('kikoba_id')
+            )
+
+
+class KikobaMonthlyRollup(models.Model):
+    """
+    A kikoba's money movements and new members in one calendar month.
+
+    Maintained by deltas as ledger postings and memberships are written
+    (see ``groups.rollups``), so trend charts read one row per month
+    instead of grouping raw transactions. Rebuilt from the ledger with the
+    ``rebuild_monthly_rollups`` management command.
+    """
+    MONEY_FIELDS = (
+        'savings', 'contributions', 'shares', 'entry_fees', 'emergency_fund',
+        'disbursements', 'principal_repaid', 'interest',
+    )
+    COUNT_FIELDS = ('new_members',)
+
+    kikoba = models.ForeignKey(Kikoba, on_delete=models.CASCADE, related_name='monthly_rollups')
+    month = models.DateField(help_text=_('First day of the month'))
+    savings = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    contributions = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    shares = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    entry_fees = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    emergency_fund = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    disbursements = models.DecimalField(max_digits=14, decimal_places=2, default=0, help_text=_('Loan principal disbursed'))
+    principal_repaid = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    interest = models.DecimalField(max_digits=14, decimal_places=2, default=0, help_text=_('Repaid above principal'))
+    new_members = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['kikoba', 'month']
+        constraints = [
+            models.UniqueConstraint(fields=['kikoba', 'month'], name='unique_kikoba_month_rollup'),
+        ]
+        indexes = [
+            # Totals across vikoba by month (super admin reports)
+            models.Index(fields=['month'], name='rollup_month_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kikoba_id} {self.month:%Y-%m}"
+
+    @property
+    def repayments(self):
+        return self.principal_repaid + self.interest
+
+    @property
+    def collected(self):
+        """Money members paid in, other than loan repayments."""
+        return self.savings + self.contributions + self.shares + self.entry_fees + self.emergency_fund
+
+    @classmethod
+    def apply_deltas(cls, deltas):
+        """
+        Atomically add ``{(kikoba_id, month): {field name: amount}}`` to many rollups.
+
+        Missing rollups are created first, so every change is applied by a
+        single UPDATE however many months and vikoba it touches.
+        """
+        deltas = {
+            key: {field: amount for field, amount in fields.items() if amount}
+            for key, fields in deltas.items()
+        }
+        deltas = {key: fields for key, fields in deltas.items() if fields}
+        if not deltas:
+            return
+        cls.objects.bulk_create([
+            cls(kikoba_id=kikoba_id, month=month) for kikoba_id, month in deltas
+        ], ignore_conflicts=True)
+        changes = {}
+        for field in {field for fields in deltas.values() for field in fields}:
+            added = models.Case(
+                *[
+                    models.When(kikoba_id=kikoba_id, month=month, then=models.Value(fields[field]))
+                    for (kikoba_id, month), fields in deltas.items() if field in fields
+                ],
+                default=models.Value(0),
+                output_field=cls._meta.get_field(field).clone(),
+            )
+            changes[field] = models.F(field) + added
+        changes['updated_at'] = timezone.now()
+        rollups = models.Q()
+        for kikoba_id, month in deltas:
+            rollups |= models.Q(kikoba_id=kikoba_id, month=month)
+        cls.objects.filter(rollups).update(**changes)
+
+
+class LedgerAccount(models.Model):
+    """
+    Balance of one ledger account (see ``groups.ledger``): a kikoba's cash,
+    or one member's savings, shares, loans and so on.
+    """
+    # Vikoba and members with ledger history cannot be deleted; their entries are the audit trail
+    kikoba = models.ForeignKey(Kikoba, on_delete=models.PROTECT, related_name='ledger_accounts')
+    member = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.PROTECT, null=True, blank=True, related_name='ledger_accounts'
+    )
+    account = models.CharField(max_length=20, choices=ACCOUNT_CHOICES)
+    balance = models.BigIntegerField(default=0, help_text=_('Debits less credits, in minor units'))
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['kikoba', 'account', 'member'], name='unique_ledger_member_account'),
+            # NULLs are distinct in the constraint above
+            models.UniqueConstraint(
+                fields=['kikoba', 'account'], condition=models.Q(member__isnull=True), name='unique_ledger_kikoba_account'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.get_account_display()} account of {self.member_id or 'kikoba'} in kikoba {self.kikoba_id}"
+
+
+class LedgerEntryQuerySet(models.QuerySet):
+    def update(self, **kwargs):
+        raise TypeError("Ledger entries cannot be changed; post an adjustment instead")
+
+    def delete(self):
+        raise TypeError("Ledger entries cannot be deleted; post a reversal instead")
+
+
+class LedgerEntry(models.Model):
+    """
+    One leg of a double-entry posting (see ``groups.ledger``). Entries are append-only.
+    """
+    transaction_id = models.UUIDField(db_index=True, help_text=_('Shared by the entries of one posting'))
+    kikoba = models.ForeignKey(Kikoba, on_delete=models.PROTECT, related_name='ledger_entries')
+    member = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.PROTECT, null=True, blank=True, related_name='ledger_entries'
+    )
+    account = models.CharField(max_length=20, choices=ACCOUNT_CHOICES)
+    amount = models.BigIntegerField(help_text=_('Minor units; debits positive, credits negative'))
+    balance = models.BigIntegerField(help_text=_('Balance of the account after this entry, in minor units'))
+    posted_at = models.DateTimeField(default=timezone.now)
+    effective_date = models.DateField(default=timezone.localdate, help_text=_('Day the money moved'))
+    source_type = models.CharField(max_length=50, help_text=_('Model of the row that caused the posting'))
+    source_id = models.PositiveBigIntegerField()
+
+    objects = LedgerEntryQuerySet.as_manager()
+
+    class Meta:
+        verbose_name_plural = _('Ledger entries')
+        indexes = [
+            # Account statements, in posting order
+            models.Index(fields=['kikoba', 'account', 'member', 'id'], name='ledger_account_entries_idx'),
+            # What a source row has posted (groups.ledger.sync)
+            models.Index(fields=['source_type', 'source_id'], name='ledger_source_idx'),
+            models.Index(fields=['kikoba', 'posted_at'], name='ledger_kikoba_posted_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_account_display()} {Amount(self.amount)} ({self.source_type} {self.source_id})"
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise TypeError("Ledger entries cannot be changed; post an adjustment instead")
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise TypeError("Ledger entries cannot be deleted; post a reversal instead")
+
+
+class LedgerSummaryMixin(LedgerVersionMixin):
+    """
+    Keeps MemberLedgerSummary in step with a money row.
+
+    Subclasses name the summary field they feed, the local fields their
+    contribution depends on, and how to turn those values into a
+    ``(membership_id, amount)`` pair. Changes are applied as deltas in the
+    same transaction as the save or delete.
+    """
+    ledger_summary_field = None
+    ledger_tracked_fields = ()
+
+    def ledger_state(self):
+        return {field: getattr(self, field) for field in self.ledger_tracked_fields}
+
+    def ledger_contribution(self, state):
+        """Return ``(membership_id, amount)`` this row contributes for a given state."""
+        raise NotImplementedError
+
+    def _stored_ledger_state(self):
+        if self._state.adding or self.pk is None:
+            return None
+        return type(self).objects.select_for_update().filter(pk=self.pk).values(*self.ledger_tracked_fields).first()
+
+    def _apply_ledger_change(self, old_state, new_state):
+        if old_state == new_state:
+            return
+        deltas = {}
+        for state, sign in ((old_state, -1), (new_state, 1)):
+            if state is None:
+                continue
+            membership_id, amount = self.ledger_contribution(state)
+            if membership_id and amount:
+                deltas[membership_id] = deltas.get(membership_id, Decimal('0')) + sign * to_decimal(amount)
+        for membership_id, amount in deltas.items():
+            MemberLedgerSummary.apply_delta(membership_id, **{self.ledger_summary_field: amount})
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            old_state = self._stored_ledger_state()
+            super().save(*args, **kwargs)
+            self._apply_ledger_change(old_state, self.ledger_state())
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            old_state = self._stored_ledger_state()
+            result = super().delete(*args, **kwargs)
+            self._apply_ledger_change(old_state, None)
+        return result
+
+
 class KikobaMemberPayment(models.Model):
     kikoba_membership = models.ForeignKey(KikobaMembership, on_delete=models.CASCADE)
     amount_due = models.DecimalField(max_digits=10, decimal_places=2)
@@ -206,7 +739,153 @@ class KikobaMemberPayment(models.Model):
     def __str__(self):
         return f"Payment for {self.kikoba_membership.user.name} in {self.kikoba_membership.kikoba.name}"
 
-class EntryFeePayment(KikobaMemberPayment):
+class MembershipLedgerMixin(LedgerSummaryMixin):
+    """Ledger tracking for rows that belong directly to a membership."""
+    ledger_tracked_fields = ('kikoba_membership_id', 'amount_paid')
+    ledger_kikoba_path = 'kikoba_membership__kikoba_id'
+
+    def ledger_contribution(self, state):
+        membership_field, amount_field = self.ledger_tracked_fields
+        return state[membership_field], state[amount_field]
+
+
+class MembershipPostingMixin(LedgerPostingMixin):
+    """Posts money a member pays into their kikoba to ``ledger_account``."""
+    ledger_account = None
+    ledger_amount_field = 'amount_paid'
+    ledger_kikoba_path = 'kikoba_membership__kikoba_id'
+    ledger_select_related = ('kikoba_membership',)
+
+    def ledger_legs(self, posted):
+        membership = self.kikoba_membership
+        return payment_legs(
+            membership.kikoba_id, membership.user_id, self.ledger_account, cents(getattr(self, self.ledger_amount_field))
+        )
+
+
+class InstallmentMixin:
+    """
+    Keeps a payment's ``amount_paid`` and ``is_fully_paid`` in step with its installments.
+
+    ``payment_field`` names the foreign key to the ``KikobaMemberPayment``.
+    Saving or deleting an installment adds the change in amount to the
+    payment with an ``F()`` update, which sets ``is_fully_paid`` in the
+    same statement, rather than re-adding every installment. The payment's
+    ledger summary, ledger postings and kikoba ledger version follow in the
+    same transaction, as they would for a save of the payment itself.
+    """
+    payment_field = None
+
+    @classmethod
+    def payment_model(cls):
+        return cls._meta.get_field(cls.payment_field).related_model
+
+    def _stored_installment(self):
+        if self._state.adding or self.pk is None:
+            return None
+        return type(self).objects.select_for_update().filter(pk=self.pk).values_list(
+            f'{self.payment_field}_id', 'amount'
+        ).first()
+
+    def _apply_installment_change(self, old_state, new_state):
+        if old_state == new_state:
+            return
+        deltas = {}
+        for state, sign in ((old_state, -1), (new_state, 1)):
+            if state is not None:
+                payment_id, amount = state
+                deltas[payment_id] = deltas.get(payment_id, Decimal('0')) + sign * to_decimal(amount)
+        type(self).apply_payment_deltas(deltas)
+        # Keep a payment the caller already holds in step with the database
+        field = self._meta.get_field(self.payment_field)
+        if field.is_cached(self):
+            getattr(self, self.payment_field).refresh_from_db(fields=['amount_paid', 'is_fully_paid'])
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            old_state = self._stored_installment()
+            super().save(*args, **kwargs)
+            self._apply_installment_change(old_state, (getattr(self, f'{self.payment_field}_id'), self.amount))
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            old_state = self._stored_installment()
+            result = super().delete(*args, **kwargs)
+            self._apply_installment_change(old_state, None)
+        return result
+
+    @classmethod
+    def apply_payment_deltas(cls, deltas):
+        """
+        Add ``{payment id: Decimal}`` to the payments' ``amount_paid``.
+
+        Every payment is updated by one statement and every ledger summary
+        by another, so the number of queries does not grow with the number
+        of payments.
+        """
+        deltas = {payment_id: amount for payment_id, amount in deltas.items() if payment_id and amount}
+        if not deltas:
+            return
+        payment_model = cls.payment_model()
+        payments = payment_model.objects.filter(pk__in=list(deltas))
+        owners = list(payments.values_list(
+            'pk', 'kikoba_membership_id', 'kikoba_membership__kikoba_id', 'kikoba_membership__user_id',
+            payment_model.ledger_date_field or 'pk',
+        ))
+        added = models.Case(
+            *[models.When(pk=payment_id, then=models.Value(amount)) for payment_id, amount in deltas.items()],
+            default=models.Value(Decimal('0')),
+            output_field=models.DecimalField(max_digits=10, decimal_places=2),
+        )
+        amount_paid = models.F('amount_paid') + added
+        payments.update(
+            amount_paid=amount_paid,
+            # Both sides see the row as it was before this update
+            is_fully_paid=models.Case(
+                models.When(GreaterThanOrEqual(amount_paid, models.F('amount_due')), then=models.Value(True)),
+                default=models.Value(False),
+            ),
+        )
+
+        summary_deltas = {}
+        postings = []
+        for payment_id, membership_id, kikoba_id, user_id, paid_on in owners:
+            per_member = summary_deltas.setdefault(membership_id, {})
+            field = payment_model.ledger_summary_field
+            per_member[field] = per_member.get(field, Decimal('0')) + deltas[payment_id]
+            postings.append(Posting(
+                source_type(payment_model), payment_id,
+                payment_legs(kikoba_id, user_id, payment_model.ledger_account, cents(deltas[payment_id])),
+                local_date(paid_on) if payment_model.ledger_date_field else None,
+            ))
+        MemberLedgerSummary.apply_deltas(summary_deltas)
+        post(postings)
+        if owners:
+            Kikoba.bump_ledger_version({owner[2] for owner in owners})
+
+    @classmethod
+    def record_bulk(cls, installments):
+        """
+        Save many installments, across payments and members, in one transaction.
+
+        The installments are written with ``bulk_create`` and their payments
+        updated with ``apply_payment_deltas``, so a meeting's worth of
+        installments costs a fixed number of queries.
+        """
+        installments = list(installments)
+        if not installments:
+            return []
+        deltas = {}
+        for installment in installments:
+            payment_id = getattr(installment, f'{cls.payment_field}_id')
+            deltas[payment_id] = deltas.get(payment_id, Decimal('0')) + to_decimal(installment.amount)
+        with transaction.atomic():
+            created = cls.objects.bulk_create(installments)
+            cls.apply_payment_deltas(deltas)
+        return created
+
+
+class EntryFeePayment(MembershipPostingMixin, MembershipLedgerMixin, KikobaMemberPayment):
     PAYMENT_METHOD_CHOICES = [
         ('cash', 'Cash'),
         ('mobile_money', 'Mobile Money'),
@@ -214,6 +893,9 @@ class EntryFeePayment(KikobaMemberPayment):
         ('check', 'Check'),
         ('other', 'Other'),
     ]
+    ledger_summary_field = 'entry_fee_total'
+    ledger_account = ENTRY_FEES
+    ledger_date_field = 'payment_date'
     
     payment_date = models.DateTimeField(null=True, blank=True)
     payment_method = models.CharField(max_length=20, choices=PAYMENT_METHOD_CHOICES, default='cash')
@@ -226,44 +908,42 @@ class EntryFeePayment(KikobaMemberPayment):
     def __str__(self):
         return f"Entry Fee for {self.kikoba_membership.user.name} - Due: {self.amount_due}"
 
-class EntryFeeInstallment(models.Model):
+class EntryFeeInstallment(InstallmentMixin, models.Model):
+    payment_field = 'entry_fee_payment'
+
     entry_fee_payment = models.ForeignKey(EntryFeePayment, on_delete=models.CASCADE, related_name='installments')
     amount = models.DecimalField(max_digits=10, decimal_places=2)
     paid_on = models.DateField(auto_now_add=True)
-    
-    def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
-        payment = self.entry_fee_payment
-        payment.amount_paid = payment.installments.aggregate(total=models.Sum('amount'))['total'] or 0
-        payment.is_fully_paid = payment.amount_paid >= payment.amount_due
-        payment.save()
 
     def __str__(self):
         return f"Installment of {self.amount} for {self.entry_fee_payment}"
 
-class ShareContribution(KikobaMemberPayment):
+class ShareContribution(MembershipPostingMixin, MembershipLedgerMixin, KikobaMemberPayment):
+    ledger_summary_field = 'share_total'
+    ledger_account = SHARES
+    ledger_date_field = 'period_start'
+
     period_start = models.DateField()
     period_end = models.DateField()
 
     def __str__(self):
         return f"Share for {self.kikoba_membership.user.name} ({self.period_start} to {self.period_end})"
     
-class ShareInstallment(models.Model):
+class ShareInstallment(InstallmentMixin, models.Model):
+    payment_field = 'share_contribution'
+
     share_contribution = models.ForeignKey(ShareContribution, on_delete=models.CASCADE, related_name='installments')
     amount = models.DecimalField(max_digits=10, decimal_places=2)
     paid_on = models.DateField(auto_now_add=True)
 
-    def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
-        contribution = self.share_contribution
-        contribution.amount_paid = contribution.installments.aggregate(total=models.Sum('amount'))['total'] or 0
-        contribution.is_fully_paid = contribution.amount_paid >= contribution.amount_due
-        contribution.save()
-
     def __str__(self):
         return f"Share Installment of {self.amount} for {self.share_contribution}"
 
-class Saving(models.Model):
+class Saving(MembershipPostingMixin, models.Model):
+    ledger_account = SAVINGS
+    ledger_amount_field = 'amount'
+    ledger_date_field = 'saved_on'
+
     kikoba_membership = models.ForeignKey(KikobaMembership, on_delete=models.CASCADE, related_name='savings')
     amount = models.DecimalField(max_digits=10, decimal_places=2)
     saved_on = models.DateField(auto_now_add=True)
@@ -271,7 +951,13 @@ class Saving(models.Model):
     def __str__(self):
         return f"Saving by {self.kikoba_membership.user.name} of {self.amount} on {self.saved_on}"
 
-class EmergencyFundContribution(models.Model):
+class EmergencyFundContribution(MembershipPostingMixin, MembershipLedgerMixin, models.Model):
+    ledger_summary_field = 'emergency_fund_total'
+    ledger_account = EMERGENCY_FUND
+    ledger_amount_field = 'amount'
+    ledger_date_field = 'contributed_on'
+    ledger_tracked_fields = ('kikoba_membership_id', 'amount')
+
     kikoba_membership = models.ForeignKey(KikobaMembership, on_delete=models.CASCADE, related_name='emergency_fund_contributions')
     amount = models.DecimalField(max_digits=10, decimal_places=2)
     contributed_on = models.DateField(auto_now_add=True)
@@ -0,0 +1,116 @@
+"""
+Hot query shapes and the indexes that serve them.
+
+``hot_queries()`` lists the filters the API, dashboards and balance updates
+run on every request or write, built with placeholder ids, together with
+the index each is meant to use. ``check_query_plan`` runs EXPLAIN on one
+and reports what is wrong with its plan: a full table scan, or a plan
+that does not use the registered index. The ``check_query_plans``
+command runs every entry.
+
+Plans are read from SQLite's ``EXPLAIN QUERY PLAN`` and PostgreSQL's
+``EXPLAIN``. On PostgreSQL sequential scans are disabled while explaining,
+since the planner rightly prefers them on small tables; a query that still
+gets one has no usable index.
+"""
+import re
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
+
+FULL_SCAN_PATTERNS = {
+    'sqlite': re.compile(r'\bSCAN (?!CONSTANT ROW)(\S+)'),
+    'postgresql': re.compile(r'\bSeq Scan on (\S+)'),
+}
+
+
+@dataclass(frozen=True)
+class HotQuery:
+    """A query shape worth an index, and the index it should use."""
+    name: str
+    build: Callable
+    index: Optional[str] = None
+
+
+def hot_queries() -> List[HotQuery]:
+    """The registered hot queries."""
+    from loans.models import LoanApplication, Repayment
+    from notifications.models import Notification
+    from savings.models import Contribution, Saving
+    from .ledger import CASH, statement
+    from .models import KikobaMembership
+
+    return [
+        HotQuery(
+            'repayments.verified_for_loan',
+            lambda: Repayment.objects.filter(loan_id=0, is_verified=True).order_by(),
+            'repayment_loan_verified_idx',
+        ),
+        HotQuery(
+            'contributions.recent_for_kikoba',
+            lambda: Contribution.objects.filter(kikoba_id=0).order_by('-date_contributed')[:10],
+            'contrib_kikoba_date_idx',
+        ),
+        HotQuery(
+            'savings.confirmed_for_member',
+            lambda: Saving.objects.filter(group_id=0, member_id=0, status='confirmed').order_by(),
+            'saving_group_member_status_idx',
+        ),
+        HotQuery(
+            'notifications.unread_for_user',
+            lambda: Notification.objects.filter(user_id=0, is_read=False).order_by('-created_at', '-id'),
+            'notif_user_unread_idx',
+        ),
+        HotQuery(
+            'memberships.active_in_kikoba',
+            lambda: KikobaMembership.objects.filter(kikoba_id=0, is_active=True),
+            'membership_kikoba_active_idx',
+        ),
+        HotQuery(
+            'loan_applications.by_status',
+            lambda: LoanApplication.objects.filter(kikoba_id=0, status='pending').order_by('-application_date'),
+            'loanapp_kikoba_status_date_idx',
+        ),
+        HotQuery(
+            'ledger.account_statement',
+            lambda: statement(0, CASH),
+            'ledger_account_entries_idx',
+        ),
+    ]
+
+
+def explain(queryset) -> str:
+    """
+    The database's plan for ``queryset``.
+
+    Raises:
+        NotImplementedError: on databases other than SQLite and PostgreSQL
+    """
+    from django.db import connections, transaction
+
+    connection = connections[queryset.db]
+    if connection.vendor == 'sqlite':
+        return queryset.explain()
+    if connection.vendor == 'postgresql':
+        with transaction.atomic(using=queryset.db):
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+            return queryset.explain()
+    raise NotImplementedError(f"Query plans are not checked on {connection.vendor}")
+
+
+def check_query_plan(query: HotQuery) -> Tuple[str, List[str]]:
+    """
+    Explain ``query`` and describe what is wrong with its plan.
+
+    Returns:
+        (plan, problems); problems is empty for a good plan
+    """
+    from django.db import connections
+
+    queryset = query.build()
+    plan = explain(queryset)
+    pattern = FULL_SCAN_PATTERNS[connections[queryset.db].vendor]
+    problems = [f'full scan of {table}' for table in pattern.findall(plan)]
+    if query.index and query.index not in plan:
+        problems.append(f'does not use {query.index}')
+    return plan, problems
@@ -0,0 +1,185 @@
+"""
+Monthly per-kikoba rollups.
+
+``KikobaMonthlyRollup`` holds, for each kikoba and calendar month, what
+members paid in (savings, contributions, shares, entry fees, emergency
+fund), the loan principal disbursed and repaid, the interest collected and
+the number of members who joined. Trend charts and period totals read one
+row per month instead of grouping years of raw transactions.
+
+Rollups are kept by deltas in the same transaction as the writes they
+count: every ledger posting adds its member legs to the month of its
+effective date (``groups.ledger.post``), so edits, reversals and changed
+dates move the rollups exactly as they move the ledger, and memberships
+add to the month they joined. ``rebuild`` recomputes them from ledger
+entries and memberships; the ``rebuild_monthly_rollups`` command runs it.
+"""
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from money import Amount
+
+from .ledger import (
+    CONTRIBUTIONS, EMERGENCY_FUND, ENTRY_FEES, INTEREST, LOANS, SAVINGS, SHARES, local_date
+)
+
+# Rollup field for a member account's legs, unless the source model overrides
+# it in ``ledger_rollup_fields`` (repayments count against principal_repaid)
+ACCOUNT_FIELDS = {
+    SAVINGS: 'savings',
+    CONTRIBUTIONS: 'contributions',
+    SHARES: 'shares',
+    ENTRY_FEES: 'entry_fees',
+    EMERGENCY_FUND: 'emergency_fund',
+    INTEREST: 'interest',
+    LOANS: 'disbursements',
+}
+
+# Rollup fields that count debits; the others count credits
+DEBIT_FIELDS = frozenset({'disbursements'})
+
+# (kikoba id, first day of month) -> {rollup field: amount}
+Deltas = Dict[Tuple[int, date], Dict[str, object]]
+
+
+def month_of(day: date) -> date:
+    return day.replace(day=1)
+
+
+def _rollup_fields(source_type: str) -> dict:
+    from django.apps import apps
+
+    try:
+        model = apps.get_model(source_type)
+    except (LookupError, ValueError):
+        return ACCOUNT_FIELDS
+    return {**ACCOUNT_FIELDS, **getattr(model, 'ledger_rollup_fields', {})}
+
+
+def leg_amount(field: str, amount: int) -> Decimal:
+    """A leg's amount (minor units, debits positive) as counted by rollup ``field``."""
+    return Amount(amount if field in DEBIT_FIELDS else -amount).to_decimal()
+
+
+def posting_deltas(postings) -> Deltas:
+    """Rollup changes for dated ledger postings; the kikoba's own legs (cash) are not counted."""
+    deltas = defaultdict(lambda: defaultdict(Decimal))
+    fields_by_source = {}
+    for posting in postings:
+        if posting.source_type not in fields_by_source:
+            fields_by_source[posting.source_type] = _rollup_fields(posting.source_type)
+        fields = fields_by_source[posting.source_type]
+        for (kikoba_id, account, member_id), amount in posting.legs.items():
+            field = fields.get(account)
+            if member_id is None or field is None:
+                continue
+            deltas[(kikoba_id, month_of(posting.effective_date))][field] += leg_amount(field, amount)
+    return deltas
+
+
+def membership_deltas(old: Optional[tuple], new: Optional[tuple]) -> Deltas:
+    """
+    Rollup changes for a membership moving from ``old`` to ``new``, each a
+    ``(kikoba_id, joined_at)`` pair or None.
+    """
+    from .models import KikobaMembership
+
+    joined_at = KikobaMembership._meta.get_field('joined_at')
+    deltas = defaultdict(lambda: defaultdict(int))
+    for state, sign in ((old, -1), (new, 1)):
+        if state is None:
+            continue
+        kikoba_id, joined = state
+        deltas[(kikoba_id, month_of(local_date(joined_at.to_python(joined))))]['new_members'] += sign
+    return deltas
+
+
+def rebuild(kikoba_ids: Optional[Iterable[int]] = None) -> int:
+    """
+    Recompute the rollups of ``kikoba_ids`` (default: every kikoba) from
+    ledger entries and memberships.
+
+    Returns:
+        The number of rollup rows written
+    """
+    from django.db import transaction
+    from django.db.models import Count, DateField, Sum
+    from django.db.models.functions import TruncMonth
+    from .models import KikobaMembership, KikobaMonthlyRollup, LedgerEntry
+
+    entries = LedgerEntry.objects.filter(member__isnull=False)
+    memberships = KikobaMembership.objects.all()
+    rollups = KikobaMonthlyRollup.objects.all()
+    if kikoba_ids is not None:
+        kikoba_ids = list(kikoba_ids)
+        entries = entries.filter(kikoba_id__in=kikoba_ids)
+        memberships = memberships.filter(kikoba_id__in=kikoba_ids)
+        rollups = rollups.filter(kikoba_id__in=kikoba_ids)
+
+    totals = defaultdict(lambda: defaultdict(Decimal))
+    fields_by_source = {}
+    for kikoba_id, month, source, account, amount in entries.annotate(
+        month=TruncMonth('effective_date')
+    ).values_list('kikoba_id', 'month', 'source_type', 'account').annotate(total=Sum('amount')).order_by():
+        if source not in fields_by_source:
+            fields_by_source[source] = _rollup_fields(source)
+        field = fields_by_source[source].get(account)
+        if field is not None:
+            totals[(kikoba_id, month)][field] += leg_amount(field, amount)
+    for kikoba_id, month, count in memberships.annotate(
+        month=TruncMonth('joined_at', output_field=DateField())
+    ).values_list('kikoba_id', 'month').annotate(count=Count('pk')).order_by():
+        totals[(kikoba_id, month)]['new_members'] += count
+
+    with transaction.atomic():
+        rollups.delete()
+        KikobaMonthlyRollup.objects.bulk_create([
+            KikobaMonthlyRollup(kikoba_id=kikoba_id, month=month, **fields)
+            for (kikoba_id, month), fields in totals.items()
+        ], batch_size=500)
+    return len(totals)
+
+
+def monthly_totals(start: date, end: date, kikoba_ids: Optional[Iterable[int]] = None) -> List[dict]:
+    """
+    Totals per calendar month from ``start``'s month to ``end``'s, across
+    ``kikoba_ids`` (default: every kikoba), with months that had no
+    activity filled in with zeros.
+    """
+    from django.db.models import Sum
+    from .models import KikobaMonthlyRollup
+
+    fields = KikobaMonthlyRollup.MONEY_FIELDS + KikobaMonthlyRollup.COUNT_FIELDS
+    rollups = KikobaMonthlyRollup.objects.filter(month__gte=month_of(start), month__lte=month_of(end))
+    if kikoba_ids is not None:
+        rollups = rollups.filter(kikoba_id__in=list(kikoba_ids))
+    found = {
+        row['month']: row
+        for row in rollups.values('month').annotate(**{field: Sum(field) for field in fields}).order_by('month')
+    }
+
+    months = []
+    month = month_of(start)
+    while month <= end:
+        row = found.get(month, {})
+        totals = {field: row.get(field) or (0 if field in KikobaMonthlyRollup.COUNT_FIELDS else Decimal('0')) for field in fields}
+        totals['month'] = month
+        totals['repayments'] = totals['principal_repaid'] + totals['interest']
+        totals['collected'] = sum(
+            (totals[field] for field in ('savings', 'contributions', 'shares', 'entry_fees', 'emergency_fund')),
+            Decimal('0'),
+        )
+        months.append(totals)
+        month = date(month.year + month.month // 12, month.month % 12 + 1, 1)
+    return months
+
+
+def months_back(count: int, end: Optional[date] = None) -> Tuple[date, date]:
+    """The first day of the month ``count - 1`` months before ``end`` (default: today), and ``end``."""
+    from django.utils import timezone
+
+    end = end or timezone.localdate()
+    index = end.year * 12 + end.month - 1 - (count - 1)
+    return date(index // 12, index % 12 + 1, 1), end
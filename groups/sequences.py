@@ -0,0 +1,90 @@
+"""
+Collision-free number allocation.
+
+Human-facing numbers (kikoba numbers and the like) come from named counters
+in the ``NumberSequence`` table rather than from "find the last number and
+add one", which races under concurrent writes. Reserving values is a single
+``UPDATE ... SET last_value = last_value + n`` followed by a read in the
+same transaction: the update locks the counter row, so concurrent callers
+queue on it and never receive the same value.
+
+``SequenceAllocator`` adds a per-process cache on top: outside a
+transaction it reserves a block of values at a time, so most allocations
+need no query at all. Values of a block that a process never uses are
+skipped, leaving gaps but never duplicates.
+"""
+import os
+import threading
+from typing import Callable, Optional
+
+
+def reserve(name: str, count: int = 1, initial: Optional[Callable[[], int]] = None) -> range:
+    """
+    Reserve ``count`` consecutive values of the named counter.
+
+    Args:
+        name: Counter name
+        count: Number of values to reserve
+        initial: Called once, when the counter does not exist yet, for the
+            last value already in use (default 0)
+
+    Returns:
+        The reserved values
+    """
+    from django.db import IntegrityError, transaction
+    from django.db.models import F
+    from .models import NumberSequence
+
+    if count < 1:
+        raise ValueError("count must be at least 1")
+    with transaction.atomic():
+        counters = NumberSequence.objects.filter(name=name)
+        if not counters.update(last_value=F('last_value') + count):
+            try:
+                with transaction.atomic():
+                    start = (initial() if initial else 0) + 1
+                    NumberSequence.objects.create(name=name, last_value=start + count - 1)
+                    return range(start, start + count)
+            except IntegrityError:
+                # Another process created the counter first
+                counters.update(last_value=F('last_value') + count)
+        last_value = counters.values_list('last_value', flat=True).get()
+    return range(last_value - count + 1, last_value + 1)
+
+
+class SequenceAllocator:
+    """
+    Hands out values of a named counter, reserving them in blocks per process.
+
+    Blocks are only cached when the allocator is called outside a
+    transaction, where the reservation commits at once. Inside a
+    transaction a rollback would undo the reservation while the cache kept
+    the values, so exactly the values needed are reserved instead.
+    """
+
+    def __init__(self, name: str, block_size: int = 1, initial: Optional[Callable[[], int]] = None):
+        self.name = name
+        self.block_size = block_size
+        self.initial = initial
+        self._lock = threading.Lock()
+        self._block = range(0)
+        self._pid = None
+
+    def reserve(self, count: int) -> range:
+        """Reserve ``count`` consecutive values, bypassing the cached block."""
+        return reserve(self.name, count, self.initial)
+
+    def next(self) -> int:
+        """Return the next unused value."""
+        from django.db import connection
+
+        if self.block_size <= 1 or connection.in_atomic_block:
+            return self.reserve(1)[0]
+        with self._lock:
+            # A forked worker must not reuse its parent's block
+            if self._pid != os.getpid() or not self._block:
+                self._block = self.reserve(self.block_size)
+                self._pid = os.getpid()
+            value = self._block[0]
+            self._block = self._block[1:]
+            return value
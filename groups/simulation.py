@@ -0,0 +1,183 @@
+"""
+Kikoba-type simulation over real ledgers.
+
+Treasurers compare what their members would receive under each kikoba type
+(``Kikoba.GROUP_TYPE_CHOICES``). Each kikoba's ledger is loaded once from
+the members' ``MemberLedgerSummary`` rows into ``finance.ContributionColumns``
+and every payout model is evaluated on those same columns. Loading is two
+queries however many vikoba are simulated; the evaluation is pure Python and
+fans out across vikoba with a process pool.
+
+Worker processes import this module without Django being set up, so model
+imports stay inside the functions that run in the parent process.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional
+
+from finance import ContributionColumns, MemberContributionSet, PayoutEngine, minor_units_to_decimal
+
+# Below this many vikoba, starting worker processes costs more than it saves
+MIN_PARALLEL_KIKOBAS = 8
+
+
+def _rotation_payouts(columns: ContributionColumns) -> List[int]:
+    # Every ROSCA member receives the pot once: back what they paid in
+    return [fixed // columns.minor_unit_divisor for fixed in columns.fixed_contribution]
+
+
+def _pooled_payouts(columns: ContributionColumns) -> List[int]:
+    # Welfare groups pool their funds and pay nothing back at share-out
+    return [0] * len(columns.member_ids)
+
+
+# Share-out payouts (in minor units) for each Kikoba.group_type
+GROUP_TYPE_PAYOUTS = {
+    'standard': PayoutEngine.standard_share_out,
+    'fixed_share': PayoutEngine.fixed_share,
+    'interest_refund': PayoutEngine.interest_refund,
+    'rosca': _rotation_payouts,
+    'welfare': _pooled_payouts,
+}
+
+
+@dataclass
+class KikobaLedger:
+    """One kikoba's member contributions in columnar form."""
+    kikoba_id: int
+    kikoba_number: Optional[str]
+    name: str
+    group_type: str
+    columns: ContributionColumns
+
+
+@dataclass
+class SimulationResult:
+    """Payout totals of one kikoba under one kikoba type."""
+    kikoba_id: int
+    kikoba_number: Optional[str]
+    name: str
+    current_type: str
+    group_type: str
+    member_count: int
+    total_contributions: Decimal
+    total_payout: Decimal
+    total_profit: Decimal
+    min_profit: Decimal
+    max_profit: Decimal
+
+    CSV_FIELDS = (
+        'kikoba_id', 'kikoba_number', 'name', 'current_type', 'group_type', 'member_count',
+        'total_contributions', 'total_payout', 'total_profit', 'min_profit', 'max_profit',
+    )
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def simulate_kikoba(ledger: KikobaLedger) -> List[SimulationResult]:
+    """Evaluate every kikoba type on one kikoba's ledger."""
+    columns = ledger.columns
+    contributions = [fixed // columns.minor_unit_divisor for fixed in columns.fixed_contribution]
+    results = []
+    for group_type, payout_model in GROUP_TYPE_PAYOUTS.items():
+        payouts = payout_model(columns)
+        profits = [payout - contribution for payout, contribution in zip(payouts, contributions)]
+        results.append(SimulationResult(
+            kikoba_id=ledger.kikoba_id,
+            kikoba_number=ledger.kikoba_number,
+            name=ledger.name,
+            current_type=ledger.group_type,
+            group_type=group_type,
+            member_count=len(columns.member_ids),
+            total_contributions=minor_units_to_decimal(sum(contributions)),
+            total_payout=minor_units_to_decimal(sum(payouts)),
+            total_profit=minor_units_to_decimal(sum(profits)),
+            min_profit=minor_units_to_decimal(min(profits, default=0)),
+            max_profit=minor_units_to_decimal(max(profits, default=0)),
+        ))
+    return results
+
+
+def load_ledgers(kikoba_ids: Optional[Iterable[int]] = None) -> List[KikobaLedger]:
+    """
+    Load the ledgers of several vikoba (default: all) with two queries.
+
+    Member figures are the same as ``MemberTotals.to_member_contribution``
+    without the emergency fund; kikoba interest counts every membership,
+    as ``kikoba_group_totals`` does. Fines are not tracked yet and are 0.
+    """
+    from .aggregates import SHARE_VALUE
+    from .models import Kikoba, KikobaMembership
+
+    vikoba = Kikoba.objects.order_by('id')
+    if kikoba_ids is not None:
+        vikoba = vikoba.filter(pk__in=list(kikoba_ids))
+    vikoba = list(vikoba.values('id', 'kikoba_number', 'name', 'group_type'))
+
+    rows = KikobaMembership.objects.filter(
+        kikoba_id__in=[kikoba['id'] for kikoba in vikoba]
+    ).values(
+        'kikoba_id', 'user_id', 'is_active',
+        'ledger_summary__share_total', 'ledger_summary__entry_fee_total',
+        'ledger_summary__repayments_total', 'ledger_summary__principal_total',
+    ).order_by('kikoba_id', 'id')
+
+    zero = Decimal('0')
+    members = {kikoba['id']: MemberContributionSet() for kikoba in vikoba}
+    interest = {kikoba['id']: zero for kikoba in vikoba}
+    for row in rows:
+        share_total = row['ledger_summary__share_total'] or zero
+        repaid = row['ledger_summary__repayments_total'] or zero
+        borrowed = row['ledger_summary__principal_total'] or zero
+        interest[row['kikoba_id']] += repaid - borrowed
+        if not row['is_active']:
+            continue
+        members[row['kikoba_id']].append(
+            row['user_id'],
+            shares=share_total / SHARE_VALUE if share_total > 0 else zero,
+            fixed_contribution=share_total + (row['ledger_summary__entry_fee_total'] or zero),
+            interest_paid=max(repaid - borrowed, zero),
+        )
+
+    return [
+        KikobaLedger(
+            kikoba_id=kikoba['id'],
+            kikoba_number=kikoba['kikoba_number'],
+            name=kikoba['name'],
+            group_type=kikoba['group_type'] or 'standard',
+            columns=ContributionColumns.from_members(
+                members[kikoba['id']], max(interest[kikoba['id']], zero), zero
+            ),
+        )
+        for kikoba in vikoba
+    ]
+
+
+def run_simulation(kikoba_ids: Optional[Iterable[int]] = None, workers: Optional[int] = None) -> List[SimulationResult]:
+    """
+    Simulate every kikoba type for several vikoba (default: all).
+
+    Args:
+        kikoba_ids: Ids of the vikoba to simulate
+        workers: Worker processes; defaults to the ``KIKOBA_SIMULATION_WORKERS``
+            setting, else the number of CPUs. 1 runs everything in this process.
+
+    Returns:
+        SimulationResult rows, by kikoba id and then kikoba type
+    """
+    from django.conf import settings
+
+    ledgers = load_ledgers(kikoba_ids)
+    if workers is None:
+        workers = getattr(settings, 'KIKOBA_SIMULATION_WORKERS', None) or os.cpu_count() or 1
+    workers = min(workers, len(ledgers))
+    if workers <= 1 or len(ledgers) < MIN_PARALLEL_KIKOBAS:
+        per_kikoba = map(simulate_kikoba, ledgers)
+        return [result for results in per_kikoba for result in results]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        per_kikoba = pool.map(simulate_kikoba, ledgers, chunksize=max(1, len(ledgers) // (workers * 4)))
+        return [result for results in per_kikoba for result in results]
@@ -0,0 +1,230 @@
+"""
+Cached financial snapshots of a kikoba.
+
+``member_totals``, ``my_total`` and the admin dashboard all need the same
+kikoba-level figures. A snapshot computes them once and caches the result
+under the kikoba's ``ledger_version``. Every write to contributions,
+repayments, loans or memberships bumps that version (see
+``LedgerVersionMixin``), so a cached snapshot is only ever returned while it
+still matches the ledger.
+
+Snapshots hold kikoba-wide figures only. Member rows carry names and phone
+numbers, which users edit without touching the ledger, so callers read
+them with ``collect_member_totals`` instead.
+
+Snapshots are kept in a small per-process memory cache in front of the
+Django cache backend. They are only stored once the surrounding transaction
+commits, so figures read from uncommitted (and possibly rolled back) writes
+are never cached.
+"""
+from collections import OrderedDict
+from dataclasses import dataclass
+from decimal import Decimal
+from threading import Lock
+from typing import Any, Dict, Iterable
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+
+from finance import GroupTotals
+from .aggregates import SHARE_VALUE, _clean_summary_row, _summary_total_expressions, _summary_totals_by_kikoba
+from .models import Kikoba, ShareContribution
+
+LOCAL_CACHE_SIZE = 256
+
+_local_snapshots = OrderedDict()
+_local_lock = Lock()
+
+
+@dataclass
+class KikobaSnapshot:
+    """Financial figures of one kikoba at a given ledger version."""
+    kikoba_id: int
+    version: int
+    member_count: int = 0
+    share_total: Decimal = Decimal('0')
+    repayments_total: Decimal = Decimal('0')
+    principal_total: Decimal = Decimal('0')
+    contributions_amount: Decimal = Decimal('0')
+    contributions_count: int = 0
+    shares_amount: Decimal = Decimal('0')
+    shares_count: int = 0
+    loans_count: int = 0
+    loans_amount: Decimal = Decimal('0')
+    active_loans_count: int = 0
+    outstanding_balance: Decimal = Decimal('0')
+
+    @property
+    def total_interest(self) -> Decimal:
+        return max(self.repayments_total - self.principal_total, Decimal('0'))
+
+    def group_totals(self, total_fines: Decimal = Decimal('0')) -> GroupTotals:
+        """Kikoba-wide payout scalars, as returned by ``kikoba_group_totals``."""
+        return GroupTotals(
+            total_shares=self.share_total / SHARE_VALUE,
+            member_count=self.member_count,
+            total_interest=self.total_interest,
+            total_fines=total_fines
+        )
+
+    def loan_totals(self) -> Dict[str, Decimal]:
+        """Kikoba-wide loan figures, as returned by ``kikoba_loan_totals``."""
+        return {
+            'total_repayments': self.repayments_total,
+            'total_principal': self.principal_total,
+            'total_interest': self.total_interest,
+        }
+
+
+def _cache_key(kikoba_id, version) -> str:
+    return f'kikoba-snapshot:{kikoba_id}:{version}'
+
+
+def _grouped_rows(queryset, kikoba_field: str, **aggregates) -> Dict[int, Dict[str, Any]]:
+    """Run one ``GROUP BY`` query over several vikoba and key the rows by kikoba id."""
+    rows = queryset.values(kikoba_field).annotate(**aggregates).order_by()
+    return {row.pop(kikoba_field): row for row in rows}
+
+
+def compute_kikoba_snapshots(versions: Dict[int, int]) -> Dict[int, KikobaSnapshot]:
+    """
+    Compute the snapshots of several vikoba from the database (no caching).
+
+    Uses one grouped query per source table however many vikoba are given.
+
+    Args:
+        versions: Dictionary mapping kikoba id to its ledger version
+
+    Returns:
+        Dictionary mapping kikoba id to its KikobaSnapshot
+    """
+    from loans.models import Loan
+    from savings.models import Contribution
+
+    kikoba_ids = list(versions)
+    summaries = _summary_totals_by_kikoba(kikoba_ids)
+    contributions = _grouped_rows(
+        Contribution.objects.filter(kikoba_id__in=kikoba_ids), 'kikoba_id',
+        total=Sum('amount'),
+        count=Count('id')
+    )
+    shares = _grouped_rows(
+        ShareContribution.objects.filter(kikoba_membership__kikoba_id__in=kikoba_ids), 'kikoba_membership__kikoba_id',
+        total=Sum('amount_paid'),
+        count=Count('id')
+    )
+    active = Q(status__in=['active', 'overdue'])
+    loans = _grouped_rows(
+        Loan.objects.filter(application__kikoba_id__in=kikoba_ids), 'application__kikoba_id',
+        count=Count('id'),
+        total=Sum('disbursed_amount'),
+        active_count=Count('id', filter=active),
+        outstanding=Sum('total_repayable', filter=active),
+    )
+
+    empty_summary = _clean_summary_row(dict.fromkeys(_summary_total_expressions()))
+    snapshots = {}
+    for kikoba_id, version in versions.items():
+        summary = summaries.get(kikoba_id, empty_summary)
+        kikoba_contributions = contributions.get(kikoba_id, {})
+        kikoba_shares = shares.get(kikoba_id, {})
+        kikoba_loans = loans.get(kikoba_id, {})
+        snapshots[kikoba_id] = KikobaSnapshot(
+            kikoba_id=kikoba_id,
+            version=version,
+            member_count=summary['member_count'],
+            share_total=summary['share_total'],
+            repayments_total=summary['repayments_total'],
+            principal_total=summary['principal_total'],
+            contributions_amount=kikoba_contributions.get('total') or Decimal('0'),
+            contributions_count=kikoba_contributions.get('count') or 0,
+            shares_amount=kikoba_shares.get('total') or Decimal('0'),
+            shares_count=kikoba_shares.get('count') or 0,
+            loans_count=kikoba_loans.get('count') or 0,
+            loans_amount=kikoba_loans.get('total') or Decimal('0'),
+            active_loans_count=kikoba_loans.get('active_count') or 0,
+            outstanding_balance=kikoba_loans.get('outstanding') or Decimal('0'),
+        )
+    return snapshots
+
+
+def _remember(snapshot: KikobaSnapshot):
+    with _local_lock:
+        _local_snapshots[snapshot.kikoba_id] = snapshot
+        _local_snapshots.move_to_end(snapshot.kikoba_id)
+        while len(_local_snapshots) > LOCAL_CACHE_SIZE:
+            _local_snapshots.popitem(last=False)
+
+
+def _store(snapshot: KikobaSnapshot):
+    _remember(snapshot)
+    cache.set(
+        _cache_key(snapshot.kikoba_id, snapshot.version),
+        snapshot,
+        getattr(settings, 'KIKOBA_SNAPSHOT_CACHE_TIMEOUT', 60 * 60)
+    )
+
+
+def get_kikoba_snapshots(vikoba: Iterable) -> Dict[int, KikobaSnapshot]:
+    """
+    Return the current financial snapshots of several vikoba.
+
+    The ledger versions are read from the database in one query, so the
+    result reflects every committed write even if the vikoba were loaded
+    earlier. Snapshots missing from the caches are computed together, with
+    a fixed number of grouped queries.
+
+    Args:
+        vikoba: Kikoba instances
+
+    Returns:
+        Dictionary mapping kikoba id to its KikobaSnapshot
+    """
+    vikoba = {kikoba.pk: kikoba for kikoba in vikoba}
+    versions = dict(Kikoba.objects.filter(pk__in=list(vikoba)).values_list('pk', 'ledger_version'))
+    missing = set(vikoba) - set(versions)
+    if missing:
+        raise Kikoba.DoesNotExist(f"Kikoba {min(missing)} does not exist")
+
+    snapshots = {}
+    for kikoba_id, version in versions.items():
+        local = _local_snapshots.get(kikoba_id)
+        if local is not None and local.version == version:
+            snapshots[kikoba_id] = local
+
+    pending = {
+        _cache_key(kikoba_id, version): kikoba_id
+        for kikoba_id, version in versions.items() if kikoba_id not in snapshots
+    }
+    for key, snapshot in (cache.get_many(list(pending)) if pending else {}).items():
+        _remember(snapshot)
+        snapshots[pending.pop(key)] = snapshot
+
+    if not pending:
+        return snapshots
+    computed = compute_kikoba_snapshots({kikoba_id: versions[kikoba_id] for kikoba_id in pending.values()})
+    for kikoba_id, snapshot in computed.items():
+        transaction.on_commit(lambda snapshot=snapshot: _store(snapshot))
+        snapshots[kikoba_id] = snapshot
+    return snapshots
+
+
+def get_kikoba_snapshot(kikoba) -> KikobaSnapshot:
+    """
+    Return the current financial snapshot of a kikoba.
+
+    Args:
+        kikoba: Kikoba instance
+
+    Returns:
+        KikobaSnapshot for the current ledger version
+    """
+    return get_kikoba_snapshots([kikoba])[kikoba.pk]
+
+
+def clear_local_snapshots():
+    """Drop this process's in-memory snapshots (the cache backend is untouched)."""
+    with _local_lock:
+        _local_snapshots.clear()
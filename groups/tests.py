@@ -1,3 +1,581 @@
-from django.test import TestCase
+import csv
+import io
+from decimal import Decimal
 
-# Create your tests here.
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import ProtectedError
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+
+from finance import MemberContribution, get_payout_calculator
+from registration.models import User
+
+from . import ledger
+from .invitations import _key, permute
+from .rollups import monthly_totals, rebuild
+from .query_plans import HotQuery, check_query_plan
+from .models import (
+    Kikoba, KikobaMembership, KikobaInvitation, ShareContribution, ShareInstallment,
+    EntryFeePayment, EntryFeeInstallment, MemberLedgerSummary, NumberSequence, LedgerAccount, LedgerEntry,
+    KikobaMonthlyRollup
+)
+from .sequences import SequenceAllocator
+from .simulation import GROUP_TYPE_PAYOUTS, MIN_PARALLEL_KIKOBAS, load_ledgers, run_simulation
+
+
+class KikobaTypeSimulationTests(TestCase):
+    """Every kikoba type is simulated on each kikoba's real ledger."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.vikoba = []
+        for k in range(MIN_PARALLEL_KIKOBAS):
+            kikoba = Kikoba.objects.create(name=f'Simulated {k}', kikoba_number=f'SIM{k:03d}')
+            for m in range(3):
+                user = User.objects.create_user(phone_number=f'07{k:04d}{m:04d}', name=f'Member {k}-{m}', password='1234')
+                membership = KikobaMembership.objects.create(kikoba=kikoba, user=user)
+                ShareContribution.objects.create(
+                    kikoba_membership=membership, amount_due=Decimal('30000'), amount_paid=Decimal('10000') * (m + 1),
+                    period_start='2025-01-01', period_end='2025-01-31'
+                )
+                EntryFeePayment.objects.create(
+                    kikoba_membership=membership, amount_due=Decimal('5000'), amount_paid=Decimal('5000')
+                )
+            cls.vikoba.append(kikoba)
+
+    def test_covers_every_group_type(self):
+        self.assertEqual(set(GROUP_TYPE_PAYOUTS), {value for value, _label in Kikoba.GROUP_TYPE_CHOICES})
+
+    def test_matches_the_payout_calculators(self):
+        kikoba = self.vikoba[0]
+        with self.assertNumQueries(2):
+            ledger, = load_ledgers([kikoba.id])
+        results = {result.group_type: result for result in run_simulation([kikoba.id], workers=1)}
+
+        members = [
+            MemberContribution(member_id=i, shares=Decimal(i + 1), fixed_contribution=Decimal('10000') * (i + 1) + 5000)
+            for i in range(3)
+        ]
+        for group_type in ('standard', 'fixed_share', 'interest_refund'):
+            payouts = get_payout_calculator(group_type).calculate_share_out_payouts(members, Decimal('0'), Decimal('0'))
+            self.assertEqual(results[group_type].total_payout, sum(payouts.values()))
+        self.assertEqual(results['fixed_share'].total_contributions, Decimal('75000.00'))
+        # Standard payouts are money: with no interest every member gets back what they paid in
+        self.assertEqual(
+            (results['standard'].total_payout, results['standard'].min_profit, results['standard'].max_profit),
+            (Decimal('75000.00'), Decimal('0.00'), Decimal('0.00'))
+        )
+        self.assertEqual(results['rosca'].total_profit, Decimal('0.00'))
+        self.assertEqual(results['welfare'].total_payout, Decimal('0.00'))
+
+    def test_standard_profit_follows_shares(self):
+        from loans.models import Loan, LoanApplication, Repayment
+
+        kikoba = self.vikoba[1]
+        borrower = kikoba.kikoba_memberships.order_by('id').first().user
+        application = LoanApplication.objects.create(
+            member=borrower, kikoba=kikoba, requested_amount=Decimal('10000'), repayment_period=12
+        )
+        loan = Loan.objects.create(application=application, disbursed_amount=Decimal('10000'), status='active')
+        Repayment.objects.create(loan=loan, amount_paid=Decimal('11200'), is_verified=True)
+
+        result, = [r for r in run_simulation([kikoba.id], workers=1) if r.group_type == 'standard']
+        # 1,200 interest over 1, 2 and 3 shares
+        self.assertEqual(result.total_profit, Decimal('1200.00'))
+        self.assertEqual((result.min_profit, result.max_profit), (Decimal('200.00'), Decimal('600.00')))
+
+    def test_process_pool_matches_inline_run(self):
+        inline = run_simulation(workers=1)
+        pooled = run_simulation(workers=2)
+        self.assertEqual([r.as_dict() for r in pooled], [r.as_dict() for r in inline])
+        self.assertEqual(len(inline), len(self.vikoba) * len(GROUP_TYPE_PAYOUTS))
+
+    def test_command_writes_csv(self):
+        out = io.StringIO()
+        call_command('simulate_kikoba_types', kikoba_number=['SIM001'], workers=1, stdout=out)
+        rows = list(csv.DictReader(io.StringIO(out.getvalue())))
+        self.assertEqual([row['group_type'] for row in rows], list(GROUP_TYPE_PAYOUTS))
+        self.assertEqual({row['kikoba_number'] for row in rows}, {'SIM001'})
+
+
+class KikobaNumberTests(TestCase):
+    """Kikoba numbers come from a counter, starting after the numbers already in use."""
+
+    def test_numbers_continue_after_existing_ones(self):
+        Kikoba.objects.create(name='Imported', kikoba_number='KB000041')
+        Kikoba.objects.create(name='Custom', kikoba_number='SPECIAL')
+        first = Kikoba.objects.create(name='First')
+        second = Kikoba.objects.create(name='Second')
+        self.assertEqual((first.kikoba_number, second.kikoba_number), ('KB000042', 'KB000043'))
+        self.assertEqual(NumberSequence.objects.get(name='kikoba_number').last_value, 43)
+
+    def test_reserve_numbers_for_bulk_onboarding(self):
+        numbers = Kikoba.allocate_kikoba_numbers(3)
+        self.assertEqual(numbers, ['KB000001', 'KB000002', 'KB000003'])
+        Kikoba.objects.bulk_create([
+            Kikoba(name=f'Onboarded {i}', kikoba_number=number) for i, number in enumerate(numbers)
+        ])
+        # One update and one read, within a savepoint
+        with self.assertNumQueries(4):
+            self.assertEqual(Kikoba.allocate_kikoba_numbers(2), ['KB000004', 'KB000005'])
+        self.assertEqual(Kikoba.objects.create(name='Next').kikoba_number, 'KB000006')
+
+
+class SequenceAllocatorTests(TransactionTestCase):
+    """Outside a transaction values are reserved a block at a time."""
+
+    def test_blocks_are_reserved_once_per_process(self):
+        allocator = SequenceAllocator('test_block', block_size=5)
+        with CaptureQueriesContext(connection) as queries:
+            values = [allocator.next() for _ in range(7)]
+        self.assertEqual(values, list(range(1, 8)))
+        self.assertEqual(NumberSequence.objects.get(name='test_block').last_value, 10)
+        # Two reservations for seven values
+        self.assertEqual(sum(query['sql'].startswith('UPDATE') for query in queries), 2)
+
+        # Another process continues after the reserved blocks
+        self.assertEqual(SequenceAllocator('test_block').next(), 11)
+
+
+class InvitationCodeTests(TestCase):
+    """Invitation codes are a keyed permutation of a counter per prefix."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(phone_number='0740000000', name='Inviter', password='1234')
+        cls.kikoba = Kikoba.objects.create(name='Wanawake Kikoba')
+
+    def expected_code(self, value):
+        return f'WA-{permute(value, "WA", _key()):06d}'
+
+    def invite(self, contact, **kwargs):
+        return KikobaInvitation.objects.create(kikoba=self.kikoba, invited_by=self.admin, email_or_phone=contact, **kwargs)
+
+    def test_permutation_is_collision_free(self):
+        key = _key()
+        values = [permute(value, 'WA', key) for value in range(20000)]
+        self.assertEqual(len(set(values)), len(values))
+        self.assertTrue(all(0 <= value < 10 ** 6 for value in values))
+        self.assertNotEqual(values, sorted(values))
+
+    def test_codes_are_issued_without_probing(self):
+        with CaptureQueriesContext(connection) as queries:
+            codes = [self.invite(f'07500000{i:02d}').invitation_code for i in range(3)]
+        self.assertEqual(codes, [self.expected_code(value) for value in range(3)])
+        self.assertFalse(any(
+            query['sql'].startswith('SELECT') and 'groups_kikobainvitation' in query['sql'] for query in queries
+        ))
+
+    def test_codes_issued_before_are_skipped(self):
+        self.invite('0750000100', invitation_code=self.expected_code(0))
+        self.assertEqual(self.invite('0750000101').invitation_code, self.expected_code(1))
+
+    def test_bulk_invite(self):
+        self.invite('0750000200', invitation_code=self.expected_code(5))
+        contacts = [f'0751{i:06d}' for i in range(300)]
+        with CaptureQueriesContext(connection) as queries:
+            invitations = KikobaInvitation.bulk_invite(self.kikoba, self.admin, contacts)
+        # The one code issued before is found with a single lookup after the insert fails
+        self.assertEqual(sum(
+            query['sql'].startswith('SELECT') and 'groups_kikobainvitation' in query['sql'] for query in queries
+        ), 1)
+        self.assertEqual(len(invitations), 300)
+        codes = set(KikobaInvitation.objects.values_list('invitation_code', flat=True))
+        self.assertEqual(len(codes), 301)
+        self.assertIn(self.expected_code(300), codes)
+
+
+class InstallmentRollupTests(TestCase):
+    """Installments add their amount to the payment instead of re-adding every installment."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.kikoba = Kikoba.objects.create(name='Installment Kikoba', kikoba_number='INS001')
+        cls.memberships = [
+            KikobaMembership.objects.create(
+                kikoba=cls.kikoba,
+                user=User.objects.create_user(phone_number=f'07330000{i:02d}', name=f'Member {i}', password='1234')
+            )
+            for i in range(4)
+        ]
+
+    def share(self, membership, due='20000'):
+        return ShareContribution.objects.create(
+            kikoba_membership=membership, amount_due=Decimal(due),
+            period_start='2025-01-01', period_end='2025-01-31'
+        )
+
+    def summary_total(self, membership, field='share_total'):
+        return getattr(MemberLedgerSummary.objects.get(kikoba_membership=membership), field)
+
+    def test_save_update_and_delete(self):
+        contribution = self.share(self.memberships[0])
+        version = Kikoba.objects.get(pk=self.kikoba.pk).ledger_version
+        first = ShareInstallment.objects.create(share_contribution=contribution, amount=Decimal('15000'))
+        self.assertEqual(contribution.amount_paid, Decimal('15000'))
+        self.assertFalse(contribution.is_fully_paid)
+
+        ShareInstallment.objects.create(share_contribution=contribution, amount=Decimal('5000'))
+        contribution.refresh_from_db()
+        self.assertEqual((contribution.amount_paid, contribution.is_fully_paid), (Decimal('20000'), True))
+        self.assertEqual(self.summary_total(self.memberships[0]), Decimal('20000'))
+
+        first.amount = Decimal('10000')
+        first.save()
+        contribution.refresh_from_db()
+        self.assertEqual((contribution.amount_paid, contribution.is_fully_paid), (Decimal('15000'), False))
+
+        first.delete()
+        contribution.refresh_from_db()
+        self.assertEqual(contribution.amount_paid, Decimal('5000'))
+        self.assertEqual(self.summary_total(self.memberships[0]), Decimal('5000'))
+        self.assertGreater(Kikoba.objects.get(pk=self.kikoba.pk).ledger_version, version)
+
+    def test_installment_adds_to_an_amount_paid_up_front(self):
+        payment = EntryFeePayment.objects.create(
+            kikoba_membership=self.memberships[1], amount_due=Decimal('5000'), amount_paid=Decimal('2000')
+        )
+        EntryFeeInstallment.objects.create(entry_fee_payment=payment, amount=Decimal('3000'))
+        payment.refresh_from_db()
+        self.assertEqual((payment.amount_paid, payment.is_fully_paid), (Decimal('5000'), True))
+        self.assertEqual(self.summary_total(self.memberships[1], 'entry_fee_total'), Decimal('5000'))
+
+    def test_query_count_does_not_depend_on_the_installment_count(self):
+        def record(installments_per_member):
+            contributions = [self.share(membership) for membership in self.memberships]
+            installments = [
+                ShareInstallment(share_contribution=contribution, amount=Decimal('1000'))
+                for contribution in contributions for _ in range(installments_per_member)
+            ]
+            with CaptureQueriesContext(connection) as ctx:
+                ShareInstallment.record_bulk(installments)
+            return contributions, len(ctx.captured_queries)
+
+        record(1)  # creates the members' ledger summaries and accounts
+        _, few = record(2)
+        contributions, many = record(5)
+        self.assertEqual(many, few)
+        for contribution in contributions:
+            contribution.refresh_from_db()
+            self.assertEqual(contribution.amount_paid, Decimal('5000'))
+        self.assertEqual(self.summary_total(self.memberships[0]), Decimal('8000'))
+
+
+class LedgerTests(TestCase):
+    """Money rows post balanced, append-only entries and keep them in step with edits."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.kikoba = Kikoba.objects.create(name='Ledger Kikoba', kikoba_number='LED001')
+        cls.user = User.objects.create_user(phone_number='0744000000', name='Member', password='1234')
+        cls.membership = KikobaMembership.objects.create(kikoba=cls.kikoba, user=cls.user)
+
+    def balances(self):
+        return ledger.account_balances(self.kikoba.id, self.user.id)
+
+    def cash(self):
+        return ledger.account_balances(self.kikoba.id).get(ledger.CASH, 0)
+
+    def assert_balanced(self):
+        by_transaction = {}
+        for transaction_id, amount in LedgerEntry.objects.values_list('transaction_id', 'amount'):
+            by_transaction[transaction_id] = by_transaction.get(transaction_id, 0) + amount
+        self.assertTrue(by_transaction)
+        self.assertEqual(set(by_transaction.values()), {0})
+        # Account balances match their entries
+        for account in LedgerAccount.objects.all():
+            entries = LedgerEntry.objects.filter(kikoba=account.kikoba, account=account.account, member=account.member)
+            self.assertEqual(sum(entries.values_list('amount', flat=True)), account.balance)
+
+    def test_edit_posts_an_adjustment_and_delete_a_reversal(self):
+        share = ShareContribution.objects.create(
+            kikoba_membership=self.membership, amount_due=Decimal('20000'), amount_paid=Decimal('15000'),
+            period_start='2025-01-01', period_end='2025-01-31'
+        )
+        self.assertEqual(self.balances()[ledger.SHARES].cents, 1500000)
+        self.assertEqual(self.cash().cents, 1500000)
+
+        share.amount_paid = Decimal('20000')
+        share.save()
+        share.save()  # nothing changed, nothing posted
+        share.delete()
+        entries = ledger.statement(self.kikoba.id, ledger.SHARES, self.user.id)
+        self.assertEqual(
+            list(entries.values_list('amount', 'balance')),
+            [(-1500000, -1500000), (-500000, -2000000), (2000000, 0)]
+        )
+        self.assertEqual(self.cash().cents, 0)
+        self.assert_balanced()
+
+    def test_repayments_go_to_principal_first(self):
+        from loans.models import Loan, LoanApplication, Repayment
+
+        application = LoanApplication.objects.create(
+            member=self.user, kikoba=self.kikoba, requested_amount=Decimal('10000'), repayment_period=12
+        )
+        loan = Loan.objects.create(application=application, disbursed_amount=Decimal('10000'), status='active')
+        self.assertEqual(self.balances()[ledger.LOANS].cents, 1000000)
+        self.assertEqual(self.cash().cents, -1000000)
+
+        Repayment.objects.create(loan=loan, amount_paid=Decimal('6000'), is_verified=True)
+        repayment = Repayment.objects.create(loan=loan, amount_paid=Decimal('5500'), is_verified=False)
+        self.assertNotIn(ledger.INTEREST, self.balances())
+        repayment.is_verified = True
+        repayment.save()
+        balances = self.balances()
+        self.assertEqual((balances[ledger.LOANS].cents, balances[ledger.INTEREST].cents), (0, 150000))
+        self.assertEqual(self.cash().cents, 150000)
+
+        loan.delete()
+        balances = self.balances()
+        self.assertEqual((balances[ledger.LOANS].cents, balances[ledger.INTEREST].cents, self.cash().cents), (0, 0, 0))
+        self.assert_balanced()
+
+    def test_installments_post_to_the_payment(self):
+        payment = EntryFeePayment.objects.create(kikoba_membership=self.membership, amount_due=Decimal('5000'))
+        EntryFeeInstallment.record_bulk([
+            EntryFeeInstallment(entry_fee_payment=payment, amount=Decimal('1000')) for _ in range(3)
+        ])
+        self.assertEqual(self.balances()[ledger.ENTRY_FEES].cents, 300000)
+        self.assert_balanced()
+
+    def test_sync_ledger_posts_rows_written_without_save(self):
+        from savings.models import Contribution
+
+        Contribution.objects.bulk_create([
+            Contribution(member=self.user, kikoba=self.kikoba, amount=Decimal('2500'), is_verified=True),
+            Contribution(member=self.user, kikoba=self.kikoba, amount=Decimal('900'), is_verified=False),
+        ])
+        self.assertFalse(LedgerEntry.objects.exists())
+        out = io.StringIO()
+        call_command('sync_ledger', kikoba_number='LED001', stdout=out)
+        self.assertIn('Posted 2 ledger entries', out.getvalue())
+        self.assertEqual(self.balances()[ledger.CONTRIBUTIONS].cents, 250000)
+
+        # Running it again posts nothing; deleting behind the model's back posts a reversal
+        Contribution.objects.filter(is_verified=True).delete()
+        call_command('sync_ledger', stdout=out)
+        self.assertEqual(self.balances()[ledger.CONTRIBUTIONS].cents, 0)
+        self.assertEqual(LedgerEntry.objects.count(), 4)
+        self.assert_balanced()
+
+    def test_save_query_counts(self):
+        from loans.models import Loan, LoanApplication, Repayment
+        from savings.models import Contribution, MemberBalance, Saving
+
+        application = LoanApplication.objects.create(
+            member=self.user, kikoba=self.kikoba, requested_amount=Decimal('10000'), repayment_period=12
+        )
+        loan = Loan.objects.create(application=application, disbursed_amount=Decimal('10000'), status='active')
+        saving = dict(group=self.kikoba, member=self.user, status='confirmed', confirmed_by=self.user)
+        # The first writes create the accounts and balance rows the later ones move
+        Saving.objects.create(amount=Decimal('1'), **saving)
+        Contribution.objects.create(kikoba=self.kikoba, member=self.user, amount=Decimal('1'), is_verified=True)
+        Repayment.objects.create(loan=loan, amount_paid=Decimal('1'), is_verified=True)
+
+        # Insert the row, read and lock the accounts, move them, write the
+        # entries and the monthly rollup, and move the kikoba and member balances
+        with self.assertNumQueries(14):
+            saving = Saving.objects.create(amount=Decimal('1000'), **saving)
+        # Unchanged: neither the ledger nor the balances are touched
+        with self.assertNumQueries(6):
+            saving.save()
+        with self.assertNumQueries(13):
+            contribution = Contribution.objects.create(
+                kikoba=self.kikoba, member=self.user, amount=Decimal('1000'), is_verified=True
+            )
+        with self.assertNumQueries(7):
+            contribution.save()
+        with self.assertNumQueries(23):
+            repayment = Repayment.objects.create(loan=loan, amount_paid=Decimal('100'), is_verified=True)
+        with self.assertNumQueries(12):
+            repayment.save()
+
+        self.assertEqual(
+            MemberBalance.objects.get(group=self.kikoba, member=self.user).last_contribution, saving.transaction_date
+        )
+        self.assertEqual(self.balances()[ledger.SAVINGS].cents, 100100)
+        self.assert_balanced()
+
+    def test_entries_are_append_only(self):
+        ShareContribution.objects.create(
+            kikoba_membership=self.membership, amount_due=Decimal('100'), amount_paid=Decimal('100'),
+            period_start='2025-01-01', period_end='2025-01-31'
+        )
+        entry = LedgerEntry.objects.first()
+        entry.amount = 1
+        with self.assertRaises(TypeError):
+            entry.save()
+        with self.assertRaises(TypeError):
+            entry.delete()
+        with self.assertRaises(TypeError):
+            LedgerEntry.objects.update(amount=0)
+        with self.assertRaises(ValueError):
+            ledger.post([ledger.Posting('test', 1, {(self.kikoba.id, ledger.CASH, None): 100})])
+        # Deleting the member would take their entries with them
+        with self.assertRaises(ProtectedError):
+            self.user.delete()
+        # ... and so would deleting the kikoba
+        with self.assertRaises(ProtectedError):
+            self.kikoba.delete()
+
+
+class KikobaSnapshotTests(TestCase):
+    """Snapshots missing from the caches are computed together."""
+
+    def setUp(self):
+        from django.core.cache import cache
+        from .snapshots import clear_local_snapshots
+
+        cache.clear()
+        clear_local_snapshots()
+        self.vikoba = []
+        for i in range(5):
+            kikoba = Kikoba.objects.create(name=f'Snapshot Kikoba {i}', kikoba_number=f'SNP{i:03d}')
+            user = User.objects.create_user(phone_number=f'07460000{i:02d}', name=f'Member {i}', password='1234')
+            ShareContribution.objects.create(
+                kikoba_membership=KikobaMembership.objects.create(kikoba=kikoba, user=user),
+                amount_due=Decimal('20000'), amount_paid=Decimal('1000') * (i + 1),
+                period_start='2025-01-01', period_end='2025-01-31'
+            )
+            self.vikoba.append(kikoba)
+
+    def test_cold_snapshots_use_a_fixed_number_of_queries(self):
+        from .snapshots import clear_local_snapshots, get_kikoba_snapshots
+
+        with CaptureQueriesContext(connection) as one:
+            get_kikoba_snapshots(self.vikoba[:1])
+        clear_local_snapshots()
+        with CaptureQueriesContext(connection) as five:
+            snapshots = get_kikoba_snapshots(self.vikoba)
+        self.assertEqual(len(five.captured_queries), len(one.captured_queries))
+        self.assertEqual(
+            [(snapshots[kikoba.id].member_count, snapshots[kikoba.id].shares_amount) for kikoba in self.vikoba],
+            [(1, Decimal('1000') * (i + 1)) for i in range(5)]
+        )
+
+
+class MonthlyRollupTests(TestCase):
+    """Monthly rollups follow every write by the date the money moved, and rebuild to the same rows."""
+
+    @classmethod
+    def setUpTestData(cls):
+        from datetime import datetime
+        from django.utils import timezone
+
+        cls.kikoba = Kikoba.objects.create(name='Rollup Kikoba', kikoba_number='ROL001')
+        cls.user = User.objects.create_user(phone_number='0745000000', name='Member', password='1234')
+        cls.membership = KikobaMembership.objects.create(
+            kikoba=cls.kikoba, user=cls.user, joined_at=timezone.make_aware(datetime(2025, 1, 10, 12))
+        )
+
+    def at(self, month, day=15):
+        from datetime import datetime
+        from django.utils import timezone
+
+        return timezone.make_aware(datetime(2025, month, day, 12))
+
+    def rollups(self):
+        return {
+            rollup.month.month: rollup
+            for rollup in KikobaMonthlyRollup.objects.filter(kikoba=self.kikoba)
+        }
+
+    def snapshot(self):
+        fields = KikobaMonthlyRollup.MONEY_FIELDS + KikobaMonthlyRollup.COUNT_FIELDS
+        return sorted(
+            KikobaMonthlyRollup.objects.filter(kikoba=self.kikoba).exclude(
+                **{field: 0 for field in fields}
+            ).values_list('month', *fields)
+        )
+
+    def test_writes_land_in_the_month_the_money_moved(self):
+        from loans.models import Loan, LoanApplication, Repayment
+        from savings.models import Contribution
+
+        contribution = Contribution.objects.create(
+            member=self.user, kikoba=self.kikoba, amount=Decimal('3000'), is_verified=True, date_contributed=self.at(2)
+        )
+        ShareContribution.objects.create(
+            kikoba_membership=self.membership, amount_due=Decimal('5000'), amount_paid=Decimal('5000'),
+            period_start='2025-02-01', period_end='2025-02-28'
+        )
+        application = LoanApplication.objects.create(
+            member=self.user, kikoba=self.kikoba, requested_amount=Decimal('10000'), repayment_period=12
+        )
+        loan = Loan.objects.create(
+            application=application, disbursed_amount=Decimal('10000'), status='active', disbursement_date=self.at(3, 1).date()
+        )
+        Repayment.objects.create(loan=loan, amount_paid=Decimal('11000'), is_verified=True, payment_date=self.at(4))
+
+        rollups = self.rollups()
+        self.assertEqual(rollups[1].new_members, 1)
+        self.assertEqual((rollups[2].contributions, rollups[2].shares, rollups[2].collected), (3000, 5000, 8000))
+        self.assertEqual(rollups[3].disbursements, 10000)
+        self.assertEqual((rollups[4].principal_repaid, rollups[4].interest, rollups[4].repayments), (10000, 1000, 11000))
+
+        # Moving the contribution to May moves it out of February
+        contribution.date_contributed = self.at(5)
+        contribution.save()
+        rollups = self.rollups()
+        self.assertEqual((rollups[2].contributions, rollups[5].contributions), (0, 3000))
+        contribution.delete()
+        self.assertEqual(self.rollups()[5].contributions, 0)
+
+        incremental = self.snapshot()
+        self.assertEqual(rebuild([self.kikoba.id]), len(KikobaMonthlyRollup.objects.filter(kikoba=self.kikoba)))
+        self.assertEqual(self.snapshot(), incremental)
+
+    def test_monthly_totals_reads_one_row_per_month(self):
+        from datetime import date
+        from savings.models import Contribution
+
+        other = Kikoba.objects.create(name='Other Kikoba', kikoba_number='ROL002')
+        for kikoba, month in ((self.kikoba, 3), (self.kikoba, 3), (other, 3), (self.kikoba, 6)):
+            Contribution.objects.create(
+                member=self.user, kikoba=kikoba, amount=Decimal('1000'), is_verified=True, date_contributed=self.at(month)
+            )
+        with self.assertNumQueries(1):
+            months = monthly_totals(date(2025, 1, 1), date(2025, 12, 31), [self.kikoba.id])
+        self.assertEqual(len(months), 12)
+        self.assertEqual(
+            [(row['month'].month, row['contributions'], row['new_members']) for row in months if any(
+                (row['contributions'], row['new_members'])
+            )],
+            [(1, 0, 1), (3, 2000, 0), (6, 1000, 0)]
+        )
+        every_kikoba = monthly_totals(date(2025, 3, 1), date(2025, 3, 1))
+        self.assertEqual(every_kikoba[0]['contributions'], 3000)
+
+    def test_rebuild_command(self):
+        KikobaMembership.objects.create(
+            kikoba=self.kikoba,
+            user=User.objects.create_user(phone_number='0745000001', name='Member 2', password='1234'),
+            joined_at=self.at(1),
+        )
+        KikobaMonthlyRollup.objects.all().delete()
+        out = io.StringIO()
+        call_command('rebuild_monthly_rollups', kikoba_number='ROL001', stdout=out)
+        self.assertIn('Rebuilt 1 monthly rollups', out.getvalue())
+        self.assertEqual(self.rollups()[1].new_members, 2)
+
+
+class QueryPlanTests(TestCase):
+    """Every registered hot query is served by its index."""
+
+    def test_hot_queries_use_their_indexes(self):
+        kikoba = Kikoba.objects.create(name='Plan Kikoba', kikoba_number='PLN001')
+        for i in range(3):
+            user = User.objects.create_user(phone_number=f'07550000{i:02d}', name=f'Member {i}', password='1234')
+            KikobaMembership.objects.create(kikoba=kikoba, user=user, is_active=bool(i))
+        out = io.StringIO()
+        call_command('check_query_plans', stdout=out)
+        self.assertIn('All 7 hot queries use their indexes', out.getvalue())
+
+    def test_full_scan_is_reported(self):
+        from savings.models import Saving
+
+        query = HotQuery('savings.by_status', lambda: Saving.objects.filter(status='confirmed'), 'saving_txn_date_id_idx')
+        plan, problems = check_query_plan(query)
+        self.assertEqual(problems, ['full scan of savings_saving', 'does not use saving_txn_date_id_idx'])
@@ -18,6 +18,7 @@ from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from .models import Kikoba, KikobaMembership, KikobaInvitation 
+from .access import accessible_kikoba_ids
 from .serializers import KikobaSerializer, KikobaMembershipSerializer, KikobaInvitationSerializer, KikobaCreateSerializer
 from django.contrib.auth import get_user_model
 from django.utils import timezone
@@ -50,8 +51,7 @@ class KikobaViewSet(viewsets.ModelViewSet): # Renamed from GroupViewSet
         user = self.request.user
         if user.is_anonymous:
             return Kikoba.objects.none()
-        user_memberships = KikobaMembership.objects.filter(user=user, is_active=True) # Changed from GroupMembership
-        return Kikoba.objects.filter(kikoba_memberships__in=user_memberships).distinct() # Changed from Group, memberships
+        return Kikoba.objects.filter(pk__in=accessible_kikoba_ids(self.request, active_only=True))
     
     def get_serializer_class(self):
         if self.action == 'create':
@@ -1,11 +1,13 @@
 from django.contrib import admin
-from .models import LoanProduct, LoanApplication, Loan, Repayment
+from .models import LoanProduct, LoanApplication, Loan, LoanInstallment, Repayment
+from django.db import transaction
 from django.utils import timezone
+from groups import ledger
 
 @admin.register(LoanProduct)
 class LoanProductAdmin(admin.ModelAdmin):
-    list_display = ('name', 'kikoba', 'interest_rate', 'min_amount', 'max_amount', 'min_duration_days', 'max_duration_days', 'is_active')
-    list_filter = ('is_active', 'kikoba__name', 'interest_rate')
+    list_display = ('name', 'kikoba', 'interest_rate', 'amortization_method', 'min_amount', 'max_amount', 'min_duration_days', 'max_duration_days', 'is_active')
+    list_filter = ('is_active', 'kikoba__name', 'interest_rate', 'amortization_method')
     search_fields = ('name', 'kikoba__name')
     autocomplete_fields = ['kikoba']
 
@@ -35,6 +37,15 @@ class LoanApplicationAdmin(admin.ModelAdmin):
             app.save()
     reject_applications.short_description = "Reject selected pending applications"
 
+class LoanInstallmentInline(admin.TabularInline):
+    model = LoanInstallment
+    extra = 0
+    can_delete = False
+    readonly_fields = ('installment_number', 'due_date', 'principal', 'interest', 'amount_paid', 'is_paid')
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
 @admin.register(Loan)
 class LoanAdmin(admin.ModelAdmin):
     list_display = ('application_member', 'kikoba_name', 'disbursed_amount', 'status', 'disbursement_date', 'current_due_date', 'total_repayable')
@@ -43,6 +54,7 @@ class LoanAdmin(admin.ModelAdmin):
     readonly_fields = ('closed_date',)
     autocomplete_fields = ['application']
     date_hierarchy = 'disbursement_date'
+    inlines = [LoanInstallmentInline]
 
     @admin.display(description='Member', ordering='application__member__name')
     def application_member(self, obj):
@@ -71,5 +83,10 @@ class RepaymentAdmin(admin.ModelAdmin):
         return obj.loan.application.kikoba.name
 
     def mark_repayments_as_verified(self, request, queryset):
-        queryset.update(is_verified=True, verified_by=request.user, verified_at=timezone.now())
+        with transaction.atomic():
+            queryset.update(is_verified=True, verified_by=request.user, verified_at=timezone.now())
+            # update() skips save(); each repayment's interest split reads the
+            # loan balance the earlier ones moved, so post them one at a time
+            for repayment in queryset.select_related('loan__application').order_by('payment_date', 'pk'):
+                ledger.sync(Repayment, [repayment])
     mark_repayments_as_verified.short_description = "Mark selected repayments as verified"
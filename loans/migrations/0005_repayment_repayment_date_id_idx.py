@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:47
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("loans", "0004_loanapplication_applicant_id_number_and_more"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="repayment",
+            index=models.Index(
+                fields=["-payment_date", "-id"], name="repayment_date_id_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,75 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("loans", "0005_repayment_repayment_date_id_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="loanproduct",
+            name="amortization_method",
+            field=models.CharField(
+                choices=[
+                    ("flat", "Flat Rate"),
+                    ("reducing_balance", "Reducing Balance"),
+                ],
+                default="flat",
+                max_length=20,
+            ),
+        ),
+        migrations.CreateModel(
+            name="LoanInstallment",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("installment_number", models.PositiveIntegerField()),
+                ("due_date", models.DateField()),
+                ("principal", models.DecimalField(decimal_places=2, max_digits=12)),
+                (
+                    "interest",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=12),
+                ),
+                (
+                    "amount_paid",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=12),
+                ),
+                ("is_paid", models.BooleanField(default=False)),
+                (
+                    "loan",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="installments",
+                        to="loans.loan",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Loan Installment",
+                "verbose_name_plural": "Loan Installments",
+                "ordering": ["loan_id", "installment_number"],
+                "indexes": [
+                    models.Index(
+                        fields=["is_paid", "due_date"], name="installment_paid_due_idx"
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("loan", "installment_number"),
+                        name="unique_loan_installment_number",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:28
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("groups", "0016_hot_query_indexes"),
+        ("loans", "0006_loanproduct_amortization_method_loaninstallment"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="loanapplication",
+            index=models.Index(
+                fields=["kikoba", "status", "-application_date"],
+                name="loanapp_kikoba_status_date_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="repayment",
+            index=models.Index(
+                condition=models.Q(("is_verified", True)),
+                fields=["loan"],
+                name="repayment_loan_verified_idx",
+            ),
+        ),
+    ]
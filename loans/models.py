@@ -1,9 +1,82 @@
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
+from decimal import Decimal
+from finance import AmortizationSchedule
+from money import Amount, to_decimal
+from groups import ledger
+from groups.models import KikobaMembership, LedgerAccount, LedgerSummaryMixin, LedgerVersionMixin, MemberLedgerSummary
+from groups.sequences import SequenceAllocator
+from savings.models import KikobaBalance
+from typing import List
+
+
+# One application number counter per year, created on first use
+_application_number_allocators = {}
+
+
+def _application_number_allocator(year: int) -> SequenceAllocator:
+    allocator = _application_number_allocators.get(year)
+    if allocator is None:
+        def last_number():
+            # Continue after the numbers issued before the counter existed
+            numbers = LoanApplication.objects.filter(
+                application_number__regex=rf'^LN-{year}-[0-9]+$'
+            ).values_list('application_number', flat=True)
+            return max((int(number.rsplit('-', 1)[1]) for number in numbers), default=0)
+
+        allocator = _application_number_allocators.setdefault(year, SequenceAllocator(
+            f'loan_application_number:{year}',
+            block_size=getattr(settings, 'LOAN_APPLICATION_NUMBER_BLOCK_SIZE', 10),
+            initial=last_number,
+        ))
+    return allocator
+
+
+def _borrower_membership_id(applications):
+    """Return the kikoba membership id of the borrower on the single application in ``applications``."""
+    return KikobaMembership.objects.filter(
+        kikoba_id=models.Subquery(applications.values('kikoba_id')[:1]),
+        user_id=models.Subquery(applications.values('member_id')[:1]),
+    ).values_list('id', flat=True).first()
+
+class LoanBookMixin(LedgerSummaryMixin):
+    """
+    Moves the kikoba's KikobaBalance.total_loans alongside the ledger summary.
+
+    ``loan_book_sign`` is +1 for money lent out and -1 for money paid back.
+    """
+    loan_book_sign = 1
+
+    def ledger_amount(self, state):
+        """Amount this row contributes in a given state (0 if it does not count)."""
+        raise NotImplementedError
+
+    def ledger_kikoba_id(self, state):
+        raise NotImplementedError
+
+    def _apply_ledger_change(self, old_state, new_state):
+        super()._apply_ledger_change(old_state, new_state)
+        if old_state == new_state:
+            return
+        deltas = {}
+        for state, sign in ((old_state, -1), (new_state, 1)):
+            if state is None:
+                continue
+            amount = self.ledger_amount(state)
+            if amount:
+                kikoba_id = self.ledger_kikoba_id(state)
+                deltas[kikoba_id] = deltas.get(kikoba_id, Decimal('0')) + sign * to_decimal(amount)
+        for kikoba_id, amount in deltas.items():
+            KikobaBalance.apply_delta(kikoba_id, loans=self.loan_book_sign * amount)
 
 class LoanProduct(models.Model):
+    AMORTIZATION_METHOD_CHOICES = [
+        (AmortizationSchedule.FLAT, _('Flat Rate')),
+        (AmortizationSchedule.REDUCING_BALANCE, _('Reducing Balance')),
+    ]
+
     kikoba = models.ForeignKey('groups.Kikoba', on_delete=models.CASCADE, related_name='loan_products', null=True, blank=True)
     name = models.CharField(max_length=255, help_text=_("e.g., Emergency Loan, Development Loan"))
     interest_rate = models.DecimalField(max_digits=5, decimal_places=2, help_text=_("Annual interest rate in percentage, e.g., 10 for 10%"))
@@ -12,6 +85,7 @@ class LoanProduct(models.Model):
     min_duration_days = models.PositiveIntegerField(default=30, help_text=_("Minimum loan duration in days"))
     max_duration_days = models.PositiveIntegerField(help_text=_("Maximum loan duration in days"))
     grace_period_days = models.PositiveIntegerField(default=0, help_text=_("Grace period in days before first repayment is due"))
+    amortization_method = models.CharField(max_length=20, choices=AMORTIZATION_METHOD_CHOICES, default=AmortizationSchedule.FLAT)
     is_active = models.BooleanField(default=True)
     description = models.TextField(blank=True, null=True)
 
@@ -22,7 +96,7 @@ class LoanProduct(models.Model):
         verbose_name = _("Loan Product")
         verbose_name_plural = _("Loan Products")
 
-class LoanApplication(models.Model):
+class LoanApplication(LedgerVersionMixin, models.Model):
     STATUS_CHOICES = [
         ('pending', _('Pending')),
         ('approved', _('Approved')),
@@ -73,23 +147,26 @@ class LoanApplication(models.Model):
     decision_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='decided_loan_applications')
     remarks = models.TextField(blank=True, null=True, help_text=_("Reason for approval/rejection"))
 
+    @staticmethod
+    def format_application_number(year: int, value: int) -> str:
+        return f'LN-{year}-{value:05d}'
+
+    @classmethod
+    def next_application_number(cls) -> str:
+        """Take the next application number of the current year."""
+        year = timezone.now().year
+        return cls.format_application_number(year, _application_number_allocator(year).next())
+
+    @classmethod
+    def allocate_application_numbers(cls, count: int) -> List[str]:
+        """Reserve ``count`` consecutive application numbers of the current year, e.g. for bulk imports."""
+        year = timezone.now().year
+        values = _application_number_allocator(year).reserve(count)
+        return [cls.format_application_number(year, value) for value in values]
+
     def save(self, *args, **kwargs):
-        # Generate application number if not exists
         if not self.application_number:
-            from django.utils import timezone
-            year = timezone.now().year
-            # Get the last application number for this year
-            last_app = LoanApplication.objects.filter(
-                application_number__startswith=f'LN-{year}-'
-            ).order_by('-id').first()
-            
-            if last_app and last_app.application_number:
-                last_num = int(last_app.application_number.split('-')[-1])
-                new_num = last_num + 1
-            else:
-                new_num = 1
-            
-            self.application_number = f'LN-{year}-{new_num:05d}'
+            self.application_number = self.next_application_number()
         
         super().save(*args, **kwargs)
 
@@ -100,8 +177,12 @@ class LoanApplication(models.Model):
         verbose_name = _("Loan Application")
         verbose_name_plural = _("Loan Applications")
         ordering = ['-application_date']
+        indexes = [
+            # A kikoba's applications by status, newest first (loan management dashboards)
+            models.Index(fields=['kikoba', 'status', '-application_date'], name='loanapp_kikoba_status_date_idx'),
+        ]
 
-class Loan(models.Model):
+class Loan(ledger.LedgerPostingMixin, LoanBookMixin, models.Model):
     STATUS_CHOICES = [
         ('pending_disbursement', _('Pending Disbursement')),
         ('active', _('Active')),
@@ -111,6 +192,14 @@ class Loan(models.Model):
         ('cleared_early', _('Cleared Early')),
         ('rescheduled', _('Rescheduled')),
     ]
+    # Loans in these states have not released any principal yet
+    UNDISBURSED_STATUSES = ('pending_disbursement',)
+    ledger_summary_field = 'principal_total'
+    ledger_tracked_fields = ('application_id', 'disbursed_amount', 'status')
+    ledger_kikoba_path = 'application__kikoba_id'
+    ledger_date_field = 'disbursement_date'
+    ledger_select_related = ('application',)
+
     application = models.OneToOneField(LoanApplication, on_delete=models.CASCADE, related_name='loan_details', null=True)  # Added null=True
     disbursed_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0.00)  # Added default=0.00
     disbursement_date = models.DateField(null=True, blank=True) # Made nullable
@@ -125,11 +214,172 @@ class Loan(models.Model):
     def __str__(self):
         return f"Loan for {self.application.member.name} - {self.disbursed_amount} ({self.status})"
 
+    def ledger_amount(self, state):
+        if not state['application_id'] or state['status'] in self.UNDISBURSED_STATUSES:
+            return 0
+        return state['disbursed_amount']
+
+    def ledger_kikoba_id(self, state):
+        return LoanApplication.objects.filter(pk=state['application_id']).values_list('kikoba_id', flat=True).first()
+
+    def ledger_legs(self, posted):
+        amount = ledger.cents(self.ledger_amount(self.ledger_state()))
+        if not amount:
+            return {}
+        application = self.application
+        return {
+            (application.kikoba_id, ledger.LOANS, application.member_id): amount,
+            (application.kikoba_id, ledger.CASH, None): -amount,
+        }
+
+    def ledger_contribution(self, state):
+        amount = self.ledger_amount(state)
+        if not amount:
+            return None, 0
+        applications = LoanApplication.objects.filter(pk=state['application_id'])
+        return _borrower_membership_id(applications), amount
+
+    def _apply_ledger_change(self, old_state, new_state):
+        super()._apply_ledger_change(old_state, new_state)
+        # The repayment schedule starts when the loan first counts as disbursed
+        if new_state and self.ledger_amount(new_state) and not (old_state and self.ledger_amount(old_state)):
+            self.generate_installments()
+
+    def generate_installments(self, update_terms=False):
+        """
+        Write the loan's repayment schedule as LoanInstallment rows.
+
+        The schedule follows the loan product's amortization method and grace
+        period. The loan's total repayable and due dates are filled in from
+        it where they are unset; pass ``update_terms=True`` to replace values
+        that were already set. Does nothing if the loan already has installments.
+        """
+        if self.installments.exists():
+            return []
+        application = self.application
+        product = application.loan_product if application else None
+        schedule = AmortizationSchedule.generate(
+            principal=self.disbursed_amount,
+            annual_interest_rate=to_decimal(self.interest_rate_at_disbursement) / 100,
+            duration_months=application.repayment_period if application else 0,
+            start_date=self.disbursement_date or timezone.localdate(),
+            method=product.amortization_method if product else AmortizationSchedule.FLAT,
+            grace_period_days=product.grace_period_days if product else 0,
+        )
+        if not schedule:
+            return []
+        installments = LoanInstallment.objects.bulk_create([
+            LoanInstallment(
+                loan=self,
+                installment_number=item.number,
+                due_date=item.due_date,
+                principal=item.principal.to_decimal(),
+                interest=item.interest.to_decimal(),
+            )
+            for item in schedule
+        ])
+        terms = {
+            'total_repayable': Amount.sum(item.total for item in schedule).to_decimal(),
+            'original_due_date': schedule[-1].due_date,
+            'current_due_date': schedule[-1].due_date,
+        }
+        if not update_terms:
+            terms = {field: value for field, value in terms.items() if not getattr(self, field)}
+        if terms:
+            Loan.objects.filter(pk=self.pk).update(**terms)
+            self.refresh_from_db(fields=list(terms))
+        return installments
+
+    def delete(self, *args, **kwargs):
+        # Repayments are removed by cascade without calling their delete()
+        with transaction.atomic():
+            repayment_ids = list(self.repayments.values_list('pk', flat=True))
+            verified_total = self.repayments.filter(is_verified=True).aggregate(
+                total=models.Sum('amount_paid')
+            )['total']
+            membership_id = kikoba_id = None
+            if verified_total and self.application_id:
+                membership_id = _borrower_membership_id(LoanApplication.objects.filter(pk=self.application_id))
+                kikoba_id = self.ledger_kikoba_id({'application_id': self.application_id})
+            result = super().delete(*args, **kwargs)
+            if membership_id:
+                MemberLedgerSummary.apply_delta(membership_id, repayments_total=-verified_total)
+            if kikoba_id:
+                KikobaBalance.apply_delta(kikoba_id, loans=verified_total)
+            ledger.sync(Repayment, deleted_ids=repayment_ids)
+        return result
+
     class Meta:
         verbose_name = _("Loan")
         verbose_name_plural = _("Loans")
         ordering = ['-disbursement_date']
 
+class LoanInstallmentQuerySet(models.QuerySet):
+    def unpaid(self):
+        return self.filter(is_paid=False)
+
+    def due_between(self, start, end):
+        """Unpaid installments falling due from ``start`` to ``end`` inclusive."""
+        return self.unpaid().filter(due_date__range=(start, end))
+
+    def in_arrears(self, as_of=None):
+        """Unpaid installments whose due date is before ``as_of`` (default today)."""
+        return self.unpaid().filter(due_date__lt=as_of or timezone.localdate())
+
+
+class LoanInstallment(models.Model):
+    """One scheduled installment of a disbursed loan (see Loan.generate_installments)."""
+    loan = models.ForeignKey(Loan, on_delete=models.CASCADE, related_name='installments')
+    installment_number = models.PositiveIntegerField()
+    due_date = models.DateField()
+    principal = models.DecimalField(max_digits=12, decimal_places=2)
+    interest = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    amount_paid = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    is_paid = models.BooleanField(default=False)
+
+    objects = LoanInstallmentQuerySet.as_manager()
+
+    def __str__(self):
+        return f"Installment {self.installment_number} of loan {self.loan_id} due {self.due_date}"
+
+    @property
+    def amount_due(self):
+        return self.principal + self.interest
+
+    @classmethod
+    def allocate_repayments(cls, loan_id):
+        """
+        Spread a loan's verified repayments over its installments, oldest first.
+
+        Only installments whose paid amount or status changes are written.
+        """
+        remaining = Repayment.objects.filter(loan_id=loan_id, is_verified=True).aggregate(
+            total=models.Sum('amount_paid')
+        )['total'] or Decimal('0')
+        changed = []
+        for installment in cls.objects.select_for_update().filter(loan_id=loan_id).order_by('installment_number'):
+            amount_paid = max(min(installment.amount_due, remaining), Decimal('0'))
+            remaining -= amount_paid
+            is_paid = amount_paid >= installment.amount_due
+            if installment.amount_paid != amount_paid or installment.is_paid != is_paid:
+                installment.amount_paid = amount_paid
+                installment.is_paid = is_paid
+                changed.append(installment)
+        if changed:
+            cls.objects.bulk_update(changed, ['amount_paid', 'is_paid'])
+
+    class Meta:
+        verbose_name = _("Loan Installment")
+        verbose_name_plural = _("Loan Installments")
+        ordering = ['loan_id', 'installment_number']
+        constraints = [
+            models.UniqueConstraint(fields=['loan', 'installment_number'], name='unique_loan_installment_number'),
+        ]
+        indexes = [
+            # "Due this week" and arrears are range scans over unpaid installments
+            models.Index(fields=['is_paid', 'due_date'], name='installment_paid_due_idx'),
+        ]
+
 class LoanGuarantor(models.Model):
     """Model to store guarantors for loan applications"""
     loan_application = models.ForeignKey(LoanApplication, on_delete=models.CASCADE, related_name='guarantors')
@@ -151,7 +401,7 @@ class LoanGuarantor(models.Model):
         ordering = ['created_at']
 
 
-class Repayment(models.Model):
+class Repayment(ledger.LedgerPostingMixin, LoanBookMixin, models.Model):
     PAYMENT_METHOD_CHOICES = [
         ('cash', _('Cash')),
         ('mobile_money', _('Mobile Money')),
@@ -159,6 +409,16 @@ class Repayment(models.Model):
         ('internal_transfer', _('Internal Transfer/Savings Deduction')),
         ('other', _('Other')),
     ]
+    ledger_summary_field = 'repayments_total'
+    ledger_tracked_fields = ('loan_id', 'amount_paid', 'is_verified')
+    ledger_kikoba_path = 'loan__application__kikoba_id'
+    ledger_date_field = 'payment_date'
+    ledger_rollup_fields = {ledger.LOANS: 'principal_repaid'}
+    ledger_select_related = ('loan__application',)
+    # The principal/interest split reads the balance earlier repayments moved
+    ledger_sync_in_batches = False
+    loan_book_sign = -1
+
     loan = models.ForeignKey(Loan, on_delete=models.CASCADE, related_name='repayments')
     amount_paid = models.DecimalField(max_digits=12, decimal_places=2)
     payment_date = models.DateTimeField(default=timezone.now)
@@ -172,7 +432,52 @@ class Repayment(models.Model):
     def __str__(self):
         return f"Repayment of {self.amount_paid} for loan {self.loan.id} by {self.loan.application.member.name}"
 
+    def ledger_amount(self, state):
+        return state['amount_paid'] if state['is_verified'] else 0
+
+    def ledger_kikoba_id(self, state):
+        return Loan.objects.filter(pk=state['loan_id']).values_list('application__kikoba_id', flat=True).first()
+
+    def ledger_legs(self, posted):
+        amount = ledger.cents(self.ledger_amount(self.ledger_state()))
+        application = self.loan.application if amount else None
+        if application is None:
+            return {}
+        kikoba_id, member_id = application.kikoba_id, application.member_id
+        loans = (kikoba_id, ledger.LOANS, member_id)
+        # Principal first: only what exceeds the member's outstanding principal is interest
+        balance = LedgerAccount.objects.filter(
+            kikoba_id=kikoba_id, account=ledger.LOANS, member_id=member_id
+        ).values_list('balance', flat=True).first() or 0
+        principal = min(amount, max(balance - posted.get(loans, 0), 0))
+        return {
+            (kikoba_id, ledger.CASH, None): amount,
+            loans: -principal,
+            (kikoba_id, ledger.INTEREST, member_id): principal - amount,
+        }
+
+    def ledger_contribution(self, state):
+        amount = self.ledger_amount(state)
+        if not amount:
+            return None, 0
+        applications = LoanApplication.objects.filter(loan_details__id=state['loan_id'])
+        return _borrower_membership_id(applications), amount
+
+    def _apply_ledger_change(self, old_state, new_state):
+        super()._apply_ledger_change(old_state, new_state)
+        if old_state == new_state:
+            return
+        loan_ids = {state['loan_id'] for state in (old_state, new_state) if state and self.ledger_amount(state)}
+        for loan_id in loan_ids:
+            LoanInstallment.allocate_repayments(loan_id)
+
     class Meta:
         verbose_name = _("Repayment")
         verbose_name_plural = _("Repayments")
         ordering = ['-payment_date']
+        indexes = [
+            # Keyset pagination of the repayments history (api.pagination)
+            models.Index(fields=['-payment_date', '-id'], name='repayment_date_id_idx'),
+            # A loan's verified repayments (balances, installment allocation)
+            models.Index(fields=['loan'], condition=models.Q(is_verified=True), name='repayment_loan_verified_idx'),
+        ]
@@ -0,0 +1,268 @@
+"""
+Monte-Carlo risk of a kikoba's loan book.
+
+Kikoba admins see how defaults and late repayments among the outstanding
+loans would change member payouts at share-out. The loan book is loaded
+once into parallel columns (amounts in minor units, probabilities as
+floats) and thousands of scenarios are drawn over those columns.
+
+Each outstanding loan, in each scenario, is either
+  * repaid in full before share-out,
+  * late: its principal comes back but the interest arrives after
+    share-out, or
+  * defaulted: nothing more is collected.
+
+Default and late rates come from the kikoba's own loan history, smoothed
+towards the kikoba-wide rate for borrowers with few past loans, and are
+raised for loans already in arrears. Rather than drawing a random number
+per loan and scenario, the scenarios in which a loan misses are drawn
+directly (geometric gaps between them), so the cost grows with the number
+of misses instead of loans times scenarios.
+
+Payouts are then computed by the kikoba's ``finance`` payout model at
+chosen percentiles of the simulated net loan income.
+"""
+import math
+import random
+from dataclasses import dataclass, field
+from datetime import date
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.db.models import F, Q, Sum
+from django.utils import timezone
+
+from finance import get_payout_calculator, minor_units_to_decimal
+from money import Amount
+
+from .models import Loan, LoanInstallment
+
+DEFAULT_SCENARIOS = 2000
+MAX_SCENARIOS = 20000
+# Loans still being repaid
+OUTSTANDING_STATUSES = ('active', 'late', 'rescheduled')
+# Loans whose outcome is known
+FINISHED_STATUSES = ('paid_on_time', 'cleared_early', 'defaulted')
+LATE_STATUSES = ('late', 'rescheduled')
+# Rates used while a kikoba has no loan history of its own
+FALLBACK_DEFAULT_RATE = 0.05
+FALLBACK_LATE_RATE = 0.10
+# Weight, in loans, of the kikoba-wide rate in each borrower's rate
+PRIOR_LOANS = 4
+# Floors for loans that already have overdue installments
+ARREARS_DEFAULT_RATE = 0.30
+ARREARS_LATE_RATE = 0.50
+# Net income percentiles at which payouts are reported
+PAYOUT_PERCENTILES = (5, 50, 95)
+
+
+@dataclass
+class LoanBook:
+    """Outstanding loans of one kikoba as parallel columns."""
+    kikoba_id: int
+    loan_ids: List[int] = field(default_factory=list)
+    # Still to be repaid, and the principal part of it, in minor units
+    remaining: List[int] = field(default_factory=list)
+    principal: List[int] = field(default_factory=list)
+    default_rate: List[float] = field(default_factory=list)
+    late_rate: List[float] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.loan_ids)
+
+
+@dataclass
+class PayoutPercentile:
+    """Member payouts when net loan income is at one percentile of the scenarios."""
+    percentile: int
+    net_income: Decimal
+    payouts: Dict[Any, Decimal]
+
+    @property
+    def total_payout(self) -> Decimal:
+        return sum(self.payouts.values(), Decimal('0'))
+
+
+@dataclass
+class LoanBookRisk:
+    """Result of simulating one kikoba's loan book."""
+    kikoba_id: int
+    group_type: str
+    scenarios: int
+    loan_count: int
+    outstanding: Decimal
+    expected_collected: Decimal
+    expected_loss: Decimal
+    # Share of scenarios in which loans lose money overall
+    shortfall_probability: float
+    percentiles: List[PayoutPercentile]
+
+
+def _smoothed_rate(events: int, loans: int, base_rate: float) -> float:
+    return (events + PRIOR_LOANS * base_rate) / (loans + PRIOR_LOANS)
+
+
+def load_loan_book(kikoba, as_of: Optional[date] = None) -> LoanBook:
+    """
+    Load a kikoba's outstanding loans and the rates used to simulate them.
+
+    Uses two queries: the kikoba's disbursed loans with their verified
+    repayments, and the outstanding loans with overdue installments.
+    """
+    as_of = as_of or timezone.localdate()
+    loans = list(
+        Loan.objects.filter(application__kikoba=kikoba).exclude(
+            status__in=Loan.UNDISBURSED_STATUSES
+        ).values(
+            'id', 'status', 'disbursed_amount', 'total_repayable', 'current_due_date',
+            borrower_id=F('application__member_id'),
+        ).annotate(
+            repaid=Sum('repayments__amount_paid', filter=Q(repayments__is_verified=True))
+        ).order_by('id')
+    )
+    in_arrears = set(
+        LoanInstallment.objects.in_arrears(as_of).filter(
+            loan__application__kikoba=kikoba, loan__status__in=OUTSTANDING_STATUSES
+        ).values_list('loan_id', flat=True).distinct()
+    )
+
+    # Loan history, kikoba-wide and per borrower: (loans, late, finished, defaulted)
+    history = {}
+    kikoba_history = [0, 0, 0, 0]
+    for loan in loans:
+        counts = history.setdefault(loan['borrower_id'], [0, 0, 0, 0])
+        outcome = (
+            1,
+            loan['status'] in LATE_STATUSES,
+            loan['status'] in FINISHED_STATUSES,
+            loan['status'] == 'defaulted',
+        )
+        for i, value in enumerate(outcome):
+            counts[i] += value
+            kikoba_history[i] += value
+    total, late, finished, defaulted = kikoba_history
+    base_late = late / total if total else FALLBACK_LATE_RATE
+    base_default = defaulted / finished if finished else FALLBACK_DEFAULT_RATE
+
+    book = LoanBook(kikoba_id=kikoba.id)
+    for loan in loans:
+        if loan['status'] not in OUTSTANDING_STATUSES:
+            continue
+        repaid = loan['repaid'] or Decimal('0')
+        remaining = Amount.from_decimal(max(loan['total_repayable'] - repaid, Decimal('0'))).cents
+        if remaining <= 0:
+            continue
+        principal = Amount.from_decimal(max(loan['disbursed_amount'] - repaid, Decimal('0'))).cents
+
+        total, late, finished, defaulted = history[loan['borrower_id']]
+        default_rate = _smoothed_rate(defaulted, finished, base_default)
+        late_rate = _smoothed_rate(late, total, base_late)
+        overdue = loan['current_due_date'] is not None and loan['current_due_date'] < as_of
+        if loan['id'] in in_arrears or overdue or loan['status'] == 'late':
+            default_rate = max(default_rate, ARREARS_DEFAULT_RATE)
+            late_rate = max(late_rate, ARREARS_LATE_RATE)
+
+        book.loan_ids.append(loan['id'])
+        book.remaining.append(remaining)
+        book.principal.append(min(principal, remaining))
+        book.default_rate.append(default_rate)
+        book.late_rate.append(min(late_rate, 1 - default_rate))
+    return book
+
+
+def simulate_collections(book: LoanBook, scenarios: int, rng: random.Random) -> List[int]:
+    """
+    Draw ``scenarios`` outcomes of the loan book.
+
+    Returns:
+        Amount collected from the outstanding loans before share-out in
+        each scenario, in minor units
+    """
+    collected = [sum(book.remaining)] * scenarios
+    draw = rng.random
+    for remaining, principal, default_rate, late_rate in zip(
+        book.remaining, book.principal, book.default_rate, book.late_rate
+    ):
+        miss_rate = default_rate + late_rate
+        if miss_rate <= 0:
+            continue
+        # Scenarios between two misses are geometrically distributed
+        log_no_miss = math.log(1 - miss_rate) if miss_rate < 1 else None
+        scenario = -1
+        while True:
+            scenario += 1
+            if log_no_miss is not None:
+                scenario += int(math.log(1.0 - draw()) / log_no_miss)
+            if scenario >= scenarios:
+                break
+            if draw() * miss_rate < default_rate:
+                collected[scenario] -= remaining
+            else:
+                collected[scenario] -= remaining - principal
+    return collected
+
+
+def _share_out_totals(net_income: Decimal) -> Tuple[Decimal, Decimal]:
+    # Income goes out as interest; a loss reduces the payouts the way fines
+    # increase them, which every payout model shares out
+    if net_income >= 0:
+        return net_income, Decimal('0')
+    return Decimal('0'), net_income
+
+
+def loan_book_risk(
+    kikoba,
+    scenarios: int = DEFAULT_SCENARIOS,
+    seed: Optional[int] = None,
+    as_of: Optional[date] = None
+) -> LoanBookRisk:
+    """
+    Simulate a kikoba's outstanding loans and the resulting member payouts.
+
+    Args:
+        kikoba: Kikoba instance
+        scenarios: Number of scenarios to draw (at most ``MAX_SCENARIOS``)
+        seed: Random seed, for reproducible results
+        as_of: Date used to find loans in arrears (default: today)
+
+    Returns:
+        LoanBookRisk with the loss figures and, for group types with a
+        share-out, member payouts at each of ``PAYOUT_PERCENTILES``
+    """
+    from groups.aggregates import build_member_contributions, collect_member_totals
+    from groups.snapshots import get_kikoba_snapshot
+
+    scenarios = max(1, min(scenarios, MAX_SCENARIOS))
+    book = load_loan_book(kikoba, as_of)
+    collected = sorted(simulate_collections(book, scenarios, random.Random(seed)))
+    outstanding = sum(book.remaining)
+
+    snapshot = get_kikoba_snapshot(kikoba)
+    # Loan income at share-out: everything repaid less everything lent
+    loan_income = Amount.from_decimal(snapshot.repayments_total - snapshot.principal_total).cents
+    shortfalls = sum(1 for amount in collected if loan_income + amount < 0)
+
+    group_type = kikoba.group_type or 'standard'
+    calculator = get_payout_calculator(group_type)
+    members = build_member_contributions(collect_member_totals(kikoba), include_emergency_fund=True)
+    percentiles = []
+    for percentile in PAYOUT_PERCENTILES:
+        index = min(scenarios - 1, percentile * scenarios // 100)
+        net_income = minor_units_to_decimal(loan_income + collected[index])
+        payouts = {}
+        if calculator is not None and members:
+            payouts = calculator.calculate_share_out_payouts(members, *_share_out_totals(net_income))
+        percentiles.append(PayoutPercentile(percentile=percentile, net_income=net_income, payouts=payouts))
+
+    expected_collected = sum(collected) // scenarios
+    return LoanBookRisk(
+        kikoba_id=kikoba.id,
+        group_type=group_type,
+        scenarios=scenarios,
+        loan_count=len(book),
+        outstanding=minor_units_to_decimal(outstanding),
+        expected_collected=minor_units_to_decimal(expected_collected),
+        expected_loss=minor_units_to_decimal(outstanding - expected_collected),
+        shortfall_probability=shortfalls / scenarios,
+        percentiles=percentiles,
+    )
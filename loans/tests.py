@@ -1,3 +1,225 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+import random
+
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from groups.models import Kikoba, KikobaMembership, ShareContribution
+from registration.models import User
+
+from .models import LoanProduct, LoanApplication, Loan, LoanInstallment, Repayment
+from .risk import ARREARS_DEFAULT_RATE, ARREARS_LATE_RATE, LoanBook, load_loan_book, loan_book_risk, simulate_collections
+
+
+class LoanInstallmentTests(TestCase):
+    """Installment rows are written on disbursement and track verified repayments."""
+
+    def setUp(self):
+        self.admin = User.objects.create_user(phone_number='0700000000', name='Admin', password='1234')
+        self.kikoba = Kikoba.objects.create(name='Schedule Kikoba', created_by=self.admin)
+        KikobaMembership.objects.create(kikoba=self.kikoba, user=self.admin, role='kikoba_admin')
+        self.product = LoanProduct.objects.create(
+            kikoba=self.kikoba, name='Development', interest_rate=Decimal('12'),
+            max_amount=Decimal('100000'), max_duration_days=365, grace_period_days=14,
+            amortization_method='reducing_balance'
+        )
+        self.application = LoanApplication.objects.create(
+            member=self.admin, kikoba=self.kikoba, loan_product=self.product,
+            requested_amount=Decimal('10000'), repayment_period=6
+        )
+
+    def create_loan(self, **kwargs):
+        return Loan.objects.create(
+            application=self.application, disbursed_amount=Decimal('10000'),
+            interest_rate_at_disbursement=Decimal('12'), disbursement_date=date(2025, 1, 31), **kwargs
+        )
+
+    def test_pending_loan_has_no_schedule(self):
+        loan = self.create_loan()
+        self.assertFalse(loan.installments.exists())
+
+    def test_schedule_written_on_disbursement(self):
+        loan = self.create_loan()
+        loan.status = 'active'
+        loan.save()
+
+        installments = list(loan.installments.all())
+        self.assertEqual(len(installments), 6)
+        self.assertEqual(installments[0].due_date, date(2025, 3, 14))
+        self.assertEqual(installments[-1].due_date, date(2025, 8, 14))
+        self.assertEqual(sum(i.principal for i in installments), Decimal('10000.00'))
+        self.assertEqual(installments[0].interest, Decimal('100.00'))
+
+        loan.refresh_from_db()
+        self.assertEqual(loan.total_repayable, sum(i.amount_due for i in installments))
+        self.assertEqual(loan.current_due_date, date(2025, 8, 14))
+
+        # Saving a disbursed loan again keeps the schedule it already has
+        loan.save()
+        self.assertEqual(loan.installments.count(), 6)
+
+    def test_schedule_keeps_terms_set_by_the_caller(self):
+        loan = self.create_loan(
+            status='active', total_repayable=Decimal('11200'), current_due_date=date(2025, 7, 31)
+        )
+        self.assertEqual(loan.installments.count(), 6)
+        self.assertEqual(
+            (loan.total_repayable, loan.original_due_date, loan.current_due_date),
+            (Decimal('11200'), date(2025, 8, 14), date(2025, 7, 31))
+        )
+        loan.refresh_from_db()
+        self.assertEqual((loan.total_repayable, loan.current_due_date), (Decimal('11200.00'), date(2025, 7, 31)))
+
+        loan.installments.all().delete()
+        loan.generate_installments(update_terms=True)
+        self.assertEqual(loan.total_repayable, sum(i.amount_due for i in loan.installments.all()))
+        self.assertEqual(loan.current_due_date, date(2025, 8, 14))
+
+    def test_repayments_mark_installments_paid_oldest_first(self):
+        loan = self.create_loan(status='active')
+        first, second = loan.installments.all()[:2]
+        repayment = Repayment.objects.create(loan=loan, amount_paid=first.amount_due + Decimal('50'), is_verified=True)
+
+        self.assertEqual(LoanInstallment.objects.filter(loan=loan, is_paid=True).count(), 1)
+        second.refresh_from_db()
+        self.assertEqual(second.amount_paid, Decimal('50.00'))
+
+        arrears = LoanInstallment.objects.in_arrears(as_of=second.due_date + timedelta(days=1))
+        self.assertEqual(list(arrears), [second])
+        self.assertEqual(
+            LoanInstallment.objects.due_between(first.due_date, second.due_date).count(), 1
+        )
+
+        repayment.delete()
+        self.assertFalse(LoanInstallment.objects.filter(loan=loan, amount_paid__gt=0).exists())
+
+
+class LoanBookRiskTests(TestCase):
+    """The loan book is simulated from the kikoba's own loan history."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.kikoba = Kikoba.objects.create(name='Risk Kikoba', group_type='standard')
+        cls.users = []
+        for i in range(3):
+            user = User.objects.create_user(phone_number=f'07100000{i:02d}', name=f'Member {i}', password='1234')
+            membership = KikobaMembership.objects.create(
+                kikoba=cls.kikoba, user=user, role='treasurer' if i == 0 else 'member'
+            )
+            ShareContribution.objects.create(
+                kikoba_membership=membership, amount_due=Decimal('50000'), amount_paid=Decimal('50000'),
+                period_start='2025-01-01', period_end='2025-12-31'
+            )
+            cls.users.append(user)
+        # Member 1 defaulted before, member 2 repaid on time; both borrow again
+        cls.create_loan(cls.users[1], 'defaulted')
+        cls.create_loan(cls.users[2], 'paid_on_time', repaid=Decimal('11000'))
+        cls.risky = cls.create_loan(cls.users[1], 'active')
+        cls.safe = cls.create_loan(cls.users[2], 'active', repaid=Decimal('4000'))
+
+    @classmethod
+    def create_loan(cls, user, status, repaid=None):
+        application = LoanApplication.objects.create(
+            member=user, kikoba=cls.kikoba, requested_amount=Decimal('10000'), repayment_period=10
+        )
+        loan = Loan.objects.create(
+            application=application, disbursed_amount=Decimal('10000'), interest_rate_at_disbursement=Decimal('12'),
+            disbursement_date=date(2099, 1, 1), status=status
+        )
+        if repaid:
+            Repayment.objects.create(loan=loan, amount_paid=repaid, is_verified=True)
+        return loan
+
+    def test_rates_follow_borrower_history(self):
+        with self.assertNumQueries(2):
+            book = load_loan_book(self.kikoba, as_of=date(2099, 1, 1))
+        self.assertEqual(book.loan_ids, [self.risky.id, self.safe.id])
+        self.assertEqual(book.remaining, [1100000, 700000])
+        self.assertEqual(book.principal, [1000000, 600000])
+        self.assertGreater(book.default_rate[0], book.default_rate[1])
+
+        # Overdue installments raise the rates of loans in arrears; the
+        # repayments on the safe loan cover the installments due so far
+        on_time = book
+        book = load_loan_book(self.kikoba, as_of=date(2099, 3, 15))
+        self.assertEqual(book.default_rate, on_time.default_rate)
+        self.assertEqual(book.late_rate[1], on_time.late_rate[1])
+        self.assertGreater(book.late_rate[0], on_time.late_rate[0])
+
+        book = load_loan_book(self.kikoba, as_of=date(2099, 6, 15))
+        self.assertEqual(book.late_rate[1], ARREARS_LATE_RATE)
+        self.assertGreaterEqual(min(book.default_rate), ARREARS_DEFAULT_RATE)
+
+    def test_simulated_outcomes(self):
+        book = LoanBook(
+            kikoba_id=self.kikoba.id, loan_ids=[1, 2, 3],
+            remaining=[1000, 2000, 4000], principal=[800, 1500, 4000],
+            default_rate=[1.0, 0.0, 0.0], late_rate=[0.0, 1.0, 0.0]
+        )
+        # Loan 1 always defaults, loan 2 only repays its principal in time
+        self.assertEqual(simulate_collections(book, 50, random.Random(1)), [5500] * 50)
+
+        book.default_rate = [0.3, 0.3, 0.3]
+        book.late_rate = [0.0, 0.0, 0.0]
+        collected = simulate_collections(book, 20000, random.Random(1))
+        self.assertAlmostEqual(sum(collected) / len(collected) / 7000, 0.7, delta=0.01)
+
+    def test_payouts_at_percentiles(self):
+        risk = loan_book_risk(self.kikoba, scenarios=500, seed=3, as_of=date(2099, 1, 1))
+        self.assertEqual(risk.loan_count, 2)
+        self.assertEqual(risk.outstanding, Decimal('18000.00'))
+        self.assertEqual(risk.expected_collected + risk.expected_loss, risk.outstanding)
+        incomes = [percentile.net_income for percentile in risk.percentiles]
+        self.assertEqual(incomes, sorted(incomes))
+        self.assertEqual(len(risk.percentiles[0].payouts), 3)
+        self.assertLessEqual(risk.percentiles[0].total_payout, risk.percentiles[-1].total_payout)
+        # Standard payouts are money: members get back what they paid in plus the net income
+        paid_in = sum(ShareContribution.objects.filter(
+            kikoba_membership__kikoba=self.kikoba
+        ).values_list('amount_paid', flat=True), Decimal('0'))
+        for percentile in risk.percentiles:
+            self.assertEqual(percentile.total_payout, paid_in + percentile.net_income)
+        self.assertEqual(loan_book_risk(self.kikoba, scenarios=500, seed=3, as_of=date(2099, 1, 1)), risk)
+
+    def test_dashboard_page(self):
+        self.client.force_login(self.users[0])
+        response = self.client.get(reverse('dashboard:loan_book_risk'), {'scenarios': 200})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['risk'].scenarios, 200)
+        self.assertContains(response, 'Member 2')
+
+
+class ApplicationNumberTests(TestCase):
+    """Application numbers come from a counter per year."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.member = User.objects.create_user(phone_number='0730000000', name='Borrower', password='1234')
+        cls.kikoba = Kikoba.objects.create(name='Numbering Kikoba')
+
+    def create_application(self, **kwargs):
+        return LoanApplication.objects.create(
+            member=self.member, kikoba=self.kikoba, requested_amount=Decimal('1000'), **kwargs
+        )
+
+    def test_numbers_continue_after_existing_ones(self):
+        year = timezone.now().year
+        self.create_application(application_number=f'LN-{year}-00007')
+        self.create_application(application_number=f'LN-{year - 1}-00900')
+        numbers = [self.create_application().application_number for _ in range(2)]
+        self.assertEqual(numbers, [f'LN-{year}-00008', f'LN-{year}-00009'])
 
-# Create your tests here.
+    def test_reserve_numbers_in_bulk(self):
+        year = timezone.now().year
+        numbers = LoanApplication.allocate_application_numbers(3)
+        self.assertEqual(numbers, [f'LN-{year}-{n:05d}' for n in (1, 2, 3)])
+        LoanApplication.objects.bulk_create([
+            LoanApplication(member=self.member, kikoba=self.kikoba, requested_amount=Decimal('1000'), application_number=number)
+            for number in numbers
+        ])
+        # Numbering never scans the applications once the counter exists
+        with self.assertNumQueries(4):
+            self.assertEqual(LoanApplication.next_application_number(), f'LN-{year}-00004')
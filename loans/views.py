@@ -6,8 +6,8 @@ from rest_framework.response import Response
 from .models import Loan, Repayment, LoanApplication, LoanProduct # Corrected import
 from .serializers import LoanSerializer, RepaymentSerializer, LoanApplicationSerializer, LoanProductSerializer # Ensure all serializers are imported
 from groups.models import Kikoba, KikobaMembership # Added KikobaMembership import
+from groups.access import ADMIN_ROLES, scope_to_member_or_kikobas
 from django.core.exceptions import PermissionDenied # Added import
-from django.db.models import Q
 from django.utils import timezone
 
 class IsGroupAdminOrSelf(permissions.BasePermission):
@@ -71,15 +71,10 @@ class LoanViewSet(viewsets.ModelViewSet):
         if user.is_staff or user.is_superuser:
             return queryset
         
-        admin_kikoba_ids = KikobaMembership.objects.filter(
-            user=user,
-            role__in=['chairperson', 'treasurer', 'kikoba_admin'],
-            is_active=True
-        ).values_list('kikoba_id', flat=True)
-        
-        return queryset.filter(
-            Q(application__member=user) | Q(application__kikoba_id__in=list(admin_kikoba_ids))
-        ).distinct()
+        return scope_to_member_or_kikobas(
+            queryset, self.request, 'application__member', 'application__kikoba_id',
+            roles=ADMIN_ROLES, active_only=True
+        )
 
     @action(detail=True, methods=['post'])
     def record_repayment(self, request, pk=None):
@@ -118,15 +113,10 @@ class RepaymentViewSet(viewsets.ModelViewSet):
         if user.is_staff or user.is_superuser:
             return queryset
 
-        admin_kikoba_ids = KikobaMembership.objects.filter(
-            user=user,
-            role__in=['chairperson', 'treasurer', 'kikoba_admin'],
-            is_active=True
-        ).values_list('kikoba_id', flat=True)
-        
-        return queryset.filter(
-            Q(loan__application__member=user) | Q(loan__application__kikoba_id__in=list(admin_kikoba_ids))
-        ).distinct()
+        return scope_to_member_or_kikobas(
+            queryset, self.request, 'loan__application__member', 'loan__application__kikoba_id',
+            roles=ADMIN_ROLES, active_only=True
+        )
 
     def perform_create(self, serializer):
         loan_id = self.request.data.get('loan') # Assuming loan ID is passed directly
@@ -180,15 +170,10 @@ class LoanApplicationViewSet(viewsets.ModelViewSet):
         if user.is_staff or user.is_superuser:
             return queryset
 
-        admin_kikoba_ids = KikobaMembership.objects.filter(
-            user=user,
-            role__in=['chairperson', 'treasurer', 'kikoba_admin'],
-            is_active=True
-        ).values_list('kikoba_id', flat=True)
-        
-        return queryset.filter(
-            Q(member=user) | Q(kikoba_id__in=list(admin_kikoba_ids))
-        ).distinct()
+        return scope_to_member_or_kikobas(
+            queryset, self.request, 'member', 'kikoba_id',
+            roles=ADMIN_ROLES, active_only=True
+        )
 
     def perform_create(self, serializer):
         # When a member creates a loan application, associate them and their kikoba if applicable
@@ -126,6 +126,23 @@ DATABASES = {
 }
 """
 
+# Cache used for kikoba financial snapshots (groups.snapshots).
+# Entries are keyed by the kikoba ledger version, so a shared backend such as
+# Redis or Memcached can be swapped in without changing invalidation.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'mangikikoba-default',
+    }
+}
+
+KIKOBA_SNAPSHOT_CACHE_TIMEOUT = 60 * 60
+
+# Worker processes for the kikoba-type simulation API. Requests share the web
+# workers' CPUs, so the default runs in the request process; the
+# simulate_kikoba_types command uses KIKOBA_SIMULATION_WORKERS or every CPU.
+KIKOBA_SIMULATION_API_WORKERS = 1
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
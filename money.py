@@ -0,0 +1,240 @@
+"""
+Money arithmetic for the VIKOBA application.
+
+``Amount`` stores a sum of money as an integer number of minor units (cents
+of a shilling). Adding, subtracting and comparing amounts is plain integer
+arithmetic, so totals never drift and results do not depend on the
+process-wide Decimal context. Conversions from Decimal and every operation
+that can produce fractions of a cent round explicitly, with a rounding mode
+chosen by the caller.
+"""
+import operator
+from decimal import (
+    Decimal, Context, ROUND_HALF_UP, ROUND_FLOOR, ROUND_CEILING, ROUND_DOWN, ROUND_UP,
+    ROUND_HALF_EVEN, MAX_EMAX, MAX_PREC, MIN_EMIN
+)
+from fractions import Fraction
+from typing import Iterable, List, Union
+
+# Amounts are settled in whole minor units (cents of a shilling)
+MINOR_UNITS = 100
+MINOR_UNIT_PLACES = 2
+
+# Context for exact conversions; never rounds a finite value
+EXACT = Context(prec=MAX_PREC, Emax=MAX_EMAX, Emin=MIN_EMIN)
+
+_CENT = Decimal('0.01')
+
+
+def to_decimal(value) -> Decimal:
+    """
+    Convert a Decimal, int, float or numeric string to Decimal.
+
+    Floats are converted from their shortest repr, so ``0.1`` becomes
+    ``Decimal('0.1')`` rather than its binary expansion.
+    """
+    if isinstance(value, Decimal):
+        return value
+    if isinstance(value, float):
+        return Decimal(repr(value))
+    if isinstance(value, Amount):
+        return value.to_decimal()
+    return Decimal(value)
+
+
+def _divide(numerator: int, denominator: int, rounding: str) -> int:
+    """Integer division of ``numerator / denominator`` (denominator > 0) with a Decimal rounding mode."""
+    quotient, remainder = divmod(numerator, denominator)
+    if remainder == 0 or rounding == ROUND_FLOOR:
+        return quotient
+    if rounding == ROUND_CEILING:
+        return quotient + 1
+    if rounding == ROUND_DOWN:
+        return quotient + 1 if quotient < 0 else quotient
+    if rounding == ROUND_UP:
+        return quotient if quotient < 0 else quotient + 1
+    twice = 2 * remainder
+    if twice > denominator:
+        return quotient + 1
+    if twice < denominator:
+        return quotient
+    # Exactly half way
+    if rounding == ROUND_HALF_EVEN:
+        return quotient + (quotient % 2)
+    if rounding == ROUND_HALF_UP:
+        return quotient if quotient < 0 else quotient + 1
+    # ROUND_HALF_DOWN
+    return quotient + 1 if quotient < 0 else quotient
+
+
+class Amount:
+    """An amount of money in whole minor units."""
+    __slots__ = ('cents',)
+
+    def __init__(self, cents: int = 0):
+        # Whole minor units only; use from_decimal() to round shillings
+        try:
+            self.cents = operator.index(cents)
+        except TypeError:
+            raise TypeError(
+                f"Amount takes a whole number of minor units, not {type(cents).__name__}; use Amount.from_decimal()"
+            ) from None
+
+    @classmethod
+    def from_decimal(cls, value, rounding: str = ROUND_HALF_UP) -> 'Amount':
+        """
+        Convert a Decimal (or int, float, numeric string) to an Amount.
+
+        Args:
+            value: amount in shillings
+            rounding: Decimal rounding mode for fractions of a minor unit
+        """
+        value = to_decimal(value)
+        return cls(int(value.quantize(_CENT, rounding=rounding, context=EXACT).scaleb(MINOR_UNIT_PLACES, EXACT)))
+
+    @classmethod
+    def sum(cls, amounts: Iterable['Amount']) -> 'Amount':
+        """Total of several amounts."""
+        return cls(sum(amount.cents for amount in amounts))
+
+    def to_decimal(self) -> Decimal:
+        """The amount in shillings, with exactly two decimal places."""
+        return Decimal(self.cents).scaleb(-MINOR_UNIT_PLACES, EXACT)
+
+    def __float__(self) -> float:
+        # For JSON responses; the cents value converts without drift
+        return self.cents / MINOR_UNITS
+
+    def __int__(self) -> int:
+        return self.cents
+
+    def __str__(self) -> str:
+        return str(self.to_decimal())
+
+    def __repr__(self) -> str:
+        return f"Amount('{self}')"
+
+    def __hash__(self) -> int:
+        return hash(self.cents)
+
+    def __bool__(self) -> bool:
+        return self.cents != 0
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Amount):
+            return self.cents == other.cents
+        if other == 0:
+            return self.cents == 0
+        return NotImplemented
+
+    def __lt__(self, other: 'Amount') -> bool:
+        if isinstance(other, Amount):
+            return self.cents < other.cents
+        return NotImplemented
+
+    def __le__(self, other: 'Amount') -> bool:
+        if isinstance(other, Amount):
+            return self.cents <= other.cents
+        return NotImplemented
+
+    def __gt__(self, other: 'Amount') -> bool:
+        if isinstance(other, Amount):
+            return self.cents > other.cents
+        return NotImplemented
+
+    def __ge__(self, other: 'Amount') -> bool:
+        if isinstance(other, Amount):
+            return self.cents >= other.cents
+        return NotImplemented
+
+    def __add__(self, other: 'Amount') -> 'Amount':
+        if isinstance(other, Amount):
+            return Amount(self.cents + other.cents)
+        return NotImplemented
+
+    def __radd__(self, other) -> 'Amount':
+        # Lets the built-in sum() start from 0
+        if other == 0:
+            return self
+        return NotImplemented
+
+    def __sub__(self, other: 'Amount') -> 'Amount':
+        if isinstance(other, Amount):
+            return Amount(self.cents - other.cents)
+        return NotImplemented
+
+    def __neg__(self) -> 'Amount':
+        return Amount(-self.cents)
+
+    def __abs__(self) -> 'Amount':
+        return Amount(abs(self.cents))
+
+    def __mul__(self, factor: int) -> 'Amount':
+        if isinstance(factor, int):
+            return Amount(self.cents * factor)
+        return NotImplemented
+
+    __rmul__ = __mul__
+
+    def multiply(self, factor: Union[Decimal, Fraction, int, str], rounding: str = ROUND_HALF_UP) -> 'Amount':
+        """
+        Multiply by a rate or ratio, rounding the result to a minor unit.
+
+        Args:
+            factor: e.g. ``Decimal('0.10')`` for 10%
+            rounding: Decimal rounding mode
+        """
+        ratio = Fraction(to_decimal(factor)) if not isinstance(factor, Fraction) else factor
+        return Amount(_divide(self.cents * ratio.numerator, ratio.denominator, rounding))
+
+    def divide(self, divisor: int, rounding: str = ROUND_HALF_UP) -> 'Amount':
+        """Divide by a positive integer, rounding the result to a minor unit."""
+        if divisor <= 0:
+            raise ValueError("divisor must be a positive integer")
+        return Amount(_divide(self.cents, divisor, rounding))
+
+    def allocate(self, weights: List[int]) -> List['Amount']:
+        """
+        Split the amount in proportion to integer ``weights``.
+
+        The parts always add up to the amount exactly (largest-remainder
+        rounding).
+        """
+        total_weight = sum(weights)
+        if total_weight <= 0:
+            raise ValueError("weights must add up to a positive number")
+        parts = allocate_largest_remainder([self.cents * weight for weight in weights], total_weight)
+        return [Amount(part) for part in parts]
+
+
+ZERO = Amount(0)
+
+
+def allocate_largest_remainder(numerators: List[int], denominator: int) -> List[int]:
+    """
+    Round exact amounts ``numerator / denominator`` to whole minor units.
+
+    Every amount is floored, then the minor units still needed to reach the
+    rounded (half up) grand total go to the amounts with the largest
+    remainders, earlier members first on ties. The result therefore always
+    sums to the rounded total of the exact amounts.
+
+    Args:
+        numerators: Exact amounts scaled by ``denominator``
+        denominator: Common positive denominator, in units per minor unit
+
+    Returns:
+        Amounts in minor units
+    """
+    floors = [n // denominator for n in numerators]
+    total, rest = divmod(sum(numerators), denominator)
+    if 2 * rest >= denominator:
+        total += 1
+    leftover = total - sum(floors)
+    if leftover > 0:
+        remainders = [n % denominator for n in numerators]
+        # A stable sort keeps earlier members first among equal remainders
+        ranked = sorted(range(len(floors)), key=remainders.__getitem__, reverse=True)
+        for index in ranked[:leftover]:
+            floors[index] += 1
+    return floors
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:47
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("groups", "0013_kikoba_ledger_version"),
+        ("notifications", "0002_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                fields=["user", "-created_at", "-id"], name="notif_user_created_id_idx"
+            ),
+        ),
+    ]
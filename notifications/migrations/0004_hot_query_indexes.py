@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:28
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("groups", "0016_hot_query_indexes"),
+        ("notifications", "0003_notification_notif_user_created_id_idx"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                condition=models.Q(("is_read", False)),
+                fields=["user", "-created_at", "-id"],
+                name="notif_user_unread_idx",
+            ),
+        ),
+    ]
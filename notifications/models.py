@@ -23,6 +23,16 @@ class Notification(models.Model):
     created_at = models.DateTimeField(default=timezone.now)
     is_read = models.BooleanField(default=False)
     
+    class Meta:
+        indexes = [
+            # A user's notifications, newest first (keyset pagination in api.pagination)
+            models.Index(fields=['user', '-created_at', '-id'], name='notif_user_created_id_idx'),
+            # A user's unread notifications, newest first (mark_all_read, ?is_read=false)
+            models.Index(
+                fields=['user', '-created_at', '-id'], condition=models.Q(is_read=False), name='notif_user_unread_idx'
+            ),
+        ]
+    
     def __str__(self):
         if self.kikoba:
             return f"{self.title} - {self.user.name} ({self.kikoba.name})"
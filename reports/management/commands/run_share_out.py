@@ -0,0 +1,90 @@
+"""
+Management command to share out a saving cycle for one or all vikoba.
+Writes a ProfitDistribution with MemberProfit rows per kikoba (see reports.shareout).
+"""
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from groups.models import Kikoba
+from registration.models import User
+from reports.shareout import ShareOutResult, run_share_out
+
+
+def _date(value):
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise CommandError(f'Invalid date {value!r}; use YYYY-MM-DD')
+
+
+class Command(BaseCommand):
+    help = 'Share out a saving cycle under each kikoba\'s payout model and record the member profits'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', type=str, required=True, help='First day of the cycle (YYYY-MM-DD)')
+        parser.add_argument('--end', type=str, required=True, help='Last day of the cycle (YYYY-MM-DD)')
+        parser.add_argument(
+            '--kikoba-number',
+            type=str,
+            action='append',
+            help='Kikoba number to share out; repeat for several (default: all vikoba)',
+        )
+        parser.add_argument(
+            '--created-by',
+            type=str,
+            help='Phone number of the user recorded on the distributions (required unless --dry-run)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            help='Worker processes (default: SHARE_OUT_WORKERS setting or the number of CPUs)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Show the share-outs without writing anything',
+        )
+
+    def handle(self, *args, **options):
+        cycle_start = _date(options['start'])
+        cycle_end = _date(options['end'])
+        if cycle_start > cycle_end:
+            raise CommandError('--start must be on or before --end')
+        dry_run = options.get('dry_run')
+
+        created_by = None
+        if options.get('created_by'):
+            created_by = User.objects.filter(phone_number=options['created_by']).first()
+            if created_by is None:
+                raise CommandError(f'User with phone number {options["created_by"]} not found')
+        elif not dry_run:
+            raise CommandError('--created-by is required unless --dry-run is given')
+
+        kikoba_ids = None
+        kikoba_numbers = options.get('kikoba_number')
+        if kikoba_numbers:
+            kikoba_ids = list(Kikoba.objects.filter(kikoba_number__in=kikoba_numbers).values_list('id', flat=True))
+            if len(kikoba_ids) != len(set(kikoba_numbers)):
+                raise CommandError(f'Kikoba not found among: {", ".join(kikoba_numbers)}')
+
+        results = run_share_out(
+            cycle_start, cycle_end, kikoba_ids,
+            created_by=created_by, dry_run=dry_run, workers=options.get('workers'),
+        )
+
+        shared = 0
+        for result in results:
+            label = result.kikoba_number or result.kikoba_id
+            if result.status == ShareOutResult.SKIPPED:
+                self.stdout.write(f'{label}: skipped, {result.detail}')
+                continue
+            shared += 1
+            self.stdout.write(
+                f'{label}: {result.member_count} members, contributions {result.total_contributions}, '
+                f'profit {result.total_profit} ({result.group_type})'
+            )
+
+        if dry_run:
+            self.stdout.write(self.style.WARNING(f'Dry run: {shared} vikoba would be shared out'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Shared out {shared} vikoba for {cycle_start} to {cycle_end}'))
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-17 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("reports", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name="profitdistribution",
+            constraint=models.UniqueConstraint(
+                fields=("kikoba", "cycle_start_date", "cycle_end_date"),
+                name="profit_distribution_cycle_unique",
+            ),
+        ),
+    ]
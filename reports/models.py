@@ -49,6 +49,15 @@ class ProfitDistribution(models.Model):
     is_finalized = models.BooleanField(default=False)
     notes = models.TextField(blank=True)
     
+    class Meta:
+        constraints = [
+            # A kikoba shares out each cycle once, however many share-out runs overlap
+            models.UniqueConstraint(
+                fields=['kikoba', 'cycle_start_date', 'cycle_end_date'],
+                name='profit_distribution_cycle_unique'
+            ),
+        ]
+    
     def __str__(self):
         if self.kikoba:
             return f"Profit Distribution for {self.kikoba.name} ({self.cycle_start_date} to {self.cycle_end_date})"
@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from rest_framework.validators import UniqueTogetherValidator
 from .models import Report, ProfitDistribution, MemberProfit
 from groups.serializers import KikobaSerializer
 from django.contrib.auth import get_user_model
@@ -48,14 +49,22 @@ class ProfitDistributionSerializer(serializers.ModelSerializer):
     class Meta:
         model = ProfitDistribution
         fields = (
-            'id', 'group', 'group_name', 'cycle_start_date', 'cycle_end_date', 
+            'id', 'kikoba', 'group_name', 'cycle_start_date', 'cycle_end_date', 
             'total_profit', 'distributed_date', 'created_by', 'created_by_name', 
             'is_finalized', 'notes', 'member_profits'
         )
-        read_only_fields = ('id', 'created_by', 'distributed_date', 'member_profits')
+        # total_profit is computed by the share-out (see reports.shareout.distribute)
+        read_only_fields = ('id', 'total_profit', 'created_by', 'distributed_date', 'member_profits')
+        # A kikoba shares out each cycle once (profit_distribution_cycle_unique)
+        validators = [
+            UniqueTogetherValidator(
+                queryset=ProfitDistribution.objects.all(),
+                fields=('kikoba', 'cycle_start_date', 'cycle_end_date')
+            )
+        ]
     
     def get_group_name(self, obj):
-        return obj.group.name if obj.group else None
+        return obj.kikoba.name if obj.kikoba else None
     
     def get_created_by_name(self, obj):
         return obj.created_by.name if obj.created_by else None
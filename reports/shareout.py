@@ -0,0 +1,300 @@
+"""
+Cycle-end share-out.
+
+At the end of a saving cycle every kikoba pays its members out under its
+``group_type`` payout model (``finance.get_payout_calculator``) and records
+the result as a ``ProfitDistribution`` with one ``MemberProfit`` row per
+active member.
+
+Only money that belongs to the cycle counts:
+  * share contributions whose period ends within the cycle,
+  * entry fees paid within the cycle,
+  * loan interest collected within the cycle. As in the member ledger,
+    repayments go to principal first, so a loan's interest is what was
+    repaid above its principal by the end of the cycle, less what had
+    already been repaid above it before the cycle started.
+
+The ledgers of all vikoba are loaded with a fixed number of grouped
+queries. Payouts are computed in worker processes, and each kikoba's rows
+are written with ``bulk_create`` in a transaction of their own, so one
+kikoba failing leaves the others' share-outs in place. A unique constraint
+on the kikoba and cycle dates keeps overlapping runs from sharing a kikoba
+out twice.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional
+
+from finance import MemberContributionSet, get_payout_calculator
+
+from groups.simulation import MIN_PARALLEL_KIKOBAS
+
+PERCENT = Decimal('0.01')
+
+
+@dataclass
+class ShareOutLedger:
+    """One kikoba's member contributions and interest within a cycle."""
+    kikoba_id: int
+    kikoba_number: Optional[str]
+    name: str
+    group_type: str
+    contributions: MemberContributionSet
+    total_interest: Decimal
+
+
+@dataclass
+class ShareOutResult:
+    """What the share-out did (or would do, in a dry run) for one kikoba."""
+    kikoba_id: int
+    kikoba_number: Optional[str]
+    name: str
+    group_type: str
+    status: str
+    member_count: int = 0
+    total_contributions: Decimal = Decimal('0')
+    total_profit: Decimal = Decimal('0')
+    detail: str = ''
+    distribution_id: Optional[int] = None
+
+    CREATED = 'created'
+    DRY_RUN = 'dry_run'
+    SKIPPED = 'skipped'
+
+
+def load_share_out_ledgers(
+    cycle_start: date,
+    cycle_end: date,
+    kikoba_ids: Optional[Iterable[int]] = None
+) -> List[ShareOutLedger]:
+    """
+    Load the cycle ledgers of several vikoba (default: all) with five queries.
+
+    Members are the active memberships; interest counts every borrower, as
+    ``kikoba_group_totals`` does. Fines are not tracked yet.
+    """
+    from django.db.models import Q, Sum
+    from groups.aggregates import SHARE_VALUE
+    from groups.models import EntryFeePayment, Kikoba, KikobaMembership, ShareContribution
+    from loans.models import Loan
+
+    vikoba = Kikoba.objects.order_by('id')
+    if kikoba_ids is not None:
+        vikoba = vikoba.filter(pk__in=list(kikoba_ids))
+    vikoba = list(vikoba.values('id', 'kikoba_number', 'name', 'group_type'))
+    ids = [kikoba['id'] for kikoba in vikoba]
+
+    memberships = KikobaMembership.objects.filter(
+        kikoba_id__in=ids, is_active=True
+    ).values_list('id', 'kikoba_id', 'user_id').order_by('kikoba_id', 'id')
+    share_totals = dict(
+        ShareContribution.objects.filter(
+            kikoba_membership__kikoba_id__in=ids, period_end__range=(cycle_start, cycle_end)
+        ).values_list('kikoba_membership_id').annotate(total=Sum('amount_paid')).order_by()
+    )
+    entry_fee_totals = dict(
+        EntryFeePayment.objects.filter(
+            kikoba_membership__kikoba_id__in=ids, payment_date__date__range=(cycle_start, cycle_end)
+        ).values_list('kikoba_membership_id').annotate(total=Sum('amount_paid')).order_by()
+    )
+    verified = Q(repayments__is_verified=True)
+    loans = Loan.objects.filter(application__kikoba_id__in=ids).exclude(
+        status__in=Loan.UNDISBURSED_STATUSES
+    ).values(
+        'id', 'application__kikoba_id', 'application__member_id', 'disbursed_amount'
+    ).annotate(
+        repaid_before=Sum('repayments__amount_paid', filter=verified & Q(repayments__payment_date__date__lt=cycle_start)),
+        repaid_through=Sum('repayments__amount_paid', filter=verified & Q(repayments__payment_date__date__lte=cycle_end)),
+    ).order_by()
+
+    zero = Decimal('0')
+    kikoba_interest = {kikoba_id: zero for kikoba_id in ids}
+    member_interest = {}
+    for loan in loans:
+        principal = loan['disbursed_amount']
+        interest = (
+            max((loan['repaid_through'] or zero) - principal, zero)
+            - max((loan['repaid_before'] or zero) - principal, zero)
+        )
+        if interest:
+            key = (loan['application__kikoba_id'], loan['application__member_id'])
+            member_interest[key] = member_interest.get(key, zero) + interest
+            kikoba_interest[loan['application__kikoba_id']] += interest
+
+    contributions = {kikoba_id: MemberContributionSet() for kikoba_id in ids}
+    for membership_id, kikoba_id, user_id in memberships:
+        share_total = share_totals.get(membership_id, zero)
+        contributions[kikoba_id].append(
+            user_id,
+            shares=share_total / SHARE_VALUE if share_total > 0 else zero,
+            fixed_contribution=share_total + entry_fee_totals.get(membership_id, zero),
+            interest_paid=member_interest.get((kikoba_id, user_id), zero),
+        )
+
+    return [
+        ShareOutLedger(
+            kikoba_id=kikoba['id'],
+            kikoba_number=kikoba['kikoba_number'],
+            name=kikoba['name'],
+            group_type=kikoba['group_type'] or 'standard',
+            contributions=contributions[kikoba['id']],
+            total_interest=kikoba_interest[kikoba['id']],
+        )
+        for kikoba in vikoba
+    ]
+
+
+def compute_payouts(ledger: ShareOutLedger) -> Optional[Dict[Any, Decimal]]:
+    """Member payouts under the kikoba's payout model, or None if it has no share-out."""
+    calculator = get_payout_calculator(ledger.group_type)
+    if calculator is None:
+        return None
+    return calculator.calculate_share_out_payouts(ledger.contributions, ledger.total_interest, Decimal('0'))
+
+
+def build_member_profits(ledger: ShareOutLedger, payouts: Dict[Any, Decimal], distribution=None) -> list:
+    """Unsaved ``MemberProfit`` rows: each member's contribution and payout less contribution."""
+    from .models import MemberProfit
+
+    total = sum((row.fixed_contribution for row in ledger.contributions), Decimal('0'))
+    rows = []
+    for member in ledger.contributions:
+        contribution = member.fixed_contribution
+        rows.append(MemberProfit(
+            distribution=distribution,
+            member_id=member.member_id,
+            total_contribution=contribution,
+            contribution_percentage=(contribution * 100 / total).quantize(PERCENT) if total else Decimal('0'),
+            profit_amount=payouts.get(member.member_id, Decimal('0')) - contribution,
+        ))
+    return rows
+
+
+def _compute_all(ledgers: List[ShareOutLedger], workers: Optional[int]) -> List[Optional[Dict[Any, Decimal]]]:
+    from django.conf import settings
+
+    if workers is None:
+        workers = getattr(settings, 'SHARE_OUT_WORKERS', None) or os.cpu_count() or 1
+    workers = min(workers, len(ledgers))
+    if workers <= 1 or len(ledgers) < MIN_PARALLEL_KIKOBAS:
+        return [compute_payouts(ledger) for ledger in ledgers]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(compute_payouts, ledgers, chunksize=max(1, len(ledgers) // (workers * 4))))
+
+
+def run_share_out(
+    cycle_start: date,
+    cycle_end: date,
+    kikoba_ids: Optional[Iterable[int]] = None,
+    created_by=None,
+    dry_run: bool = False,
+    workers: Optional[int] = None
+) -> List[ShareOutResult]:
+    """
+    Share out one cycle for several vikoba (default: all).
+
+    Args:
+        cycle_start: First day of the cycle
+        cycle_end: Last day of the cycle
+        kikoba_ids: Ids of the vikoba to share out
+        created_by: User recorded on the distributions; required unless ``dry_run``
+        dry_run: Compute and report the share-outs without writing anything
+        workers: Worker processes; defaults to the ``SHARE_OUT_WORKERS``
+            setting, else the number of CPUs. 1 computes everything in this process.
+
+    Returns:
+        ShareOutResult rows, by kikoba id. Vikoba whose group type has no
+        share-out, with no contributions in the cycle, or already shared out
+        for this cycle are skipped.
+    """
+    from django.db import IntegrityError, transaction
+    from .models import MemberProfit, ProfitDistribution
+
+    if cycle_start > cycle_end:
+        raise ValueError("The cycle must start on or before its end")
+    if created_by is None and not dry_run:
+        raise ValueError("created_by is required unless dry_run is set")
+
+    ledgers = load_share_out_ledgers(cycle_start, cycle_end, kikoba_ids)
+    already_shared = set(ProfitDistribution.objects.filter(
+        kikoba_id__in=[ledger.kikoba_id for ledger in ledgers],
+        cycle_start_date=cycle_start,
+        cycle_end_date=cycle_end,
+    ).values_list('kikoba_id', flat=True))
+
+    results = []
+    for ledger, payouts in zip(ledgers, _compute_all(ledgers, workers)):
+        result = ShareOutResult(
+            kikoba_id=ledger.kikoba_id,
+            kikoba_number=ledger.kikoba_number,
+            name=ledger.name,
+            group_type=ledger.group_type,
+            status=ShareOutResult.SKIPPED,
+            member_count=len(ledger.contributions),
+        )
+        results.append(result)
+        if ledger.kikoba_id in already_shared:
+            result.detail = 'already shared out for this cycle'
+            continue
+        if payouts is None:
+            result.detail = f'{ledger.group_type} vikoba have no share-out'
+            continue
+        if not payouts:
+            result.detail = 'no contributions in this cycle'
+            continue
+
+        rows = build_member_profits(ledger, payouts)
+        result.total_contributions = sum((row.total_contribution for row in rows), Decimal('0'))
+        result.total_profit = sum((row.profit_amount for row in rows), Decimal('0'))
+        if dry_run:
+            result.status = ShareOutResult.DRY_RUN
+            continue
+
+        try:
+            with transaction.atomic():
+                distribution = ProfitDistribution.objects.create(
+                    kikoba_id=ledger.kikoba_id,
+                    cycle_start_date=cycle_start,
+                    cycle_end_date=cycle_end,
+                    total_profit=result.total_profit,
+                    created_by=created_by,
+                )
+                for row in rows:
+                    row.distribution = distribution
+                MemberProfit.objects.bulk_create(rows)
+        except IntegrityError:
+            # Another run shared this kikoba out since already_shared was read
+            result.detail = 'already shared out for this cycle'
+            continue
+        result.status = ShareOutResult.CREATED
+        result.distribution_id = distribution.id
+    return results
+
+
+def distribute(distribution) -> list:
+    """
+    Fill in an existing ``ProfitDistribution`` from its kikoba's cycle ledger.
+
+    Replaces its ``MemberProfit`` rows and sets ``total_profit`` to the
+    profit actually shared out.
+
+    Returns:
+        The MemberProfit rows written (none if the kikoba has no share-out)
+    """
+    from django.db import transaction
+    from .models import MemberProfit
+
+    ledger, = load_share_out_ledgers(
+        distribution.cycle_start_date, distribution.cycle_end_date, [distribution.kikoba_id]
+    )
+    payouts = compute_payouts(ledger)
+    rows = build_member_profits(ledger, payouts, distribution) if payouts else []
+    with transaction.atomic():
+        distribution.member_profits.all().delete()
+        MemberProfit.objects.bulk_create(rows)
+        distribution.total_profit = sum((row.profit_amount for row in rows), Decimal('0'))
+        distribution.save(update_fields=['total_profit'])
+    return rows
@@ -1,3 +1,196 @@
+import io
+from datetime import date, datetime
+from decimal import Decimal
+from unittest import mock
+
+from django.core.management import call_command
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from finance import FixedShareVikoba, MemberContribution
+from groups.models import Kikoba, KikobaMembership, ShareContribution, EntryFeePayment
+from groups.simulation import MIN_PARALLEL_KIKOBAS
+from loans.models import LoanApplication, Loan, Repayment
+from registration.models import User
+
+from .models import ProfitDistribution, MemberProfit
+from .shareout import ShareOutResult, distribute, load_share_out_ledgers, run_share_out
+
+CYCLE = (date(2025, 1, 1), date(2025, 12, 31))
+
+
+def paid_at(year, month, day):
+    return timezone.make_aware(datetime(year, month, day, 12))
+
+
+class ShareOutTests(TestCase):
+    """The cycle-end share-out counts only the cycle's money and writes member profits in bulk."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(phone_number='0720000000', name='Treasurer', password='1234')
+        cls.kikoba = Kikoba.objects.create(name='Share-out Kikoba', kikoba_number='SO001', group_type='fixed_share')
+        cls.welfare = Kikoba.objects.create(name='Welfare Kikoba', kikoba_number='SO002', group_type='welfare')
+        cls.members = []
+        for i in range(3):
+            user = User.objects.create_user(phone_number=f'07200000{i + 1:02d}', name=f'Member {i}', password='1234')
+            membership = KikobaMembership.objects.create(kikoba=cls.kikoba, user=user)
+            KikobaMembership.objects.create(kikoba=cls.welfare, user=user)
+            ShareContribution.objects.create(
+                kikoba_membership=membership, amount_due=Decimal('20000'), amount_paid=Decimal('10000') * (i + 1),
+                period_start='2025-01-01', period_end='2025-06-30'
+            )
+            # Last cycle's shares are not shared out again
+            ShareContribution.objects.create(
+                kikoba_membership=membership, amount_due=Decimal('20000'), amount_paid=Decimal('20000'),
+                period_start='2024-07-01', period_end='2024-12-31'
+            )
+            EntryFeePayment.objects.create(
+                kikoba_membership=membership, amount_due=Decimal('5000'), amount_paid=Decimal('5000'),
+                payment_date=paid_at(2025, 1, 15)
+            )
+            cls.members.append(user)
+
+        # Borrowed 10,000 in 2024 and repaid 6,000 then; 5,500 in 2025 brings 1,500 interest
+        application = LoanApplication.objects.create(
+            member=cls.members[0], kikoba=cls.kikoba, requested_amount=Decimal('10000'), repayment_period=12
+        )
+        loan = Loan.objects.create(application=application, disbursed_amount=Decimal('10000'), status='active')
+        Repayment.objects.create(loan=loan, amount_paid=Decimal('6000'), is_verified=True, payment_date=paid_at(2024, 11, 1))
+        Repayment.objects.create(loan=loan, amount_paid=Decimal('5500'), is_verified=True, payment_date=paid_at(2025, 3, 1))
+        Repayment.objects.create(loan=loan, amount_paid=Decimal('900'), is_verified=False, payment_date=paid_at(2025, 4, 1))
+
+    def test_ledger_counts_only_the_cycle(self):
+        with self.assertNumQueries(5):
+            ledger, welfare = load_share_out_ledgers(*CYCLE, [self.kikoba.id, self.welfare.id])
+        self.assertEqual(ledger.total_interest, Decimal('1500'))
+        self.assertEqual(
+            [row.fixed_contribution for row in ledger.contributions],
+            [Decimal('15000'), Decimal('25000'), Decimal('35000')]
+        )
+        self.assertEqual(ledger.contributions[0].interest_paid, Decimal('1500'))
+        self.assertEqual(welfare.total_interest, Decimal('0'))
+
+    def test_dry_run_writes_nothing(self):
+        results = run_share_out(*CYCLE, dry_run=True, workers=1)
+        self.assertFalse(ProfitDistribution.objects.exists())
+        by_kikoba = {result.kikoba_id: result for result in results}
+        self.assertEqual(by_kikoba[self.kikoba.id].status, ShareOutResult.DRY_RUN)
+        self.assertEqual(by_kikoba[self.kikoba.id].total_profit, Decimal('1500.00'))
+        self.assertEqual(by_kikoba[self.welfare.id].status, ShareOutResult.SKIPPED)
+
+    def test_share_out_applies_the_payout_model(self):
+        with self.assertNumQueries(5 + 1 + 4):  # ledgers, existing distributions, one transaction
+            run_share_out(*CYCLE, kikoba_ids=[self.kikoba.id], created_by=self.admin, workers=1)
+        distribution = ProfitDistribution.objects.get(kikoba=self.kikoba)
+        self.assertEqual((distribution.cycle_start_date, distribution.cycle_end_date), CYCLE)
+        self.assertEqual(distribution.total_profit, Decimal('1500.00'))
+
+        expected = FixedShareVikoba.calculate_payouts([
+            MemberContribution(member_id=user.id, fixed_contribution=Decimal('10000') * (i + 1) + 5000)
+            for i, user in enumerate(self.members)
+        ], Decimal('1500'), Decimal('0'))
+        for profit in distribution.member_profits.all():
+            self.assertEqual(profit.total_contribution + profit.profit_amount, expected[profit.member_id])
+        self.assertEqual(
+            sorted(distribution.member_profits.values_list('contribution_percentage', flat=True)),
+            [Decimal('20.00'), Decimal('33.33'), Decimal('46.67')]
+        )
+
+        # Running the same cycle again leaves the distribution alone
+        result, = run_share_out(*CYCLE, kikoba_ids=[self.kikoba.id], created_by=self.admin, workers=1)
+        self.assertEqual(result.status, ShareOutResult.SKIPPED)
+        self.assertEqual(MemberProfit.objects.count(), 3)
+
+    def test_overlapping_run_is_skipped(self):
+        def load_while_another_run_commits(*args, **kwargs):
+            ledgers = load_share_out_ledgers(*args, **kwargs)
+            ProfitDistribution.objects.create(
+                kikoba=self.kikoba, cycle_start_date=CYCLE[0], cycle_end_date=CYCLE[1],
+                total_profit=Decimal('1500.00'), created_by=self.admin
+            )
+            return ledgers
+
+        with mock.patch('reports.shareout.load_share_out_ledgers', side_effect=load_while_another_run_commits):
+            result, = run_share_out(*CYCLE, kikoba_ids=[self.kikoba.id], created_by=self.admin, workers=1)
+        self.assertEqual((result.status, result.detail), (ShareOutResult.SKIPPED, 'already shared out for this cycle'))
+        self.assertEqual(ProfitDistribution.objects.filter(kikoba=self.kikoba).count(), 1)
+        self.assertFalse(MemberProfit.objects.exists())
+
+    def test_process_pool_matches_inline_run(self):
+        extra = [
+            Kikoba.objects.create(name=f'Extra {i}', group_type='standard') for i in range(MIN_PARALLEL_KIKOBAS)
+        ]
+        for kikoba in extra:
+            membership = KikobaMembership.objects.create(kikoba=kikoba, user=self.admin)
+            ShareContribution.objects.create(
+                kikoba_membership=membership, amount_due=Decimal('30000'), amount_paid=Decimal('30000'),
+                period_start='2025-01-01', period_end='2025-12-31'
+            )
+        inline = run_share_out(*CYCLE, dry_run=True, workers=1)
+        pooled = run_share_out(*CYCLE, dry_run=True, workers=2)
+        self.assertEqual(pooled, inline)
+        self.assertEqual(len(inline), len(extra) + 2)
+
+    def test_standard_kikoba_profit_is_money(self):
+        kikoba = Kikoba.objects.create(name='Standard Kikoba', kikoba_number='SO003', group_type='standard')
+        for i, user in enumerate(self.members[:2]):
+            membership = KikobaMembership.objects.create(kikoba=kikoba, user=user)
+            ShareContribution.objects.create(
+                kikoba_membership=membership, amount_due=Decimal('30000'), amount_paid=Decimal('30000') if i else Decimal('10000'),
+                period_start='2025-01-01', period_end='2025-06-30'
+            )
+        application = LoanApplication.objects.create(
+            member=self.members[0], kikoba=kikoba, requested_amount=Decimal('5000'), repayment_period=6
+        )
+        loan = Loan.objects.create(application=application, disbursed_amount=Decimal('5000'), status='active')
+        Repayment.objects.create(loan=loan, amount_paid=Decimal('6500'), is_verified=True, payment_date=paid_at(2025, 5, 1))
+
+        run_share_out(*CYCLE, kikoba_ids=[kikoba.id], created_by=self.admin, workers=1)
+        distribution = ProfitDistribution.objects.get(kikoba=kikoba)
+        self.assertEqual(distribution.total_profit, Decimal('1500.00'))
+        # 1,500 interest over 1 and 3 shares
+        self.assertEqual(
+            dict(distribution.member_profits.values_list('member_id', 'profit_amount')),
+            {self.members[0].id: Decimal('375.00'), self.members[1].id: Decimal('1125.00')}
+        )
+
+    def test_distribute_existing_distribution(self):
+        distribution = ProfitDistribution.objects.create(
+            kikoba=self.kikoba, cycle_start_date=CYCLE[0], cycle_end_date=CYCLE[1],
+            total_profit=Decimal('0'), created_by=self.admin
+        )
+        rows = distribute(distribution)
+        self.assertEqual(len(rows), 3)
+        distribution.refresh_from_db()
+        self.assertEqual(distribution.total_profit, Decimal('1500.00'))
+
+    def test_api_creates_and_shares_out_a_distribution(self):
+        KikobaMembership.objects.create(kikoba=self.kikoba, user=self.admin, role='treasurer')
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.admin)}')
+        data = {
+            'kikoba': self.kikoba.id, 'cycle_start_date': '2025-01-01', 'cycle_end_date': '2025-12-31',
+            'total_profit': '999999.00'
+        }
+        response = client.post('/api/reports/profit-distributions/', data, format='json')
+        self.assertEqual(response.status_code, 201, response.content[:200])
+        distribution = ProfitDistribution.objects.get(pk=response.data['id'])
+        # The treasurer joined without contributing and still gets an equal profit share
+        self.assertEqual(distribution.total_profit, Decimal('1500.00'))
+        self.assertEqual(distribution.member_profits.count(), 4)
+
+        response = client.post('/api/reports/profit-distributions/', data, format='json')
+        self.assertEqual(response.status_code, 400)
+        outsider = Kikoba.objects.create(name='Outsider Kikoba', kikoba_number='SO004')
+        response = client.post('/api/reports/profit-distributions/', {**data, 'kikoba': outsider.id}, format='json')
+        self.assertEqual(response.status_code, 403)
 
-# Create your tests here.
+    def test_command(self):
+        out = io.StringIO()
+        call_command('run_share_out', start='2025-01-01', end='2025-12-31', kikoba_number=['SO001', 'SO002'],
+                     created_by=self.admin.phone_number, workers=1, stdout=out)
+        self.assertIn('SO002: skipped', out.getvalue())
+        self.assertEqual(ProfitDistribution.objects.get().kikoba, self.kikoba)
@@ -1,15 +1,15 @@
 from django.shortcuts import render
 from rest_framework import viewsets, permissions, status, filters
 from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied
 from rest_framework.response import Response
-from .models import Report, ProfitDistribution, MemberProfit
+from .models import Report, ProfitDistribution
 from .serializers import ReportSerializer, ProfitDistributionSerializer, MemberProfitSerializer
+from .shareout import distribute
 from groups.models import Kikoba, KikobaMembership
-from savings.models import MemberBalance
 from loans.models import Loan
-from django.db.models import Sum, F, ExpressionWrapper, DecimalField, Q
+from django.db.models import F, ExpressionWrapper, DecimalField, Q
 from django.utils import timezone
-from decimal import Decimal
 import csv
 import io
 from django.http import HttpResponse
@@ -27,9 +27,9 @@ class IsKikobaAdmin(permissions.BasePermission):
     """
     def has_object_permission(self, request, view, obj):
         # Check if user is an admin in the kikoba
-        if hasattr(obj, 'group'): # Assuming obj.group is the kikoba instance
+        if getattr(obj, 'kikoba_id', None):
             return KikobaMembership.objects.filter( # MODIFIED: Changed from GroupMembership
-                kikoba=obj.group, # MODIFIED: Changed from group to kikoba
+                kikoba_id=obj.kikoba_id,
                 user=request.user,
                 role__in=['chairperson', 'treasurer', 'kikoba_admin'], # MODIFIED: Added kikoba_admin
                 is_active=True
@@ -119,13 +119,22 @@ class ProfitDistributionViewSet(viewsets.ModelViewSet):
             is_active=True
         ).values_list('kikoba', flat=True) # MODIFIED: Changed from group to kikoba
         
-        # Assuming ProfitDistribution.group refers to a Kikoba instance
-        return ProfitDistribution.objects.filter(group__in=admin_vikoba)
+        return ProfitDistribution.objects.filter(kikoba__in=admin_vikoba)
     
     def perform_create(self, serializer):
+        kikoba = serializer.validated_data.get('kikoba')
+        if kikoba is None or not KikobaMembership.objects.filter(
+            user=self.request.user,
+            kikoba=kikoba,
+            role__in=['chairperson', 'treasurer', 'kikoba_admin'],
+            is_active=True
+        ).exists():
+            raise PermissionDenied("Only admins of the kikoba can create its profit distribution")
+        # total_profit is read-only: the share-out sets it to the profit it distributes
         profit_distribution = serializer.save(
             created_by=self.request.user,
-            distributed_date=timezone.now()
+            distributed_date=timezone.now(),
+            total_profit=0
         )
         
         if not profit_distribution.is_finalized:
@@ -152,35 +161,5 @@ class ProfitDistributionViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
     
     def calculate_profit_distribution(self, distribution):
-        """Calculate profit distribution based on member contributions"""
-        kikoba = distribution.group # This is a Kikoba instance
-        start_date = distribution.cycle_start_date
-        end_date = distribution.cycle_end_date
-        
-        # Get all active members with contributions in this kikoba
-        members = MemberBalance.objects.filter(
-            group=kikoba, # Ensure MemberBalance.group refers to Kikoba
-            total_contribution__gt=0
-        )
-        
-        # Calculate total group contribution
-        total_contribution = members.aggregate(
-            total=Sum('total_contribution')
-        )['total'] or Decimal('0.00')
-        
-        if total_contribution <= 0:
-            return
-        
-        # For each member, calculate their percentage and profit amount
-        for member_balance in members:
-            percentage = (member_balance.total_contribution / total_contribution) * 100
-            profit_amount = (percentage / 100) * distribution.total_profit
-            
-            # Create or update MemberProfit
-            MemberProfit.objects.create(
-                distribution=distribution,
-                member=member_balance.member,
-                total_contribution=member_balance.total_contribution,
-                contribution_percentage=percentage,
-                profit_amount=profit_amount
-            )
+        """Share out the distribution's cycle under the kikoba's payout model and set its total_profit"""
+        distribute(distribution)
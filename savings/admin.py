@@ -1,6 +1,8 @@
 from django.contrib import admin
 from .models import SavingCycle, Contribution
+from django.db import transaction
 from django.utils import timezone
+from groups import ledger
 
 @admin.register(SavingCycle)
 class SavingCycleAdmin(admin.ModelAdmin):
@@ -21,5 +23,8 @@ class ContributionAdmin(admin.ModelAdmin):
     actions = ['mark_as_verified']
 
     def mark_as_verified(self, request, queryset):
-        queryset.update(is_verified=True, verified_by=request.user, verified_at=timezone.now())
+        with transaction.atomic():
+            queryset.update(is_verified=True, verified_by=request.user, verified_at=timezone.now())
+            # update() skips save(), so post the verified contributions here
+            ledger.sync(Contribution, queryset)
     mark_as_verified.short_description = "Mark selected contributions as verified"
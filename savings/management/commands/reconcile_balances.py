@@ -0,0 +1,98 @@
+"""
+Management command to reconcile KikobaBalance and MemberBalance rows.
+Balances are maintained by deltas on write; this recomputes them from
+savings, loans and repayments and corrects any drift (for example after
+bulk imports or direct database edits that bypass model save()).
+"""
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from groups.models import Kikoba
+from savings.models import KikobaBalance, MemberBalance
+
+
+class Command(BaseCommand):
+    help = 'Recompute kikoba and member balances and correct any drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--kikoba-number',
+            type=str,
+            help='Only reconcile this kikoba (default: all vikoba)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report drift without correcting it',
+        )
+
+    def handle(self, *args, **options):
+        kikoba_number = options.get('kikoba_number')
+        dry_run = options.get('dry_run')
+
+        vikoba = Kikoba.objects.all()
+        if kikoba_number:
+            vikoba = vikoba.filter(kikoba_number=kikoba_number)
+            if not vikoba.exists():
+                self.stdout.write(self.style.ERROR(f'Kikoba with number {kikoba_number} not found'))
+                return
+        kikoba_ids = list(vikoba.values_list('id', flat=True))
+        zero = Decimal('0')
+
+        with transaction.atomic():
+            # Lock the stored balances so concurrent deltas apply after the correction
+            stored_kikoba = {
+                balance.kikoba_id: balance
+                for balance in KikobaBalance.objects.select_for_update().filter(kikoba_id__in=kikoba_ids)
+            }
+            stored_members = {
+                (balance.group_id, balance.member_id): balance
+                for balance in MemberBalance.objects.select_for_update().filter(group_id__in=kikoba_ids)
+            }
+            kikoba_totals = KikobaBalance.compute_totals(kikoba_ids)
+            member_totals = MemberBalance.compute_totals(kikoba_ids)
+
+            kikoba_fixes = []
+            now = timezone.now()
+            for kikoba_id in kikoba_ids:
+                figures = kikoba_totals.get(kikoba_id)
+                balance = stored_kikoba.get(kikoba_id)
+                if balance is None:
+                    if figures is None:
+                        continue
+                    balance = KikobaBalance(kikoba_id=kikoba_id)
+                figures = figures or {'total_savings': zero, 'total_loans': zero, 'available_balance': zero}
+                if all(getattr(balance, field) == value for field, value in figures.items()) and balance.pk:
+                    continue
+                for field, value in figures.items():
+                    setattr(balance, field, value)
+                balance.last_updated = now
+                kikoba_fixes.append(balance)
+
+            member_fixes = []
+            for key in set(stored_members) | set(member_totals):
+                figures = member_totals.get(key, {'total_contribution': zero, 'last_contribution': None})
+                balance = stored_members.get(key) or MemberBalance(group_id=key[0], member_id=key[1])
+                if balance.pk and balance.total_contribution == figures['total_contribution'] \
+                        and balance.last_contribution == figures['last_contribution']:
+                    continue
+                balance.total_contribution = figures['total_contribution']
+                balance.last_contribution = figures['last_contribution']
+                member_fixes.append(balance)
+
+            if not dry_run:
+                for balance in kikoba_fixes + member_fixes:
+                    balance.save()
+
+        for balance in kikoba_fixes:
+            self.stdout.write(
+                f'Kikoba {balance.kikoba_id}: savings {balance.total_savings:,.2f}, '
+                f'loans {balance.total_loans:,.2f}, available {balance.available_balance:,.2f}'
+            )
+        verb = 'Found' if dry_run else 'Corrected'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {len(kikoba_fixes)} kikoba balance(s) and {len(member_fixes)} member balance(s) out of step'
+        ))
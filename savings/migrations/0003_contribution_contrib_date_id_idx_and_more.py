@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:47
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("groups", "0013_kikoba_ledger_version"),
+        ("savings", "0002_savingcycle_contribution"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="contribution",
+            index=models.Index(
+                fields=["-date_contributed", "-id"], name="contrib_date_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="saving",
+            index=models.Index(
+                fields=["-transaction_date", "-id"], name="saving_txn_date_id_idx"
+            ),
+        ),
+    ]
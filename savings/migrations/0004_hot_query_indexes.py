@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:28
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("groups", "0016_hot_query_indexes"),
+        ("savings", "0003_contribution_contrib_date_id_idx_and_more"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="contribution",
+            index=models.Index(
+                fields=["kikoba", "-date_contributed"], name="contrib_kikoba_date_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="saving",
+            index=models.Index(
+                fields=["group", "member", "status", "transaction_date"],
+                name="saving_group_member_status_idx",
+            ),
+        ),
+    ]
@@ -1,9 +1,13 @@
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
+from decimal import Decimal
+from money import to_decimal
+from groups.ledger import CONTRIBUTIONS, SAVINGS, LedgerPostingMixin, cents, payment_legs
+from groups.models import LedgerVersionMixin
 
-class Saving(models.Model):
+class Saving(LedgerPostingMixin, models.Model):
     STATUS_CHOICES = (
         ('pending', 'Pending'),
         ('confirmed', 'Confirmed'),
@@ -26,9 +30,21 @@ class Saving(models.Model):
     transaction_reference = models.CharField(max_length=100, blank=True)
     notes = models.TextField(blank=True)
     
+    class Meta:
+        indexes = [
+            # Keyset pagination of the savings history (api.pagination)
+            models.Index(fields=['-transaction_date', '-id'], name='saving_txn_date_id_idx'),
+            # A member's confirmed savings and the latest of them (MemberBalance.apply_delta)
+            models.Index(fields=['group', 'member', 'status', 'transaction_date'], name='saving_group_member_status_idx'),
+        ]
+    
     def __str__(self):
         return f"{self.member.name} saved {self.amount} in {self.group.name}"
     
+    BALANCE_TRACKED_FIELDS = ('group_id', 'member_id', 'amount', 'status', 'transaction_date')
+    ledger_kikoba_path = 'group_id'
+    ledger_date_field = 'transaction_date'
+
     def confirm(self, confirmed_by):
         self.status = 'confirmed'
         self.confirmed_by = confirmed_by
@@ -41,8 +57,59 @@ class Saving(models.Model):
         self.confirmation_date = timezone.now()
         self.save()
 
+    def _balance_state(self):
+        return {field: getattr(self, field) for field in self.BALANCE_TRACKED_FIELDS}
+
+    def ledger_legs(self, posted):
+        if self.status != 'confirmed':
+            return {}
+        return payment_legs(self.group_id, self.member_id, SAVINGS, cents(self.amount))
+
+    def _stored_balance_state(self):
+        if self._state.adding or self.pk is None:
+            return None
+        return Saving.objects.select_for_update().filter(pk=self.pk).values(*self.BALANCE_TRACKED_FIELDS).first()
+
+    def _apply_balance_change(self, old_state, new_state):
+        """Move KikobaBalance and MemberBalance by the change in confirmed savings."""
+        if old_state == new_state:
+            return
+        deltas = {}
+        for state, sign in ((old_state, -1), (new_state, 1)):
+            if state is None or state['status'] != 'confirmed':
+                continue
+            key = (state['group_id'], state['member_id'])
+            amount, last = deltas.get(key, (Decimal('0'), None))
+            deltas[key] = (amount + sign * to_decimal(state['amount']), state['transaction_date'] if sign > 0 else last)
+        for (kikoba_id, member_id), (amount, contributed_at) in deltas.items():
+            KikobaBalance.apply_delta(kikoba_id, savings=amount)
+            MemberBalance.apply_delta(kikoba_id, member_id, amount, contributed_at)
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            old_state = self._stored_balance_state()
+            new_state = self._balance_state()
+            # The ledger legs depend on the tracked fields only
+            super().save(*args, sync_ledger=old_state != new_state, **kwargs)
+            self._apply_balance_change(old_state, new_state)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            old_state = self._stored_balance_state()
+            result = super().delete(*args, **kwargs)
+            self._apply_balance_change(old_state, None)
+        return result
+
 class KikobaBalance(models.Model): # Renamed from GroupBalance
-    """This model tracks the total balance of a kikoba at any given time"""
+    """
+    This model tracks the total balance of a kikoba at any given time.
+
+    Figures are moved by F() deltas when savings are confirmed or reversed,
+    loans are disbursed and repayments are verified, so reading a balance
+    never recomputes it. ``total_loans`` is the net loan book: disbursed
+    principal less verified repayments. The ``reconcile_balances`` command
+    recomputes the figures to catch drift.
+    """
     kikoba = models.OneToOneField('groups.Kikoba', on_delete=models.CASCADE, related_name='kikoba_balance_detail') # Renamed from group, updated related_name
     total_savings = models.DecimalField(max_digits=12, decimal_places=2, default=0)
     total_loans = models.DecimalField(max_digits=12, decimal_places=2, default=0)
@@ -51,31 +118,82 @@ class KikobaBalance(models.Model): # Renamed from GroupBalance
     
     def __str__(self):
         return f"{self.kikoba.name} Balance: {self.available_balance}" # Changed to self.kikoba.name
+
+    @classmethod
+    def compute_totals(cls, kikoba_ids=None):
+        """
+        Recompute balances from savings, loans and repayments with grouped queries.
+
+        Args:
+            kikoba_ids: Restrict to these kikobas (all kikobas if None)
+
+        Returns:
+            Dictionary mapping kikoba id to total_savings, total_loans and available_balance
+        """
+        from loans.models import Loan, Repayment
+
+        savings = Saving.objects.filter(status='confirmed')
+        loans = Loan.objects.exclude(status__in=Loan.UNDISBURSED_STATUSES)
+        repayments = Repayment.objects.filter(is_verified=True)
+        if kikoba_ids is not None:
+            kikoba_ids = list(kikoba_ids)
+            savings = savings.filter(group_id__in=kikoba_ids)
+            loans = loans.filter(application__kikoba_id__in=kikoba_ids)
+            repayments = repayments.filter(loan__application__kikoba_id__in=kikoba_ids)
+
+        zero = Decimal('0')
+        totals = {}
+
+        def row_for(kikoba_id):
+            return totals.setdefault(kikoba_id, {'total_savings': zero, 'total_loans': zero})
+
+        for row in savings.values('group_id').annotate(total=models.Sum('amount')).order_by():
+            row_for(row['group_id'])['total_savings'] += row['total'] or zero
+        for row in loans.values('application__kikoba_id').annotate(total=models.Sum('disbursed_amount')).order_by():
+            row_for(row['application__kikoba_id'])['total_loans'] += row['total'] or zero
+        for row in repayments.values('loan__application__kikoba_id').annotate(total=models.Sum('amount_paid')).order_by():
+            row_for(row['loan__application__kikoba_id'])['total_loans'] -= row['total'] or zero
+
+        for figures in totals.values():
+            figures['available_balance'] = figures['total_savings'] - figures['total_loans']
+        return totals
+
+    @classmethod
+    def apply_delta(cls, kikoba_id, savings=Decimal('0'), loans=Decimal('0')):
+        """Atomically add confirmed savings and net loan book changes to a kikoba's balance."""
+        if not kikoba_id or not (savings or loans):
+            return
+        changes = {
+            'total_savings': models.F('total_savings') + savings,
+            'total_loans': models.F('total_loans') + loans,
+            'available_balance': models.F('available_balance') + savings - loans,
+            'last_updated': timezone.now(),
+        }
+        if cls.objects.filter(kikoba_id=kikoba_id).update(**changes):
+            return
+        # First movement for this kikoba: start from the recomputed figures,
+        # which already include the write being recorded
+        with transaction.atomic():
+            figures = cls.compute_totals([kikoba_id]).get(kikoba_id, {})
+            balance, created = cls.objects.get_or_create(kikoba_id=kikoba_id, defaults=figures)
+            if not created:
+                cls.objects.filter(pk=balance.pk).update(**changes)
     
     def update_balance(self):
         """Recalculate the kikoba balance"""
-        from loans.models import Loan
-        
-        total_savings = Saving.objects.filter(
-            group=self.kikoba, # Changed from self.group
-            status='confirmed'
-        ).aggregate(models.Sum('amount'))['amount__sum'] or 0
-        
-        total_loans = Loan.objects.filter(
-            group=self.kikoba, # Changed from self.group
-            status__in=['approved', 'partially_paid']
-        ).aggregate(
-            models.Sum(models.F('amount') - models.F('amount_paid'))
-        )['amount__sum'] or 0
-        
-        self.total_savings = total_savings
-        self.total_loans = total_loans
-        self.available_balance = total_savings - total_loans
+        figures = self.compute_totals([self.kikoba_id]).get(self.kikoba_id, {})
+        self.total_savings = figures.get('total_savings', Decimal('0'))
+        self.total_loans = figures.get('total_loans', Decimal('0'))
+        self.available_balance = figures.get('available_balance', Decimal('0'))
         self.last_updated = timezone.now()
         self.save()
 
 class MemberBalance(models.Model):
-    """This model tracks each member's total contribution to a kikoba"""
+    """
+    This model tracks each member's total contribution to a kikoba.
+
+    Maintained by deltas from Saving.save(); see ``KikobaBalance``.
+    """
     group = models.ForeignKey('groups.Kikoba', on_delete=models.CASCADE, related_name='member_balances')  # Changed Group to Kikoba
     member = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='balances')
     total_contribution = models.DecimalField(max_digits=10, decimal_places=2, default=0)
@@ -86,24 +204,65 @@ class MemberBalance(models.Model):
     
     def __str__(self):
         return f"{self.member.name} contribution in {self.group.name}: {self.total_contribution}"
+
+    @classmethod
+    def compute_totals(cls, kikoba_ids=None):
+        """
+        Recompute member contributions from confirmed savings with one grouped query.
+
+        Returns:
+            Dictionary mapping (kikoba id, member id) to total_contribution and last_contribution
+        """
+        savings = Saving.objects.filter(status='confirmed')
+        if kikoba_ids is not None:
+            savings = savings.filter(group_id__in=list(kikoba_ids))
+        rows = savings.values('group_id', 'member_id').annotate(
+            total=models.Sum('amount'),
+            last=models.Max('transaction_date')
+        ).order_by()
+        return {
+            (row['group_id'], row['member_id']): {
+                'total_contribution': row['total'] or Decimal('0'),
+                'last_contribution': row['last'],
+            }
+            for row in rows
+        }
+
+    @classmethod
+    def apply_delta(cls, kikoba_id, member_id, amount, contributed_at=None):
+        """Atomically add ``amount`` of confirmed savings to a member's balance."""
+        if not amount:
+            return
+        balances = cls.objects.filter(group_id=kikoba_id, member_id=member_id)
+        changes = {'total_contribution': models.F('total_contribution') + amount}
+        if amount > 0 and contributed_at:
+            changes['last_contribution'] = models.Case(
+                models.When(
+                    models.Q(last_contribution__isnull=True) | models.Q(last_contribution__lt=contributed_at),
+                    then=models.Value(contributed_at, output_field=models.DateTimeField()),
+                ),
+                default=models.F('last_contribution'),
+            )
+        if not balances.update(**changes):
+            with transaction.atomic():
+                figures = cls.compute_totals([kikoba_id]).get((kikoba_id, member_id), {})
+                balance, created = cls.objects.get_or_create(group_id=kikoba_id, member_id=member_id, defaults=figures)
+                if created:
+                    return
+                balances.update(**changes)
+        if amount < 0:
+            # A confirmed saving was reversed; the latest date may have gone with it
+            last = Saving.objects.filter(
+                group_id=kikoba_id, member_id=member_id, status='confirmed'
+            ).aggregate(last=models.Max('transaction_date'))['last']
+            balances.update(last_contribution=last)
     
     def update_balance(self):
         """Recalculate the member's total contribution"""
-        total = Saving.objects.filter(
-            group=self.group,
-            member=self.member,
-            status='confirmed'
-        ).aggregate(models.Sum('amount'))['amount__sum'] or 0
-        
-        last_saving = Saving.objects.filter(
-            group=self.group,
-            member=self.member,
-            status='confirmed'
-        ).order_by('-transaction_date').first()
-        
-        self.total_contribution = total
-        if last_saving:
-            self.last_contribution = last_saving.transaction_date
+        figures = self.compute_totals([self.group_id]).get((self.group_id, self.member_id), {})
+        self.total_contribution = figures.get('total_contribution', Decimal('0'))
+        if figures.get('last_contribution'):
+            self.last_contribution = figures['last_contribution']
         self.save()
 
 class SavingCycle(models.Model):
@@ -122,7 +281,9 @@ class SavingCycle(models.Model):
         verbose_name_plural = _("Saving Cycles")
         ordering = ['-start_date']
 
-class Contribution(models.Model):
+class Contribution(LedgerPostingMixin, LedgerVersionMixin, models.Model):
+    ledger_date_field = 'date_contributed'
+
     member = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='contributions')
     kikoba = models.ForeignKey('groups.Kikoba', on_delete=models.CASCADE, related_name='kikoba_contributions')
     saving_cycle = models.ForeignKey(SavingCycle, on_delete=models.SET_NULL, null=True, blank=True, related_name='cycle_contributions')
@@ -136,7 +297,18 @@ class Contribution(models.Model):
     def __str__(self):
         return f"{self.member.name} - {self.amount} to {self.kikoba.name}"
 
+    def ledger_legs(self, posted):
+        if not self.is_verified:
+            return {}
+        return payment_legs(self.kikoba_id, self.member_id, CONTRIBUTIONS, cents(self.amount))
+
     class Meta:
         verbose_name = _("Contribution")
         verbose_name_plural = _("Contributions")
         ordering = ['-date_contributed']
+        indexes = [
+            # Keyset pagination of the contributions history (api.pagination)
+            models.Index(fields=['-date_contributed', '-id'], name='contrib_date_id_idx'),
+            # A kikoba's recent contributions (dashboards)
+            models.Index(fields=['kikoba', '-date_contributed'], name='contrib_kikoba_date_idx'),
+        ]
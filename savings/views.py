@@ -59,19 +59,9 @@ class SavingViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
+        # Member and kikoba balances are moved by Saving.save()
         saving.confirm(request.user)
         
-        # Update member balance
-        member_balance, created = MemberBalance.objects.get_or_create(
-            group=saving.group,
-            member=saving.member
-        )
-        member_balance.update_balance()
-        
-        # Update kikoba balance
-        kikoba_balance, created = KikobaBalance.objects.get_or_create(kikoba=saving.group)
-        kikoba_balance.update_balance()
-        
         serializer = self.get_serializer(saving)
         return Response(serializer.data)
     
@@ -0,0 +1,68 @@
+"""
+Unit tests for loan repayment schedules in finance.py.
+"""
+import unittest
+from datetime import date
+from decimal import Decimal
+
+from finance import AmortizationSchedule, VikobaCalculator, add_months
+from money import Amount
+
+
+class TestAddMonths(unittest.TestCase):
+    """Test monthly due date arithmetic."""
+
+    def test_clamps_to_month_end(self):
+        self.assertEqual(add_months(date(2025, 1, 31), 1), date(2025, 2, 28))
+        self.assertEqual(add_months(date(2024, 1, 31), 1), date(2024, 2, 29))
+        self.assertEqual(add_months(date(2025, 1, 31), 2), date(2025, 3, 31))
+
+    def test_crosses_year_end(self):
+        self.assertEqual(add_months(date(2025, 11, 15), 3), date(2026, 2, 15))
+
+
+class TestAmortizationSchedule(unittest.TestCase):
+    """Test flat and reducing-balance schedules."""
+
+    def test_flat_matches_calculate_loan(self):
+        schedule = AmortizationSchedule.generate(Decimal('10000'), Decimal('0.10'), 12, date(2025, 1, 1))
+        loan = VikobaCalculator.calculate_loan(10000, 0.10, 12)
+        self.assertEqual(len(schedule), 12)
+        self.assertEqual(Amount.sum(i.total for i in schedule), Amount.from_decimal(loan.total_repayment))
+        self.assertEqual(Amount.sum(i.principal for i in schedule), Amount.from_decimal('10000'))
+        self.assertEqual(schedule[0].principal, Amount.from_decimal('833.34'))
+        self.assertEqual(schedule[-1].principal, Amount.from_decimal('833.33'))
+
+    def test_reducing_balance_constant_installment(self):
+        schedule = AmortizationSchedule.generate(
+            Decimal('10000'), Decimal('0.12'), 12, date(2025, 1, 1), method=AmortizationSchedule.REDUCING_BALANCE
+        )
+        totals = {i.total for i in schedule[:-1]}
+        self.assertEqual(totals, {Amount.from_decimal('888.49')})
+        self.assertEqual(schedule[0].interest, Amount.from_decimal('100.00'))
+        self.assertEqual(Amount.sum(i.principal for i in schedule), Amount.from_decimal('10000'))
+        self.assertLessEqual(abs(schedule[-1].total - Amount.from_decimal('888.49')), Amount(12))
+
+    def test_zero_rate_reducing_balance(self):
+        schedule = AmortizationSchedule.generate(
+            Decimal('100'), Decimal('0'), 3, date(2025, 1, 1), method=AmortizationSchedule.REDUCING_BALANCE
+        )
+        self.assertEqual([i.principal.cents for i in schedule], [3334, 3333, 3333])
+        self.assertFalse(any(i.interest for i in schedule))
+
+    def test_grace_period_defers_first_due_date(self):
+        schedule = AmortizationSchedule.generate(
+            Decimal('1000'), Decimal('0.10'), 2, date(2025, 1, 10), grace_period_days=30
+        )
+        self.assertEqual([i.due_date for i in schedule], [date(2025, 3, 9), date(2025, 4, 9)])
+
+    def test_invalid_method(self):
+        with self.assertRaises(ValueError):
+            AmortizationSchedule.generate(Decimal('1000'), Decimal('0.10'), 2, date(2025, 1, 1), method='balloon')
+
+    def test_no_term(self):
+        self.assertEqual(AmortizationSchedule.generate(Decimal('1000'), Decimal('0.10'), 0, date(2025, 1, 1)), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+"""
+Unit tests for the integer minor-unit money type.
+"""
+import unittest
+from decimal import Decimal, ROUND_HALF_EVEN, ROUND_FLOOR, ROUND_CEILING, ROUND_DOWN, getcontext
+
+from money import Amount, ZERO, to_decimal
+
+
+class TestAmount(unittest.TestCase):
+    """Test conversion, arithmetic and rounding of Amount."""
+
+    def test_from_decimal_rounds_half_up_by_default(self):
+        self.assertEqual(Amount.from_decimal(Decimal('10.005')).cents, 1001)
+        self.assertEqual(Amount.from_decimal(Decimal('-10.005')).cents, -1001)
+        self.assertEqual(Amount.from_decimal(Decimal('10.005'), rounding=ROUND_HALF_EVEN).cents, 1000)
+
+    def test_from_float_and_int(self):
+        self.assertEqual(Amount.from_decimal(0.1).cents, 10)
+        self.assertEqual(Amount.from_decimal(12).cents, 1200)
+        self.assertEqual(to_decimal(0.1), Decimal('0.1'))
+
+    def test_no_float_drift(self):
+        total = sum((Amount.from_decimal('0.1') for _ in range(10)), ZERO)
+        self.assertEqual(total, Amount.from_decimal(1))
+        self.assertEqual(float(total), 1.0)
+
+    def test_large_values_keep_every_digit(self):
+        value = Decimal('123456789012345.67')
+        self.assertEqual(Amount.from_decimal(value).to_decimal(), value)
+
+    def test_arithmetic(self):
+        a = Amount.from_decimal('100.50')
+        b = Amount.from_decimal('0.75')
+        self.assertEqual(a + b, Amount(10125))
+        self.assertEqual(a - b, Amount(9975))
+        self.assertEqual(-b, Amount(-75))
+        self.assertEqual(b * 3, Amount(225))
+        self.assertEqual(Amount.sum([a, b, b]), Amount(10200))
+        self.assertTrue(b < a)
+        self.assertEqual(max(b - a, ZERO), ZERO)
+
+    def test_rejects_fractional_minor_units_and_foreign_comparisons(self):
+        for cents in (1.5, 1.0, Decimal('1.5'), '150'):
+            with self.assertRaises(TypeError):
+                Amount(cents)
+        with self.assertRaises(TypeError):
+            Amount(100) < 2
+        with self.assertRaises(TypeError):
+            Amount(100) >= Decimal('1.00')
+
+    def test_multiply_and_divide_round_explicitly(self):
+        a = Amount(1000)
+        self.assertEqual(a.multiply(Decimal('0.125')), Amount(125))
+        self.assertEqual(Amount(1001).multiply('0.5'), Amount(501))
+        self.assertEqual(Amount(1001).multiply('0.5', rounding=ROUND_HALF_EVEN), Amount(500))
+        self.assertEqual(a.divide(3), Amount(333))
+        self.assertEqual(a.divide(3, rounding=ROUND_CEILING), Amount(334))
+        self.assertEqual(Amount(-1000).divide(3, rounding=ROUND_FLOOR), Amount(-334))
+        self.assertEqual(Amount(-1000).divide(3, rounding=ROUND_DOWN), Amount(-333))
+
+    def test_allocate_reconciles(self):
+        parts = Amount(10000).allocate([1, 1, 1])
+        self.assertEqual(parts, [Amount(3334), Amount(3333), Amount(3333)])
+        self.assertEqual(Amount.sum(parts), Amount(10000))
+
+    def test_to_decimal_has_two_places(self):
+        self.assertEqual(str(Amount(5)), '0.05')
+        self.assertEqual(Amount(123400).to_decimal(), Decimal('1234.00'))
+
+    def test_importing_finance_leaves_decimal_context_alone(self):
+        precision = getcontext().prec
+        import finance  # noqa: F401
+        self.assertEqual(getcontext().prec, precision)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,195 @@
+"""
+Tests for the minor-unit payout engine in finance.py.
+
+The engine's share-out payouts must agree with the per-member Decimal
+formulas (``calculate_member_payout``) to within one minor unit per member,
+and add up exactly to the group total rounded to the minor unit.
+"""
+import random
+import unittest
+from decimal import Decimal, localcontext
+
+from finance import (
+    MemberContribution, MemberContributionSet, GroupTotals, ContributionColumns, PayoutEngine,
+    StandardVikoba, FixedShareVikoba, InterestRefundVikoba,
+    allocate_largest_remainder
+)
+from money import MINOR_UNITS
+
+CENT = Decimal('0.01')
+CALCULATORS = (StandardVikoba, FixedShareVikoba, InterestRefundVikoba)
+
+
+def reference_payouts(calculator, members, total_interest, total_fines):
+    """Unrounded payouts from the Decimal formulas, at full precision."""
+    with localcontext() as ctx:
+        ctx.prec = 50
+        totals = GroupTotals(
+            total_shares=sum((m.shares for m in members), Decimal('0')),
+            member_count=len(members),
+            total_interest=total_interest,
+            total_fines=total_fines
+        )
+        return {m.member_id: calculator.calculate_member_payout(m, totals) for m in members}
+
+
+def random_members(count, seed):
+    rng = random.Random(seed)
+    return [
+        MemberContribution(
+            member_id=i,
+            shares=Decimal(rng.randint(1, 50_000)) / Decimal('7'),
+            fixed_contribution=Decimal(rng.randint(0, 5_000_000)).scaleb(-2),
+            interest_paid=Decimal(rng.randint(0, 300_000)).scaleb(-2)
+        )
+        for i in range(count)
+    ]
+
+
+class TestLargestRemainder(unittest.TestCase):
+    """Test rounding of exact amounts to whole minor units."""
+
+    def test_remainder_goes_to_earliest_on_ties(self):
+        self.assertEqual(allocate_largest_remainder([100, 100, 100], 3), [34, 33, 33])
+
+    def test_largest_remainder_wins(self):
+        # 1.2, 1.5, 2.3 -> total 5: the 0.5 remainder gets the extra unit
+        self.assertEqual(allocate_largest_remainder([12, 15, 23], 10), [1, 2, 2])
+
+    def test_exact_amounts_unchanged(self):
+        self.assertEqual(allocate_largest_remainder([200, 400], 100), [2, 4])
+
+    def test_empty(self):
+        self.assertEqual(allocate_largest_remainder([], 7), [])
+
+
+class TestPayoutEngine(unittest.TestCase):
+    """Test the engine against the Decimal calculators."""
+
+    def assertMatchesReference(self, calculator, members, total_interest, total_fines):
+        payouts = calculator.calculate_share_out_payouts(members, total_interest, total_fines)
+        reference = reference_payouts(calculator, members, total_interest, total_fines)
+        self.assertEqual(set(payouts), set(reference))
+        for member_id, payout in payouts.items():
+            self.assertEqual(payout.as_tuple().exponent, -2)
+            with localcontext() as ctx:
+                ctx.prec = 50
+                self.assertLessEqual(abs(payout - reference[member_id]), CENT)
+        with localcontext() as ctx:
+            ctx.prec = 50
+            expected_total = sum(reference.values(), Decimal('0')).quantize(CENT)
+            self.assertEqual(sum(payouts.values(), Decimal('0')), expected_total)
+
+    def test_exact_results_are_equal(self):
+        members = [
+            MemberContribution(member_id=1, shares=Decimal('5'), fixed_contribution=Decimal('1000'), interest_paid=Decimal('1500')),
+            MemberContribution(member_id=2, shares=Decimal('3'), fixed_contribution=Decimal('1000'), interest_paid=Decimal('500')),
+            MemberContribution(member_id=3, shares=Decimal('2'), fixed_contribution=Decimal('1000')),
+        ]
+        for calculator in CALCULATORS:
+            with self.subTest(calculator=calculator.__name__):
+                payouts = calculator.calculate_share_out_payouts(members, Decimal('9000'), Decimal('3000'))
+                reference = reference_payouts(calculator, members, Decimal('9000'), Decimal('3000'))
+                self.assertEqual(payouts, reference)
+
+    def test_small_groups(self):
+        for seed in range(20):
+            members = random_members(random.Random(seed).randint(1, 30), seed)
+            for calculator in CALCULATORS:
+                with self.subTest(seed=seed, calculator=calculator.__name__):
+                    self.assertMatchesReference(calculator, members, Decimal('123456.78'), Decimal('9999.99'))
+
+    def test_large_federation(self):
+        members = random_members(20_000, 99)
+        for calculator in CALCULATORS:
+            with self.subTest(calculator=calculator.__name__):
+                self.assertMatchesReference(calculator, members, Decimal('987654321.09'), Decimal('1234567.89'))
+
+    def test_no_shares(self):
+        members = [MemberContribution(member_id=1), MemberContribution(member_id=2)]
+        self.assertEqual(StandardVikoba.calculate_payouts(members, Decimal('100'), Decimal('0')), {})
+        self.assertEqual(FixedShareVikoba.calculate_payouts([], Decimal('100'), Decimal('0')), {})
+
+    def test_standard_share_out_is_money(self):
+        # 3 and 1 shares of 10,000; 1,500 interest and 500 fines shared by shares
+        members = [
+            MemberContribution(member_id=1, shares=Decimal('3'), fixed_contribution=Decimal('30000')),
+            MemberContribution(member_id=2, shares=Decimal('1'), fixed_contribution=Decimal('10000')),
+        ]
+        payouts = StandardVikoba.calculate_share_out_payouts(members, Decimal('1500'), Decimal('500'))
+        self.assertEqual(payouts, {1: Decimal('31500.00'), 2: Decimal('10500.00')})
+        self.assertEqual(
+            FixedShareVikoba.calculate_share_out_payouts(members, Decimal('1500'), Decimal('500')),
+            FixedShareVikoba.calculate_payouts(members, Decimal('1500'), Decimal('500'))
+        )
+
+    def test_int_amounts(self):
+        members = [
+            MemberContribution(member_id=1, shares=3, fixed_contribution=30000, interest_paid=1000),
+            MemberContribution(member_id=2, shares=1, fixed_contribution=10000),
+        ]
+        self.assertEqual(
+            StandardVikoba.calculate_share_out_payouts(members, 1500, 500),
+            {1: Decimal('31500.00'), 2: Decimal('10500.00')}
+        )
+        self.assertEqual(
+            InterestRefundVikoba.calculate_payouts(members, 1500, 500),
+            {1: Decimal('31250.00'), 2: Decimal('10250.00')}
+        )
+
+    def test_columns_hold_inputs_exactly(self):
+        members = [MemberContribution(member_id='a', shares=Decimal('1.2345'), fixed_contribution=Decimal('10.5'))]
+        columns = ContributionColumns.from_members(members, Decimal('3'), Decimal('0.1'))
+        self.assertEqual(columns.scale, 4)
+        self.assertEqual(columns.shares, [12345])
+        self.assertEqual(columns.fixed_contribution, [105000])
+        self.assertEqual(columns.total_interest, 30000)
+        self.assertEqual(columns.minor_unit_divisor * MINOR_UNITS, 10 ** columns.scale)
+        self.assertEqual(PayoutEngine.fixed_share(columns), [1360])
+
+
+class TestMemberContributionSet(unittest.TestCase):
+    """Test the columnar contribution container."""
+
+    def test_calculators_accept_a_set(self):
+        members = random_members(200, 7)
+        contributions = MemberContributionSet.from_members(members)
+        for calculator in CALCULATORS:
+            with self.subTest(calculator=calculator.__name__):
+                self.assertEqual(
+                    calculator.calculate_payouts(contributions, Decimal('5432.1'), Decimal('99.99')),
+                    calculator.calculate_payouts(members, Decimal('5432.1'), Decimal('99.99'))
+                )
+
+    def test_rows_read_like_member_contributions(self):
+        contributions = MemberContributionSet()
+        contributions.append('a', shares=Decimal('2'), fixed_contribution=Decimal('1500.50'))
+        contributions.append('b', fixed_contribution=750, interest_paid=0.25)
+        self.assertEqual(len(contributions), 2)
+        self.assertEqual([row.member_id for row in contributions], ['a', 'b'])
+        self.assertEqual(contributions[0].total_contribution, Decimal('2'))
+        self.assertEqual(contributions[-1].total_contribution, Decimal('750'))
+        self.assertEqual(contributions[1].interest_paid, Decimal('0.25'))
+        with self.assertRaises(AttributeError):
+            contributions[0].extra = 1
+        with self.assertRaises(IndexError):
+            contributions[2]
+
+    def test_scale_grows_to_hold_inputs_exactly(self):
+        contributions = MemberContributionSet()
+        contributions.append(1, shares=Decimal('3'), fixed_contribution=Decimal('10.5'))
+        contributions.append(2, shares=Decimal('1.2345'))
+        self.assertEqual(contributions.scale, 4)
+        self.assertEqual(contributions.shares, [30000, 12345])
+        self.assertEqual(contributions.fixed_contribution, [105000, 0])
+        self.assertEqual(contributions[1].shares, Decimal('1.2345'))
+
+        columns = ContributionColumns.from_members(contributions, Decimal('0.00001'), Decimal('0'))
+        self.assertEqual(columns.scale, 5)
+        self.assertEqual(columns.shares, [300000, 123450])
+        self.assertEqual(columns.total_interest, 1)
+        self.assertIs(ContributionColumns.from_members(contributions, Decimal('1'), Decimal('0')).shares, contributions.shares)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+"""
+Unit tests for the compact ROSCA rotation in finance.py.
+"""
+import unittest
+from datetime import date
+
+from finance import RoscaModel, RoscaSchedule
+from money import Amount
+
+
+class TestRoscaSchedule(unittest.TestCase):
+    """Test meeting lookup on a compact rotation."""
+
+    def setUp(self):
+        self.rotation = RoscaSchedule(recipients=[11, 12, 13], contribution=Amount(500000), start_date=date(2025, 1, 31))
+
+    def test_meetings_are_lazy_and_complete(self):
+        meetings = self.rotation.meetings()
+        first = next(meetings)
+        self.assertEqual((first.meeting_number, first.recipient, first.meeting_date), (1, 11, date(2025, 1, 31)))
+        self.assertEqual([m.meeting_date for m in meetings], [date(2025, 2, 28), date(2025, 3, 31)])
+        self.assertEqual(self.rotation.pot_size, Amount(1500000))
+
+    def test_meeting_out_of_range(self):
+        with self.assertRaises(IndexError):
+            self.rotation.meeting(4)
+
+    def test_next_meeting_by_date(self):
+        self.assertEqual(self.rotation.next_meeting(date(2024, 6, 1)).meeting_number, 1)
+        self.assertEqual(self.rotation.next_meeting(date(2025, 2, 28)).recipient, 12)
+        self.assertEqual(self.rotation.next_meeting(date(2025, 3, 1)).recipient, 13)
+        self.assertIsNone(self.rotation.next_meeting(date(2025, 4, 1)))
+
+    def test_weekly_meetings(self):
+        rotation = RoscaSchedule([1, 2, 3], Amount(100), date(2025, 1, 1), meeting_frequency='weekly')
+        self.assertEqual(rotation.meeting(3).meeting_date, date(2025, 1, 15))
+        self.assertEqual(rotation.next_meeting(date(2025, 1, 8)).meeting_number, 2)
+        self.assertEqual(rotation.next_meeting(date(2025, 1, 9)).meeting_number, 3)
+
+    def test_unknown_frequency(self):
+        with self.assertRaises(ValueError):
+            RoscaSchedule([1], Amount(100), date(2025, 1, 1), meeting_frequency='yearly')
+
+    def test_payout_schedule_shares_read_only_contributions(self):
+        schedule = RoscaModel.calculate_payout_schedule(10000, 3)
+        self.assertEqual([row['recipient'] for row in schedule], ['Member 1', 'Member 2', 'Member 3'])
+        self.assertIs(schedule[0]['contributions'], schedule[2]['contributions'])
+        self.assertEqual(dict(schedule[2]['contributions']), {'Member 1': 10000, 'Member 2': 10000, 'Member 3': 10000})
+        with self.assertRaises(TypeError):
+            schedule[0]['contributions']['Member 1'] = 0
+        self.assertIsNone(schedule[0]['meeting_date'])
+
+    def test_payout_schedule_uses_meeting_frequency(self):
+        schedule = RoscaModel.calculate_payout_schedule(10000, 3, 'biweekly', start_date=date(2025, 1, 1))
+        self.assertEqual([row['meeting_date'] for row in schedule], [date(2025, 1, 1), date(2025, 1, 15), date(2025, 1, 29)])
+        with self.assertRaises(ValueError):
+            RoscaModel.calculate_payout_schedule(10000, 3, 'yearly', start_date=date(2025, 1, 1))
+
+    def test_payout_schedule_without_dates_ignores_frequency(self):
+        schedule = RoscaModel.calculate_payout_schedule(10000, 2, 'yearly')
+        self.assertEqual([row['meeting_number'] for row in schedule], [1, 2])
+        self.assertEqual(schedule[1]['pot_size'], 20000.0)
+
+
+if __name__ == '__main__':
+    unittest.main()